@@ -3,9 +3,14 @@ import logging
 import time
 import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Pattern
+from typing import List, Dict, Any, Optional, Pattern, Callable, Tuple
+import concurrent.futures
+import shutil
+import tempfile
+import threading
 from datetime import datetime, timezone
 import fnmatch
+import heapq
 import re
 
 # Attempt to import is_probably_text from core to avoid duplication
@@ -34,12 +39,152 @@ except ImportError:
         except OSError:
             return False
 
+from .atlas_inventory import InventoryBinWriter, mtime_to_us
+
 logger = logging.getLogger(__name__)
 
+
+class AtlasScanCanceled(Exception):
+    """Raised from AtlasScanner.scan when its is_canceled callback returns True."""
+
+
+class _DirRollup:
+    """
+    Recursive directory totals, computed while the walk runs.
+
+    Directories arrive in pre-order (`enter`); a stack holds the ones on the
+    current path. A directory is complete once the walk enters something that
+    is not below it. It is then popped (post-order), its totals are added to
+    its parent, its dirs-inventory entry is written with the recursive
+    numbers, and it is offered to a bounded top_dirs heap.
+    """
+
+    def __init__(self, dirs_inv_f=None, top_n: int = 50):
+        self.dirs_inv_f = dirs_inv_f
+        self.top_n = top_n
+        # [rel, dirs-inventory entry or None, recursive bytes, recursive files, pre-order seq]
+        self._stack: List[List[Any]] = []
+        self._top: List[Tuple[int, int, str]] = []  # min-heap of (bytes, -seq, rel)
+        self._seq = 0
+
+    def enter(self, rel: str, entry: Optional[Dict[str, Any]] = None) -> None:
+        stack = self._stack
+        while stack:
+            top = stack[-1][0]
+            if top == "." or rel.startswith(top + "/"):
+                break
+            self._leave()
+        stack.append([rel, entry, 0, 0, self._seq])
+        self._seq += 1
+
+    def add(self, files: int, nbytes: int) -> None:
+        frame = self._stack[-1]
+        frame[2] += nbytes
+        frame[3] += files
+
+    def _leave(self) -> None:
+        rel, entry, nbytes, files, seq = self._stack.pop()
+        if self._stack:
+            parent = self._stack[-1]
+            parent[2] += nbytes
+            parent[3] += files
+        if entry is not None and self.dirs_inv_f is not None:
+            entry["recursive_bytes"] = nbytes
+            entry["recursive_files"] = files
+            self.dirs_inv_f.write(json.dumps(entry, ensure_ascii=False, sort_keys=True) + "\n")
+        # Ties keep walk order (earlier directory first)
+        item = (nbytes, -seq, rel)
+        if len(self._top) < self.top_n:
+            heapq.heappush(self._top, item)
+        elif item > self._top[0]:
+            heapq.heapreplace(self._top, item)
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Pops the remaining open directories; returns top_dirs (largest first)."""
+        while self._stack:
+            self._leave()
+        return [{"path": rel, "bytes": nbytes} for nbytes, _, rel in sorted(self._top, reverse=True)]
+
+
+class _UnitResult:
+    """Stats, spooled inventory lines and pre-order directories of one parallel-scan partition."""
+
+    SPOOL_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, want_inv: bool, want_dirs_inv: bool):
+        self.total_files = 0
+        self.total_dirs = 0
+        self.total_bytes = 0
+        self.extensions: Dict[str, int] = {}
+        self.repo_nodes: List[str] = []
+        # (rel, dirs-inventory entry or None, files, bytes) in pre-order, replayed into _DirRollup
+        self.dirs: List[Tuple[str, Optional[Dict[str, Any]], int, int]] = []
+        self.depth_limit_hit = False
+        self.entries_hit = False
+        self.children: List[Tuple[str, str, int]] = []
+        self.bin_records: List[Tuple[Any, ...]] = []
+        self.want_dirs_inv = want_dirs_inv
+        self.inv = tempfile.SpooledTemporaryFile(self.SPOOL_BYTES, mode="w+", encoding="utf-8") if want_inv else None
+
+    def close(self) -> None:
+        if self.inv is not None:
+            self.inv.close()
+
+
+class _ParallelScan:
+    """Shared state of a parallel scan: atomic entry budget, stop flag, progress totals."""
+
+    def __init__(self, max_entries: int, progress: Optional[Callable[[Dict[str, Any]], None]],
+                 is_canceled: Optional[Callable[[], bool]]):
+        self.max_entries = max_entries
+        self.taken = 0
+        self.entries_hit = False
+        self.canceled = False
+        self.want_bin = False
+        self._progress = progress
+        self._is_canceled = is_canceled
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._files = 0
+        self._dirs = 0
+        self._bytes = 0
+
+    def take_entry(self) -> bool:
+        with self._lock:
+            self.taken += 1
+            if self.taken > self.max_entries:
+                self.entries_hit = True
+                return False
+            return True
+
+    def report(self, files: int, nbytes: int, rel: str) -> None:
+        with self._lock:
+            self._files += files
+            self._dirs += 1
+            self._bytes += nbytes
+            snapshot = {"files": self._files, "dirs": self._dirs, "bytes": self._bytes, "current_dir": rel}
+            if self._progress:
+                self._progress(snapshot)
+        if self._is_canceled and self._is_canceled():
+            self.canceled = True
+            self.stop()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+
 class AtlasScanner:
     def __init__(self, root: Path, max_depth: int = 6, max_entries: int = 200000,
-                 exclude_globs: List[str] = None, inventory_strict: bool = False):
+                 exclude_globs: List[str] = None, inventory_strict: bool = False,
+                 index: Optional[Any] = None, workers: int = 1):
         self.root = root
+        # Optional live directory index (adapters/watch.LiveIndex); falls back to disk per directory
+        self.index = index
+        # >1: top-level subtrees are scanned by a thread pool (see _walk_parallel)
+        self.workers = max(1, int(workers or 1))
         self.max_depth = max_depth
         self.max_entries = max_entries
         self.inventory_strict = inventory_strict
@@ -138,13 +283,208 @@ class AtlasScanner:
             return True
         return False
 
-    def scan(self, inventory_file: Optional[Path] = None, dirs_inventory_file: Optional[Path] = None) -> Dict[str, Any]:
+    def _is_excluded_rel(self, rel_posix: str) -> bool:
+        return bool(self._exclude_regex.fullmatch(rel_posix))
+
+    def _scan_dir(self, abs_dir: str, rel: str, depth: int, ctx: "_ParallelScan",
+                  out: "_UnitResult") -> List[Tuple[str, str]]:
+        """
+        One directory of the parallel walk, mirroring a single os.walk step of
+        the serial loop. Returns the (abs, rel) subdirectories to descend into.
+        """
+        if depth > self.max_depth:
+            out.depth_limit_hit = True
+            return []
+
+        _scandir = self.index.scandir if self.index is not None else os.scandir
+        try:
+            with _scandir(abs_dir) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return []
+
+        dirs = []
+        files = []
+        for e in entries:
+            try:
+                is_dir = e.is_dir()  # follows symlinks, like os.walk's classification
+            except OSError:
+                is_dir = False
+            (dirs if is_dir else files).append(e)
+
+        if any(e.name == ".git" for e in dirs):
+            out.repo_nodes.append(rel)
+            dirs = [e for e in dirs if e.name != ".git"]
+
+        prefix = "" if rel == "." else rel + "/"
+        dirs = [e for e in dirs if not self._is_excluded_rel(prefix + e.name)]
+        files = [e for e in files if not self._is_excluded_rel(prefix + e.name)]
+
+        dir_entry = None
+        if out.want_dirs_inv:
+            try:
+                dir_mtime = os.stat(abs_dir).st_mtime
+            except OSError:
+                dir_mtime = 0
+            dir_entry = {
+                "rel_path": rel,
+                "depth": depth,
+                "n_files": len(files),
+                "n_dirs": len(dirs),
+                "mtime": datetime.fromtimestamp(dir_mtime, timezone.utc).isoformat().replace('+00:00', 'Z')
+            }
+
+        dir_bytes = 0
+        dir_files = 0
+        for e in files:
+            if not ctx.take_entry():
+                out.entries_hit = True
+                out.dirs.append((rel, dir_entry, dir_files, dir_bytes))
+                return []
+            try:
+                st = e.stat()  # cached on the DirEntry
+                is_sym = e.is_symlink()
+            except OSError:
+                continue
+            size = st.st_size
+            ext = os.path.splitext(e.name)[1].lower()
+            out.total_files += 1
+            out.total_bytes += size
+            out.extensions[ext] = out.extensions.get(ext, 0) + 1
+            dir_bytes += size
+            dir_files += 1
+            if out.inv is not None or ctx.want_bin:
+                f_path = Path(abs_dir) / e.name
+                is_txt = is_probably_text(f_path, size)
+            if ctx.want_bin:
+                out.bin_records.append((rel, e.name, ext, size, mtime_to_us(st.st_mtime_ns), is_txt, is_sym))
+            if out.inv is not None:
+                entry = {
+                    "rel_path": prefix + e.name,
+                    "name": e.name,
+                    "ext": ext,
+                    "size_bytes": size,
+                    "mtime": datetime.fromtimestamp(st.st_mtime, timezone.utc).isoformat().replace('+00:00', 'Z'),
+                    "is_text": is_txt,
+                    "is_symlink": is_sym
+                }
+                out.inv.write(json.dumps(entry, ensure_ascii=False, sort_keys=True) + "\n")
+
+        out.total_dirs += 1
+        out.dirs.append((rel, dir_entry, dir_files, dir_bytes))
+        ctx.report(len(files), dir_bytes, rel)
+
+        # os.walk(followlinks=False) lists symlinked dirs but does not descend
+        return [(os.path.join(abs_dir, e.name), prefix + e.name) for e in dirs if not e.is_symlink()]
+
+    def _scan_unit(self, abs_dir: str, rel: str, depth: int, recursive: bool,
+                   ctx: "_ParallelScan", want_inv: bool, want_dirs_inv: bool) -> "_UnitResult":
+        """Sorted pre-order walk of one partition (or a single directory if not recursive)."""
+        out = _UnitResult(want_inv, want_dirs_inv)
+        stack = [(abs_dir, rel, depth)]
+        while stack and not ctx.stopped():
+            a, r, d = stack.pop()
+            children = self._scan_dir(a, r, d, ctx, out)
+            if out.entries_hit:
+                ctx.stop()
+                break
+            if recursive:
+                for ca, cr in reversed(children):
+                    stack.append((ca, cr, d + 1))
+            else:
+                out.children = [(ca, cr, d + 1) for ca, cr in children]
+        return out
+
+    def _walk_parallel(self, inv_f, dirs_inv_f, rollup: _DirRollup,
+                       progress: Optional[Callable[[Dict[str, Any]], None]],
+                       is_canceled: Optional[Callable[[], bool]], bin_writer: Optional[InventoryBinWriter] = None) -> bool:
+        """
+        Parallel walk: the root (and, with few top-level dirs, the top level
+        itself) is split into subtree partitions handled by a thread pool.
+        Partitions are walked in sorted pre-order and merged in partition
+        order, so inventories are deterministic (sorted pre-order) unless
+        max_entries truncates; the entry budget is shared by all workers.
+        Returns depth_limit_hit.
+        """
+        ctx = _ParallelScan(self.max_entries, progress, is_canceled)
+        want_inv, want_dirs_inv = inv_f is not None, dirs_inv_f is not None
+        ctx.want_bin = bin_writer is not None
+        root = str(self.root)
+
+        # Partition plan: directory-only units stay in order ahead of their subtrees
+        root_unit = self._scan_unit(root, ".", 0, False, ctx, want_inv, want_dirs_inv)
+        plan: List[Any] = [root_unit]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                   thread_name_prefix="atlas-scan") as pool:
+            top = root_unit.children
+            split = 0 < len(top) < self.workers
+            for a, r, d in top:
+                if split:
+                    head = pool.submit(self._scan_unit, a, r, d, False, ctx, want_inv, want_dirs_inv)
+                    plan.append((head, [
+                        pool.submit(self._scan_unit, ca, cr, cd, True, ctx, want_inv, want_dirs_inv)
+                        for ca, cr, cd in head.result().children
+                    ]))
+                else:
+                    plan.append(pool.submit(self._scan_unit, a, r, d, True, ctx, want_inv, want_dirs_inv))
+
+            units: List[_UnitResult] = []
+            for item in plan:
+                if isinstance(item, _UnitResult):
+                    units.append(item)
+                elif isinstance(item, tuple):
+                    units.append(item[0].result())
+                    units.extend(f.result() for f in item[1])
+                else:
+                    units.append(item.result())
+
+        if ctx.canceled:
+            raise AtlasScanCanceled("Atlas scan canceled")
+
+        # Deterministic merge in partition order
+        depth_limit_hit = False
+        for u in units:
+            self.stats["total_files"] += u.total_files
+            self.stats["total_dirs"] += u.total_dirs
+            self.stats["total_bytes"] += u.total_bytes
+            for ext, n in u.extensions.items():
+                self.stats["extensions"][ext] = self.stats["extensions"].get(ext, 0) + n
+            self.stats["repo_nodes"].extend(u.repo_nodes)
+            for rel, entry, files, nbytes in u.dirs:
+                rollup.enter(rel, entry)
+                rollup.add(files, nbytes)
+            depth_limit_hit = depth_limit_hit or u.depth_limit_hit
+            self.stats["truncated"]["dirs_seen"] += u.total_dirs + (1 if u.entries_hit else 0)
+            if inv_f is not None:
+                u.inv.seek(0)
+                shutil.copyfileobj(u.inv, inv_f)
+            if bin_writer is not None:
+                for rec in u.bin_records:
+                    bin_writer.add(*rec)
+            u.close()
+
+        self.stats["truncated"]["files_seen"] = min(ctx.taken, self.max_entries)
+        if ctx.entries_hit:
+            self.stats["truncated"]["hit"] = True
+            self.stats["truncated"]["reason"] = "max_entries"
+        return depth_limit_hit
+
+    def scan(self, inventory_file: Optional[Path] = None, dirs_inventory_file: Optional[Path] = None,
+             inventory_bin_file: Optional[Path] = None,
+             progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+             is_canceled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
         """
         Scans the directory structure.
 
         Args:
             inventory_file: Optional path to write a JSONL inventory of all files.
             dirs_inventory_file: Optional path to write a JSONL inventory of all directories.
+            inventory_bin_file: Optional path for the same file inventory in the compact
+                binary format (see atlas_inventory); written without per-file JSON/datetime.
+            progress: Optional callback, called once per directory with
+                {"files", "dirs", "bytes", "current_dir"} so far.
+            is_canceled: Optional callback polled once per directory; raises
+                AtlasScanCanceled when it returns True.
         """
         self.stats["start_time"] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         start_ts = time.time()
@@ -163,10 +503,18 @@ class AtlasScanner:
         except OSError as e:
             logger.error(f"Failed to open inventory files: {e}")
 
-        dir_sizes = {} # path -> size
+        # Recursive sizes per directory, rolled up as the walk leaves each one
+        rollup = _DirRollup(dirs_inv_f)
+        bin_writer = InventoryBinWriter() if inventory_bin_file else None
 
         try:
-            for root, dirs, files in os.walk(self.root, topdown=True):
+            if self.workers > 1:
+                depth_limit_hit = self._walk_parallel(inv_f, dirs_inv_f, rollup, progress, is_canceled, bin_writer)
+                serial_walk = ()
+            else:
+                walk = self.index.walk if self.index is not None else os.walk
+                serial_walk = walk(self.root)
+            for root, dirs, files in serial_walk:
                 current_root = Path(root)
 
                 # Check exclusions for current root (prune traversal)
@@ -198,9 +546,9 @@ class AtlasScanner:
                     if self._is_excluded(d_path):
                         continue
                     kept_dirs.append(d)
-                dirs[:] = kept_dirs
-
-                dir_bytes = 0
+                # Sorted pre-order (files of a directory before its subtrees), like the
+                # parallel walk; atlas_diff stream-merges inventories in this order.
+                dirs[:] = sorted(kept_dirs)
 
                 # Filter files for this directory
                 kept_files = []
@@ -208,20 +556,20 @@ class AtlasScanner:
                     f_path = current_root / f
                     if not self._is_excluded(f_path):
                         kept_files.append(f)
+                kept_files.sort()
 
-                # Directory Inventory
+                # Directory Inventory (written by the rollup once the subtree is done,
+                # with recursive_bytes / recursive_files)
+                dir_entry = None
                 if dirs_inv_f:
-                    entry = {
+                    dir_entry = {
                         "rel_path": rel_path.as_posix(),
                         "depth": depth,
                         "n_files": len(kept_files),
                         "n_dirs": len(dirs),
-                        # bytes will be populated post-loop or via separate logic?
-                        # For pure inventory, structure is key.
-                        # We can't know recursive bytes here yet.
                         "mtime": datetime.fromtimestamp(current_root.stat().st_mtime, timezone.utc).isoformat().replace('+00:00', 'Z')
                     }
-                    dirs_inv_f.write(json.dumps(entry, ensure_ascii=False, sort_keys=True) + "\n")
+                rollup.enter(rel_path.as_posix(), dir_entry)
 
                 self.stats["truncated"]["dirs_seen"] += 1
 
@@ -240,21 +588,29 @@ class AtlasScanner:
                         break
 
                     try:
-                        stat = f_path.stat()
+                        cached = self.index.lookup(f_path) if self.index is not None else None
+                        if cached is not None:
+                            stat = cached.stat()
+                            is_sym = cached.is_symlink()
+                        else:
+                            stat = f_path.stat()
+                            is_sym = f_path.is_symlink()
                         size = stat.st_size
                         mtime = stat.st_mtime
                         ext = f_path.suffix.lower()
-                        is_sym = f_path.is_symlink()
 
                         self.stats["total_files"] += 1
                         self.stats["total_bytes"] += size
                         self.stats["extensions"][ext] = self.stats["extensions"].get(ext, 0) + 1
 
-                        dir_bytes += size
+                        rollup.add(1, size)
 
                         # Inventory Output
-                        if inv_f:
+                        if inv_f or bin_writer:
                             is_txt = is_probably_text(f_path, size)
+                        if bin_writer:
+                            bin_writer.add(rel_path.as_posix(), f, ext, size, mtime_to_us(stat.st_mtime_ns), is_txt, is_sym)
+                        if inv_f:
                             file_rel = f_path.relative_to(self.root).as_posix()
                             entry = {
                                 "rel_path": file_rel,
@@ -274,12 +630,25 @@ class AtlasScanner:
                     break
 
                 self.stats["total_dirs"] += 1
-                dir_sizes[str(rel_path)] = dir_bytes
 
+                if progress:
+                    progress({
+                        "files": self.stats["total_files"],
+                        "dirs": self.stats["total_dirs"],
+                        "bytes": self.stats["total_bytes"],
+                        "current_dir": rel_path.as_posix(),
+                    })
+                if is_canceled and is_canceled():
+                    raise AtlasScanCanceled("Atlas scan canceled")
+
+            top_dirs = rollup.close()
         finally:
             if inv_f: inv_f.close()
             if dirs_inv_f: dirs_inv_f.close()
 
+        if bin_writer:
+            bin_writer.write(inventory_bin_file)
+
         # Update stats
         if depth_limit_hit:
              self.stats["truncated"]["depth_limit_hit"] = True
@@ -291,27 +660,14 @@ class AtlasScanner:
         self.stats["end_time"] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         self.stats["duration_seconds"] = time.time() - start_ts
 
-        # Find Top Dirs (Hotspots) - simplistic aggregation
-        all_paths = sorted(dir_sizes.keys(), key=lambda p: len(Path(p).parts), reverse=True)
-        recursive_sizes = dir_sizes.copy()
-
-        for p_str in all_paths:
-            if p_str == ".":
-                continue
-            p = Path(p_str)
-            parent = str(p.parent)
-            if parent == ".":
-                pass
-
-            if parent in recursive_sizes:
-                recursive_sizes[parent] += recursive_sizes[p_str]
-
-        sorted_dirs = sorted(recursive_sizes.items(), key=lambda x: x[1], reverse=True)
-        self.stats["top_dirs"] = [{"path": p, "bytes": s} for p, s in sorted_dirs[:50]]
+        # Top Dirs (Hotspots): recursive sizes, largest first
+        self.stats["top_dirs"] = top_dirs
 
         # Add inventory metadata to stats if file was generated
         if inventory_file:
             self.stats["inventory_file"] = str(inventory_file.resolve())
+        if inventory_bin_file:
+            self.stats["inventory_bin_file"] = str(inventory_bin_file.resolve())
         if dirs_inventory_file:
             self.stats["dirs_inventory_file"] = str(dirs_inventory_file.resolve())
 
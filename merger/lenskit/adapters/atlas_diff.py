@@ -0,0 +1,390 @@
+"""
+Diff of two Atlas file inventories (JSONL or `*.inventory.bin`).
+
+Both inventories are read as streams and merged in walk order: a file's key
+is (its directory with "/" mapped to "\\0", its name). That is the order
+AtlasScanner writes (sorted pre-order, a directory's files before its
+subdirectories), so a single pass pairs every path and keeps only:
+
+- one record per input,
+- a stack of the directories on the current path (per-directory byte
+  deltas are rolled up into the parent when a directory is left), and
+- two bounded heaps for the hotspot tables.
+
+Memory does not grow with the number of files. Inventories written before
+walks were sorted (serial os.walk order) are detected on the fly; the pass
+is then restarted on an external merge sort of that input (sorted chunks
+spilled to temporary files), which still keeps memory bounded.
+
+CLI:
+    python -m merger.lenskit.adapters.atlas_diff old.inventory.jsonl new.inventory.jsonl \\
+        [--md diff.md] [--changes changes.jsonl] [--dirs dirs.jsonl] [--top 20] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .atlas_inventory import InventoryRecord, iter_inventory, us_to_iso
+
+# Records per sorted chunk when an input has to be sorted first
+SORT_CHUNK_RECORDS = 100_000
+# JSONL renders st_mtime (float) and the binary format st_mtime_ns; they may differ by 1µs
+MTIME_TOLERANCE_US = 1
+
+Key = Tuple[str, str]
+
+
+class InventoryOrderError(ValueError):
+    """An inventory is not in walk order (see module docstring)."""
+
+    def __init__(self, path: Path, rel_path: str):
+        super().__init__(f"Inventory not in walk order at {rel_path!r}: {path}")
+        self.path = path
+
+
+def walk_key(rel_path: str) -> Key:
+    parent, _, name = rel_path.rpartition("/")
+    return parent.replace("/", "\0"), name
+
+
+def _ordered(records: Iterable[InventoryRecord], path: Path) -> Iterator[Tuple[Key, InventoryRecord]]:
+    prev = None
+    for rec in records:
+        key = walk_key(rec.rel_path)
+        if prev is not None and key <= prev:
+            raise InventoryOrderError(path, rec.rel_path)
+        prev = key
+        yield key, rec
+
+
+def _spill(chunk: List[Tuple[Key, InventoryRecord]], tmpdir: str, n: int) -> str:
+    chunk.sort(key=lambda kr: kr[0])
+    spill = os.path.join(tmpdir, f"chunk-{n}.jsonl")
+    with open(spill, "w", encoding="utf-8") as f:
+        for _, rec in chunk:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    return spill
+
+
+def _read_spill(spill: str) -> Iterator[Tuple[Key, InventoryRecord]]:
+    with open(spill, "r", encoding="utf-8") as f:
+        for line in f:
+            rec = InventoryRecord(*json.loads(line))
+            yield walk_key(rec.rel_path), rec
+
+
+def _externally_sorted(path: Path, chunk_records: int) -> Iterator[Tuple[Key, InventoryRecord]]:
+    """Walk-ordered records of `path`, sorted in chunks of `chunk_records` and merged."""
+    with tempfile.TemporaryDirectory(prefix="atlas-diff-") as tmpdir:
+        spills: List[str] = []
+        chunk: List[Tuple[Key, InventoryRecord]] = []
+        for rec in iter_inventory(path):
+            chunk.append((walk_key(rec.rel_path), rec))
+            if len(chunk) >= chunk_records:
+                spills.append(_spill(chunk, tmpdir, len(spills)))
+                chunk = []
+        if chunk:
+            spills.append(_spill(chunk, tmpdir, len(spills)))
+            chunk = []
+        merged = heapq.merge(*(_read_spill(s) for s in spills), key=lambda kr: kr[0])
+        # Re-check: duplicate paths would otherwise be paired arbitrarily
+        yield from _ordered((rec for _, rec in merged), path)
+
+
+class _DirFrame:
+    __slots__ = ("path", "before", "after", "added", "removed", "changed")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.before = 0
+        self.after = 0
+        self.added = 0
+        self.removed = 0
+        self.changed = 0
+
+
+class _TopN:
+    """The `n` largest (value, label) pairs seen, via a bounded min-heap."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self._heap: List[Tuple[int, str, Dict[str, Any]]] = []
+
+    def push(self, value: int, label: str, item: Dict[str, Any]) -> None:
+        if self.n <= 0:
+            return
+        entry = (value, label, item)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Dict[str, Any]]:
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (-e[0], e[1]))]
+
+
+class _DiffPass:
+    def __init__(self, top: int, changes_f: Optional[TextIO], dirs_f: Optional[TextIO]):
+        self.changes_f = changes_f
+        self.dirs_f = dirs_f
+        self.stack: List[_DirFrame] = [_DirFrame(".")]
+        self.hot_dirs = _TopN(top)
+        self.hot_files = _TopN(top)
+        self.counts = {"added": 0, "removed": 0, "changed": 0, "unchanged": 0}
+        self.files_old = self.files_new = 0
+        self.bytes_added = self.bytes_removed = 0
+        self.root: Optional[_DirFrame] = None
+
+    def _leave(self) -> None:
+        frame = self.stack.pop()
+        if self.stack:
+            parent = self.stack[-1]
+            parent.before += frame.before
+            parent.after += frame.after
+            parent.added += frame.added
+            parent.removed += frame.removed
+            parent.changed += frame.changed
+        else:
+            self.root = frame
+        if not (frame.added or frame.removed or frame.changed):
+            return
+        item = {
+            "path": frame.path,
+            "bytes_before": frame.before,
+            "bytes_after": frame.after,
+            "delta": frame.after - frame.before,
+            "added": frame.added,
+            "removed": frame.removed,
+            "changed": frame.changed,
+        }
+        if self.dirs_f:
+            self.dirs_f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        # "." is the grand total, not a hotspot
+        if frame.path != "." and item["delta"] > 0:
+            self.hot_dirs.push(item["delta"], frame.path, item)
+
+    def _enter(self, rel_dir: str) -> _DirFrame:
+        stack = self.stack
+        while len(stack) > 1:
+            top = stack[-1].path
+            if rel_dir == top or rel_dir.startswith(top + "/"):
+                break
+            self._leave()
+        top = stack[-1].path
+        if rel_dir != top:
+            rest = rel_dir if top == "." else rel_dir[len(top) + 1:]
+            prefix = "" if top == "." else top + "/"
+            for part in rest.split("/"):
+                prefix += part
+                stack.append(_DirFrame(prefix))
+                prefix += "/"
+        return stack[-1]
+
+    def _record(self, op: str, old: Optional[InventoryRecord], new: Optional[InventoryRecord]) -> None:
+        rec = new or old
+        rel_dir = rec.rel_path.rpartition("/")[0] or "."
+        frame = self._enter(rel_dir)
+        size_before = old.size_bytes if old else 0
+        size_after = new.size_bytes if new else 0
+        frame.before += size_before
+        frame.after += size_after
+        if op == "unchanged":
+            self.counts[op] += 1
+            return
+        setattr(frame, op, getattr(frame, op) + 1)
+        self.counts[op] += 1
+        if op == "added":
+            self.bytes_added += size_after
+        elif op == "removed":
+            self.bytes_removed += size_before
+
+        item = {
+            "op": op,
+            "path": rec.rel_path,
+            "size_before": old.size_bytes if old else None,
+            "size_after": new.size_bytes if new else None,
+            "delta": size_after - size_before,
+            "mtime_before": us_to_iso(old.mtime_us) if old else None,
+            "mtime_after": us_to_iso(new.mtime_us) if new else None,
+        }
+        if self.changes_f:
+            self.changes_f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        if item["delta"] > 0:
+            self.hot_files.push(item["delta"], rec.rel_path, item)
+
+    def run(self, old_iter: Iterator[Tuple[Key, InventoryRecord]],
+            new_iter: Iterator[Tuple[Key, InventoryRecord]]) -> None:
+        a = next(old_iter, None)
+        b = next(new_iter, None)
+        while a is not None or b is not None:
+            if b is None or (a is not None and a[0] < b[0]):
+                self.files_old += 1
+                self._record("removed", a[1], None)
+                a = next(old_iter, None)
+            elif a is None or b[0] < a[0]:
+                self.files_new += 1
+                self._record("added", None, b[1])
+                b = next(new_iter, None)
+            else:
+                old, new = a[1], b[1]
+                self.files_old += 1
+                self.files_new += 1
+                same = (old.size_bytes == new.size_bytes
+                        and abs(old.mtime_us - new.mtime_us) <= MTIME_TOLERANCE_US
+                        and old.is_symlink == new.is_symlink)
+                self._record("unchanged" if same else "changed", old, new)
+                a = next(old_iter, None)
+                b = next(new_iter, None)
+        while self.stack:
+            self._leave()
+
+
+def _open_tmp(path: Optional[Path]) -> Optional[TextIO]:
+    if path is None:
+        return None
+    return path.with_name(path.name + ".tmp").open("w", encoding="utf-8")
+
+
+def diff_inventories(old_path: Path, new_path: Path, top: int = 20,
+                     changes_file: Optional[Path] = None, dirs_file: Optional[Path] = None,
+                     sort_chunk_records: int = SORT_CHUNK_RECORDS) -> Dict[str, Any]:
+    """
+    Compares two inventories in one streaming pass.
+
+    Args:
+        old_path, new_path: JSONL or binary inventories (format auto-detected).
+        top: Size of the `hotspots` (directories) and `top_files` tables, by byte growth.
+        changes_file: Optional JSONL output, one line per added/removed/changed file.
+        dirs_file: Optional JSONL output, one line per directory with changes below it
+            (recursive byte totals before/after and change counts), in post-order.
+
+    Returns the summary dict rendered by `render_diff_md`.
+    """
+    unsorted = set()
+    while True:
+        changes_f = _open_tmp(changes_file)
+        dirs_f = _open_tmp(dirs_file)
+        iters = []
+        for path in (old_path, new_path):
+            if path in unsorted:
+                iters.append(_externally_sorted(path, sort_chunk_records))
+            else:
+                iters.append(_ordered(iter_inventory(path), path))
+        diff = _DiffPass(top, changes_f, dirs_f)
+        try:
+            diff.run(iters[0], iters[1])
+        except InventoryOrderError as e:
+            if e.path in unsorted:
+                raise
+            unsorted.add(e.path)
+            continue
+        finally:
+            for it in iters:
+                it.close()
+            for f in (changes_f, dirs_f):
+                if f:
+                    f.close()
+        break
+
+    for out in (changes_file, dirs_file):
+        if out is not None:
+            os.replace(out.with_name(out.name + ".tmp"), out)
+
+    root = diff.root
+    return {
+        "old": str(old_path),
+        "new": str(new_path),
+        "files_old": diff.files_old,
+        "files_new": diff.files_new,
+        "bytes_old": root.before,
+        "bytes_new": root.after,
+        "bytes_delta": root.after - root.before,
+        **diff.counts,
+        "bytes_added": diff.bytes_added,
+        "bytes_removed": diff.bytes_removed,
+        "externally_sorted": sorted(str(p) for p in unsorted),
+        "hotspots": diff.hot_dirs.items(),
+        "top_files": diff.hot_files.items(),
+    }
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):+.2f}"
+
+
+def render_diff_md(diff: Dict[str, Any]) -> str:
+    lines = []
+    lines.append("# 🗺️ Atlas Diff")
+    lines.append(f"- **Old:** `{Path(diff['old']).name}` ({diff['files_old']} files, {diff['bytes_old'] / (1024*1024):.2f} MB)")
+    lines.append(f"- **New:** `{Path(diff['new']).name}` ({diff['files_new']} files, {diff['bytes_new'] / (1024*1024):.2f} MB)")
+    lines.append("")
+
+    lines.append("## 📊 Overview")
+    lines.append(f"- **Added:** {diff['added']} files ({_mb(diff['bytes_added'])} MB)")
+    lines.append(f"- **Removed:** {diff['removed']} files ({_mb(-diff['bytes_removed'])} MB)")
+    lines.append(f"- **Changed:** {diff['changed']} files")
+    lines.append(f"- **Unchanged:** {diff['unchanged']} files")
+    lines.append(f"- **Net Size Change:** {_mb(diff['bytes_delta'])} MB")
+    lines.append("")
+
+    lines.append("## 📈 Growth Hotspots (Folders)")
+    if diff["hotspots"]:
+        lines.append("| Path | Before (MB) | After (MB) | Δ (MB) | +/−/~ |")
+        lines.append("|---|---|---|---|---|")
+        for d in diff["hotspots"]:
+            lines.append(f"| `{d['path']}` | {d['bytes_before'] / (1024*1024):.2f} | {d['bytes_after'] / (1024*1024):.2f} "
+                         f"| {_mb(d['delta'])} | {d['added']}/{d['removed']}/{d['changed']} |")
+    else:
+        lines.append("_No folder grew._")
+    lines.append("")
+
+    lines.append("## 📄 Largest Growing Files")
+    if diff["top_files"]:
+        lines.append("| Path | Change | Δ (MB) |")
+        lines.append("|---|---|---|")
+        for f in diff["top_files"]:
+            lines.append(f"| `{f['path']}` | {f['op']} | {_mb(f['delta'])} |")
+    else:
+        lines.append("_No file grew._")
+
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Diff two Atlas inventories (JSONL or binary).")
+    parser.add_argument("old", help="Older inventory")
+    parser.add_argument("new", help="Newer inventory")
+    parser.add_argument("--top", type=int, default=20, help="Rows in the hotspot tables")
+    parser.add_argument("--md", help="Write the Markdown summary here (default: stdout)")
+    parser.add_argument("--changes", help="Write added/removed/changed files as JSONL")
+    parser.add_argument("--dirs", help="Write per-directory byte deltas as JSONL")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON instead of Markdown")
+    args = parser.parse_args(argv)
+
+    old, new = Path(args.old), Path(args.new)
+    for p in (old, new):
+        if not p.is_file():
+            print(f"Not a file: {p}", file=sys.stderr)
+            return 1
+    diff = diff_inventories(old, new, top=args.top,
+                            changes_file=Path(args.changes) if args.changes else None,
+                            dirs_file=Path(args.dirs) if args.dirs else None)
+    if args.json:
+        print(json.dumps(diff, indent=2, ensure_ascii=False))
+    elif args.md:
+        Path(args.md).write_text(render_diff_md(diff) + "\n", encoding="utf-8")
+    else:
+        print(render_diff_md(diff))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
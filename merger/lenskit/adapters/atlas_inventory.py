@@ -0,0 +1,369 @@
+"""
+Compact binary Atlas inventory (`*.inventory.bin`), alongside JSONL.
+
+The JSONL inventory spends most of its bytes (and its writer most of its
+time) on repeated path prefixes, JSON keys and ISO timestamps. This format
+stores the same records column by column:
+
+    magic   b"RLINV\\x01"
+    header  varints: n_strings, n_dirs, n_files, zigzag(mtime_base_us)
+    strings n_strings x (varint byte length, UTF-8 bytes)   interned components/exts
+    dirs    n_dirs x (varint parent_id + 1, varint name string id); dir 0 is the root
+    columns 6 x (varint byte length, payload):
+              dir id, name string id, ext string id   (varints)
+              size_bytes                               (varint)
+              mtime                                    (zigzag varint, µs since the
+                                                        epoch minus mtime_base_us)
+              flags                                    (1 byte: 1=is_text, 2=is_symlink)
+
+Every column has a length prefix, so readers can skip columns they do not
+need. `bin_to_jsonl`/`jsonl_to_bin` convert losslessly between both formats
+(JSONL lines are reproduced byte for byte), so `jsonl-*` tooling keeps
+working on converted files.
+
+CLI:
+    python -m merger.lenskit.adapters.atlas_inventory to-bin  in.jsonl out.bin
+    python -m merger.lenskit.adapters.atlas_inventory to-jsonl in.bin  out.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+MAGIC = b"RLINV\x01"
+FLAG_TEXT = 1
+FLAG_SYMLINK = 2
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class InventoryRecord(NamedTuple):
+    rel_path: str
+    name: str
+    ext: str
+    size_bytes: int
+    mtime_us: int
+    is_text: bool
+    is_symlink: bool
+
+
+def _put_varint(buf: bytearray, n: int) -> None:
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _zigzag(n: int) -> int:
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+def _unzigzag(n: int) -> int:
+    return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+
+
+def _iter_varints(data, pos: int, count: int) -> Iterator[int]:
+    """Lazily decodes `count` varints from data[pos:] (streaming readers)."""
+    for _ in range(count):
+        b = data[pos]
+        pos += 1
+        n = b & 0x7F
+        shift = 7
+        while b >= 0x80:
+            b = data[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            shift += 7
+        yield n
+
+
+def _decode_varints(data: bytes, pos: int, count: int) -> Tuple[List[int], int]:
+    """Decodes `count` varints from data[pos:]; returns (values, new pos)."""
+    out = [0] * count
+    for i in range(count):
+        b = data[pos]
+        pos += 1
+        if b < 0x80:
+            out[i] = b
+            continue
+        n = b & 0x7F
+        shift = 7
+        while True:
+            b = data[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                break
+            shift += 7
+        out[i] = n
+    return out, pos
+
+
+def mtime_to_us(mtime_ns: int) -> int:
+    return (mtime_ns + 500) // 1000
+
+
+def iso_to_us(iso: str) -> int:
+    dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def us_to_iso(us: int) -> str:
+    """Same rendering as the JSONL writer (isoformat, 'Z', microseconds only if non-zero)."""
+    return (_EPOCH + timedelta(microseconds=us)).isoformat().replace("+00:00", "Z")
+
+
+class InventoryBinWriter:
+    """Accumulates columns in memory; `write` emits the file atomically."""
+
+    def __init__(self):
+        self._strings: Dict[str, int] = {}
+        self._string_list: List[str] = []
+        self._dirs: Dict[str, int] = {".": 0}
+        self._dir_rows: List[Tuple[int, int]] = [(-1, self._intern(""))]
+        self._col_dir = bytearray()
+        self._col_name = bytearray()
+        self._col_ext = bytearray()
+        self._col_size = bytearray()
+        self._mtimes: List[int] = []
+        self._col_flags = bytearray()
+        self.count = 0
+
+    def _intern(self, s: str) -> int:
+        idx = self._strings.get(s)
+        if idx is None:
+            idx = len(self._string_list)
+            self._strings[s] = idx
+            self._string_list.append(s)
+        return idx
+
+    def _dir_id(self, rel_dir: str) -> int:
+        idx = self._dirs.get(rel_dir)
+        if idx is not None:
+            return idx
+        parent, _, name = rel_dir.rpartition("/")
+        parent_id = self._dir_id(parent or ".")
+        idx = len(self._dir_rows)
+        self._dir_rows.append((parent_id, self._intern(name)))
+        self._dirs[rel_dir] = idx
+        return idx
+
+    def add(self, rel_dir: str, name: str, ext: str, size: int, mtime_us: int,
+            is_text: bool, is_symlink: bool) -> None:
+        _put_varint(self._col_dir, self._dir_id(rel_dir or "."))
+        _put_varint(self._col_name, self._intern(name))
+        _put_varint(self._col_ext, self._intern(ext))
+        _put_varint(self._col_size, size)
+        self._mtimes.append(mtime_us)
+        self._col_flags.append((FLAG_TEXT if is_text else 0) | (FLAG_SYMLINK if is_symlink else 0))
+        self.count += 1
+
+    def add_record(self, item: Dict[str, Any]) -> None:
+        """Adds one JSONL inventory item (see AtlasScanner)."""
+        rel_path = item["rel_path"]
+        rel_dir, _, name = rel_path.rpartition("/")
+        if name != item.get("name", name):
+            raise ValueError(f"Inventory item name does not match rel_path: {rel_path}")
+        self.add(rel_dir or ".", name, item.get("ext", ""), int(item.get("size_bytes", 0)),
+                 iso_to_us(item["mtime"]), bool(item.get("is_text")), bool(item.get("is_symlink")))
+
+    def write(self, path: Path) -> None:
+        base = min(self._mtimes) if self._mtimes else 0
+        col_mtime = bytearray()
+        for us in self._mtimes:
+            _put_varint(col_mtime, _zigzag(us - base))
+
+        out = bytearray(MAGIC)
+        for n in (len(self._string_list), len(self._dir_rows), self.count, _zigzag(base)):
+            _put_varint(out, n)
+        for s in self._string_list:
+            raw = s.encode("utf-8", "surrogateescape")
+            _put_varint(out, len(raw))
+            out += raw
+        for parent_id, name_id in self._dir_rows:
+            _put_varint(out, parent_id + 1)
+            _put_varint(out, name_id)
+        for col in (self._col_dir, self._col_name, self._col_ext, self._col_size, col_mtime, self._col_flags):
+            _put_varint(out, len(col))
+            out += col
+
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(bytes(out))
+        os.replace(tmp, path)
+
+
+def _read_tables(data, path: Path) -> Tuple[List[str], List[str], int, int, int]:
+    """Header, string and dir tables; returns (strings, dir_paths, n_files, mtime base, columns offset)."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a binary Atlas inventory: {path}")
+    (n_strings, n_dirs, n_files, base_zz), pos = _decode_varints(data, len(MAGIC), 4)
+
+    strings: List[str] = []
+    for _ in range(n_strings):
+        (length,), pos = _decode_varints(data, pos, 1)
+        strings.append(data[pos:pos + length].decode("utf-8", "surrogateescape"))
+        pos += length
+
+    rows, pos = _decode_varints(data, pos, 2 * n_dirs)
+    dir_paths: List[str] = []
+    for i in range(n_dirs):
+        parent, name = rows[2 * i] - 1, strings[rows[2 * i + 1]]
+        if parent < 0:
+            dir_paths.append(".")
+        else:
+            p = dir_paths[parent]
+            dir_paths.append(name if p == "." else f"{p}/{name}")
+    return strings, dir_paths, n_files, _unzigzag(base_zz), pos
+
+
+class InventoryBin:
+    """Decoded binary inventory: string/dir tables plus one list per column."""
+
+    def __init__(self, strings: List[str], dir_paths: List[str], columns: Dict[str, Any]):
+        self.strings = strings
+        self.dir_paths = dir_paths
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["size"])
+
+    @classmethod
+    def load(cls, path: Path, columns: Optional[List[str]] = None) -> "InventoryBin":
+        """
+        Reads the file. `columns` restricts decoding to a subset of
+        ("dir", "name", "ext", "size", "mtime", "flags"); others are skipped.
+        """
+        data = path.read_bytes()
+        strings, dir_paths, n_files, base, pos = _read_tables(data, path)
+        wanted = set(columns) if columns else None
+        cols: Dict[str, Any] = {}
+        for key in ("dir", "name", "ext", "size", "mtime", "flags"):
+            (length,), pos = _decode_varints(data, pos, 1)
+            end = pos + length
+            if wanted is None or key in wanted or key == "size":
+                if key == "flags":
+                    cols[key] = data[pos:end]
+                else:
+                    values, _ = _decode_varints(data, pos, n_files)
+                    if key == "mtime":
+                        values = [base + _unzigzag(v) for v in values]
+                    cols[key] = values
+            pos = end
+        return cls(strings, dir_paths, cols)
+
+    def rel_paths(self) -> Iterator[str]:
+        strings, dir_paths = self.strings, self.dir_paths
+        for d, n in zip(self.columns["dir"], self.columns["name"]):
+            parent = dir_paths[d]
+            yield strings[n] if parent == "." else f"{parent}/{strings[n]}"
+
+    def __iter__(self) -> Iterator[InventoryRecord]:
+        strings, cols = self.strings, self.columns
+        for rel_path, name_id, ext_id, size, mtime, flags in zip(
+                self.rel_paths(), cols["name"], cols["ext"], cols["size"], cols["mtime"], cols["flags"]):
+            yield InventoryRecord(rel_path, strings[name_id], strings[ext_id], size, mtime,
+                                  bool(flags & FLAG_TEXT), bool(flags & FLAG_SYMLINK))
+
+
+def record_to_item(rec: InventoryRecord) -> Dict[str, Any]:
+    """JSONL item of a record, keys as written by AtlasScanner."""
+    return {
+        "rel_path": rec.rel_path,
+        "name": rec.name,
+        "ext": rec.ext,
+        "size_bytes": rec.size_bytes,
+        "mtime": us_to_iso(rec.mtime_us),
+        "is_text": rec.is_text,
+        "is_symlink": rec.is_symlink,
+    }
+
+
+def iter_bin_records(path: Path) -> Iterator[InventoryRecord]:
+    """
+    Streams a binary inventory through mmap: only the string and dir tables
+    are decoded up front, the columns are read in lockstep (one cursor each).
+    """
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Not a binary Atlas inventory: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            strings, dir_paths, n_files, base, pos = _read_tables(data, path)
+            starts = []
+            for _ in range(6):
+                (length,), pos = _decode_varints(data, pos, 1)
+                starts.append(pos)
+                pos += length
+            flags_at = starts[5]
+            cols = zip(*(_iter_varints(data, start, n_files) for start in starts[:5]))
+            for i, (d, name_id, ext_id, size, mtime) in enumerate(cols):
+                parent = dir_paths[d]
+                name = strings[name_id]
+                flags = data[flags_at + i]
+                yield InventoryRecord(name if parent == "." else f"{parent}/{name}", name, strings[ext_id],
+                                      size, base + _unzigzag(mtime), bool(flags & FLAG_TEXT), bool(flags & FLAG_SYMLINK))
+
+
+def iter_inventory(path: Path) -> Iterator[InventoryRecord]:
+    """Records of a JSONL or binary inventory (detected by magic bytes), streamed."""
+    with path.open("rb") as f:
+        is_bin = f.read(len(MAGIC)) == MAGIC
+    if is_bin:
+        yield from iter_bin_records(path)
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            yield InventoryRecord(item["rel_path"], item["name"], item.get("ext", ""), int(item.get("size_bytes", 0)),
+                                  iso_to_us(item["mtime"]), bool(item.get("is_text")), bool(item.get("is_symlink")))
+
+
+def jsonl_to_bin(src: Path, dst: Path) -> int:
+    writer = InventoryBinWriter()
+    with src.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                writer.add_record(json.loads(line))
+    writer.write(dst)
+    return writer.count
+
+
+def bin_to_jsonl(src: Path, dst: Path) -> int:
+    count = 0
+    tmp = dst.with_name(dst.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as out:
+        for rec in InventoryBin.load(src):
+            out.write(json.dumps(record_to_item(rec), ensure_ascii=False, sort_keys=True) + "\n")
+            count += 1
+    os.replace(tmp, dst)
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert Atlas inventories between JSONL and the binary format.")
+    parser.add_argument("command", choices=["to-bin", "to-jsonl"])
+    parser.add_argument("src", help="Input inventory")
+    parser.add_argument("dst", help="Output inventory")
+    args = parser.parse_args(argv)
+
+    src, dst = Path(args.src), Path(args.dst)
+    if not src.is_file():
+        print(f"Not a file: {src}", file=sys.stderr)
+        return 1
+    count = jsonl_to_bin(src, dst) if args.command == "to-bin" else bin_to_jsonl(src, dst)
+    print(f"{count} records -> {dst} ({dst.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -48,13 +48,25 @@ def _token_secret() -> bytes:
     return s.encode("utf-8")
 
 def issue_fs_token(abs_path: Path, ttl_seconds: int = 1200) -> str:
-    payload = {
-        "p": str(abs_path),
-        "exp": int(time.time()) + int(ttl_seconds),
-    }
-    body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    sig = hmac.new(_token_secret(), body, hashlib.sha256).digest()
-    return f"{_b64url(body)}.{_b64url(sig)}"
+    return issue_fs_tokens([abs_path], ttl_seconds)[0]
+
+def issue_fs_tokens(abs_paths: List[Path], ttl_seconds: int = 1200) -> List[str]:
+    """Batch form of issue_fs_token: one secret lookup/HMAC key setup, shared expiry."""
+    if not abs_paths:
+        return []
+    exp = int(time.time()) + int(ttl_seconds)
+    keyed = hmac.new(_token_secret(), digestmod=hashlib.sha256)
+    out = []
+    for abs_path in abs_paths:
+        payload = {
+            "p": str(abs_path),
+            "exp": exp,
+        }
+        body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        mac = keyed.copy()
+        mac.update(body)
+        out.append(f"{_b64url(body)}.{_b64url(mac.digest())}")
+    return out
 
 def _parse_fs_token(token: str) -> Tuple[Path, int]:
     try:
@@ -94,9 +106,23 @@ def resolve_fs_token(token: str) -> Path:
     p, _exp = _parse_fs_token(token)
     return p
 
-def resolve_fs_path(hub: Optional[Path], merges_dir: Optional[Path], root_id: Optional[str] = None, rel_path: Optional[str] = None, token: Optional[str] = None) -> TrustedPath:
+def resolve_fs_child(parent: Path, name: str) -> Path:
+    """
+    Lazy navigation: a direct child of an already trusted directory, by name.
+    Saves issuing a token per subdirectory in every listing.
+    """
+    if not name or name in (".", "..") or "/" in name or "\\" in name or "\x00" in name or len(name) > 255:
+        raise HTTPException(status_code=400, detail="Invalid child name")
+    sec = get_security_config()
+    return sec.validate_path((parent / name).resolve())
+
+def resolve_fs_path(hub: Optional[Path], merges_dir: Optional[Path], root_id: Optional[str] = None, rel_path: Optional[str] = None, token: Optional[str] = None,
+                    child: Optional[str] = None) -> TrustedPath:
     if token is not None:
-        return TrustedPath(resolve_fs_token(token))
+        base = resolve_fs_token(token)
+        if child is not None:
+            return TrustedPath(resolve_fs_child(base, child))
+        return TrustedPath(base)
 
     if root_id is not None:
         root_map: Dict[str, Optional[Path]] = {
@@ -0,0 +1,534 @@
+"""
+Live filesystem index for the rLens service (optional watch mode).
+
+Keeps an in-memory table of every directory below a root (typically the hub)
+and serves it through an `os.scandir` / `os.walk` compatible interface, so
+scan_repo, prescan_repo and AtlasScanner can run without touching the disk
+for unchanged directories.
+
+Change tracking backends:
+  - "inotify": stdlib-only ctypes shim around libc inotify (Linux). Every
+    indexed directory gets one watch; events mark that directory dirty.
+  - "poll":    background thread re-reads directories periodically and marks
+    those whose listing changed. Used where inotify is unavailable or the
+    watch limit is exhausted.
+
+Dirty directories are re-read lazily on the next access. A directory that is
+deleted, moved away or replaced (same name, new inode) is dropped with its
+subtree and indexed afresh from its parent. Queue overflow invalidates the
+whole index; the next access rebuilds it with a
+real walk (consistency fallback). Directories that are not indexed (SKIP_DIRS,
+excluded paths, anything outside the root) are always read from disk.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import stat as stat_mod
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    from ..core.merge import SKIP_DIRS
+except ImportError:
+    from merger.lenskit.core.merge import SKIP_DIRS
+
+logger = logging.getLogger(__name__)
+
+WATCH_BACKENDS = ("auto", "inotify", "poll")
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONTFOLLOW = 0x02000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONTFOLLOW
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _Stat(NamedTuple):
+    st_mode: int
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+
+
+class IndexedEntry(NamedTuple):
+    """Cached os.DirEntry look-alike. Stat data follows symlinks (like os.walk/Path.stat)."""
+    name: str
+    path: str
+    kind: str  # "dir" | "file" | "other" | "broken" (dangling symlink)
+    link: bool
+    st_mode: int
+    st_size: int
+    st_mtime_ns: int
+    st_ino: int = 0
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        if self.link and not follow_symlinks:
+            return False
+        return self.kind == "dir"
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        if self.link and not follow_symlinks:
+            return False
+        return self.kind == "file"
+
+    def is_symlink(self) -> bool:
+        return self.link
+
+    def stat(self, follow_symlinks: bool = True) -> _Stat:
+        if self.kind == "broken" and follow_symlinks:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.path)
+        return _Stat(self.st_mode, self.st_size, self.st_mtime_ns / 1e9, self.st_mtime_ns)
+
+
+class _Listing(list):
+    """List of entries usable like the os.scandir() context manager."""
+
+    def __enter__(self):
+        return iter(self)
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _read_entry(entry: os.DirEntry) -> Optional[IndexedEntry]:
+    try:
+        link = entry.is_symlink()
+        try:
+            st = entry.stat(follow_symlinks=True)
+        except OSError:
+            if not link:
+                raise
+            # Broken symlink: listed like a file by os.walk, but stat() fails
+            st = entry.stat(follow_symlinks=False)
+            return IndexedEntry(entry.name, entry.path, "broken", True, st.st_mode, st.st_size, st.st_mtime_ns,
+                                st.st_ino)
+    except OSError:
+        return None
+    if stat_mod.S_ISDIR(st.st_mode):
+        kind = "dir"
+    elif stat_mod.S_ISREG(st.st_mode):
+        kind = "file"
+    else:
+        kind = "other"
+    return IndexedEntry(entry.name, entry.path, kind, link, st.st_mode, st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def _read_dir(path: str) -> Optional[Dict[str, IndexedEntry]]:
+    try:
+        with os.scandir(path) as it:
+            out = {}
+            for e in it:
+                rec = _read_entry(e)
+                if rec is not None:
+                    out[rec.name] = rec
+            return out
+    except OSError:
+        return None
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify_init1 / inotify_add_watch / inotify_rm_watch."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        for fn in ("inotify_init1", "inotify_add_watch", "inotify_rm_watch"):
+            if not hasattr(self._libc, fn):
+                raise OSError(errno.ENOSYS, f"{fn} not available")
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """All queued events (reads until the non-blocking fd is drained)."""
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 256 * 1024)
+            except BlockingIOError:
+                return events
+            if not buf:
+                return events
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "surrogateescape")
+                offset += name_len
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class LiveIndex:
+    """
+    In-memory directory table below `root`, kept current by a watch backend.
+
+    Public interface (duck-typed by core consumers):
+      scandir(path)   -> os.scandir-compatible listing
+      walk(top)       -> os.walk-compatible iterator (topdown, followlinks=False)
+      lookup(path)    -> IndexedEntry or None
+    """
+
+    def __init__(self, root: Path, backend: str = "auto", poll_interval: float = 2.0,
+                 skip_dirs: Iterable[str] = SKIP_DIRS, exclude: Iterable[Path] = ()):
+        if backend not in WATCH_BACKENDS:
+            raise ValueError(f"Invalid watch backend '{backend}'. Use one of {WATCH_BACKENDS}.")
+        self.root = os.path.normpath(os.fspath(Path(root).resolve()))
+        self.requested_backend = backend
+        self.backend: Optional[str] = None
+        self.poll_interval = poll_interval
+        self.skip_dirs = set(skip_dirs)
+        self.exclude = {os.path.normpath(os.fspath(p)) for p in exclude}
+
+        self._lock = threading.RLock()
+        self._dirs: Dict[str, Dict[str, IndexedEntry]] = {}
+        self._dirty: Set[str] = set()
+        self._valid = False
+        # Bumped on every observed change; lets consumers validate derived caches
+        self._generation = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._inotify: Optional[_Inotify] = None
+        self._wd_to_dir: Dict[int, str] = {}
+        self._dir_to_wd: Dict[str, int] = {}
+
+        self.counters = {"events": 0, "overflows": 0, "rebuilds": 0, "dir_refreshes": 0,
+                         "served_dirs": 0, "fallback_dirs": 0}
+
+    # --- Lifecycle ---
+
+    def start(self) -> "LiveIndex":
+        backend = self.requested_backend
+        if backend in ("auto", "inotify"):
+            try:
+                self._inotify = _Inotify()
+                backend = "inotify"
+            except (OSError, AttributeError) as e:
+                if self.requested_backend == "inotify":
+                    raise
+                logger.info("inotify unavailable (%s), using polling watcher", e)
+                backend = "poll"
+        self.backend = backend
+
+        with self._lock:
+            self._rebuild()
+
+        target = self._inotify_loop if backend == "inotify" else self._poll_loop
+        self._thread = threading.Thread(target=target, name="rlens-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    # --- Index maintenance ---
+
+    def _covers(self, path: str) -> bool:
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def _indexable(self, path: str) -> bool:
+        return os.path.basename(path) not in self.skip_dirs and path not in self.exclude
+
+    def _rebuild(self) -> None:
+        # Must be called under lock
+        for wd in list(self._wd_to_dir):
+            self._unwatch_wd(wd)
+        self._dirs.clear()
+        self._dirty.clear()
+        self._index_tree(self.root)
+        self._valid = True
+        self._generation += 1
+        self.counters["rebuilds"] += 1
+
+    def _index_tree(self, top: str) -> None:
+        # Must be called under lock. Watch first, then read: no gap for lost events.
+        stack = [top]
+        while stack:
+            d = stack.pop()
+            if not self._indexable(d) and d != self.root:
+                continue
+            self._watch(d)
+            listing = _read_dir(d)
+            if listing is None:
+                self._unwatch_dir(d)
+                continue
+            self._dirs[d] = listing
+            for e in listing.values():
+                if e.kind == "dir" and not e.link:
+                    stack.append(e.path)
+
+    def _drop_subtree(self, top: str) -> None:
+        # Must be called under lock
+        prefix = top + os.sep
+        for d in [k for k in self._dirs if k == top or k.startswith(prefix)]:
+            del self._dirs[d]
+            self._dirty.discard(d)
+            self._unwatch_dir(d)
+
+    def _refresh_dir(self, d: str) -> None:
+        # Must be called under lock
+        self._dirty.discard(d)
+        self.counters["dir_refreshes"] += 1
+        old = self._dirs.get(d)
+        new = _read_dir(d)
+        if new is None:
+            self._drop_subtree(d)
+            return
+
+        def _subdirs(listing):
+            return {n for n, e in listing.items() if e.kind == "dir" and not e.link} if listing else set()
+
+        old_sub, new_sub = _subdirs(old), _subdirs(new)
+        for name in old_sub - new_sub:
+            self._drop_subtree(os.path.join(d, name))
+        self._dirs[d] = new
+        for name in sorted(new_sub):
+            sub = os.path.join(d, name)
+            # Known subdirectory: keep it unless it was replaced (new inode), dropped or lost its watch
+            if (name in old_sub and old[name].st_ino == new[name].st_ino and sub in self._dirs
+                    and (self._inotify is None or sub in self._dir_to_wd)):
+                continue
+            self._drop_subtree(sub)
+            self._index_tree(sub)
+
+    def _mark_dirty(self, d: str) -> None:
+        with self._lock:
+            if d in self._dirs:
+                self._dirty.add(d)
+                self._generation += 1
+
+    def invalidate(self) -> None:
+        """Drop trust in the index; next access rebuilds with a real walk."""
+        with self._lock:
+            self._valid = False
+
+    def _sync(self) -> None:
+        # Must be called under lock: apply pending events, rebuild if needed
+        if self._inotify:
+            self._process_events(self._inotify.read_events())
+        if not self._valid:
+            self._rebuild()
+
+    # --- inotify backend ---
+
+    def _watch(self, d: str) -> None:
+        if not self._inotify or d in self._dir_to_wd:
+            return
+        try:
+            wd = self._inotify.add_watch(d, _WATCH_MASK)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                # Watch limit exhausted: degrade to polling for correctness
+                logger.warning("inotify watch limit reached, switching to polling watcher")
+                self._switch_to_polling()
+            return
+        self._wd_to_dir[wd] = d
+        self._dir_to_wd[d] = wd
+
+    def _unwatch_dir(self, d: str) -> None:
+        wd = self._dir_to_wd.get(d)
+        if wd is not None:
+            self._unwatch_wd(wd)
+
+    def _unwatch_wd(self, wd: int) -> None:
+        d = self._wd_to_dir.pop(wd, None)
+        if d is not None:
+            self._dir_to_wd.pop(d, None)
+        if self._inotify:
+            self._inotify.rm_watch(wd)
+
+    def _switch_to_polling(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+        self.backend = "poll"
+
+    def _process_events(self, events: List[Tuple[int, int, str]]) -> None:
+        # Must be called under lock
+        for wd, mask, _name in events:
+            self.counters["events"] += 1
+            self._generation += 1
+            if mask & IN_Q_OVERFLOW:
+                self.counters["overflows"] += 1
+                self._valid = False
+                continue
+            d = self._wd_to_dir.get(wd)
+            if d is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                # The watched directory is gone (or elsewhere): forget its subtree,
+                # the parent's refresh indexes whatever now carries the name
+                if d == self.root:
+                    self._valid = False
+                    continue
+                self._drop_subtree(d)
+                parent = os.path.dirname(d)
+                if parent in self._dirs:
+                    self._dirty.add(parent)
+            elif d in self._dirs:
+                self._dirty.add(d)
+
+    def _inotify_loop(self) -> None:
+        while not self._stop.is_set():
+            ino = self._inotify
+            if ino is None:
+                # Degraded at runtime
+                self._poll_loop()
+                return
+            try:
+                ready, _, _ = select.select([ino.fd], [], [], 0.5)
+            except (OSError, ValueError):
+                return
+            if ready:
+                with self._lock:
+                    if self._inotify:
+                        self._process_events(self._inotify.read_events())
+
+    # --- polling backend ---
+
+    def poll_once(self) -> None:
+        """Re-read every indexed directory and mark those that changed."""
+        with self._lock:
+            dirs = list(self._dirs)
+        for d in dirs:
+            listing = _read_dir(d)
+            with self._lock:
+                if d in self._dirs and listing != self._dirs[d] and d not in self._dirty:
+                    self._dirty.add(d)
+                    self._generation += 1
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Polling watcher failed; invalidating index")
+                self.invalidate()
+
+    # --- Query interface ---
+
+    def scandir(self, path) -> "_Listing":
+        """Entries of `path`, from the index when covered, else from disk."""
+        p = os.path.normpath(os.fspath(path))
+        with self._lock:
+            self._sync()
+            if p in self._dirty:
+                self._refresh_dir(p)
+            listing = self._dirs.get(p)
+            if listing is not None:
+                self.counters["served_dirs"] += 1
+                return _Listing(listing.values())
+        self.counters["fallback_dirs"] += 1
+        disk = _read_dir(p)
+        if disk is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), p)
+        return _Listing(disk.values())
+
+    def lookup(self, path) -> Optional[IndexedEntry]:
+        p = os.path.normpath(os.fspath(path))
+        parent, name = os.path.split(p)
+        with self._lock:
+            self._sync()
+            if parent in self._dirty:
+                self._refresh_dir(parent)
+            listing = self._dirs.get(parent)
+            return listing.get(name) if listing is not None else None
+
+    def walk(self, top) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """os.walk(top) equivalent (topdown=True, followlinks=False); prune dirnames in place."""
+        stack = [os.fspath(top)]
+        while stack:
+            d = stack.pop()
+            try:
+                entries = self.scandir(d)
+            except OSError:
+                continue
+            dirnames, filenames, links = [], [], set()
+            for e in entries:
+                if e.is_dir():
+                    dirnames.append(e.name)
+                    if e.is_symlink():
+                        links.add(e.name)
+                else:
+                    filenames.append(e.name)
+            yield d, dirnames, filenames
+            for name in reversed(dirnames):
+                if name not in links:
+                    stack.append(os.path.join(d, name))
+
+    @property
+    def generation(self) -> int:
+        """Change counter (pending events applied first). Equal values = no change observed."""
+        with self._lock:
+            if self._inotify:
+                self._process_events(self._inotify.read_events())
+            return self._generation
+
+    def dirty_subtrees(self) -> List[str]:
+        with self._lock:
+            if self._inotify:
+                self._process_events(self._inotify.read_events())
+            return sorted(os.path.relpath(d, self.root).replace(os.sep, "/") for d in self._dirty)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "root": self.root,
+                "backend": self.backend,
+                "valid": self._valid,
+                "dirs": len(self._dirs),
+                "entries": sum(len(v) for v in self._dirs.values()),
+                "watches": len(self._wd_to_dir),
+                "dirty": len(self._dirty),
+                **self.counters,
+            }
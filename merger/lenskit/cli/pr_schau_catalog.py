@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+pr-schau-catalog: List or rebuild the PR-Schau bundle catalogue.
+
+Usage:
+    python -m merger.lenskit.cli.pr_schau_catalog <hub> [--rebuild [--full]] [--level {basic,full}] [--json]
+
+The catalogue (<hub>/.repolens/pr-schau/catalog.jsonl) is maintained by the
+extractor whenever it writes a bundle. Use --rebuild after bundles were copied,
+deleted or edited by hand. Unchanged bundles keep their entry; --full
+re-indexes and re-verifies every bundle.
+
+Exit codes: 0 = ok, 1 = usage error, 2 = at least one bundle failed verification.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+try:
+    from merger.lenskit.core.merge import PR_SCHAU_DIR
+    from merger.lenskit.core.pr_schau_bundle import catalog_path, list_pr_schau_bundles, rebuild_catalog
+except ImportError:
+    # Run as a standalone script
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from lenskit.core.merge import PR_SCHAU_DIR
+    from lenskit.core.pr_schau_bundle import catalog_path, list_pr_schau_bundles, rebuild_catalog
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PR-Schau Catalog")
+    parser.add_argument("hub", help="Path to the Hub directory")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index bundle directories on disk")
+    parser.add_argument("--full", action="store_true", help="With --rebuild: re-index every bundle, not only changed ones")
+    parser.add_argument("--level", choices=["basic", "full"], default="full", help="Verification level for indexed bundles")
+    parser.add_argument("--json", action="store_true", help="Print entries as JSON lines")
+    args = parser.parse_args(argv)
+
+    hub = Path(args.hub).expanduser()
+    if not hub.is_dir():
+        print(f"❌ Hub not found: {hub}", file=sys.stderr)
+        return 1
+    root = hub / PR_SCHAU_DIR
+
+    if args.rebuild:
+        entries = rebuild_catalog(root, verify_level=args.level, full=args.full)
+    else:
+        entries = list_pr_schau_bundles(root, verify_level=args.level)
+
+    failed = [e for e in entries if e.get("verified") == "failed"]
+    if args.json:
+        for e in entries:
+            print(json.dumps(e, ensure_ascii=False, sort_keys=True))
+    else:
+        for e in entries:
+            flag = "⚠️ " if e.get("verified") in ("failed", "missing") else "✅"
+            summary = e.get("summary") or {}
+            counts = f"+{summary.get('added', 0)} ~{summary.get('changed', 0)} -{summary.get('removed', 0)}"
+            print(f"{flag} {e['dir']}  {counts}  parts={len(e.get('parts', []))}  {e.get('size', 0)} B")
+            if e.get("error"):
+                print(f"     {e['error']}")
+        print(f"\n{len(entries)} bundles, {len(failed)} failed ({catalog_path(root)})")
+    return 2 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
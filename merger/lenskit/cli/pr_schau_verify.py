@@ -14,13 +14,13 @@ Checks:
     - Integrity: primary_part in parts
     - Integrity: parts <-> artifacts mapping
     - SHA256 verification of content artifacts
+      (one concurrent read pass per file; cached by path/size/mtime)
     - Guard: No-Truncate check in Markdown content
     - Semantics: Byte overhead check (<= 64KB or 5%)
 """
 
 import sys
 import json
-import hashlib
 import argparse
 from pathlib import Path
 from typing import Dict, Any
@@ -30,21 +30,18 @@ try:
 except ImportError:
     jsonschema = None
 
+try:
+    from merger.lenskit.core.pr_schau_bundle import TRUNCATION_MARKERS, ZONE_MARKERS, scan_parts
+except ImportError:
+    # Run as a standalone script
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from lenskit.core.pr_schau_bundle import TRUNCATION_MARKERS, ZONE_MARKERS, scan_parts
+
 # Constants from Contract
 SCHEMA_PATH = Path(__file__).parents[1] / "contracts" / "pr-schau.v1.schema.json"
 MAX_OVERHEAD_BYTES = 64 * 1024
 MAX_OVERHEAD_RATIO = 0.05
 
-def _compute_sha256(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        while True:
-            chunk = f.read(65536)
-            if not chunk:
-                break
-            h.update(chunk)
-    return h.hexdigest()
-
 def _fail(msg: str):
     print(f"❌ FAIL: {msg}", file=sys.stderr)
     sys.exit(1)
@@ -108,6 +105,14 @@ def verify_full(bundle_path: Path, data: Dict[str, Any]) -> None:
             _fail(f"Part '{p}' has no corresponding artifact entry")
     _pass("All parts map to artifacts")
 
+    # Hash, marker scan and byte count of all files in one pass each
+    targets = [bundle_dir / a.get("basename") for a in arts if a.get("basename")]
+    targets += [bundle_dir / p for p in parts]
+    try:
+        scans = scan_parts(t for t in targets if t.exists())
+    except OSError as e:
+        _fail(f"Could not read bundle files: {e}")
+
     # 3. SHA256 Verification
     # Check all artifacts that have a sha256 field, especially canonical_md/part_md
     for art in arts:
@@ -125,8 +130,8 @@ def verify_full(bundle_path: Path, data: Dict[str, Any]) -> None:
         if role in ("canonical_md", "part_md") and not declared_sha:
              _fail(f"Artifact '{basename}' (role={role}) missing required sha256")
 
-        if target.exists() and declared_sha:
-            computed = _compute_sha256(target)
+        if target in scans and declared_sha:
+            computed = scans[target].sha256
             if computed != declared_sha:
                 _fail(f"SHA256 mismatch for {basename}. Declared: {declared_sha}, Computed: {computed}")
             print(f"   - Verified hash for {basename}")
@@ -138,45 +143,32 @@ def verify_full(bundle_path: Path, data: Dict[str, Any]) -> None:
         # The contract says "No silent truncation". Binary omission is explicit.
         # However, "content truncated at" usually implies the file reader gave up.
         # For now, we strictly guard against 'truncated at' which implies partial read.
-        strict_forbidden = ["Content truncated at", "content truncated at", "truncated at"]
-
         for p in parts:
-            p_path = bundle_dir / p
-            if p_path.exists():
-                try:
-                    text = p_path.read_text(encoding="utf-8", errors="ignore")
-                    for sub in strict_forbidden:
-                        if sub in text:
-                            _fail(f"Found truncation marker '{sub}' in {p}, but policy is not 'truncate'")
-                except Exception as e:
-                    print(f"⚠️  Could not read {p} for text scan: {e}")
+            scan = scans.get(bundle_dir / p)
+            if scan:
+                for sub in TRUNCATION_MARKERS:
+                    if sub in scan.markers:
+                        _fail(f"Found truncation marker '{sub}' in {p}, but policy is not 'truncate'")
         _pass("No silent truncation detected")
 
     # 5. Zone Verification (MUST)
     # Primary part must contain summary and files_manifest zones
     if primary:
-        p_path = bundle_dir / primary
-        if p_path.exists():
-            try:
-                text = p_path.read_text(encoding="utf-8", errors="ignore")
-                if "<!-- zone:begin type=summary -->" not in text:
-                    _fail(f"Primary part {primary} missing mandatory 'summary' zone")
-                if "<!-- zone:begin type=files_manifest -->" not in text:
-                    _fail(f"Primary part {primary} missing mandatory 'files_manifest' zone")
-                _pass("Mandatory zones (summary, files_manifest) present")
-            except Exception:
-                pass
+        scan = scans.get(bundle_dir / primary)
+        if scan:
+            summary_zone, manifest_zone = ZONE_MARKERS
+            if summary_zone not in scan.markers:
+                _fail(f"Primary part {primary} missing mandatory 'summary' zone")
+            if manifest_zone not in scan.markers:
+                _fail(f"Primary part {primary} missing mandatory 'files_manifest' zone")
+            _pass("Mandatory zones (summary, files_manifest) present")
 
     # 6. Semantics: Byte Overhead & Consistency
     if is_complete:
         expected = comp.get("expected_bytes", 0)
         declared_emitted = comp.get("emitted_bytes", 0)
 
-        actual_emitted = 0
-        for p in parts:
-            p_path = bundle_dir / p
-            if p_path.exists():
-                actual_emitted += p_path.stat().st_size
+        actual_emitted = sum(scans[bundle_dir / p].size for p in parts if bundle_dir / p in scans)
 
         # expected must be meaningful for complete bundles
         if expected <= 0 and len(parts) > 0:
@@ -21,11 +21,11 @@ if str(MERGER_ROOT) not in sys.path:
 
 try:
     # Primary Canonical Import: relative to package
-    from ..service.app import app, init_service
+    from ..service.app import app, init_service, state
 except ImportError:
     # Fallback for standalone execution (if sys.path is set correctly for top-level)
     try:
-        from merger.lenskit.service.app import app, init_service
+        from merger.lenskit.service.app import app, init_service, state
     except ImportError as e:
         print("[rlens] Fatal Error: Could not import 'lenskit.service.app'.", file=sys.stderr)
         print(f"[rlens] Debug info: sys.path={sys.path}", file=sys.stderr)
@@ -61,6 +61,10 @@ def main():
     parser.add_argument("--hub", default=os.environ.get("RLENS_HUB"), help="Path to the Hub directory (Required)")
     parser.add_argument("--merges", default=os.environ.get("RLENS_MERGES"), help="Path to output directory")
     parser.add_argument("--token", default=os.environ.get("RLENS_TOKEN"), help="Auth token (Required for non-loopback)")
+    parser.add_argument("--isolation", choices=["thread", "process"], default=os.environ.get("RLENS_JOB_ISOLATION", "thread"),
+                        help="Job execution mode: in-process threads or isolated worker processes")
+    parser.add_argument("--watch", choices=["off", "auto", "inotify", "poll"], default=os.environ.get("RLENS_WATCH", "off"),
+                        help="Keep a live in-memory index of the hub (inotify with polling fallback)")
     parser.add_argument("--open", action="store_true", help="ignored (legacy)")
 
     args = parser.parse_args()
@@ -114,7 +118,9 @@ def main():
         hub_path=hub_path,
         token=token,
         host=args.host,
-        merges_dir=merges_path
+        merges_dir=merges_path,
+        job_isolation=args.isolation,
+        watch=args.watch
     )
 
     # 5. Startup Logging
@@ -122,6 +128,8 @@ def main():
     print(f"[rlens] hub: {hub_path}", flush=True)
     print(f"[rlens] output: {merges_path if merges_path else '(default: hub/merges)'}", flush=True)
     print(f"[rlens] token: {'(set)' if token else '(not set)'}", flush=True)
+    print(f"[rlens] job isolation: {args.isolation}", flush=True)
+    print(f"[rlens] watch: {state.watcher.backend if state.watcher else 'off'}", flush=True)
     if args.open:
         print("[rlens] note: --open flag is deprecated and ignored.", flush=True)
 
@@ -19,15 +19,20 @@ Diff-Berichte:
 - Liegen direkt im merges-Verzeichnis des Hubs.
 """
 
+import os
+import struct
 import sys
 import shutil
+import threading
+import concurrent.futures
 import zipfile
+import zlib
 import datetime
 import json
 import hashlib
 import fnmatch
 from pathlib import Path
-from typing import Dict, Tuple, Optional, List, Any
+from typing import Callable, Dict, NamedTuple, Tuple, Optional, List, Any
 
 try:
     import console  # type: ignore
@@ -75,8 +80,12 @@ try:
         detect_hub_dir,
         get_merges_dir,
         get_repo_snapshot,
+        get_paths_snapshot,
         PR_SCHAU_DIR,
     )
+    from lenskit.core.fingerprint import RepoFingerprint, build_repo_fingerprint
+    from lenskit.core.line_diff import unified_diff as unified_line_diff
+    from lenskit.core.pr_schau_bundle import update_catalog
 except ImportError:
     # SCRIPT_DIR is lenskit/core. Parent is lenskit. Parent is merger.
     sys.path.append(str(SCRIPT_DIR.parent.parent))
@@ -84,19 +93,257 @@ except ImportError:
         detect_hub_dir,
         get_merges_dir,
         get_repo_snapshot,
+        get_paths_snapshot,
         PR_SCHAU_DIR,
     )
+    from lenskit.core.fingerprint import RepoFingerprint, build_repo_fingerprint
+    from lenskit.core.line_diff import unified_diff as unified_line_diff
+    from lenskit.core.pr_schau_bundle import update_catalog
 
 
 def detect_hub(explicit_hub: Optional[str] = None) -> Path:
     return detect_hub_dir(SCRIPT_PATH, explicit_hub)
 
 
+# Persistierte Fingerprints (MD5-Cache) der importierten Repos, pro Repo eine Datei
+SNAPSHOT_CACHE_DIR = Path(".repolens") / "snapshots"
+
+
+class RepoSnapshot:
+    """
+    Snapshot eines Baums (get_repo_snapshot: rel_path -> (size, md5, category)),
+    einmal pro Import berechnet und an generate_review_bundle und diff_trees
+    weitergereicht.
+
+    Der zugehörige Fingerprint hält die MD5s pro (size, mtime_ns); mit einem
+    geladenen Vorgänger-Fingerprint werden nur geänderte Dateien gehasht.
+    """
+
+    def __init__(self, root: Path, files: Dict[str, Tuple[int, str, str]],
+                 fingerprint: Optional[RepoFingerprint] = None):
+        self.root = root
+        self.files = files
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, root: Path, previous: Optional[RepoFingerprint] = None) -> "RepoSnapshot":
+        fp = build_repo_fingerprint(root, previous=previous)
+        return cls(root, get_repo_snapshot(root, fingerprint=fp), fp)
+
+
+def _snapshot_cache_path(hub: Path, repo_name: str) -> Path:
+    return hub / SNAPSHOT_CACHE_DIR / f"{repo_name}.json"
+
+
+# ---------------------------------------------------------------------------
+# ZIP-Delta: Abgleich über das Central Directory (CRC32/Größe)
+# ---------------------------------------------------------------------------
+
+CRC_INDEX_VERSION = 1
+
+
+def _crc_index_path(hub: Path, repo_name: str) -> Path:
+    return hub / SNAPSHOT_CACHE_DIR / f"{repo_name}.crc.json"
+
+
+def _load_crc_index(hub: Path, repo_name: str) -> Optional[Dict[str, List[int]]]:
+    """rel_path -> [size, crc32, mtime_ns] des zuletzt importierten Stands, oder None."""
+    try:
+        data = json.loads(_crc_index_path(hub, repo_name).read_text(encoding="utf-8"))
+        if data.get("version") != CRC_INDEX_VERSION:
+            return None
+        return {k: [int(v[0]), int(v[1]), int(v[2])] for k, v in data["files"].items()}
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def _save_crc_index(hub: Path, repo_name: str, repo_root: Path, entries: Dict[str, zipfile.ZipInfo]) -> None:
+    """Merkt sich Größe/CRC32 aus der ZIP und die mtime der Datei auf der Platte."""
+    files = {}
+    for rel, info in entries.items():
+        try:
+            st = os.lstat(repo_root / rel)
+        except OSError:
+            continue
+        files[rel] = [info.file_size, info.CRC, st.st_mtime_ns]
+    path = _crc_index_path(hub, repo_name)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": CRC_INDEX_VERSION, "files": files}, separators=(",", ":")),
+                       encoding="utf-8")
+        tmp.replace(path)
+    except OSError as e:
+        print(f"  Warnung: CRC-Index nicht gespeichert ({e})")
+
+
+def _zip_member_relpath(name: str) -> str:
+    """Pfad eines ZIP-Eintrags so, wie ZipFile.extract ihn anlegt ('', '.', '..' entfernt)."""
+    return "/".join(p for p in name.replace("\\", "/").split("/") if p not in ("", ".", ".."))
+
+
+def _zip_entries(zf: zipfile.ZipFile) -> Tuple[Dict[str, zipfile.ZipInfo], set]:
+    """(rel_path -> ZipInfo der Dateien, alle Verzeichnisse der ZIP inkl. impliziter)."""
+    files: Dict[str, zipfile.ZipInfo] = {}
+    dirs = set()
+    for info in zf.infolist():
+        rel = _zip_member_relpath(info.filename)
+        if not rel:
+            continue
+        if info.is_dir():
+            dirs.add(rel)
+        else:
+            files[rel] = info
+        parent = rel.rpartition("/")[0]
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = parent.rpartition("/")[0]
+    return files, dirs
+
+
+def _crc32_file(path: Path) -> int:
+    crc = 0
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
+def _current_crcs(repo_root: Path, index: Dict[str, List[int]]) -> Dict[str, Tuple[int, int]]:
+    """
+    rel_path -> (size, crc32) aller Dateien unter repo_root. Der CRC kommt aus
+    dem Index, solange size/mtime_ns passen; sonst wird die Datei gelesen.
+    Symlinks bekommen CRC -1 (gelten damit immer als geändert).
+    """
+    current: Dict[str, Tuple[int, int]] = {}
+    root_str = os.fspath(repo_root)
+    for dirpath, _dirnames, filenames in os.walk(root_str):
+        rel_dir = os.path.relpath(dirpath, root_str).replace(os.sep, "/")
+        for fn in filenames:
+            rel = fn if rel_dir == "." else f"{rel_dir}/{fn}"
+            abs_path = os.path.join(dirpath, fn)
+            try:
+                st = os.lstat(abs_path)
+                if os.path.islink(abs_path):
+                    current[rel] = (st.st_size, -1)
+                    continue
+                entry = index.get(rel)
+                if entry and entry[0] == st.st_size and entry[2] == st.st_mtime_ns:
+                    current[rel] = (st.st_size, entry[1])
+                else:
+                    current[rel] = (st.st_size, _crc32_file(Path(abs_path)))
+            except OSError:
+                continue
+    return current
+
+
+def _import_zip_delta(zip_path: Path, hub: Path, merges_dir: Path, repo_name: str,
+                      target_dir: Path, tmp_dir: Path, index: Dict[str, List[int]],
+                      artifacts: Dict[str, Path]) -> Optional[Path]:
+    """
+    Import über das Central Directory: Delta aus CRC32/Größe der ZIP gegen den
+    CRC-Index des vorhandenen Repos; nur neue/geänderte Einträge werden
+    entpackt (Staging in tmp_dir) und danach einzeln per os.replace ins Repo
+    getauscht, entfernte Dateien gelöscht. PR-Schau und Diff bekommen
+    Snapshots nur der betroffenen Pfade.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        entries, zip_dirs = _zip_entries(zf)
+        current = _current_crcs(target_dir, index)
+
+        added = sorted(set(entries) - set(current))
+        removed = sorted(set(current) - set(entries))
+        changed = sorted(
+            rel for rel in set(entries) & set(current)
+            if (entries[rel].file_size, entries[rel].CRC) != current[rel]
+        )
+        print(f"  ZIP-Delta: +{len(added)} ~{len(changed)} -{len(removed)} "
+              f"(unverändert: {len(entries) - len(added) - len(changed)})")
+
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        # zf.open prüft den CRC beim Lesen
+        for rel in added + changed:
+            dest = tmp_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with zf.open(entries[rel]) as src, dest.open("wb") as out:
+                shutil.copyfileobj(src, out, 1 << 20)
+
+    old_snap = RepoSnapshot(target_dir, get_paths_snapshot(target_dir, removed + changed))
+    new_snap = RepoSnapshot(tmp_dir, get_paths_snapshot(tmp_dir, added + changed))
+
+    # 1. PR-Review-Bundle (Kritisch: muss VOR dem Austausch passieren)
+    try:
+        artifacts["pr_schau"] = generate_review_bundle(target_dir, tmp_dir, repo_name, hub,
+                                                       old_snapshot=old_snap, new_snapshot=new_snap)
+        print("  PR-Review-Bundle erfolgreich erstellt.")
+    except Exception as e:
+        print(f"  ❌ FEHLER bei PR-Bundle-Erstellung: {e}")
+        print("  ⚠️ ABBRUCH: Repo wird NICHT verändert, um Datenverlust zu vermeiden.")
+        shutil.rmtree(tmp_dir)
+        raise e  # Hard stop
+
+    # 2. Legacy Diff
+    diff_path = None  # type: Optional[Path]
+    try:
+        diff_path = diff_trees(target_dir, tmp_dir, repo_name, merges_dir,
+                               old_snapshot=old_snap, new_snapshot=new_snap)
+        artifacts["diff"] = diff_path
+        print("  Diff-Bericht:", diff_path)
+    except Exception as e:
+        print(f"  Warnung: Fehler beim Diff-Erstellen ({e}). Fahre fort.")
+
+    # 3. Austausch: erst löschen (und leere, in der ZIP fehlende Ordner entfernen),
+    #    dann neue/geänderte Dateien atomar pro Datei ersetzen
+    for rel in removed:
+        try:
+            (target_dir / rel).unlink()
+        except OSError:
+            continue
+        parent = rel.rpartition("/")[0]
+        while parent and parent not in zip_dirs:
+            try:
+                (target_dir / parent).rmdir()
+            except OSError:
+                break
+            parent = parent.rpartition("/")[0]
+    for rel in added + changed:
+        dest = target_dir / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_dir / rel, dest)
+    for rel in zip_dirs:
+        (target_dir / rel).mkdir(parents=True, exist_ok=True)
+    shutil.rmtree(tmp_dir)
+    print(f"  Repo aktualisiert (in place): {target_dir}")
+
+    _save_crc_index(hub, repo_name, target_dir, entries)
+    return diff_path
+
+
+def _delete_zip(zip_path: Path) -> None:
+    # ZIP nach erfolgreichem Import löschen
+    try:
+        zip_path.unlink()
+        print("  ZIP gelöscht:", zip_path.name)
+    except OSError as e:
+        print(f"  Warnung: Konnte ZIP nicht löschen ({e})")
+    print("")
+
+
+# Spalten der Dateizeilen im .delta.json-Sidecar ("files")
+DELTA_FILE_COLUMNS = ("path", "status", "size_old", "size_new", "md5_old", "md5_new", "category_old", "category_new")
+DELTA_SIDECAR_VERSION = 2
+
+
 def build_delta_meta_from_diff(
     only_old: List[str],
     only_new: List[str],
     changed: List[Tuple[str, int, int, str, str, str, str]],
     base_timestamp: Optional[str] = None,
+    files: Optional[List[List[Any]]] = None,
 ) -> Dict[str, Any]:
     """
     Builds a delta metadata dict conforming to repolens-delta.schema.json.
@@ -106,6 +353,8 @@ def build_delta_meta_from_diff(
         only_new: List of files added
         changed: List of changed file tuples (path, size_old, size_new, ...)
         base_timestamp: Optional timestamp of base import
+        files: Optional full per-file rows (DELTA_FILE_COLUMNS), stored as
+            "files" so delta consumers need not parse the Markdown diff
 
     Returns:
         Delta metadata dict conforming to schema
@@ -132,10 +381,63 @@ def build_delta_meta_from_diff(
             for item in changed
         ],
     }
+    if files is not None:
+        delta_meta["delta_version"] = DELTA_SIDECAR_VERSION
+        delta_meta["file_columns"] = list(DELTA_FILE_COLUMNS)
+        delta_meta["files"] = files
 
     return delta_meta
 
 
+def delta_sidecar_path(diff_path: Path) -> Path:
+    return diff_path.with_suffix(".delta.json")
+
+
+def load_delta_sidecar(diff_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Lädt den .delta.json-Sidecar eines Import-Diffs (diff_trees).
+    None, wenn er fehlt, kaputt ist oder (alt) keine Dateizeilen enthält.
+    """
+    try:
+        raw = json.loads(delta_sidecar_path(diff_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(raw, dict)
+        or raw.get("type") != "repolens-delta"
+        or raw.get("file_columns") != list(DELTA_FILE_COLUMNS)
+        or not isinstance(raw.get("files"), list)
+    ):
+        return None
+    return raw
+
+
+def delta_rows_from_meta(delta_meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Dateizeilen eines Delta-Sidecars im Format von parse_import_diff_table
+    (+ md5_old/md5_new, category_old/category_new).
+    """
+    rows = []
+    for path, status, size_old, size_new, md5_old, md5_new, cat_old, cat_new in delta_meta.get("files", []):
+        if status == "removed":
+            delta, md5_changed = -size_old, None
+        elif status == "added":
+            delta, md5_changed = size_new, None
+        else:
+            delta, md5_changed = size_new - size_old, md5_old != md5_new
+        rows.append({
+            "path": path, "status": status, "category": cat_new or cat_old,
+            "size_old": size_old, "size_new": size_new, "delta": delta, "md5_changed": md5_changed,
+            "md5_old": md5_old, "md5_new": md5_new, "category_old": cat_old, "category_new": cat_new,
+        })
+    return rows
+
+
+def _schema_delta_meta(delta_meta: Dict[str, Any]) -> Dict[str, Any]:
+    # Ohne Dateizeilen: die landen sonst in jedem Merge-JSON, das das Delta einbettet
+    return {k: v for k, v in delta_meta.items() if k not in ("delta_version", "file_columns", "files")}
+
+
 def extract_delta_meta_from_diff_file(diff_path: Path) -> Optional[Dict[str, Any]]:
     """
     Extract delta metadata from an import-diff file.
@@ -145,8 +447,14 @@ def extract_delta_meta_from_diff_file(diff_path: Path) -> Optional[Dict[str, Any
 
     Returns:
         Delta metadata dict conforming to repolens-delta.schema.json,
-        or None if extraction fails
+        or None if extraction fails. Read from the .delta.json sidecar when
+        it carries file rows, otherwise parsed from the Markdown table.
     """
+    sidecar = load_delta_sidecar(diff_path)
+    if sidecar is not None:
+        return _schema_delta_meta(sidecar)
+
+    # Legacy: Diffs ohne strukturierten Sidecar aus der Markdown-Tabelle lesen
     try:
         text = diff_path.read_text(encoding="utf-8")
 
@@ -195,6 +503,8 @@ def diff_trees(
     new: Path,
     repo_name: str,
     merges_dir: Path,
+    old_snapshot: Optional[RepoSnapshot] = None,
+    new_snapshot: Optional[RepoSnapshot] = None,
 ) -> Path:
     """
     Vergleicht zwei Repo-Verzeichnisse und schreibt einen Markdown-Diff-Bericht.
@@ -202,14 +512,16 @@ def diff_trees(
     Neu: „Manifest-Anklang“
       - kleine Tabelle mit Pfad, Status, Kategorie, Größen und MD5-Änderung
       - Kategorien stammen aus merge_core.classify_file_v2 via get_repo_snapshot
+      - old_snapshot/new_snapshot: bereits berechnete Snapshots (import_zip),
+        sonst wird hier gescannt
 
     Rückgabe:
       Pfad zur Diff-Datei.
     """
     # Snapshot-Maps:
     #   rel_path -> (size, md5, category)
-    old_map = get_repo_snapshot(old)
-    new_map = get_repo_snapshot(new)
+    old_map = old_snapshot.files if old_snapshot else get_repo_snapshot(old)
+    new_map = new_snapshot.files if new_snapshot else get_repo_snapshot(new)
 
     old_keys = set(old_map.keys())
     new_keys = set(new_map.keys())
@@ -246,12 +558,22 @@ def diff_trees(
     # Manifest-artige Tabelle: ein Eintrag pro betroffener Datei
     any_rows = bool(only_old or only_new or changed)
 
-    # Immer Delta-Metadaten neben das Diff schreiben – auch wenn keine Änderungen vorliegen
+    # Immer Delta-Metadaten neben das Diff schreiben – auch wenn keine Änderungen vorliegen.
+    # Der Sidecar ist die Quelle für Delta-Merges (Zeilen in DELTA_FILE_COLUMNS-Reihenfolge).
     try:
-        delta_meta = build_delta_meta_from_diff(only_old, only_new, changed)
-        delta_json_path = out_path.with_suffix(".delta.json")
+        file_rows: List[List[Any]] = []
+        for rel in only_old:
+            size_old, md5_old, cat_old = old_map[rel]
+            file_rows.append([rel, "removed", size_old, None, md5_old, None, cat_old, None])
+        for rel in only_new:
+            size_new, md5_new, cat_new = new_map[rel]
+            file_rows.append([rel, "added", None, size_new, None, md5_new, None, cat_new])
+        for rel, s_old, s_new, md5_old, md5_new, cat_old, cat_new in changed:
+            file_rows.append([rel, "changed", s_old, s_new, md5_old, md5_new, cat_old, cat_new])
+        delta_meta = build_delta_meta_from_diff(only_old, only_new, changed, files=file_rows)
+        delta_json_path = delta_sidecar_path(out_path)
         delta_json_path.write_text(
-            json.dumps(delta_meta, indent=2, ensure_ascii=False),
+            json.dumps(delta_meta, ensure_ascii=False, separators=(",", ":")),
             encoding="utf-8",
         )
     except Exception as e:
@@ -320,17 +642,77 @@ def diff_trees(
     return out_path
 
 
-def _construct_logical_payload(header_lines: List[str], content_chunks: List[str]) -> str:
-    """
-    Constructs the logical payload text from header and content chunks.
+def _normalize_newlines(text: str) -> str:
+    """Ensure strictly \n, removing potential \r (byte-exact accounting)."""
+    return text.replace("\r\n", "\n").replace("\r", "\n")
 
-    This function serves as the Single Source of Truth for:
-    1. Calculating expected_bytes
-    2. (Conceptually) Generating single-file content (though parts are flushed directly)
 
-    Logic: "\n".join(header_lines + content_chunks)
+class _ReviewPartWriter:
     """
-    return "\n".join(header_lines + content_chunks)
+    Streams review.md / review_partN.md: every entry (header line or content
+    block) is written straight into the current part, which holds the entries
+    joined by "\n". A block that would push the part over `max_part_size`
+    starts the next part (continuation header, counted as overhead).
+
+    Accounting happens while writing:
+      - expected_bytes: bytes of the logical, un-split payload
+        ("\n".join(all entries))
+      - emitted_bytes: bytes actually written over all parts
+      - SHA-256 per part
+    """
+
+    def __init__(self, bundle_dir: Path, max_part_size: int):
+        self.bundle_dir = bundle_dir
+        self.max_part_size = max_part_size
+        self.parts: List[Tuple[str, int, str]] = []  # (basename, bytes, sha256)
+        self.expected_bytes = -1  # n entries -> n-1 separators
+        self.emitted_bytes = 0
+        self._idx = 0
+        self._f = None  # type: Any
+        self._name = ""
+        self._size = 0  # bytes written to the current part
+        self._entries = 0
+        self._sha = hashlib.sha256()
+
+    def _open(self) -> None:
+        self._idx += 1
+        self._name = "review.md" if self._idx == 1 else f"review_part{self._idx}.md"
+        self._f = (self.bundle_dir / self._name).open("wb")
+        self._size = 0
+        self._entries = 0
+        self._sha = hashlib.sha256()
+
+    def _close(self) -> None:
+        if self._f is None:
+            return
+        self._f.close()
+        self._f = None
+        self.parts.append((self._name, self._size, self._sha.hexdigest()))
+        self.emitted_bytes += self._size
+
+    def _write_entry(self, data: bytes) -> None:
+        if self._entries:
+            data = b"\n" + data
+        self._f.write(data)
+        self._sha.update(data)
+        self._size += len(data)
+        self._entries += 1
+
+    def add(self, entry: str, splittable: bool = True) -> None:
+        data = _normalize_newlines(entry).encode("utf-8")
+        self.expected_bytes += len(data) + 1
+        if self._f is None:
+            self._open()
+        # Part size as planned by the split: every entry counted with its newline
+        elif splittable and self._size + 1 + len(data) + 1 > self.max_part_size:
+            self._close()
+            self._open()
+            self._write_entry(f"# PR-Review (Part {self._idx})".encode("utf-8"))
+        self._write_entry(data)
+
+    def close(self) -> List[Tuple[str, int, str]]:
+        self._close()
+        return self.parts
 
 
 def _compute_sha256(path: Path) -> Optional[str]:
@@ -425,9 +807,18 @@ def _content_looks_like_secret(text: str) -> bool:
     return False
 
 
+# Unified diffs statt vollem Inhalt für geänderte Textdateien (generate_review_bundle)
+PR_SCHAU_UNIFIED_DIFF = os.getenv("RLENS_PR_SCHAU_DIFF", "0") == "1"
+# Größere Dateien werden nicht gedifft (Vollinhalt bzw. Omitted)
+MAX_DIFF_INPUT_SIZE = 8 * 1024 * 1024
+
+
 def generate_review_bundle(
-    old_repo: Path, new_repo: Path, repo_name: str, hub: Path
-) -> None:
+    old_repo: Path, new_repo: Path, repo_name: str, hub: Path,
+    old_snapshot: Optional[RepoSnapshot] = None,
+    new_snapshot: Optional[RepoSnapshot] = None,
+    unified_diff: Optional[bool] = None,
+) -> Path:
     """
     Erzeugt ein persistentes 'PR-Schau'-Bundle aus dem Vergleich zweier Repo-Stände.
     Das Bundle wird unter wc-hub/.repolens/pr-schau/<repo>/<timestamp>/ abgelegt.
@@ -436,7 +827,22 @@ def generate_review_bundle(
     - delta.json (Format 1)
     - review.md (Content)
     - bundle.json (Meta)
+
+    und trägt das Bundle in den Katalog (pr-schau/catalog.jsonl) ein.
+
+    old_snapshot/new_snapshot: bereits berechnete Snapshots (import_zip), sonst
+    wird hier gescannt.
+
+    unified_diff (Default: PR_SCHAU_UNIFIED_DIFF / RLENS_PR_SCHAU_DIFF=1):
+    geänderte Textdateien als Unified Diff (core/line_diff) statt mit vollem
+    Inhalt; auch Dateien über MAX_INLINE_SIZE, solange der Diff klein genug
+    ist. Greift ein Guard (Zeit, Edit-Distanz) oder ist der Diff nicht
+    kleiner als die Datei oder leer (nur Zeilenenden geändert), wird der volle
+    Inhalt gezeigt. delta.json bekommt lines_added/lines_removed nur für
+    Dateien, die im Review als Diff stehen.
     """
+    if unified_diff is None:
+        unified_diff = PR_SCHAU_UNIFIED_DIFF
     now_utc = datetime.datetime.now(datetime.timezone.utc)
     ts_folder = now_utc.strftime("%Y-%m-%dT%H%M%SZ")
 
@@ -451,8 +857,8 @@ def generate_review_bundle(
     # Wir brauchen aber SHA256 und echten Content, also scannen wir die Keys
     # und lesen dann gezielt.
 
-    old_snap = get_repo_snapshot(old_repo)
-    new_snap = get_repo_snapshot(new_repo)
+    old_snap = old_snapshot.files if old_snapshot else get_repo_snapshot(old_repo)
+    new_snap = new_snapshot.files if new_snapshot else get_repo_snapshot(new_repo)
 
     old_files = set(old_snap.keys())
     new_files = set(new_snap.keys())
@@ -523,6 +929,7 @@ def generate_review_bundle(
         all_entries.append(make_entry(f, "removed", old_repo))
 
     # Sort for delta.json (optional, but good for consistency)
+    # (written after the review: unified diffs add line counts to the entries)
     # Primary sort: Status (added/changed/removed) - actually standard is usually by path or status.
     # Let's keep delta.json strictly sorted by path to be canonical.
     delta_files = sorted(all_entries, key=lambda x: x["path"])
@@ -540,10 +947,6 @@ def generate_review_bundle(
         "files": delta_files
     }
 
-    (bundle_dir / "delta.json").write_text(
-        json.dumps(delta_json, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
-
     # --- 2. review.md (Content Splitting & Zones) ---
     MAX_PART_SIZE = 200 * 1024 # 200 KB per part threshold
     MAX_INLINE_SIZE = 200 * 1024 # 200 KB max file content size
@@ -600,17 +1003,47 @@ def generate_review_bundle(
     header_lines.append("<!-- zone:end -->")
     header_lines.append("")
 
-    # Calculate content for diffs
-    content_chunks = [] # List of strings (blocks)
-
-    # Pre-calculate content to enable splitting (logical, un-splitted payload)
-    content_chunks.append("<!-- zone:begin type=diff -->")
+    # Stream the review: header first, then one file block at a time into the current part
+    writer = _ReviewPartWriter(bundle_dir, MAX_PART_SIZE)
+    for line in header_lines:
+        writer.add(line, splittable=False)
 
-    def _normalize_list(lst: List[str]) -> List[str]:
-        """Ensure all strings use strictly \n, removing potential \r."""
-        return [s.replace("\r\n", "\n").replace("\r", "\n") for s in lst]
+    diff_stats = {"files": 0, "fallback_full": 0, "lines_added": 0, "lines_removed": 0}
 
-    for item in review_files:
+    def append_unified_diff(item, block) -> bool:
+        """Unified Diff einer geänderten Textdatei anhängen; False -> voller Inhalt."""
+        if item["size_bytes"] > MAX_DIFF_INPUT_SIZE:
+            return False
+        try:
+            old_raw = (old_repo / item["path"]).read_bytes()
+            new_raw = (new_repo / item["path"]).read_bytes()
+        except OSError:
+            return False
+        if b"\x00" in old_raw[:4096] or b"\x00" in new_raw[:4096]:
+            return False
+        old_text = _normalize_newlines(old_raw.decode("utf-8", errors="replace"))
+        new_text = _normalize_newlines(new_raw.decode("utf-8", errors="replace"))
+        if _content_looks_like_secret(old_text) or _content_looks_like_secret(new_text):
+            return False  # regular path redacts
+        diff = unified_line_diff(old_text, new_text)
+        # Leerer Diff: nur Zeilenende/Newline am Dateiende geändert -> voller Inhalt
+        if (diff is None or not diff.text or len(diff.text) > MAX_INLINE_SIZE
+                or len(diff.text) >= len(new_text)):
+            diff_stats["fallback_full"] += 1
+            return False
+        item["lines_added"] = diff.added
+        item["lines_removed"] = diff.removed
+        diff_stats["files"] += 1
+        diff_stats["lines_added"] += diff.added
+        diff_stats["lines_removed"] += diff.removed
+        block.append(f"- Diff: unified (+{diff.added} / -{diff.removed} lines)")
+        block.append("")
+        block.append("```diff")
+        block.append(diff.text)
+        block.append("```")
+        return True
+
+    def render_block(item) -> str:
         path = item["path"]
         status = item["status"]
 
@@ -634,6 +1067,8 @@ def generate_review_bundle(
             if _is_secret_file(path):
                 block.append("\n> 🔒 **REDACTED (filename rule)**\n")
                 skip_content = True
+            elif unified_diff and status == "changed" and append_unified_diff(item, block):
+                skip_content = True
             elif item["size_bytes"] > MAX_INLINE_SIZE:
                  block.append(f"\n> ⚠️ **Omitted (Size > {MAX_INLINE_SIZE/1024:.0f}KB)**\n")
                  skip_content = True
@@ -673,55 +1108,19 @@ def generate_review_bundle(
                     block.append(f"\n> ⚠️ Error reading content: {e}\n")
 
             block.append("")
+        return "\n".join(block)
 
-        content_chunks.append("\n".join(block))
-
-    content_chunks.append("<!-- zone:end -->")
-
-    # Harden: Normalize inputs to ensure byte-exactness holds across all potential input anomalies
-    header_lines = _normalize_list(header_lines)
-    content_chunks = _normalize_list(content_chunks)
-
-    # Splitting Logic
-    parts_created = []
-    current_part_lines = list(header_lines)
-    current_part_size = sum(len(l.encode('utf-8')) + 1 for l in current_part_lines) # +1 for newline
-    part_idx = 1
-
-    # Helper to flush current part
-    def flush_part(idx, lines):
-        fname = "review.md" if idx == 1 else f"review_part{idx}.md"
-        out_path = bundle_dir / fname
-        text = "\n".join(lines)
-        # Enforce LF for exact byte accounting across platforms
-        with out_path.open("w", encoding="utf-8", newline="\n") as f:
-            f.write(text)
-        return fname
-
-    for chunk in content_chunks:
-        # chunk is a multi-line block; we add it as one entry (with newline via join)
-        chunk_size = len(chunk.encode('utf-8')) + 1
-
-        # If adding this chunk exceeds limit and we have content (header excluded if part > 1), flush
-        # Note: header is always in part 1. Part 2+ start empty or with continuation header.
-        if current_part_size + chunk_size > MAX_PART_SIZE and len(current_part_lines) > 0:
-             # Flush current
-             pname = flush_part(part_idx, current_part_lines)
-             parts_created.append(pname)
-
-             # Start next part
-             part_idx += 1
-             # continuation header (counts as overhead by design)
-             current_part_lines = [f"# PR-Review (Part {part_idx})"]
-             current_part_size = len(current_part_lines[0].encode('utf-8')) + 1
-
-        current_part_lines.append(chunk)
-        current_part_size += chunk_size
-
-    # Flush last part
-    if current_part_lines:
-        pname = flush_part(part_idx, current_part_lines)
-        parts_created.append(pname)
+    try:
+        writer.add("<!-- zone:begin type=diff -->")
+        for item in review_files:
+            writer.add(render_block(item))
+        writer.add("<!-- zone:end -->")
+    finally:
+        parts_created = writer.close()
+
+    (bundle_dir / "delta.json").write_text(
+        json.dumps(delta_json, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
 
     # --- 3. bundle.json ---
     # Construct artifacts list for v1 schema
@@ -734,27 +1133,17 @@ def generate_review_bundle(
         "mime": "application/json"
     })
 
-    # Collect parts artifacts
-    emitted_bytes = 0
-    # expected_bytes must be exact: byte-size of the logical, un-splitted payload
-    logical_text = _construct_logical_payload(header_lines, content_chunks)
-    expected_bytes = len(logical_text.encode("utf-8"))
-
-    for pname in parts_created:
-        ppath = bundle_dir / pname
-        if ppath.exists():
-            psize = ppath.stat().st_size
-            emitted_bytes += psize
-            sha = _compute_sha256(ppath)
-            if not sha or len(sha) != 64:
-                raise RuntimeError(f"SHA256 computation failed for {ppath}")
-            role = "canonical_md" if pname == "review.md" else "part_md"
-            artifacts_list.append({
-                "role": role,
-                "basename": pname,
-                "mime": "text/markdown",
-                "sha256": sha
-            })
+    # expected_bytes is exact: byte-size of the logical, un-splitted payload
+    expected_bytes = writer.expected_bytes
+    emitted_bytes = writer.emitted_bytes
+    for pname, _psize, sha in parts_created:
+        role = "canonical_md" if pname == "review.md" else "part_md"
+        artifacts_list.append({
+            "role": role,
+            "basename": pname,
+            "mime": "text/markdown",
+            "sha256": sha
+        })
 
     bundle_meta = {
         "kind": "repolens.pr_schau.bundle",
@@ -773,7 +1162,7 @@ def generate_review_bundle(
         "completeness": {
             "is_complete": True,
             "policy": "split",
-            "parts": parts_created,
+            "parts": [pname for pname, _, _ in parts_created],
             "primary_part": "review.md",
             "expected_bytes": expected_bytes,
             "emitted_bytes": emitted_bytes
@@ -789,25 +1178,55 @@ def generate_review_bundle(
         }
     }
 
+    if unified_diff:
+        # Changed files rendered as diffs (their bytes are part of expected/emitted)
+        bundle_meta["completeness"]["unified_diff"] = diff_stats
+
     (bundle_dir / "bundle.json").write_text(
         json.dumps(bundle_meta, indent=2, ensure_ascii=False), encoding="utf-8"
     )
 
+    # Katalog (pr-schau/catalog.jsonl) nachführen; Fehler hier kosten kein Bundle
+    try:
+        update_catalog(hub / PR_SCHAU_DIR, bundle_dir)
+    except Exception as e:
+        print(f"  Warnung: PR-Schau-Katalog nicht aktualisiert: {e}")
+    return bundle_dir
+
 
-def import_zip(zip_path: Path, hub: Path, merges_dir: Path) -> Optional[Path]:
+def import_zip(zip_path: Path, hub: Path, merges_dir: Path, zip_delta: bool = True,
+               artifacts: Optional[Dict[str, Path]] = None) -> Optional[Path]:
     """
     Entpackt eine einzelne ZIP-Datei in den Hub, behandelt Konflikte,
     schreibt ggf. Diff und ersetzt das alte Repo.
 
+    zip_delta:
+      Gibt es für das Repo einen CRC-Index des letzten Imports, wird nur das
+      Delta laut Central Directory entpackt und in place getauscht
+      (_import_zip_delta). Sonst (oder mit False) kompletter Austausch.
+
+    artifacts:
+      Wird (falls übergeben) mit den erzeugten Dateien gefüllt
+      ("pr_schau", "diff").
+
     Rückgabe:
       Pfad zum Diff-Bericht oder None.
     """
+    if artifacts is None:
+        artifacts = {}
     repo_name = zip_path.stem
     target_dir = hub / repo_name
     tmp_dir = hub / ("__extract_tmp_" + repo_name)
 
     print("Verarbeite ZIP:", zip_path.name, "-> Repo", repo_name)
 
+    crc_index = _load_crc_index(hub, repo_name) if zip_delta and target_dir.is_dir() else None
+    if crc_index is not None:
+        diff_path = _import_zip_delta(zip_path, hub, merges_dir, repo_name, target_dir, tmp_dir, crc_index,
+                                      artifacts)
+        _delete_zip(zip_path)
+        return diff_path
+
     if tmp_dir.exists():
         shutil.rmtree(tmp_dir)
 
@@ -816,16 +1235,25 @@ def import_zip(zip_path: Path, hub: Path, merges_dir: Path) -> Optional[Path]:
     # ZIP entpacken
     with zipfile.ZipFile(zip_path, "r") as zf:
         zf.extractall(tmp_dir)
+        entries, _ = _zip_entries(zf)
 
     diff_path = None  # type: Optional[Path]
 
+    new_snap = None  # type: Optional[RepoSnapshot]
+    cache_path = _snapshot_cache_path(hub, repo_name)
+
     # Wenn es schon ein Repo mit diesem Namen gibt -> Diff + Bundle + löschen
     if target_dir.exists():
         print("  Zielordner existiert bereits:", target_dir)
 
         # 1. PR-Review-Bundle erzeugen (Kritisch: muss VOR Löschung passieren)
         try:
-            generate_review_bundle(target_dir, tmp_dir, repo_name, hub)
+            # Beide Bäume genau einmal scannen; das alte Repo nutzt den MD5-Cache
+            # des letzten Imports (nur geänderte Dateien werden gehasht)
+            old_snap = RepoSnapshot.build(target_dir, previous=RepoFingerprint.load(cache_path))
+            new_snap = RepoSnapshot.build(tmp_dir)
+            artifacts["pr_schau"] = generate_review_bundle(target_dir, tmp_dir, repo_name, hub,
+                                                           old_snapshot=old_snap, new_snapshot=new_snap)
             print("  PR-Review-Bundle erfolgreich erstellt.")
         except Exception as e:
             print(f"  ❌ FEHLER bei PR-Bundle-Erstellung: {e}")
@@ -836,7 +1264,9 @@ def import_zip(zip_path: Path, hub: Path, merges_dir: Path) -> Optional[Path]:
 
         # 2. Legacy Diff (Optional, but kept for compatibility as 'diff work state')
         try:
-            diff_path = diff_trees(target_dir, tmp_dir, repo_name, merges_dir)
+            diff_path = diff_trees(target_dir, tmp_dir, repo_name, merges_dir,
+                                   old_snapshot=old_snap, new_snapshot=new_snap)
+            artifacts["diff"] = diff_path
             print("  Diff-Bericht:", diff_path)
         except Exception as e:
             print(f"  Warnung: Fehler beim Diff-Erstellen ({e}). Fahre fort.")
@@ -851,47 +1281,137 @@ def import_zip(zip_path: Path, hub: Path, merges_dir: Path) -> Optional[Path]:
     tmp_dir.rename(target_dir)
     print("  Neuer Repo-Ordner:", target_dir)
 
-    # ZIP nach erfolgreichem Import löschen
-    try:
-        zip_path.unlink()
-        print("  ZIP gelöscht:", zip_path.name)
-    except OSError as e:
-        print(f"  Warnung: Konnte ZIP nicht löschen ({e})")
-    print("")
-
+    # MD5-Cache für den nächsten Import (rename erhält size/mtime der Dateien)
+    if new_snap is not None:
+        try:
+            new_snap.fingerprint.root = str(target_dir)
+            new_snap.fingerprint.save(cache_path)
+        except OSError as e:
+            print(f"  Warnung: Snapshot-Cache nicht gespeichert ({e})")
+    # Basis für den nächsten Import im ZIP-Delta-Modus
+    _save_crc_index(hub, repo_name, target_dir, entries)
+
+    _delete_zip(zip_path)
     return diff_path
 
 
-def import_zip_wrapper(zip_path: Path, hub: Path, merges_dir: Path) -> Optional[Path]:
-    """Wraps import_zip, erzeugt optional Delta-Merge und sorgt für Cleanup."""
-    diff_path: Optional[Path] = None
-    try:
-        # Normalen Import + Diff laufen lassen
-        diff_path = import_zip(zip_path, hub, merges_dir)
+# Ein Lock pro Ziel-Repo: Imports verschiedener Repos laufen parallel, zwei
+# ZIPs für dasselbe Repo (auch "Repo.zip"/"repo.zip" auf case-insensitiven
+# Dateisystemen) nacheinander.
+_REPO_LOCKS: Dict[str, threading.Lock] = {}
+_REPO_LOCKS_GUARD = threading.Lock()
 
-        # Automatisch Delta-Merge erzeugen, wenn ein Diff existiert
-        if diff_path is not None:
-            repo_name = zip_path.stem
-            repo_root = hub / repo_name
-            if repo_root.exists():
-                try:
-                    delta_path = create_delta_merge_from_diff(
-                        diff_path, repo_root, merges_dir, profile="delta-full"
-                    )
-                    print(f"  Delta-Merge: {delta_path}")
-                except Exception as e:
-                    print(f"  Warnung: Konnte Delta-Merge nicht erzeugen ({e}).")
 
-        return diff_path
+def _repo_lock(hub: Path, repo_name: str) -> threading.Lock:
+    key = os.path.abspath(os.fspath(hub / repo_name)).casefold()
+    with _REPO_LOCKS_GUARD:
+        lock = _REPO_LOCKS.get(key)
+        if lock is None:
+            lock = _REPO_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def import_zip_wrapper(zip_path: Path, hub: Path, merges_dir: Path,
+                       artifacts: Optional[Dict[str, Path]] = None) -> Optional[Path]:
+    """
+    Wraps import_zip, erzeugt optional Delta-Merge und sorgt für Cleanup.
+    `artifacts` sammelt wie bei import_zip die erzeugten Dateien (+ "delta_merge").
+    Das ZIP wird nur nach erfolgreichem Import gelöscht; ein fehlgeschlagenes
+    bleibt liegen und wird beim nächsten Lauf erneut versucht.
+    """
+    if artifacts is None:
+        artifacts = {}
+    try:
+        with _repo_lock(hub, zip_path.stem):
+            diff_path = _import_zip_and_delta_merge(zip_path, hub, merges_dir, artifacts)
     except Exception:
+        print(f"  ZIP behalten für erneuten Versuch ({zip_path.name})")
         raise
-    finally:
-        if zip_path.exists():
+    if zip_path.exists():
+        try:
+            zip_path.unlink()
+            print(f"  Cleanup: ZIP gelöscht ({zip_path.name})")
+        except OSError:
+            pass
+    return diff_path
+
+
+def _import_zip_and_delta_merge(zip_path: Path, hub: Path, merges_dir: Path,
+                                artifacts: Dict[str, Path]) -> Optional[Path]:
+    # Normalen Import + Diff laufen lassen
+    diff_path = import_zip(zip_path, hub, merges_dir, artifacts=artifacts)
+
+    # Automatisch Delta-Merge erzeugen, wenn ein Diff existiert
+    if diff_path is not None:
+        repo_name = zip_path.stem
+        repo_root = hub / repo_name
+        if repo_root.exists():
             try:
-                zip_path.unlink()
-                print(f"  Cleanup: ZIP gelöscht ({zip_path.name})")
-            except OSError:
-                pass
+                delta_path = create_delta_merge_from_diff(
+                    diff_path, repo_root, merges_dir, profile="delta-full"
+                )
+                artifacts["delta_merge"] = delta_path
+                print(f"  Delta-Merge: {delta_path}")
+            except Exception as e:
+                print(f"  Warnung: Konnte Delta-Merge nicht erzeugen ({e}).")
+
+    return diff_path
+
+
+class ImportResult(NamedTuple):
+    zip_path: Path
+    diff_path: Optional[Path]
+    error: Optional[BaseException]
+    artifacts: Dict[str, Path]
+
+
+def _default_import_workers() -> int:
+    # Imports warten überwiegend auf I/O (Entpacken, Hashen, Schreiben)
+    env = os.getenv("RLENS_EXTRACTOR_WORKERS")
+    if env:
+        return max(1, int(env))
+    return min(8, (os.cpu_count() or 1) + 2)
+
+
+def import_zips(
+    zips: List[Path],
+    hub: Path,
+    merges_dir: Path,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[ImportResult, int, int], None]] = None,
+) -> List[ImportResult]:
+    """
+    Importiert mehrere ZIPs parallel über import_zip_wrapper.
+
+    Rückgabe (in der Reihenfolge von `zips`):
+      ein ImportResult pro ZIP (Fehler statt Exception).
+    on_result(result, done, total) wird nach jedem fertigen ZIP aufgerufen
+    (serialisiert, aus den Worker-Threads).
+    """
+    total = len(zips)
+    results: Dict[Path, ImportResult] = {}
+    done_lock = threading.Lock()
+
+    def run(zp: Path) -> ImportResult:
+        artifacts: Dict[str, Path] = {}
+        try:
+            result = ImportResult(zp, import_zip_wrapper(zp, hub, merges_dir, artifacts), None, artifacts)
+        except Exception as e:
+            result = ImportResult(zp, None, e, artifacts)
+        with done_lock:
+            results[zp] = result
+            if on_result is not None:
+                on_result(result, len(results), total)
+        return result
+
+    n = min(total, workers or _default_import_workers())
+    if n <= 1:
+        for zp in zips:
+            run(zp)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n, thread_name_prefix="rlens-import") as pool:
+            list(pool.map(run, zips))
+    return [results[zp] for zp in zips]
 
 
 def _console_alert(title: str, msg: str) -> None:
@@ -917,6 +1437,76 @@ def _zip_fingerprint(zip_path: Path) -> Dict[str, Any]:
     }
 
 
+STATE_VERSION = 2
+# Ledger-Einträge, die höchstens behalten werden (älteste fliegen zuerst)
+LEDGER_MAX = 500
+_EOCD_SIG = b"PK\x05\x06"
+_EOCD64_LOCATOR_SIG = b"PK\x06\x07"
+_EOCD64_SIG = b"PK\x06\x06"
+
+
+def zip_content_fingerprint(zip_path: Path) -> str:
+    """
+    Schneller Inhalts-Fingerprint einer ZIP: Dateigröße + CRC32 über das
+    Central Directory (inkl. End-Record). Das Central Directory enthält
+    Namen, Größen und CRC32 aller Einträge – gleicher Inhalt ergibt denselben
+    Fingerprint, unabhängig von mtime. Gelesen wird nur das Dateiende.
+    Kein gültiges ZIP: CRC32 über die letzten 64 KiB.
+    """
+    size = zip_path.stat().st_size
+    with zip_path.open("rb") as f:
+        tail_len = min(size, 65536 + 22)
+        f.seek(size - tail_len)
+        tail = f.read(tail_len)
+        eocd = tail.rfind(_EOCD_SIG)
+        if eocd < 0 or len(tail) - eocd < 22:
+            return f"{size}-raw{zlib.crc32(tail[-65536:]):08x}"
+        eocd_pos = size - tail_len + eocd
+        cd_size, _cd_offset = struct.unpack("<II", tail[eocd + 12:eocd + 20])
+        end_pos = eocd_pos
+        if cd_size == 0xFFFFFFFF and eocd >= 20 and tail[eocd - 20:eocd - 16] == _EOCD64_LOCATOR_SIG:
+            (rec64_pos,) = struct.unpack("<Q", tail[eocd - 12:eocd - 4])
+            f.seek(rec64_pos)
+            rec64 = f.read(56)
+            if rec64[:4] == _EOCD64_SIG:
+                (cd_size,) = struct.unpack("<Q", rec64[40:48])
+                end_pos = rec64_pos
+        # Wie zipfile: Start relativ zum End-Record (verträgt vorangestellte Daten)
+        start = max(0, end_pos - cd_size)
+        f.seek(start)
+        crc = 0
+        remaining = eocd_pos + 22 - start
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            remaining -= len(chunk)
+    return f"{size}-{crc:08x}"
+
+
+def _ledger_fingerprint(zip_path: Path, stat_cache: Dict[str, Any]) -> str:
+    """
+    Fingerprint über den stat-Cache (name -> size/mtime_ns/ctime_ns); die ZIP
+    wird nur gelesen, wenn sich eines davon geändert hat.
+    """
+    st = zip_path.stat()
+    key = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "ctime_ns": st.st_ctime_ns}
+    cached = stat_cache.get(zip_path.name)
+    if isinstance(cached, dict) and all(cached.get(k) == v for k, v in key.items()):
+        return cached["fingerprint"]
+    fp = zip_content_fingerprint(zip_path)
+    stat_cache[zip_path.name] = dict(key, fingerprint=fp)
+    return fp
+
+
+def _artifact_ref(path: Path, hub: Path) -> str:
+    try:
+        return path.resolve().relative_to(hub.resolve()).as_posix()
+    except (OSError, ValueError):
+        return str(path)
+
+
 def _read_state(merges_dir: Path) -> Dict[str, Any]:
     p = _state_path(merges_dir)
     try:
@@ -931,19 +1521,60 @@ def _read_state(merges_dir: Path) -> Dict[str, Any]:
 def _write_state(merges_dir: Path, state: Dict[str, Any]) -> None:
     p = _state_path(merges_dir)
     try:
-        p.write_text(json.dumps(state, ensure_ascii=False, indent=2) + "\n", "utf-8")
+        tmp = p.with_name(p.name + ".tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2) + "\n", "utf-8")
+        tmp.replace(p)
     except Exception as e:
         sys.stderr.write(f"Warning: Failed to write extractor state: {e}\n")
 
 
+def _same_fingerprint(prev: Any, fp: Dict[str, Any]) -> bool:
+    return (
+        isinstance(prev, dict)
+        and prev.get("name") == fp.get("name")
+        and int(prev.get("mtime", -1)) == int(fp.get("mtime"))
+        and int(prev.get("size", -1)) == int(fp.get("size"))
+    )
+
+
+def _prune_ledger(ledger: Dict[str, Any]) -> None:
+    if len(ledger) > LEDGER_MAX:
+        by_age = sorted(ledger, key=lambda k: str(ledger[k].get("imported_at", "")))
+        for key in by_age[:len(ledger) - LEDGER_MAX]:
+            del ledger[key]
+
+
+def _last_imported(state: Dict[str, Any], ledger: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Repo -> Fingerprint des zuletzt erfolgreich importierten ZIP-Inhalts.
+    Ältere v2-States ohne "last": aus dem jüngsten ok-Eintrag je Repo ableiten.
+    """
+    last = state.get("last")
+    if isinstance(last, dict):
+        return {str(k): str(v) for k, v in last.items()}
+    newest: Dict[str, Tuple[str, str]] = {}
+    for fp, entry in ledger.items():
+        if not isinstance(entry, dict) or entry.get("status") != "ok" or not entry.get("repo"):
+            continue
+        at = str(entry.get("imported_at", ""))
+        if entry["repo"] not in newest or at > newest[entry["repo"]][0]:
+            newest[entry["repo"]] = (at, fp)
+    return {repo: fp for repo, (_, fp) in newest.items()}
+
+
 def run_extractor(
     hub_override: Optional[Path] = None,
     show_alert: bool = False,
     incremental: bool = True,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Tuple[int, str]:
     """Programmatic entry point for callers like repoLens.
 
     By default: quiet (no alerts), best-effort, returns a status+message.
+    ZIPs are imported in parallel (`workers`, default RLENS_EXTRACTOR_WORKERS
+    or an I/O-sized pool); `progress` receives
+    {"done", "total", "zip", "ok", "error"} after each ZIP.
     """
     hub = hub_override if hub_override is not None else detect_hub_dir(SCRIPT_PATH)
     if hub is None:
@@ -960,41 +1591,81 @@ def run_extractor(
             _console_alert("No imports found", msg)
         return 0, msg
 
-    newest = zips[0]
-    newest_fp = _zip_fingerprint(newest)
-    prev_state = _read_state(merges_dir)
+    state = _read_state(merges_dir)
+    ledger = state.get("ledger") if isinstance(state.get("ledger"), dict) else {}
+    stat_cache = state.get("stat") if isinstance(state.get("stat"), dict) else {}
+    # Drop stat entries of ZIPs that are gone (imports delete their ZIP)
+    stat_cache = {zp.name: stat_cache[zp.name] for zp in zips if zp.name in stat_cache}
+    stat_before = json.dumps(stat_cache, sort_keys=True)
+    fingerprints = {zp: _ledger_fingerprint(zp, stat_cache) for zp in zips}
+    last = _last_imported(state, ledger)
 
     if incremental:
-        prev_fp = prev_state.get("newest_zip", {})
-        if (
-            isinstance(prev_fp, dict)
-            and prev_fp.get("name") == newest_fp.get("name")
-            and int(prev_fp.get("mtime", -1)) == int(newest_fp.get("mtime"))
-            and int(prev_fp.get("size", -1)) == int(newest_fp.get("size"))
-        ):
+        # Pre-ledger states only knew name/mtime/size
+        legacy = [state.get("newest_zip")] + list((state.get("zips") or {}).values())
+        todo = []
+        for zp in zips:
+            # Nur der zuletzt importierte Inhalt des Repos zählt: ein früherer
+            # Stand (Revert X -> Y -> X) muss erneut importiert werden
+            if last.get(zp.stem) == fingerprints[zp]:
+                continue
+            if any(_same_fingerprint(prev, _zip_fingerprint(zp)) for prev in legacy):
+                continue
+            todo.append(zp)
+        zips = todo
+        if not zips:
+            if json.dumps(stat_cache, sort_keys=True) != stat_before:
+                # Re-touched ZIPs with known content: remember their new stat
+                state["stat"] = stat_cache
+                state["last"] = last
+                _write_state(merges_dir, state)
             msg = "No new hub zip detected; extractor skipped (incremental)."
             if show_alert:
                 _console_alert("Extractor skipped", msg)
             return 0, msg
 
+    state = {"version": STATE_VERSION, "ledger": ledger, "stat": stat_cache, "last": last}
     processed = 0
-    failures = 0
-    for zp in zips:
-        try:
-            diff_path = import_zip_wrapper(zp, hub, merges_dir)
+    failed: List[str] = []
+
+    def on_result(result: ImportResult, done: int, total: int) -> None:
+        nonlocal processed
+        zp, diff_path, error, artifacts = result
+        refs = {k: _artifact_ref(v, hub) for k, v in artifacts.items() if v is not None}
+        if diff_path is not None:
+            refs["delta_json"] = _artifact_ref(diff_path.with_suffix(".delta.json"), hub)
+        ledger[fingerprints[zp]] = {
+            "repo": zp.stem,
+            "zip": zp.name,
+            "status": "ok" if error is None else "failed",
+            "error": None if error is None else str(error),
+            "imported_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "artifacts": refs,
+        }
+        if error is None:
+            last[zp.stem] = fingerprints[zp]
+        _prune_ledger(ledger)
+        # Written per ZIP as soon as it is done, so an interrupted run keeps its progress
+        _write_state(merges_dir, state)
+        if error is None:
             if diff_path is not None:
                 processed += 1
-        except Exception as e:
-            sys.stderr.write(f"Error processing {zp.name}: {e}\n")
-            failures += 1
-
-    # Update state after a run (even if some failures happened)
-    _write_state(merges_dir, {"newest_zip": newest_fp})
-
-    msg = f"imports processed: {processed}, failures: {failures}, hub zips: {len(zips)}, incremental: {incremental}"
+        else:
+            sys.stderr.write(f"Error processing {zp.name}: {error}\n")
+            failed.append(zp.name)
+        print(f"[{done}/{total}] {zp.name}: {'ok' if error is None else 'FEHLER'}")
+        if progress is not None:
+            progress({"done": done, "total": total, "zip": zp.name, "ok": error is None,
+                      "error": None if error is None else str(error)})
+
+    import_zips(zips, hub, merges_dir, workers=workers, on_result=on_result)
+
+    msg = f"imports processed: {processed}, failures: {len(failed)}, hub zips: {len(zips)}, incremental: {incremental}"
+    if failed:
+        msg += f" (failed: {', '.join(sorted(failed))})"
     if show_alert:
         _console_alert("Extractor finished", msg)
-    return (0 if failures == 0 else 2), msg
+    return (0 if not failed else 2), msg
 
 
 def main() -> int:
@@ -1023,13 +1694,11 @@ def main() -> int:
 
     diff_paths = []
 
-    for zp in zips:
-        try:
-            diff = import_zip_wrapper(zp, hub, merges_dir)
-            if diff is not None:
-                diff_paths.append(diff)
-        except Exception as e:
-            print("Fehler bei {}: {}".format(zp, e), file=sys.stderr)
+    for zp, diff, error, _ in import_zips(zips, hub, merges_dir):
+        if error is not None:
+            print("Fehler bei {}: {}".format(zp, error), file=sys.stderr)
+        elif diff is not None:
+            diff_paths.append(diff)
 
     summary_lines = []
     summary_lines.append("Import fertig.")
@@ -1158,8 +1827,9 @@ def build_delta_merge_report(
     profile: str = "delta-full",
 ) -> Path:
     """
-    Erzeugt einen WC-Merger-kompatiblen Delta-Report auf Basis eines
-    Import-Diffs (parse_import_diff_table).
+    Erzeugt einen WC-Merger-kompatiblen Delta-Report auf Basis der
+    Dateizeilen eines Import-Diffs (delta_rows_from_meta bzw. legacy
+    parse_import_diff_table).
 
     Standardverhalten:
       - Status "changed" und "added" → mit Inhalt
@@ -1336,15 +2006,18 @@ def create_delta_merge_from_diff(
 ) -> Path:
     """
     Komfort-Helfer:
-      - liest einen vorhandenen Import-Diff
-      - parst die Manifest-Tabelle
+      - liest die Dateizeilen eines vorhandenen Import-Diffs aus dem
+        .delta.json-Sidecar (ältere Diffs: Manifest-Tabelle parsen)
       - erzeugt einen Delta-Merge-Report
 
     Rückgabe:
       Pfad zur erzeugten Delta-Merge-Datei.
     """
-    text = diff_path.read_text(encoding="utf-8")
-    rows = parse_import_diff_table(text)
+    sidecar = load_delta_sidecar(diff_path)
+    if sidecar is not None:
+        rows = delta_rows_from_meta(sidecar)
+    else:
+        rows = parse_import_diff_table(diff_path.read_text(encoding="utf-8"))
     return build_delta_merge_report(repo_root, repo_root.name, rows, merges_dir, profile=profile)
 
 
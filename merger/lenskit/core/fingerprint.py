@@ -0,0 +1,269 @@
+"""
+Merkle fingerprints for repository trees.
+
+Every directory gets a hash over its direct children:
+  - files:  name, size and mtime_ns
+  - dirs:   name and the child directory's hash
+
+Properties:
+  - The root hash changes iff anything below it changed (stat-level).
+  - Two fingerprints can be compared top-down; equal subtree hashes are
+    skipped without looking at their contents.
+  - Building a new fingerprint against a previous one only stats files.
+    Content hashes of files whose (size, mtime_ns) did not change are carried
+    over, so consumers such as scan_repo can skip re-hashing them.
+  - Content hashes live in a side table per directory and are not part of the
+    Merkle input: attaching them never changes a directory hash.
+
+Persisted as JSON (one file per repo), see RepoFingerprint.save/load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .merge import SKIP_DIRS, SKIP_FILES
+
+FINGERPRINT_VERSION = 2
+
+# name -> (size, mtime_ns)
+FileStat = Tuple[int, int]
+
+
+@dataclass
+class DirNode:
+    hash: str = ""
+    files: Dict[str, FileStat] = field(default_factory=dict)
+    dirs: List[str] = field(default_factory=list)
+    # name -> content hash, only for files whose hash is known
+    content: Dict[str, str] = field(default_factory=dict)
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return name if rel_dir == "." else f"{rel_dir}/{name}"
+
+
+def _split(rel_path: str) -> Tuple[str, str]:
+    head, _, tail = rel_path.rpartition("/")
+    return (head or "."), tail
+
+
+class RepoFingerprint:
+    """Per-directory Merkle tree of a repository, keyed by posix relpath ("." = root)."""
+
+    def __init__(self, root: str, dirs: Optional[Dict[str, DirNode]] = None):
+        self.root = root
+        self.dirs: Dict[str, DirNode] = dirs if dirs is not None else {}
+
+    @property
+    def root_hash(self) -> str:
+        node = self.dirs.get(".")
+        return node.hash if node else hashlib.sha256(b"").hexdigest()
+
+    # --- Content hash cache ---
+
+    def lookup_content_hash(self, rel_path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Cached content hash for rel_path, only if its stat still matches."""
+        rel_dir, name = _split(rel_path)
+        node = self.dirs.get(rel_dir)
+        if not node:
+            return None
+        if node.files.get(name) == (size, mtime_ns):
+            return node.content.get(name)
+        return None
+
+    def set_content_hash(self, rel_path: str, content_hash: str) -> None:
+        """Attach a content hash to a known file. Directory hashes are unaffected."""
+        rel_dir, name = _split(rel_path)
+        node = self.dirs.get(rel_dir)
+        if node and name in node.files:
+            node.content[name] = content_hash
+
+    def _node_hash(self, rel_dir: str) -> str:
+        node = self.dirs[rel_dir]
+        h = hashlib.sha256()
+        for name in sorted(node.files):
+            size, mtime_ns = node.files[name]
+            h.update(f"f\0{name}\0{size}\0{mtime_ns}\n".encode("utf-8", "surrogateescape"))
+        for name in sorted(node.dirs):
+            child = self.dirs.get(_join(rel_dir, name))
+            h.update(f"d\0{name}\0{child.hash if child else ''}\n".encode("utf-8", "surrogateescape"))
+        return h.hexdigest()
+
+    # --- Comparison ---
+
+    def changed_subtrees(self, since: Optional["RepoFingerprint"]) -> List[str]:
+        """
+        Directories that changed compared to `since` (an older fingerprint).
+
+        Returns directories whose own entries (files or child dir names) differ,
+        plus added/removed directories. Subtrees with equal hashes are not visited.
+        `since=None` means everything changed (["."]).
+        """
+        if since is None:
+            return ["."]
+        if self.root_hash == since.root_hash:
+            return []
+
+        changed: List[str] = []
+        stack = ["."]
+        while stack:
+            rel_dir = stack.pop()
+            new = self.dirs.get(rel_dir)
+            old = since.dirs.get(rel_dir)
+            if new is None or old is None:
+                changed.append(rel_dir)
+                continue
+            if new.hash == old.hash:
+                continue
+
+            new_dirs, old_dirs = set(new.dirs), set(old.dirs)
+            if new.files != old.files or new_dirs != old_dirs:
+                changed.append(rel_dir)
+            # Added/removed child dirs are reported as a whole, not descended into
+            for name in new_dirs ^ old_dirs:
+                changed.append(_join(rel_dir, name))
+            common = new_dirs & old_dirs
+            for name in sorted(common, reverse=True):
+                stack.append(_join(rel_dir, name))
+
+        return sorted(changed)
+
+    # --- Persistence ---
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": FINGERPRINT_VERSION,
+            "root": self.root,
+            "root_hash": self.root_hash,
+            "dirs": {
+                rel: {
+                    "hash": n.hash,
+                    "files": {k: list(v) for k, v in n.files.items()},
+                    "dirs": n.dirs,
+                    "content": n.content,
+                }
+                for rel, n in self.dirs.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RepoFingerprint":
+        if data.get("version") != FINGERPRINT_VERSION:
+            raise ValueError(f"Unsupported fingerprint version: {data.get('version')}")
+        dirs = {}
+        for rel, n in data.get("dirs", {}).items():
+            files = {k: (int(v[0]), int(v[1])) for k, v in n.get("files", {}).items()}
+            content = {k: str(v) for k, v in n.get("content", {}).items() if k in files}
+            dirs[rel] = DirNode(hash=n.get("hash", ""), files=files, dirs=list(n.get("dirs", [])), content=content)
+        return cls(root=data.get("root", ""), dirs=dirs)
+
+    def save(self, path: Path) -> None:
+        """Atomic write (tmp + replace)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["RepoFingerprint"]:
+        """Returns None for missing or unreadable files (caller rebuilds from scratch)."""
+        try:
+            return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return None
+
+
+def build_repo_fingerprint(
+    repo_root: Path,
+    previous: Optional[RepoFingerprint] = None,
+    exclude: Iterable[Path] = (),
+) -> RepoFingerprint:
+    """
+    Walks repo_root (stat only, same directory rules as scan_repo) and builds
+    the Merkle tree. Content hashes are carried over from `previous` for files
+    whose size and mtime are unchanged.
+    """
+    root_str = os.fspath(repo_root)
+    excluded = {os.path.normpath(os.fspath(p)) for p in exclude}
+    fp = RepoFingerprint(root=root_str)
+
+    # Iterative DFS; record visit order so hashes can be computed children-first.
+    order: List[str] = []
+    stack: List[Tuple[str, str]] = [(".", root_str)]
+    while stack:
+        rel_dir, abs_dir = stack.pop()
+        node = DirNode()
+        fp.dirs[rel_dir] = node
+        order.append(rel_dir)
+        prev_node = previous.dirs.get(rel_dir) if previous else None
+
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        for entry in entries:
+            name = entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if name in SKIP_DIRS or os.path.normpath(entry.path) in excluded:
+                        continue
+                    node.dirs.append(name)
+                    stack.append((_join(rel_dir, name), entry.path))
+                    continue
+                if name in SKIP_FILES:
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+            node.files[name] = (st.st_size, st.st_mtime_ns)
+            if prev_node and prev_node.files.get(name) == node.files[name]:
+                content = prev_node.content.get(name)
+                if content:
+                    node.content[name] = content
+
+        node.dirs.sort()
+
+    for rel_dir in reversed(order):
+        fp.dirs[rel_dir].hash = fp._node_hash(rel_dir)
+
+    return fp
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Merkle fingerprint of a repository tree.")
+    parser.add_argument("repo", help="Repository root")
+    parser.add_argument("--since", help="Previous fingerprint JSON; prints changed subtrees")
+    parser.add_argument("--save", help="Write the new fingerprint JSON to this path")
+    args = parser.parse_args(argv)
+
+    repo = Path(args.repo).expanduser().resolve()
+    if not repo.is_dir():
+        print(f"Not a directory: {repo}", file=sys.stderr)
+        return 1
+
+    previous = RepoFingerprint.load(Path(args.since)) if args.since else None
+    fp = build_repo_fingerprint(repo, previous=previous)
+
+    out = {"root": str(repo), "root_hash": fp.root_hash}
+    if args.since:
+        out["changed_subtrees"] = fp.changed_subtrees(previous)
+    print(json.dumps(out, indent=2))
+
+    if args.save:
+        fp.save(Path(args.save))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Line-level unified diffs for PR-Schau review bundles.
+
+Pipeline per file:
+  1. Common prefix/suffix lines are stripped (small edits to large files
+     leave only a tiny middle section).
+  2. The remaining lines are interned to ints (one hash per line), so the
+     inner loop compares ints instead of strings.
+  3. Myers' O(ND) algorithm finds a shortest edit script on the middle.
+
+Guards: the edit distance D is capped (`max_edits`) and a wall-clock budget
+is checked while searching. When either trips, unified_diff() returns None
+and the caller falls back to full content.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_CONTEXT = 3
+DEFAULT_MAX_EDITS = 2000
+DEFAULT_TIME_BUDGET = 0.5  # seconds per file
+
+# Edit ops: (op, old_index, new_index); op in "=", "-", "+"
+Op = Tuple[str, int, int]
+
+
+class LineDiff(NamedTuple):
+    text: str  # unified diff (hunks only, no ---/+++ header)
+    added: int
+    removed: int
+
+
+def _intern(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    ids: Dict[str, int] = {}
+    return ([ids.setdefault(line, len(ids)) for line in a],
+            [ids.setdefault(line, len(ids)) for line in b])
+
+
+def _myers(a: List[int], b: List[int], max_edits: int, deadline: float) -> Optional[List[Op]]:
+    """Shortest edit script of a -> b, or None if D > max_edits or the deadline passed."""
+    n, m = len(a), len(b)
+    max_d = min(n + m, max_edits)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    # trace[d]: V before step d, restricted to k in [-d-1, d+1]
+    trace: List[List[int]] = []
+    for d in range(max_d + 1):
+        if d & 31 == 0 and time.monotonic() > deadline:
+            return None
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace: List[List[int]], n: int, m: int) -> List[Op]:
+    ops: List[Op] = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        snap = trace[d]  # index of k is k + d + 1
+        k = x - y
+        if k == -d or (k != d and snap[k - 1 + d + 1] < snap[k + 1 + d + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = snap[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            ops.append(("=", x, y))
+        if x == prev_x:
+            ops.append(("+", x, prev_y))
+        else:
+            ops.append(("-", prev_x, y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        ops.append(("=", x, y))
+    ops.reverse()
+    return ops
+
+
+def edit_script(a: Sequence[str], b: Sequence[str], max_edits: int = DEFAULT_MAX_EDITS,
+                time_budget: float = DEFAULT_TIME_BUDGET) -> Optional[List[Op]]:
+    """Edit script over whole line lists (prefix/suffix trimmed before Myers)."""
+    n, m = len(a), len(b)
+    pre = 0
+    while pre < n and pre < m and a[pre] == b[pre]:
+        pre += 1
+    suf = 0
+    while suf < n - pre and suf < m - pre and a[n - 1 - suf] == b[m - 1 - suf]:
+        suf += 1
+    ia, ib = _intern(a[pre:n - suf], b[pre:m - suf])
+    middle = _myers(ia, ib, max_edits, time.monotonic() + time_budget)
+    if middle is None:
+        return None
+    ops: List[Op] = [("=", i, i) for i in range(pre)]
+    ops.extend((op, i + pre, j + pre) for op, i, j in middle)
+    ops.extend(("=", n - suf + i, m - suf + i) for i in range(suf))
+    return ops
+
+
+def _lines(text: str) -> List[str]:
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()  # final newline terminates the last line
+    return lines
+
+
+def unified_diff(old: str, new: str, context: int = DEFAULT_CONTEXT,
+                 max_edits: int = DEFAULT_MAX_EDITS,
+                 time_budget: float = DEFAULT_TIME_BUDGET) -> Optional[LineDiff]:
+    """
+    Unified diff hunks ("@@ -a,b +c,d @@") of two texts, or None when a guard
+    tripped.
+    """
+    a = _lines(old)
+    b = _lines(new)
+    ops = edit_script(a, b, max_edits, time_budget)
+    if ops is None:
+        return None
+
+    changes = [i for i, (op, _, _) in enumerate(ops) if op != "="]
+    added = sum(1 for op, _, _ in ops if op == "+")
+    removed = len(changes) - added
+    out: List[str] = []
+    start = 0
+    while start < len(changes):
+        # Group changes whose context windows overlap into one hunk
+        end = start
+        while end + 1 < len(changes) and changes[end + 1] - changes[end] <= 2 * context:
+            end += 1
+        lo = max(0, changes[start] - context)
+        hi = min(len(ops), changes[end] + context + 1)
+        hunk = ops[lo:hi]
+        old_len = sum(1 for op, _, _ in hunk if op != "+")
+        new_len = sum(1 for op, _, _ in hunk if op != "-")
+        # Hunk starts: first old/new line index covered (as in difflib, 0 means "empty range")
+        old_start = hunk[0][1] + (1 if old_len else 0)
+        new_start = hunk[0][2] + (1 if new_len else 0)
+        out.append(f"@@ -{old_start},{old_len} +{new_start},{new_len} @@")
+        for op, i, j in hunk:
+            if op == "=":
+                out.append(" " + a[i])
+            elif op == "-":
+                out.append("-" + a[i])
+            else:
+                out.append("+" + b[j])
+        start = end + 1
+    return LineDiff("\n".join(out), added, removed)
@@ -14,12 +14,17 @@ import datetime
 import re
 import unicodedata
 import concurrent.futures
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any, Iterator, NamedTuple, Set
 from dataclasses import dataclass
 
 from . import lenses
 from . import clock
+from .report_splice import PriorReport, ReportSplice, find_prior_report
 
 try:
     import yaml  # PyYAML
@@ -1839,139 +1844,376 @@ def is_critical_file(rel_path_str: str) -> bool:
         return True
     return False
 
-def prescan_repo(repo_root: Path, max_depth: int = 10, ignore_globs: Optional[List[str]] = None) -> Dict[str, Any]:
+# --- Prescan walker (shared by prescan_repo, prescan_level, prescan_signature) ---
+
+_PRESCAN_ENV_ALLOWED = (".env.example", ".env.template", ".env.sample")
+# Directory listings are reused while the directory's (mtime_ns, inode) is unchanged.
+# In-place file edits do not touch the directory, so entries also expire after a TTL.
+PRESCAN_LISTING_TTL_SEC = float(os.getenv("RLENS_PRESCAN_CACHE_SEC", "30"))
+# Node ceiling of the materialized full tree (prescan_repo); prescan_level has none
+PRESCAN_MAX_NODES = 50000
+
+
+class _BoundedCache:
     """
-    Lightweight scan for structure visualization (Prescan).
-    Returns a nested dict representing the tree.
+    Thread-safe LRU with a TTL and a weight budget (e.g. listed names), so a
+    large hub cannot keep its whole tree in process memory.
     """
-    repo_root = repo_root.resolve()
-    root_label = repo_root.name
 
-    # Build ignores
-    ignore_set = set(SKIP_DIRS)
-    import fnmatch
+    def __init__(self, max_entries: int, max_weight: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, int, Any]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            if now - hit[0] >= self.ttl:
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return hit[2]
+
+    def put(self, key: Any, value: Any, weight: int = 1) -> None:
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (time.monotonic(), weight, value)
+            self._weight += weight
+            while self._data and (len(self._data) > self.max_entries or self._weight > self.max_weight):
+                self._pop(next(iter(self._data)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _pop(self, key: Any) -> None:
+        self._weight -= self._data.pop(key)[1]
+
+
+# path -> (fingerprint, [(name, is_dir, size)]); weight = listed names
+_prescan_listings = _BoundedCache(max_entries=20000, max_weight=250000, ttl=PRESCAN_LISTING_TTL_SEC)
+# (root, max_depth, globs) -> _PrescanResult of the last aggregate walk; weight = directories.
+# globs come from clients: few entries and a TTL keep arbitrary keys from piling up.
+_prescan_snapshots = _BoundedCache(max_entries=32, max_weight=200000, ttl=600.0)
+
+
+class _PrescanFilter:
+    """Prescan ignore rules: fixed names plus all user globs compiled into one regex."""
+
+    def __init__(self, ignore_globs: Optional[List[str]] = None):
+        self.names = set(SKIP_DIRS) | set(SKIP_FILES)
+        globs = [g for g in (ignore_globs or []) if g]
+        self.regex = re.compile("|".join(fnmatch.translate(g) for g in globs)) if globs else None
+
+    def ignored(self, name: str, relpath: str) -> bool:
+        if name in self.names:
+            return True
+        if name.startswith(".env") and name not in _PRESCAN_ENV_ALLOWED:
+            return True
+        # User globs match against name (basename) OR relpath
+        if self.regex is not None and (self.regex.match(name) or self.regex.match(relpath)):
+            return True
+        return False
+
+
+def _prescan_list_dir(path: str, index: Optional[Any],
+                      use_cache: bool = True) -> Tuple[Optional[Tuple[int, int]], List[Tuple[str, bool, int]]]:
+    """
+    (fingerprint, [(name, is_dir, size)]) of one directory, sorted by name, symlinks dropped.
+    Served from the live index when given, else from the listing cache
+    (unless use_cache=False). Raises OSError.
+    """
+    fp = None
+    use_cache = use_cache and index is None
+    if use_cache:
+        st = os.stat(path)
+        fp = (st.st_mtime_ns, st.st_ino)
+        cached = _prescan_listings.get(path)
+        if cached and cached[0] == fp:
+            return fp, cached[1]
+
+    entries: List[Tuple[str, bool, int]] = []
+    with (index.scandir(path) if index is not None else os.scandir(path)) as it:
+        for entry in it:
+            try:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    entries.append((entry.name, True, 0))
+                else:
+                    entries.append((entry.name, False, entry.stat(follow_symlinks=False).st_size))
+            except OSError:
+                continue
+    entries.sort()
+
+    if use_cache:
+        _prescan_listings.put(path, (fp, entries), weight=len(entries) + 1)
+    return fp, entries
+
 
-    # Simple tree structure: { "path": ".", "type": "dir", "children": [...] }
-    # To build it, we traverse and collect nodes.
-    # We can perform a recursive function.
+@dataclass
+class _PrescanResult:
+    signature: str
+    file_count: int
+    total_bytes: int
+    # rel_dir -> [file_count, dir_count, total_bytes] (recursive)
+    aggregates: Dict[str, List[int]]
+    # rel_dir -> directory fingerprint (None when served from a live index)
+    dir_fps: Dict[str, Optional[Tuple[int, int]]]
+    tree: Optional[Dict[str, Any]] = None
+    generation: Optional[int] = None
+
+
+def _prescan_walk(repo_root: str, max_depth: int, flt: _PrescanFilter, index: Optional[Any] = None,
+                  build_tree: bool = False, max_nodes: Optional[int] = None,
+                  use_cache: bool = True) -> _PrescanResult:
+    """
+    Single pass over the repo with an explicit stack and string paths.
 
+    The signature is sha256 over the sorted "relpath:size" lines of all files,
+    fed incrementally: siblings are visited in the order their lines sort
+    ("name:size" for files, "name/" for dirs), so the DFS emits lines in
+    globally sorted order without collecting them.
+    """
+    sig = hashlib.sha256()
+    sig_first = True
     total_files = 0
     total_bytes = 0
     node_count = 0
-    MAX_NODES = 50000
-
-    def _is_ignored(name: str, relpath: str) -> bool:
-        if name in ignore_set or name in SKIP_FILES:
-            return True
-        if name.startswith(".env") and name not in (".env.example", ".env.template", ".env.sample"):
-            return True
-        if ignore_globs:
-            for g in ignore_globs:
-                # User request: match against name (basename) OR relpath
-                if fnmatch.fnmatch(name, g) or fnmatch.fnmatch(relpath, g):
-                    return True
-        return False
+    aggregates: Dict[str, List[int]] = {}
+    dir_fps: Dict[str, Optional[Tuple[int, int]]] = {}
+    order: List[str] = []
+
+    root_node = {"path": ".", "type": "dir", "children": []} if build_tree else None
+    # Stack items: (abs_dir, rel_dir, depth, node) for dirs, (None, sig_line) for files
+    stack: List[Tuple[Any, ...]] = [(repo_root, ".", 0, root_node)]
+
+    while stack:
+        item = stack.pop()
+        if item[0] is None:
+            if not sig_first:
+                sig.update(b"\n")
+            sig.update(item[1].encode("utf-8", "surrogateescape"))
+            sig_first = False
+            continue
 
-    def _walk(path: Path, depth: int) -> Dict[str, Any]:
-        nonlocal total_files, total_bytes, node_count
+        abs_dir, rel_dir, depth, node = item
         node_count += 1
-        if node_count > MAX_NODES:
-            # Hard abort signal
-            raise RuntimeError(f"Prescan limit reached ({MAX_NODES} nodes). Repo too large.")
-
-        rel_dir = path.relative_to(repo_root).as_posix() if path != repo_root else "."
-        node = {
-            "path": rel_dir,
-            "type": "dir",
-            "children": []
-        }
+        if max_nodes is not None and node_count > max_nodes:
+            raise RuntimeError(f"Prescan limit reached ({max_nodes} nodes). Repo too large.")
+        agg = aggregates[rel_dir] = [0, 0, 0]
+        order.append(rel_dir)
 
         if depth > max_depth:
-            return node
-
+            dir_fps[rel_dir] = None
+            continue
         try:
-            # Sort for deterministic output
-            with os.scandir(path) as it:
-                entries = sorted(it, key=lambda e: e.name)
+            fp, entries = _prescan_list_dir(abs_dir, index, use_cache)
         except OSError:
-            return node
+            dir_fps[rel_dir] = None
+            continue
+        dir_fps[rel_dir] = fp
 
-        for entry in entries:
-            name = entry.name
-            full = path / name
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        work: List[Tuple[str, Tuple[Any, ...]]] = []
+        for name, is_dir, size in entries:
+            child_rel = prefix + name
+            if flt.ignored(name, child_rel):
+                continue
+            if is_dir:
+                child_node = None
+                if build_tree:
+                    child_node = {"path": child_rel, "type": "dir", "children": []}
+                    node["children"].append(child_node)
+                agg[1] += 1
+                work.append((name + "/", (abs_dir + os.sep + name, child_rel, depth + 1, child_node)))
+            else:
+                total_files += 1
+                node_count += 1
+                if max_nodes is not None and node_count > max_nodes:
+                    raise RuntimeError(f"Prescan limit reached ({max_nodes} nodes). Repo too large.")
+                total_bytes += size
+                agg[0] += 1
+                agg[2] += size
+                if build_tree:
+                    node["children"].append({"path": child_rel, "type": "file", "size": size})
+                work.append((f"{name}:{size}", (None, f"{child_rel}:{size}")))
+
+        work.sort(key=lambda w: w[0])
+        for _, frame in reversed(work):
+            stack.append(frame)
+
+    # Recursive rollup: children were discovered after their parents
+    for rel_dir in reversed(order):
+        if rel_dir == ".":
+            continue
+        parent = rel_dir.rpartition("/")[0] or "."
+        p, c = aggregates[parent], aggregates[rel_dir]
+        p[0] += c[0]
+        p[1] += c[1]
+        p[2] += c[2]
+
+    return _PrescanResult(
+        signature=sig.hexdigest(),
+        file_count=total_files,
+        total_bytes=total_bytes,
+        aggregates=aggregates,
+        dir_fps=dir_fps,
+        tree=root_node,
+    )
 
-            # Compute relpath for check
-            # if rel_dir is ".", then relpath is name. Else rel_dir/name.
-            child_rel = name if rel_dir == "." else f"{rel_dir}/{name}"
 
-            if _is_ignored(name, child_rel):
-                continue
+def _prescan_snapshot(repo_root: Path, max_depth: int, ignore_globs: Optional[List[str]],
+                      index: Optional[Any]) -> _PrescanResult:
+    """
+    Aggregates + signature of a repo, reused while nothing changed: with a live
+    index its generation must match; otherwise every directory fingerprint
+    (mtime_ns, inode) must match and the listing TTL must not have expired.
+    """
+    root = str(repo_root)
+    key = (root, max_depth, tuple(ignore_globs or ()))
+    cached = _prescan_snapshots.get(key)
+
+    if cached is not None and index is not None and cached.generation == index.generation:
+        return cached
+
+    # Read before walking: events during the walk must invalidate this snapshot
+    generation = index.generation if index is not None else None
+    result = _prescan_walk(root, max_depth, _PrescanFilter(ignore_globs), index=index)
+    if index is not None:
+        result.generation = generation
+    elif cached is not None and cached.dir_fps == result.dir_fps and cached.signature == result.signature:
+        # Unchanged: keep the old object so callers can compare identity cheaply
+        return cached
+    _prescan_snapshots.put(key, result, weight=len(result.aggregates) + 1)
+    return result
+
+
+def prescan_signature(repo_root: Path, max_depth: int = 10, ignore_globs: Optional[List[str]] = None,
+                      index: Optional[Any] = None) -> Dict[str, Any]:
+    """Global prescan signature and totals, without building the tree."""
+    snap = _prescan_snapshot(repo_root.resolve(), max_depth, ignore_globs, index)
+    return {
+        "root": repo_root.resolve().name,
+        "signature": snap.signature,
+        "file_count": snap.file_count,
+        "total_bytes": snap.total_bytes,
+    }
 
-            # Symlink Check (Security/Recursion)
-            if entry.is_symlink():
-                continue
 
-            try:
-                st = entry.stat(follow_symlinks=False)
-            except OSError:
-                continue
+def prescan_level(repo_root: Path, rel_dir: str = ".", max_depth: int = 10,
+                  ignore_globs: Optional[List[str]] = None, index: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    One directory level of the prescan tree (lazy expansion).
 
-            if entry.is_dir(follow_symlinks=False):
-                 child_node = _walk(full, depth + 1)
-                 node["children"].append(child_node)
+    Directory entries carry recursive file_count / dir_count / total_bytes;
+    file entries carry their size. Totals and signature cover the whole repo.
+    There is no node ceiling: nothing but per-directory aggregates is kept.
+    Raises ValueError for paths outside the repo or not in the (filtered) tree.
+    """
+    repo_root = repo_root.resolve()
+    rel = (rel_dir or ".").strip().strip("/") or "."
+    parts = [] if rel == "." else rel.split("/")
+    if any(p in ("", ".", "..") for p in parts):
+        raise ValueError(f"Invalid prescan path: {rel_dir}")
+
+    snap = _prescan_snapshot(repo_root, max_depth, ignore_globs, index)
+    agg = snap.aggregates.get(rel)
+    if agg is None:
+        raise ValueError(f"Path not in prescan tree: {rel}")
+
+    flt = _PrescanFilter(ignore_globs)
+    depth = len(parts)
+    entries: List[Dict[str, Any]] = []
+    if depth <= max_depth:
+        abs_dir = os.path.join(str(repo_root), *parts)
+        try:
+            _, listing = _prescan_list_dir(abs_dir, index)
+        except OSError:
+            listing = []
+        prefix = "" if rel == "." else rel + "/"
+        for name, is_dir, size in listing:
+            child_rel = prefix + name
+            if flt.ignored(name, child_rel):
+                continue
+            if is_dir:
+                c = snap.aggregates.get(child_rel, [0, 0, 0])
+                entries.append({
+                    "path": child_rel, "type": "dir",
+                    "file_count": c[0], "dir_count": c[1], "total_bytes": c[2],
+                    "has_children": bool(c[0] or c[1]) or depth + 1 > max_depth,
+                })
             else:
-                 # File
-                 total_files += 1
-                 node_count += 1
-                 if node_count > MAX_NODES:
-                     raise RuntimeError(f"Prescan limit reached ({MAX_NODES} nodes). Repo too large.")
-
-                 total_bytes += st.st_size
-                 file_node = {
-                     "path": full.relative_to(repo_root).as_posix(),
-                     "type": "file",
-                     "size": st.st_size
-                 }
-                 node["children"].append(file_node)
-
-        return node
-
-    tree = _walk(repo_root, 0)
-
-    # Compute a signature (hash of file paths + total bytes)
-    # This helps detecting drift between prescan and merge.
-    # Collect all file paths and sizes for signature
-    sig_items = []
-
-    def _collect_for_sig(node):
-        if node["type"] == "file":
-            # relpath:size
-            sig_items.append(f"{node['path']}:{node.get('size', 0)}")
-        if node.get("children"):
-            for c in node["children"]:
-                _collect_for_sig(c)
-
-    _collect_for_sig(tree)
-    sig_items.sort()
-
-    sig_raw = "\n".join(sig_items)
-    signature = hashlib.sha256(sig_raw.encode("utf-8")).hexdigest()
+                entries.append({"path": child_rel, "type": "file", "size": size})
 
     return {
-        "root": root_label,
-        "tree": tree,
-        "signature": signature,
-        "file_count": total_files,
-        "total_bytes": total_bytes
+        "root": repo_root.name,
+        "path": rel,
+        "entries": entries,
+        "file_count": agg[0],
+        "dir_count": agg[1],
+        "total_bytes": agg[2],
+        "signature": snap.signature,
+        "repo_file_count": snap.file_count,
+        "repo_total_bytes": snap.total_bytes,
     }
 
-def scan_repo(repo_root: Path, extensions: Optional[List[str]] = None, path_contains: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES, include_paths: Optional[List[str]] = None, calculate_md5: bool = True) -> Dict[str, Any]:
+
+def prescan_repo(repo_root: Path, max_depth: int = 10, ignore_globs: Optional[List[str]] = None, index: Optional[Any] = None,
+                 max_nodes: Optional[int] = PRESCAN_MAX_NODES) -> Dict[str, Any]:
+    """
+    Lightweight scan for structure visualization (Prescan).
+    Returns a nested dict representing the tree.
+
+    Single iterative pass (see `_prescan_walk`): ignore globs are compiled into
+    one regex, paths stay strings and the signature (sha256 over the sorted
+    "relpath:size" lines) is hashed while walking.
+
+    `index` (optional): live directory index (adapters/watch.LiveIndex) whose
+    scandir() replaces os.scandir; uncovered directories are read from disk.
+
+    `max_nodes`: abort with RuntimeError once the materialized tree would
+    exceed this many nodes (None = unlimited). Large repos should use
+    `prescan_level` instead.
+    """
+    repo_root = repo_root.resolve()
+    result = _prescan_walk(str(repo_root), max_depth, _PrescanFilter(ignore_globs), index=index,
+                           build_tree=True, max_nodes=max_nodes, use_cache=False)
+    return {
+        "root": repo_root.name,
+        "tree": result.tree,
+        "signature": result.signature,
+        "file_count": result.file_count,
+        "total_bytes": result.total_bytes
+    }
+
+def scan_repo(repo_root: Path, extensions: Optional[List[str]] = None, path_contains: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES, include_paths: Optional[List[str]] = None, calculate_md5: bool = True, fingerprint: Optional[Any] = None, index: Optional[Any] = None) -> Dict[str, Any]:
     """
     Scans a repository and returns a summary dict with file info.
 
     calculate_md5:
         If False, skips all MD5 computation. Intended for plan-only / non-manifest
         operations where file integrity hashes are not required.
+
+    fingerprint:
+        Optional core.fingerprint.RepoFingerprint of this repo. Full-file MD5s are
+        reused for files whose size/mtime match the fingerprint, and freshly
+        computed full MD5s are written back into it (caller persists it).
+
+    index:
+        Optional live directory index (adapters/watch.LiveIndex). Directory
+        listings and file stats are served from it instead of the disk.
     """
     repo_root = repo_root.resolve()
     root_label = repo_root.name
@@ -2042,7 +2284,9 @@ def scan_repo(repo_root: Path, extensions: Optional[List[str]] = None, path_cont
     # Pre-normalize root for robust containment checks
     root_norm = os.path.normpath(os.path.abspath(root_str))
 
-    for dirpath, dirnames, filenames in os.walk(root_str):
+    walk = index.walk if index is not None else os.walk
+
+    for dirpath, dirnames, filenames in walk(root_str):
         # Filter directories
         keep_dirs = []
         for d in dirnames:
@@ -2128,7 +2372,8 @@ def scan_repo(repo_root: Path, extensions: Optional[List[str]] = None, path_cont
             rel_path = Path(rel_path_str)
 
             try:
-                st = abs_path.stat()
+                entry = index.lookup(abs_path_str) if index is not None else None
+                st = entry.stat() if entry is not None else abs_path.stat()
             except OSError:
                 continue
 
@@ -2173,7 +2418,16 @@ def scan_repo(repo_root: Path, extensions: Optional[List[str]] = None, path_cont
             fi.lens = lenses.infer_lens(rel_path)
             files.append(fi)
             if should_hash:
-                files_to_hash.append((fi, abs_path, effective_limit))
+                cached_md5 = None
+                # A limited hash of a file no larger than the limit is a full-file hash
+                if effective_limit is not None and size <= effective_limit:
+                    effective_limit = None
+                if fingerprint is not None and effective_limit is None:
+                    cached_md5 = fingerprint.lookup_content_hash(rel_path_str, size, st.st_mtime_ns)
+                if cached_md5:
+                    fi.md5 = cached_md5
+                else:
+                    files_to_hash.append((fi, abs_path, effective_limit))
 
     # Parallel MD5 computation
     if files_to_hash:
@@ -2186,8 +2440,11 @@ def scan_repo(repo_root: Path, extensions: Optional[List[str]] = None, path_cont
             # Note: compute_md5 captures exceptions and returns "ERROR", so this is safe
             results = executor.map(compute_md5, paths, limits)
 
-            for (fi, _, _), result_md5 in zip(files_to_hash, results):
+            for (fi, _, limit), result_md5 in zip(files_to_hash, results):
                 fi.md5 = result_md5
+                # Only full-file hashes are valid content hashes for the fingerprint
+                if fingerprint is not None and limit is None and result_md5 != "ERROR":
+                    fingerprint.set_content_hash(fi.rel_path.as_posix(), result_md5)
 
     # Sort files: first by repo order (if multi-repo context handled outside,
     # but here root_label is constant per scan_repo call unless we merge lists later),
@@ -2218,7 +2475,7 @@ def parse_human_size(text: str) -> int:
                 return 0
     return 0
 
-def get_repo_snapshot(repo_root: Path) -> Dict[str, Tuple[int, str, str]]:
+def get_repo_snapshot(repo_root: Path, fingerprint: Optional[Any] = None) -> Dict[str, Tuple[int, str, str]]:
     """
     Liefert einen Snapshot des Repos für Diff-Zwecke.
 
@@ -2229,16 +2486,60 @@ def get_repo_snapshot(repo_root: Path) -> Dict[str, Tuple[int, str, str]]:
       - nutzt scan_repo, d. h. dieselben Ignore-Regeln wie der Merger
       - Category stammt direkt aus classify_file_v2 und ist damit
         kompatibel zum Manifest (source/doc/config/test/contract/ci/other)
+      - fingerprint (core.fingerprint.RepoFingerprint, optional) wird an
+        scan_repo durchgereicht: MD5s unveränderter Dateien (size/mtime)
+        kommen aus dem Cache, neue werden dort eingetragen
     """
     snapshot: Dict[str, Tuple[int, str, str]] = {}
     summary = scan_repo(
-        repo_root, extensions=None, path_contains=None, max_bytes=100_000_000, calculate_md5=True
+        repo_root, extensions=None, path_contains=None, max_bytes=100_000_000, calculate_md5=True,
+        fingerprint=fingerprint,
     )  # großes Limit, damit wir verlässliche MD5s haben
     for fi in summary["files"]:
         snapshot[fi.rel_path.as_posix()] = (fi.size, fi.md5, fi.category or "other")
     return snapshot
 
 
+def get_paths_snapshot(repo_root: Path, rel_paths: List[str],
+                       max_bytes: int = 100_000_000) -> Dict[str, Tuple[int, str, str]]:
+    """
+    get_repo_snapshot für eine bekannte Pfadliste (z. B. ein ZIP-Delta):
+    dieselben Ignore-Regeln, MD5s und Kategorien wie scan_repo, aber ohne den
+    Baum zu durchlaufen. Fehlende Pfade werden übersprungen.
+    """
+    snapshot: Dict[str, Tuple[int, str, str]] = {}
+    todo: List[Tuple[str, Path, Optional[int]]] = []
+    for rel in rel_paths:
+        parts = rel.split("/")
+        name = parts[-1]
+        if any(part in SKIP_DIRS for part in parts[:-1]) or name in SKIP_FILES:
+            continue
+        if name.startswith(".env") and name not in (".env.example", ".env.template", ".env.sample"):
+            continue
+        abs_path = repo_root / rel
+        try:
+            size = abs_path.stat().st_size
+        except OSError:
+            continue
+        ext = os.path.splitext(name)[1].lower()
+        category, _ = classify_file_v2(Path(rel), ext)
+        snapshot[rel] = (size, "", category or "other")
+        # Same rule as scan_repo: text files in full, binaries up to the limit
+        if is_probably_text(abs_path, size):
+            todo.append((rel, abs_path, None))
+        elif size <= max_bytes:
+            todo.append((rel, abs_path, max_bytes))
+
+    if todo:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(compute_md5, [p for _, p, _ in todo], [l for _, _, l in todo])
+            for (rel, _, _), md5 in zip(todo, results):
+                size, _, category = snapshot[rel]
+                snapshot[rel] = (size, md5, category)
+    return snapshot
+
+
 def compute_epistemic_metrics(files: List[FileInfo], processed_files: List[Tuple[FileInfo, str]]) -> Dict[str, Any]:
     """
     Compute epistemic metrics (counts, ratios, risks) in one place.
@@ -2861,9 +3162,15 @@ class ReportValidator:
         Validates headings found in the chunk.
         """
         # We process line by line to reliably catch headings
-        self.buffer += chunk
-        while "\n" in self.buffer:
-            line, self.buffer = self.buffer.split("\n", 1)
+        if "\n" not in chunk:
+            self.buffer += chunk
+            return
+        lines = (self.buffer + chunk).split("\n")
+        self.buffer = lines.pop()
+        for line in lines:
+            # Inside a code block only a fence can change state (same as _check_line)
+            if self.in_code_block and "```" not in line:
+                continue
             self._check_line(line)
 
     def close(self):
@@ -3026,6 +3333,23 @@ class ReportValidator:
                  raise ValidationException(f"Missing required section: {req}")
 
 
+def _file_block_key(fi: FileInfo, fid: str, status: str, max_file_bytes: int,
+                    meta_density: str, nav: NavStyle) -> Optional[str]:
+    """
+    Render key of a content file block: hashes every input of the block
+    renderer in iter_report_blocks (content via MD5). Keep in sync with it.
+    None if the content is not fingerprinted.
+    """
+    if not fi.md5:
+        return None
+    parts = (
+        "v1", fid, str(fi.rel_path), fi.root_label, fi.anchor, fi.anchor_alias, status,
+        fi.category, tuple(fi.tags or ()), fi.size, fi.md5, fi.ext,
+        getattr(fi, "inclusion_reason", "normal"), max_file_bytes, meta_density, nav.emit_search_markers,
+    )
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
 def iter_report_blocks(
     files: List[FileInfo],
     level: str,
@@ -3041,6 +3365,7 @@ def iter_report_blocks(
     artifact_refs: Optional[Dict[str, str]] = None,
     meta_density: str = "auto",
     meta_none: bool = False,
+    splice: Optional[ReportSplice] = None,
 ) -> Iterator[str]:
     if extras is None:
         extras = ExtrasConfig.none()
@@ -3946,10 +4271,21 @@ def iter_report_blocks(
             yield "\n".join(_heading_block(3, f"repo-{repo_slug}", fi.root_label, nav=nav)) + "\n"
             current_root = fi.root_label
 
+        fid = _stable_file_id(fi) # Now returns FILE:f_...
+
+        # Incremental report: copy the block of an unchanged file from the prior report
+        if splice is not None:
+            key = _file_block_key(fi, fid, status, max_file_bytes, meta_density, nav)
+            if key:
+                cached = splice.reuse(fid, key)
+                splice.mark(fid, key)
+                if cached is not None:
+                    yield cached
+                    continue
+
         block = ["---"]
 
         # 1. Stable File Marker (with path) - PR1
-        fid = _stable_file_id(fi) # Now returns FILE:f_...
         # Fix PR13: Quote attributes to handle paths with spaces
         # Fix PR13-Followup: Quote id as well for consistency
         block.append(f'<!-- file:id="{fid}" path="{fi.rel_path}" -->')
@@ -4315,6 +4651,76 @@ def generate_json_sidecar(
     _validate_agent_json_dict(out, allow_empty_primary=True)
     return out
 
+def _single_part_blocks(iterator: Iterator[str]) -> Iterator[str]:
+    """Enforces the Part 1/1 header strictly on the first yielded block (Header contract)."""
+    for i, block in enumerate(iterator):
+        if i == 0:
+            lines = block.splitlines(True)
+            for line_idx, line in enumerate(lines):
+                stripped = line.lstrip("\ufeff")
+                if stripped.startswith("# repoLens Report"):
+                    lines[line_idx] = "# repoLens Report (Part 1/1)\n"
+                    break
+            block = "".join(lines)
+        yield block
+
+
+def stream_report_v2(
+    merges_dir: Path,
+    repo_summaries: List[Dict],
+    detail: str,
+    max_bytes: int,
+    plan_only: bool,
+    code_only: bool = False,
+    path_filter: Optional[str] = None,
+    ext_filter: Optional[List[str]] = None,
+    extras: Optional[ExtrasConfig] = None,
+    meta_density: str = "auto",
+    meta_none: bool = False,
+) -> Tuple[Path, Iterator[str]]:
+    """
+    Single-file "gesamt" report as a lazy block iterator (no split, no sidecars).
+
+    Returns (output path write_reports_v2 would use, blocks). Blocks are
+    byte-identical to the single-file write path, including the PLAN_ONLY
+    marker and the Part 1/1 header, and are fed through ReportValidator.
+    """
+    plan_only, code_only, meta_none, _ = _normalize_mode_flags(plan_only, code_only, meta_none)
+    ext_filter_str = ",".join(sorted(ext_filter)) if ext_filter else None
+    global_ts = clock.now_utc().strftime("%y%m%d-%H%M")
+    repo_names = [s["name"] for s in repo_summaries]
+    run_id = _generate_run_id(
+        repo_names, detail, path_filter, ext_filter_str,
+        plan_only=plan_only, code_only=code_only, timestamp=global_ts, meta_none=meta_none
+    )
+    out_path = make_output_filename(
+        merges_dir, repo_names, detail, "", path_filter, ext_filter_str, run_id,
+        plan_only=plan_only, code_only=code_only, timestamp=global_ts, meta_none=meta_none,
+    )
+
+    all_files: List[FileInfo] = []
+    sources: List[Path] = []
+    for s in repo_summaries:
+        all_files.extend(s["files"])
+        sources.append(s["root"])
+
+    def _blocks() -> Iterator[str]:
+        validator = ReportValidator(plan_only=plan_only, code_only=code_only, machine_lean=(detail == "machine-lean"))
+        if plan_only:
+            yield "<!-- MODE:PLAN_ONLY -->\n"
+        iterator = iter_report_blocks(
+            all_files, detail, max_bytes, sources, plan_only, code_only, False,
+            path_filter, ext_filter, extras, None,
+            meta_density=meta_density, meta_none=meta_none,
+        )
+        for block in _single_part_blocks(iterator):
+            validator.feed(block)
+            yield block
+        validator.close()
+
+    return out_path, _blocks()
+
+
 def write_reports_v2(
     merges_dir: Path,
     hub: Path,
@@ -4332,7 +4738,17 @@ def write_reports_v2(
     delta_meta: Optional[Dict[str, Any]] = None,
     meta_density: str = "auto",
     meta_none: bool = False,
+    block_index: bool = False,
+    splice_from: Optional[Path] = None,
+    splice_stats: Optional[Dict[str, int]] = None,
 ) -> MergeArtifacts:
+    """
+    block_index / splice_from (single-file reports only, ignored with split_size):
+      block_index writes <report>.blocks (file block offsets, report_splice);
+      splice_from copies unchanged file blocks from that earlier report
+      instead of re-rendering them. splice_stats (if given) is filled with
+      reused/rendered block counts.
+    """
     out_paths = []
 
     plan_only, code_only, meta_none, requested_flags = _normalize_mode_flags(plan_only, code_only, meta_none)
@@ -4530,6 +4946,14 @@ def write_reports_v2(
             # Standard single file (Streamed Write)
             out_path = output_filename_base_func(part_suffix="")
 
+            splice = None
+            if (block_index or splice_from) and not plan_only:
+                prior = None
+                # Same-minute rerun may target the prior report itself: never read what we truncate
+                if splice_from and Path(splice_from).resolve() != out_path.resolve():
+                    prior = PriorReport.open(Path(splice_from))
+                splice = ReportSplice(prior, meta={"repos": sorted(p.name for p in target_sources), "detail": detail})
+
             with out_path.open("w", encoding="utf-8") as f:
                 if plan_only:
                     f.write("<!-- MODE:PLAN_ONLY -->\n")
@@ -4549,25 +4973,27 @@ def write_reports_v2(
                     artifact_refs=artifact_refs,
                     meta_density=meta_density,
                 meta_none=meta_none,
+                    splice=splice,
                 )
 
-                for i, block in enumerate(iterator):
-                    # Enforce Part 1/1 header strictly on the first yielded block (Header contract)
-                    if i == 0:
-                        lines = block.splitlines(True)
-                        for line_idx, line in enumerate(lines):
-                            stripped = line.lstrip("\ufeff")
-                            if stripped.startswith("# repoLens Report"):
-                                lines[line_idx] = "# repoLens Report (Part 1/1)\n"
-                                break
-                        block = "".join(lines)
-
+                for block in _single_part_blocks(iterator):
                     validator.feed(block)
                     f.write(block)
+                    if splice is not None:
+                        splice.advance(len(block.encode("utf-8")))
 
             validator.close()
             out_paths.append(out_path)
 
+            if splice is not None:
+                if splice.prior:
+                    splice.prior.close()
+                if block_index:
+                    out_paths.append(splice.save(out_path))
+                if splice_stats is not None:
+                    for k, v in splice.stats().items():
+                        splice_stats[k] = splice_stats.get(k, 0) + v
+
     if mode == "gesamt":
         all_files = []
         repo_names = []
@@ -4799,3 +5225,34 @@ def write_reports_v2(
             md_parts=verified_md,
             other=other_paths
         )
+
+
+def write_incremental_report(
+    merges_dir: Path,
+    hub: Path,
+    repo_summaries: List[Dict],
+    detail: str = "max",
+    max_bytes: int = 0,
+    extras: Optional[ExtrasConfig] = None,
+    meta_density: str = "auto",
+    prior_report: Optional[Path] = None,
+    splice_stats: Optional[Dict[str, int]] = None,
+) -> MergeArtifacts:
+    """
+    Fresh single-file "gesamt" report that copies the rendered blocks of
+    unchanged files from an earlier report (report_splice) and renders only
+    changed/new files. The output is byte-identical to a from-scratch render.
+
+    prior_report: defaults to the newest report in merges_dir with a block
+    index for the same repos and profile. Without one, everything is rendered
+    (and the new report gets its block index for the next run).
+    """
+    if prior_report is None:
+        prior_report = find_prior_report(
+            merges_dir, {"repos": sorted(s["root"].name for s in repo_summaries), "detail": detail}
+        )
+    return write_reports_v2(
+        merges_dir, hub, repo_summaries, detail, "gesamt", max_bytes, plan_only=False,
+        extras=extras, meta_density=meta_density,
+        block_index=True, splice_from=prior_report, splice_stats=splice_stats,
+    )
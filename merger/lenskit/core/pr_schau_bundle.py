@@ -12,10 +12,15 @@ Etymology note:
 
 from __future__ import annotations
 
+import concurrent.futures
 import json
 import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Tuple, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Tuple, Optional
 
 try:
     import jsonschema  # type: ignore
@@ -37,19 +42,90 @@ LEGACY_TOP_LEVEL_KEYS = {
 }
 
 
+# Text the verifier looks for in parts (see cli/pr_schau_verify.py)
+TRUNCATION_MARKERS = ("Content truncated at", "content truncated at", "truncated at")
+ZONE_MARKERS = ("<!-- zone:begin type=summary -->", "<!-- zone:begin type=files_manifest -->")
+_SCAN_MARKERS = tuple(m.encode("ascii") for m in TRUNCATION_MARKERS + ZONE_MARKERS)
+_SCAN_OVERLAP = max(len(m) for m in _SCAN_MARKERS) - 1
+_SCAN_CHUNK = 1 << 20
+
+# Scan results are cached per (path, size, mtime_ns, ino). Files modified within
+# the last RACY_WINDOW_NS are not cached: a same-size rewrite within the
+# file system's timestamp granularity would otherwise go unnoticed.
+SCAN_CACHE_MAX = 4096
+RACY_WINDOW_NS = 2_000_000_000
+
+
 class PRSchauBundleError(RuntimeError):
     pass
 
 
-def _compute_sha256(path: Path) -> str:
+class PartScan(NamedTuple):
+    """One streaming pass over a bundle file."""
+    size: int
+    sha256: str
+    markers: FrozenSet[str]  # found entries of TRUNCATION_MARKERS + ZONE_MARKERS
+
+
+_scan_cache: "OrderedDict[Tuple[str, int, int, int], PartScan]" = OrderedDict()
+_scan_cache_lock = threading.Lock()
+
+
+def _scan_file(path: Path) -> PartScan:
     h = hashlib.sha256()
+    size = 0
+    found = set()
+    tail = b""
     with path.open("rb") as f:
         while True:
-            chunk = f.read(65536)
+            chunk = f.read(_SCAN_CHUNK)
             if not chunk:
                 break
             h.update(chunk)
-    return h.hexdigest()
+            size += len(chunk)
+            window = tail + chunk
+            for marker in _SCAN_MARKERS:
+                if marker in window:
+                    found.add(marker.decode("ascii"))
+            tail = window[-_SCAN_OVERLAP:]
+    return PartScan(size, h.hexdigest(), frozenset(found))
+
+
+def scan_part(path: Path) -> PartScan:
+    """SHA-256, byte count and marker hits of a file in one pass (cached)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino)
+    with _scan_cache_lock:
+        hit = _scan_cache.get(key)
+        if hit is not None:
+            _scan_cache.move_to_end(key)
+            return hit
+    result = _scan_file(path)
+    if result.size == st.st_size and time.time_ns() - st.st_mtime_ns > RACY_WINDOW_NS:
+        with _scan_cache_lock:
+            _scan_cache[key] = result
+            while len(_scan_cache) > SCAN_CACHE_MAX:
+                _scan_cache.popitem(last=False)
+    return result
+
+
+def scan_parts(paths: Iterable[Path], max_workers: Optional[int] = None) -> Dict[Path, PartScan]:
+    """scan_part for several files, concurrently (hashlib releases the GIL)."""
+    unique = list(dict.fromkeys(Path(p) for p in paths))
+    if len(unique) <= 1:
+        return {p: scan_part(p) for p in unique}
+    workers = min(len(unique), max_workers or min(8, (os.cpu_count() or 1) + 2))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(unique, pool.map(scan_part, unique)))
+
+
+def clear_scan_cache() -> None:
+    with _scan_cache_lock:
+        _scan_cache.clear()
+
+
+def _compute_sha256(path: Path) -> str:
+    return scan_part(path).sha256
 
 
 def _load_schema() -> Optional[Dict[str, Any]]:
@@ -161,20 +237,253 @@ def load_pr_schau_bundle(
     # --- Full verification: hashes for content artifacts ---
     if verify_level == "full":
         arts = data.get("artifacts", [])
-        art_map = [a for a in arts if isinstance(a, dict)]
-        for art in art_map:
-            role = art.get("role")
+        content = [a for a in arts if isinstance(a, dict) and a.get("role") in ("canonical_md", "part_md")]
+        for art in content:
+            basename = art.get("basename")
+            if not art.get("sha256"):
+                _raise(f"Missing sha256 for content artifact: {basename} (role={art.get('role')})")
+            if not (bundle_dir / str(basename)).exists():
+                _raise(f"Missing artifact file on disk: {basename}")
+        scans = scan_parts(bundle_dir / str(a.get("basename")) for a in content)
+        for art in content:
             basename = art.get("basename")
             declared = art.get("sha256")
-
-            if role in ("canonical_md", "part_md"):
-                if not declared:
-                    _raise(f"Missing sha256 for content artifact: {basename} (role={role})")
-                p = bundle_dir / str(basename)
-                if not p.exists():
-                    _raise(f"Missing artifact file on disk: {basename}")
-                computed = _compute_sha256(p)
-                if computed != declared:
-                    _raise(f"SHA256 mismatch for {basename}: declared={declared} computed={computed}")
+            computed = scans[bundle_dir / str(basename)].sha256
+            if computed != declared:
+                _raise(f"SHA256 mismatch for {basename}: declared={declared} computed={computed}")
 
     return data, bundle_dir
+
+
+def verify_pr_schau_bundles(
+    bundle_dirs: Iterable[Path],
+    *,
+    verify_level: str = "full",
+    max_workers: Optional[int] = None,
+) -> List[Tuple[Path, Optional[str]]]:
+    """
+    load_pr_schau_bundle for many bundles (catalogue rebuild), concurrently.
+    Returns (bundle_dir, error message or None) in input order. Unchanged
+    parts are not re-hashed across calls (scan cache).
+    """
+    dirs = [Path(d) for d in bundle_dirs]
+
+    def check(d: Path) -> Optional[str]:
+        try:
+            load_pr_schau_bundle(d, verify_level=verify_level)
+            return None
+        except PRSchauBundleError as e:
+            return str(e)
+
+    if len(dirs) <= 1:
+        return [(d, check(d)) for d in dirs]
+    workers = min(len(dirs), max_workers or min(8, (os.cpu_count() or 1) + 2))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(zip(dirs, pool.map(check, dirs)))
+
+
+# --- Catalogue ---------------------------------------------------------------
+#
+# <pr-schau root>/catalog.jsonl: one line per bundle directory (<repo>/<ts>/),
+# rewritten atomically whenever generate_review_bundle writes a bundle.
+# Consumers (bundle browser, merge-of-bundles) list bundles from here instead
+# of walking the tree and loading every bundle.json.
+# "verified": "full" | "basic" | "failed" (loader rejected it) | "missing"
+# (directory without bundle.json). rebuild_catalog() recovers from drift.
+
+CATALOG_FILENAME = "catalog.jsonl"
+CATALOG_VERSION = 1
+
+_catalog_lock = threading.Lock()
+
+
+def catalog_path(pr_schau_root: Path) -> Path:
+    return Path(pr_schau_root) / CATALOG_FILENAME
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text("utf-8"))
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _stamp(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def catalog_entry(pr_schau_root: Path, bundle_dir: Path, *, verify_level: str = "full") -> Dict[str, Any]:
+    """Catalogue record of one bundle directory (loads and verifies the bundle)."""
+    bundle_dir = Path(bundle_dir)
+    if not (bundle_dir / "bundle.json").exists():
+        return _catalog_record(pr_schau_root, bundle_dir, "missing", None)
+    [(_, error)] = verify_pr_schau_bundles([bundle_dir], verify_level=verify_level)
+    return _catalog_record(pr_schau_root, bundle_dir, "failed" if error else verify_level, error)
+
+
+def _catalog_record(root: Path, bundle_dir: Path, verified: str, error: Optional[str]) -> Dict[str, Any]:
+    bundle_json = bundle_dir / "bundle.json"
+    raw = _read_json(bundle_json) or {}
+    comp = raw.get("completeness") if isinstance(raw.get("completeness"), dict) else {}
+    meta = raw.get("meta") if isinstance(raw.get("meta"), dict) else {}
+    delta = _read_json(bundle_dir / "delta.json") or {}
+
+    parts = [p for p in comp.get("parts", []) if isinstance(p, str)]
+    stamps = [_stamp(bundle_dir / p) for p in parts]
+    return {
+        "v": CATALOG_VERSION,
+        "dir": bundle_dir.relative_to(Path(root)).as_posix(),
+        "repo": bundle_dir.parent.name,
+        "ts": bundle_dir.name,
+        "generated_at": meta.get("generated_at"),
+        "summary": delta.get("summary") if isinstance(delta.get("summary"), dict) else None,
+        "parts": parts,
+        "primary_part": comp.get("primary_part"),
+        "is_complete": comp.get("is_complete"),
+        "expected_bytes": comp.get("expected_bytes"),
+        "emitted_bytes": comp.get("emitted_bytes"),
+        "size": sum(s[0] for s in stamps if s),
+        "has_review": (bundle_dir / "review.md").exists(),
+        "verified": verified,
+        "error": error,
+        # Flat pre-v1 bundles: keys shown by the bundle merge
+        "legacy": {k: raw[k] for k in sorted(LEGACY_TOP_LEVEL_KEYS) if k in raw},
+        "stamp": _stamp(bundle_json),
+    }
+
+
+def _bundle_dirs(root: Path) -> List[Path]:
+    found = []
+    try:
+        repo_dirs = sorted(d for d in root.iterdir() if d.is_dir())
+    except OSError:
+        return found
+    for repo_dir in repo_dirs:
+        for ts_dir in sorted(d for d in repo_dir.iterdir() if d.is_dir()):
+            if any((ts_dir / n).exists() for n in ("bundle.json", "review.md", "delta.json")):
+                found.append(ts_dir)
+    return found
+
+
+def load_catalog(pr_schau_root: Path) -> Optional[List[Dict[str, Any]]]:
+    """Catalogue entries (None if there is no catalogue). Unreadable lines are skipped."""
+    path = catalog_path(pr_schau_root)
+    try:
+        lines = path.read_text("utf-8").splitlines()
+    except FileNotFoundError:
+        return None
+    except OSError:
+        return None
+    entries = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and entry.get("v") == CATALOG_VERSION and entry.get("dir"):
+            entries.append(entry)
+    return entries
+
+
+def _write_catalog(pr_schau_root: Path, entries: List[Dict[str, Any]]) -> None:
+    path = catalog_path(pr_schau_root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    entries = sorted(entries, key=lambda e: e["dir"])
+    tmp.write_text("".join(json.dumps(e, ensure_ascii=False, sort_keys=True) + "\n" for e in entries),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def update_catalog(pr_schau_root: Path, bundle_dir: Path, *, verify_level: str = "full") -> Dict[str, Any]:
+    """(Re-)index one bundle. A missing catalogue is rebuilt first."""
+    root = Path(pr_schau_root)
+    entry = catalog_entry(root, bundle_dir, verify_level=verify_level)
+    with _catalog_lock:
+        entries = load_catalog(root)
+        if entries is None:
+            entries = _rebuild_entries(root, [], verify_level)
+        entries = [e for e in entries if e["dir"] != entry["dir"]] + [entry]
+        _write_catalog(root, entries)
+    return entry
+
+
+def _rebuild_entries(root: Path, previous: List[Dict[str, Any]], verify_level: str,
+                     max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    known = {e["dir"]: e for e in previous}
+    reuse, todo = [], []
+    for d in _bundle_dirs(root):
+        old = known.get(d.relative_to(root).as_posix())
+        if old and old.get("stamp") == _stamp(d / "bundle.json") and old.get("verified") in (verify_level, "missing"):
+            reuse.append(old)
+        else:
+            todo.append(d)
+    # Verification (part hashing) is the expensive step; it runs concurrently
+    checked = dict(verify_pr_schau_bundles([d for d in todo if (d / "bundle.json").exists()],
+                                           verify_level=verify_level, max_workers=max_workers))
+    fresh = []
+    for d in todo:
+        if d not in checked:
+            fresh.append(_catalog_record(root, d, "missing", None))
+        else:
+            error = checked[d]
+            fresh.append(_catalog_record(root, d, "failed" if error else verify_level, error))
+    return reuse + fresh
+
+
+def rebuild_catalog(pr_schau_root: Path, *, verify_level: str = "full", full: bool = False,
+                    max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Rebuild the catalogue from the bundle directories on disk. Entries whose
+    bundle.json is unchanged (size, mtime) are kept unless full=True.
+    """
+    root = Path(pr_schau_root)
+    with _catalog_lock:
+        previous = [] if full else (load_catalog(root) or [])
+        entries = _rebuild_entries(root, previous, verify_level, max_workers)
+        _write_catalog(root, entries)
+    return sorted(entries, key=lambda e: e["dir"])
+
+
+def catalog_is_stale(pr_schau_root: Path) -> bool:
+    """
+    Cheap drift check: True if the catalogue is missing or a repo directory
+    changed (bundle added/removed) after the catalogue was last written.
+    Only stats the <repo>/ directories, not the bundles.
+    """
+    root = Path(pr_schau_root)
+    try:
+        written = catalog_path(root).stat().st_mtime_ns
+    except OSError:
+        return True
+    entries = load_catalog(root) or []
+    try:
+        repo_dirs = [d for d in root.iterdir() if d.is_dir()]
+    except OSError:
+        return False
+    names = {d.name for d in repo_dirs}
+    indexed = {e["repo"] for e in entries}
+    if indexed - names:
+        return True  # repo directory removed
+    for d in repo_dirs:
+        # >=: on coarse timestamps a same-tick change must count as drift
+        if d.stat().st_mtime_ns >= written:
+            return True
+        if d.name not in indexed and any(c.is_dir() for c in d.iterdir()):
+            return True  # copied in with old timestamps
+    return False
+
+
+def list_pr_schau_bundles(pr_schau_root: Path, *, verify_level: str = "full") -> List[Dict[str, Any]]:
+    """Catalogue entries; the catalogue is rebuilt (incrementally) if it drifted."""
+    root = Path(pr_schau_root)
+    if not root.is_dir():
+        return []
+    if catalog_is_stale(root):
+        return rebuild_catalog(root, verify_level=verify_level)
+    return sorted(load_catalog(root) or [], key=lambda e: e["dir"])
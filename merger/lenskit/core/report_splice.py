@@ -0,0 +1,157 @@
+"""
+Block splicing for incremental full reports.
+
+A single-file report can be written with a block index next to it
+(<report>.blocks, JSON): for every file block (the "---" line before
+`<!-- file:id="..." -->` up to the backlinks) its byte offset and length in
+the report plus a render key. The render key hashes everything the block
+renderer reads (path, anchors, status, category, tags, size, MD5, render
+options), so two blocks with the same fid and key are byte-identical.
+
+A later run renders a fresh report and, for each file whose key is unchanged,
+copies the block from the prior report instead of reading and rendering the
+file. Blocks come in report order, so the prior report is read sequentially.
+
+Guards: the prior report must still have the size and mtime recorded in its
+index, and every copied block must start with its own file marker; otherwise
+the block (or the whole prior report) is rendered fresh.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BLOCK_INDEX_VERSION = 1
+BLOCK_INDEX_SUFFIX = ".blocks"
+
+
+def block_index_path(report_path: Path) -> Path:
+    return Path(report_path).with_suffix(BLOCK_INDEX_SUFFIX)
+
+
+class PriorReport:
+    """Read access to the file blocks of an earlier report (via its block index)."""
+
+    def __init__(self, report_path: Path, blocks: Dict[str, List]):
+        self.path = Path(report_path)
+        self._blocks = blocks
+        self._fh = None
+
+    @classmethod
+    def open(cls, report_path: Path) -> Optional["PriorReport"]:
+        """None if there is no usable index or the report changed since it was written."""
+        report_path = Path(report_path)
+        try:
+            index = json.loads(block_index_path(report_path).read_text(encoding="utf-8"))
+            st = report_path.stat()
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get("version") != BLOCK_INDEX_VERSION:
+            return None
+        if [index.get("size"), index.get("mtime_ns")] != [st.st_size, st.st_mtime_ns]:
+            return None
+        blocks = index.get("blocks")
+        return cls(report_path, blocks) if isinstance(blocks, dict) else None
+
+    def get(self, fid: str, key: str) -> Optional[str]:
+        entry = self._blocks.get(fid)
+        if not entry or entry[2] != key:
+            return None
+        offset, length = entry[0], entry[1]
+        try:
+            if self._fh is None:
+                self._fh = self.path.open("rb")
+            if self._fh.tell() != offset:
+                self._fh.seek(offset)
+            data = self._fh.read(length)
+            if not data.startswith(f'---\n<!-- file:id="{fid}"'.encode("utf-8")):
+                return None
+            return data.decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class ReportSplice:
+    """
+    Per-output state: serves prior blocks to iter_report_blocks and records the
+    block index of the report being written.
+
+    iter_report_blocks calls reuse() and mark() for file blocks; the writer
+    calls advance() with the byte length of every block it writes, in order.
+    """
+
+    def __init__(self, prior: Optional[PriorReport] = None, meta: Optional[Dict] = None):
+        self.prior = prior
+        self.meta = dict(meta or {})
+        self.reused = 0
+        self.rendered = 0
+        self._offset = 0
+        self._pending: Optional[Tuple[str, str]] = None
+        self._blocks: Dict[str, List] = {}
+
+    def reuse(self, fid: str, key: str) -> Optional[str]:
+        block = self.prior.get(fid, key) if self.prior else None
+        if block is None:
+            self.rendered += 1
+        else:
+            self.reused += 1
+        return block
+
+    def mark(self, fid: str, key: str) -> None:
+        """The next block handed to advance() is the file block of fid."""
+        self._pending = (fid, key)
+
+    def advance(self, nbytes: int) -> None:
+        if self._pending is not None:
+            fid, key = self._pending
+            self._blocks[fid] = [self._offset, nbytes, key]
+            self._pending = None
+        self._offset += nbytes
+
+    def stats(self) -> Dict[str, int]:
+        return {"reused": self.reused, "rendered": self.rendered}
+
+    def save(self, report_path: Path) -> Path:
+        """Write the block index of report_path (after the report is closed)."""
+        st = Path(report_path).stat()
+        index = {
+            "version": BLOCK_INDEX_VERSION,
+            "report": Path(report_path).name,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            **self.meta,
+            "blocks": self._blocks,
+        }
+        out = block_index_path(report_path)
+        tmp = out.with_name(out.name + ".tmp")
+        tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, out)
+        return out
+
+
+def find_prior_report(merges_dir: Path, meta: Dict) -> Optional[Path]:
+    """Newest report in merges_dir whose block index carries the given meta (repos, detail, ...)."""
+    best: Optional[Tuple[int, Path]] = None
+    for idx in Path(merges_dir).glob(f"*{BLOCK_INDEX_SUFFIX}"):
+        try:
+            data = json.loads(idx.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if not isinstance(data, dict) or any(data.get(k) != v for k, v in meta.items()):
+            continue
+        report = idx.parent / str(data.get("report", ""))
+        try:
+            mtime = report.stat().st_mtime_ns
+        except OSError:
+            continue
+        if best is None or mtime > best[0]:
+            best = (mtime, report)
+    return best[1] if best else None
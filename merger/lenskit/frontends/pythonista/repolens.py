@@ -178,6 +178,7 @@ try:
         ExtrasConfig,
         parse_human_size,
     )
+    from lenskit.core.pr_schau_bundle import list_pr_schau_bundles
 except ImportError:
     sys.path.append(str(SCRIPT_DIR.parent.parent.parent))
     from lenskit.core.merge import (
@@ -192,6 +193,7 @@ except ImportError:
         ExtrasConfig,
         parse_human_size,
     )
+    from lenskit.core.pr_schau_bundle import list_pr_schau_bundles
 
 PROFILE_DESCRIPTIONS = {
     # Kurzbeschreibung der Profile für den UI-Hint
@@ -1573,29 +1575,16 @@ class MergerUI(object):
             bdir = item.get("bundle_dir")
             if not bdir: continue
 
-            # Load metadata
-            meta = {}
-            delta = {}
-            try:
-                p_bundle = bdir / "bundle.json"
-                if p_bundle.exists():
-                    meta = json.loads(p_bundle.read_text("utf-8"))
-            except Exception:
-                pass
-
-            try:
-                p_delta = bdir / "delta.json"
-                if p_delta.exists():
-                    delta = json.loads(p_delta.read_text("utf-8"))
-            except Exception:
-                pass
+            # Metadata from the catalogue entry (no bundle.json/delta.json reads)
+            entry = item.get("catalog") or {}
+            meta = entry.get("legacy") or {}
 
             repo = meta.get("repo", item["repo"])
             created = meta.get("created_at", item["ts"])
 
             summary_str = "n/a"
-            if "summary" in delta:
-                s = delta["summary"]
+            if entry.get("summary"):
+                s = entry["summary"]
                 summary_str = f"+{s.get('added',0)} / ~{s.get('changed',0)} / -{s.get('removed',0)}"
 
             lines.append(f"## {repo} @ {created}")
@@ -1681,57 +1670,48 @@ class MergerUI(object):
             except ValueError:
                 return None
 
+        # Bundles aus dem Katalog (pr-schau/catalog.jsonl); bei Drift wird er nachgeführt
         items = []
-        if pr_dir.exists():
-            for repo_dir in pr_dir.iterdir():
-                if not repo_dir.is_dir(): continue
-                repo_name = repo_dir.name
-
-                for ts_dir in repo_dir.iterdir():
-                    if not ts_dir.is_dir(): continue
-
-                    # Timestamp Contract: Ensure strictly formatted timestamp folder name
-                    # Expected: %Y-%m-%dT%H%M%SZ (e.g. 2025-05-10T123000Z)
-                    ts_raw = ts_dir.name
-                    ts_sort = _normalize_ts(ts_raw)
-
-                    if not ts_sort:
-                        # Attempt fallback from bundle.json if folder name is invalid
-                        try:
-                            bj_path = ts_dir / "bundle.json"
-                            if bj_path.exists():
-                                bj = json.loads(bj_path.read_text("utf-8"))
-                                if "created_at" in bj:
-                                    # Normalize the JSON timestamp too
-                                    ts_sort = _normalize_ts(bj["created_at"])
-                        except Exception:
-                            pass
-
-                    # If still no valid sort key, use a fallback to ensure list display but minimal priority
-                    display_ts = ts_raw
-                    if not ts_sort:
-                        ts_sort = "0000-00-00T000000Z" # Sorts to bottom in desc
-                        display_ts = f"{ts_raw} (invalid ts)"
-                    else:
-                        display_ts = ts_sort
-
-                    review_md = ts_dir / "review.md"
-                    bundle_json = ts_dir / "bundle.json"
-                    delta_json = ts_dir / "delta.json"
-
-                    # Robustness: Include even if review.md missing, if metadata exists
-                    if review_md.exists() or bundle_json.exists() or delta_json.exists():
-                        display_text = f"{repo_name} @ {display_ts}"
-                        if not review_md.exists():
-                            display_text += " (no review.md)"
-
-                        items.append({
-                            "repo": repo_name,
-                            "ts": ts_sort,
-                            "path": review_md,
-                            "bundle_dir": ts_dir,
-                            "display": display_text
-                        })
+        try:
+            entries = list_pr_schau_bundles(pr_dir)
+        except Exception as e:
+            sys.stderr.write(f"[repoLens] PR-Schau catalog error: {e}\n")
+            entries = []
+
+        for entry in entries:
+            ts_dir = pr_dir / entry["dir"]
+            repo_name = entry["repo"]
+
+            # Timestamp Contract: Ensure strictly formatted timestamp folder name
+            # Expected: %Y-%m-%dT%H%M%SZ (e.g. 2025-05-10T123000Z)
+            ts_raw = entry["ts"]
+            ts_sort = _normalize_ts(ts_raw)
+            if not ts_sort:
+                # Fallback: timestamp recorded in the bundle metadata
+                ts_sort = _normalize_ts(entry.get("legacy", {}).get("created_at") or entry.get("generated_at"))
+
+            # If still no valid sort key, use a fallback to ensure list display but minimal priority
+            if not ts_sort:
+                ts_sort = "0000-00-00T000000Z" # Sorts to bottom in desc
+                display_ts = f"{ts_raw} (invalid ts)"
+            else:
+                display_ts = ts_sort
+
+            # Robustness: Include even if review.md missing, if metadata exists
+            display_text = f"{repo_name} @ {display_ts}"
+            if not entry.get("has_review"):
+                display_text += " (no review.md)"
+            if entry.get("verified") == "failed":
+                display_text += " ⚠️ unverified"
+
+            items.append({
+                "repo": repo_name,
+                "ts": ts_sort,
+                "path": ts_dir / "review.md",
+                "bundle_dir": ts_dir,
+                "catalog": entry,
+                "display": display_text
+            })
 
         if not items:
             if console:
@@ -1943,7 +1923,7 @@ class MergerUI(object):
         # Execute delta extraction (without generating a legacy report)
         try:
             # We bypass create_delta_merge_from_diff to avoid double-writing.
-            # Instead we extract metadata directly from the diff file.
+            # Instead we load the delta metadata of the diff (its .delta.json sidecar).
             delta_meta = None
             extract_returned_none = False
             diff_mtime = None
@@ -2004,7 +1984,9 @@ class MergerUI(object):
                             and raw.get("type") == "repolens-delta"
                             and "summary" in raw
                         ):
-                            delta_meta = raw
+                            # Per-file rows (delta_version 2) are not needed for the merge
+                            delta_meta = {k: v for k, v in raw.items()
+                                          if k not in ("delta_version", "file_columns", "files")}
                             break
                 except Exception as e:
                     print(f"[repoLens] Failed to read delta metadata: {e}", file=sys.stderr)
@@ -827,6 +827,8 @@ async function loadPickerRoots() {
     }
 }
 
+const PICKER_PAGE_SIZE = 500;
+
 async function loadPickerToken(token) {
     const list = document.getElementById('pickerList');
     const pathDisplay = document.getElementById('pickerCurrentPath');
@@ -834,7 +836,7 @@ async function loadPickerToken(token) {
 
     try {
         // Use token navigation
-        const url = `${API_BASE}/fs/list?token=${encodeURIComponent(token)}`;
+        const url = `${API_BASE}/fs/list?token=${encodeURIComponent(token)}&limit=${PICKER_PAGE_SIZE}`;
         const res = await apiFetch(url);
 
         if (res.status === 403) throw new Error("Access Denied (Path restricted)");
@@ -871,27 +873,50 @@ async function loadPickerToken(token) {
             list.appendChild(upDiv);
         }
 
-        data.entries.forEach(entry => {
-            const div = document.createElement('div');
-            div.className = "flex items-center cursor-pointer hover:bg-gray-700 p-1 rounded";
-
-            if (entry.type === 'dir') {
-                // Directory: Click to navigate
-                div.onclick = () => loadPickerToken(entry.token);
-                div.innerHTML = `<span class="mr-2">📁</span> <span>${entry.name}</span>`;
-            } else {
-                // File: Non-clickable in folder picker mode (or select?)
-                div.className += " text-gray-500 cursor-default";
-                div.innerHTML = `<span class="mr-2">📄</span> <span>${entry.name}</span>`;
-            }
-            list.appendChild(div);
-        });
+        appendPickerEntries(list, token, data);
 
     } catch (e) {
         list.innerHTML = `<div class="text-red-400">Error: ${e.message}</div>`;
     }
 }
 
+// Renders one page of a picker listing; large directories load further pages on demand
+function appendPickerEntries(list, token, data) {
+    data.entries.forEach(entry => {
+        const div = document.createElement('div');
+        div.className = "flex items-center cursor-pointer hover:bg-gray-700 p-1 rounded";
+
+        if (entry.type === 'dir') {
+            // Directory: Click to navigate
+            div.onclick = () => loadPickerToken(entry.token);
+            div.innerHTML = `<span class="mr-2">📁</span> <span>${entry.name}</span>`;
+        } else {
+            // File: Non-clickable in folder picker mode (or select?)
+            div.className += " text-gray-500 cursor-default";
+            div.innerHTML = `<span class="mr-2">📄</span> <span>${entry.name}</span>`;
+        }
+        list.appendChild(div);
+    });
+
+    if (data.next_offset !== null && data.next_offset !== undefined) {
+        const more = document.createElement('div');
+        more.className = "p-1 text-blue-300 cursor-pointer hover:bg-gray-700 rounded text-xs";
+        more.textContent = `Load more (${data.total - data.next_offset} remaining)`;
+        more.onclick = async () => {
+            more.textContent = 'Loading...';
+            try {
+                const res = await apiFetch(`${API_BASE}/fs/list?token=${encodeURIComponent(token)}&offset=${data.next_offset}&limit=${PICKER_PAGE_SIZE}`);
+                if (!res.ok) throw new Error("Fetch failed");
+                more.remove();
+                appendPickerEntries(list, token, await res.json());
+            } catch (e) {
+                more.textContent = `Error: ${e.message}`;
+            }
+        };
+        list.appendChild(more);
+    }
+}
+
 function pickerSelect() {
     if (currentPickerTarget && currentPickerPath) {
         document.getElementById(currentPickerTarget).value = currentPickerPath;
@@ -905,11 +930,19 @@ function pickerSelect() {
     }
 }
 
+const ARTIFACT_PAGE_SIZE = 50;
+
+function artifactPageUrl(cursor) {
+    let url = `${API_BASE}/artifacts?limit=${ARTIFACT_PAGE_SIZE}&fields=id,created_at,repos,paths,params.level,params.mode`;
+    if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+    return url;
+}
+
 async function loadArtifacts() {
     const list = document.getElementById('artifactList');
     list.innerHTML = '<div class="text-gray-500 italic">Loading...</div>';
     try {
-        const res = await apiFetch(`${API_BASE}/artifacts`);
+        const res = await apiFetch(artifactPageUrl(null));
         if (res.status === 401) {
              list.innerHTML = '<div class="text-red-400">Auth Required</div>';
              return;
@@ -922,64 +955,88 @@ async function loadArtifacts() {
             return;
         }
 
-        arts.forEach(art => {
-            const div = document.createElement('div');
-            div.className = "bg-gray-900 p-2 rounded border border-gray-700 flex flex-col";
+        appendArtifacts(list, arts, res.headers.get('X-Next-Cursor'));
+
+    } catch (e) {
+        list.innerHTML = '<div class="text-red-500">Error loading artifacts.</div>';
+    }
+}
 
-            const date = new Date(art.created_at).toLocaleString();
-            const repos = art.repos.length > 3 ? `${art.repos.slice(0,3).join(', ')} +${art.repos.length-3}` : art.repos.join(', ');
+function appendArtifacts(list, arts, nextCursor) {
+    arts.forEach(art => {
+        const div = document.createElement('div');
+        div.className = "bg-gray-900 p-2 rounded border border-gray-700 flex flex-col";
 
-            let links = [];
+        const date = new Date(art.created_at).toLocaleString();
+        const repos = art.repos.length > 3 ? `${art.repos.slice(0,3).join(', ')} +${art.repos.length-3}` : art.repos.join(', ');
 
-            // Handle known keys explicitly, then others
-            // Primary JSON
-            if (art.paths.json) {
-                links.push(`<button data-dl="${API_BASE}/artifacts/${art.id}/download?key=json" data-name="${art.paths.json}" class="text-green-400 hover:underline">JSON</button>`);
-            }
-            // Canonical MD
-            if (art.paths.md) {
-                links.push(`<button data-dl="${API_BASE}/artifacts/${art.id}/download?key=md" data-name="${art.paths.md}" class="text-blue-400 hover:underline">Markdown</button>`);
-            }
-            // Other parts
-            for (const [key, val] of Object.entries(art.paths)) {
-                if (key !== 'json' && key !== 'md' && key !== 'canonical_md' && key !== 'index_json') {
-                    // Try to be smart about parts
-                    if (key.startsWith('md_part')) {
-                         links.push(`<button data-dl="${API_BASE}/artifacts/${art.id}/download?key=${key}" data-name="${val}" class="text-gray-400 hover:underline text-xs">Part ${key.split('_').pop()}</button>`);
-                    }
+        let links = [];
+
+        // Handle known keys explicitly, then others
+        // Primary JSON
+        if (art.paths.json) {
+            links.push(`<button data-dl="${API_BASE}/artifacts/${art.id}/download?key=json" data-name="${art.paths.json}" class="text-green-400 hover:underline">JSON</button>`);
+        }
+        // Canonical MD
+        if (art.paths.md) {
+            links.push(`<button data-dl="${API_BASE}/artifacts/${art.id}/download?key=md" data-name="${art.paths.md}" class="text-blue-400 hover:underline">Markdown</button>`);
+        }
+        // Other parts
+        for (const [key, val] of Object.entries(art.paths)) {
+            if (key !== 'json' && key !== 'md' && key !== 'canonical_md' && key !== 'index_json') {
+                // Try to be smart about parts
+                if (key.startsWith('md_part')) {
+                     links.push(`<button data-dl="${API_BASE}/artifacts/${art.id}/download?key=${key}" data-name="${val}" class="text-gray-400 hover:underline text-xs">Part ${key.split('_').pop()}</button>`);
                 }
             }
+        }
 
-            div.innerHTML = `
-                <div class="flex justify-between items-start">
-                    <span class="font-bold text-blue-300">${art.params.level} / ${art.params.mode}</span>
-                    <span class="text-xs text-gray-500">${date}</span>
-                </div>
-                <div class="text-xs text-gray-400 truncate mb-1" title="${art.repos.join(', ')}">${repos || 'All Repos'}</div>
-                <div class="flex flex-wrap gap-2 text-xs mt-1">
-                    ${links.join(' <span class="text-gray-600">|</span> ')}
-                </div>
-            `;
-            list.appendChild(div);
-        });
+        div.innerHTML = `
+            <div class="flex justify-between items-start">
+                <span class="font-bold text-blue-300">${art.params.level} / ${art.params.mode}</span>
+                <span class="text-xs text-gray-500">${date}</span>
+            </div>
+            <div class="text-xs text-gray-400 truncate mb-1" title="${art.repos.join(', ')}">${repos || 'All Repos'}</div>
+            <div class="flex flex-wrap gap-2 text-xs mt-1">
+                ${links.join(' <span class="text-gray-600">|</span> ')}
+            </div>
+        `;
 
-    } catch (e) {
-        list.innerHTML = '<div class="text-red-500">Error loading artifacts.</div>';
-    }
+        // Wire download buttons
+        div.querySelectorAll('button[data-dl]').forEach(btn => {
+            btn.addEventListener('click', async () => {
+                try {
+                    const url = btn.getAttribute('data-dl');
+                    const name = btn.getAttribute('data-name') || 'artifact';
+                    // Use the updated function for secure downloads
+                    await downloadWithAuth(url, name);
+                } catch (e) {
+                    alert(e.message);
+                }
+            });
+        });
+        list.appendChild(div);
+    });
 
-    // Wire download buttons
-    list.querySelectorAll('button[data-dl]').forEach(btn => {
-        btn.addEventListener('click', async () => {
+    // Older artifacts: follow the listing cursor page by page
+    if (nextCursor) {
+        const more = document.createElement('div');
+        more.className = "p-1 text-blue-300 cursor-pointer hover:bg-gray-700 rounded text-xs";
+        more.textContent = 'Load more';
+        more.onclick = async () => {
+            more.textContent = 'Loading...';
             try {
-                const url = btn.getAttribute('data-dl');
-                const name = btn.getAttribute('data-name') || 'artifact';
-                // Use the updated function for secure downloads
-                await downloadWithAuth(url, name);
+                const res = await apiFetch(artifactPageUrl(nextCursor));
+                if (!res.ok) throw new Error("Fetch failed");
+                const arts = await res.json();
+                more.remove();
+                appendArtifacts(list, arts, res.headers.get('X-Next-Cursor'));
             } catch (e) {
-                alert(e.message);
+                more.textContent = `Error: ${e.message}`;
             }
-        });
-    });
+        };
+        list.appendChild(more);
+    }
 }
 
 async function startJob(e) {
@@ -1398,15 +1455,38 @@ async function startAtlasJob(e) {
         if (!res.ok) throw new Error("Atlas scan failed: " + res.statusText);
 
         const art = await res.json();
-        alert(`Atlas scan started/completed: ${art.id}`);
-        loadAtlasArtifacts();
+        // Button stays disabled until the scan ends (progress via SSE)
+        followAtlasScan(art.id, btn);
+        return;
 
     } catch (e) {
         alert(e.message);
-    } finally {
+    }
+    btn.disabled = false;
+    btn.innerText = "Create Atlas";
+}
+
+function followAtlasScan(scanId, btn) {
+    const token = getToken();
+    const url = `${API_BASE}/atlas/${scanId}/events` + (token ? `?token=${encodeURIComponent(token)}` : '');
+    const es = new EventSource(url);
+    const done = (msg) => {
+        es.close();
         btn.disabled = false;
         btn.innerText = "Create Atlas";
-    }
+        if (msg) alert(msg);
+        loadAtlasArtifacts();
+    };
+
+    es.addEventListener('progress', (event) => {
+        const p = JSON.parse(event.data).progress;
+        btn.innerText = `Scanning... ${p.files} files, ${(p.bytes / (1024*1024)).toFixed(1)} MB`;
+    });
+    es.addEventListener('end', (event) => {
+        const scan = JSON.parse(event.data);
+        done(scan.status === 'succeeded' ? null : `Atlas scan ${scan.status}${scan.error ? ': ' + scan.error : ''}`);
+    });
+    es.onerror = () => done("Atlas progress connection lost");
 }
 
 async function loadAtlasArtifacts() {
@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Depends, Body, Request
+from fastapi import FastAPI, HTTPException, Query, Depends, Body, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse, HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import StreamingResponse, HTMLResponse, RedirectResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.concurrency import run_in_threadpool
 from typing import List, Optional, Dict, Any
@@ -10,13 +10,19 @@ import asyncio
 import json
 import time
 import ipaddress
+import hashlib
 import logging
+import threading
+import uuid
 import re
 from datetime import datetime, timezone
 
-from .models import JobRequest, Job, Artifact, AtlasRequest, AtlasArtifact, AtlasEffective, calculate_job_hash, PrescanRequest, PrescanResponse, FSRoot, FSRootsResponse
+from .models import JobRequest, Job, Artifact, AtlasRequest, AtlasArtifact, AtlasEffective, AtlasScanStatus, AtlasDiffRequest, AtlasDiffResponse, calculate_job_hash, PrescanRequest, PrescanResponse, PrescanLevelRequest, PrescanLevelResponse, FSRoot, FSRootsResponse
 from .jobstore import JobStore
-from .runner import JobRunner
+from .runner import JobRunner, WorkerLimits, JobCanceled, _find_repos, _parse_extras_csv, scan_request, resolve_output_dir, input_fingerprint
+from .cache import ArtifactCache, calculate_cache_key
+from .delivery import ENCODING_SUFFIXES, finalize_outputs, serve_file
+from .atlas_jobs import AtlasJobManager, scan_key
 from .logging_provider import LogProvider, FileLogProvider
 from .auth import verify_token
 from ..adapters.security import (
@@ -26,16 +32,18 @@ from ..adapters.security import (
     InvalidPathError,
     AccessDeniedError,
 )
-from ..adapters.filesystem import resolve_fs_path, list_allowed_roots, issue_fs_token
+from ..adapters.filesystem import resolve_fs_path, list_allowed_roots, issue_fs_token, issue_fs_tokens
 from ..adapters.atlas import AtlasScanner, render_atlas_md
+from ..adapters.atlas_diff import diff_inventories, render_diff_md
+from ..adapters.watch import LiveIndex
 from ..adapters.metarepo import sync_from_metarepo
 from ..adapters import sources as sources_refresh
 from ..adapters import diagnostics as diagnostics_rebuild
 
 try:
-    from ..core.merge import get_merges_dir, SPEC_VERSION, prescan_repo
+    from ..core.merge import get_merges_dir, SPEC_VERSION, prescan_repo, prescan_level, parse_human_size, stream_report_v2, _normalize_ext_list
 except ImportError:
-    from merger.lenskit.core.merge import get_merges_dir, SPEC_VERSION, prescan_repo
+    from merger.lenskit.core.merge import get_merges_dir, SPEC_VERSION, prescan_repo, prescan_level, parse_human_size, stream_report_v2, _normalize_ext_list
 
 # Global Version Info
 SERVER_START_TIME = datetime.now(timezone.utc).isoformat()
@@ -103,6 +111,19 @@ GC_MAX_JOBS = int(os.getenv("RLENS_GC_MAX_JOBS", "100"))
 GC_MAX_AGE_HOURS = int(os.getenv("RLENS_GC_MAX_AGE_HOURS", "24"))
 # SSE polling (seconds)
 SSE_POLL_SEC = float(os.getenv("RLENS_SSE_POLL_SEC", "0.25"))
+# Job execution isolation ("thread" | "process"), see runner.ISOLATION_MODES
+JOB_ISOLATION = os.getenv("RLENS_JOB_ISOLATION", "thread")
+# Streaming merge: coalesce report blocks into chunks of at least this size (first block is sent at once)
+STREAM_CHUNK_BYTES = int(os.getenv("RLENS_STREAM_CHUNK_BYTES", str(64 * 1024)))
+# Artifact cache disk budget (LRU eviction), 0 = unlimited
+CACHE_MAX_BYTES = parse_human_size(os.getenv("RLENS_CACHE_MAX_BYTES", "0"))
+# Live hub index ("off" | "auto" | "inotify" | "poll"), see adapters/watch.py
+WATCH_MODE = os.getenv("RLENS_WATCH", "off")
+WATCH_POLL_SEC = float(os.getenv("RLENS_WATCH_POLL_SEC", "2.0"))
+# Atlas: threads per scan (1 = serial os.walk); see AtlasScanner._walk_parallel
+ATLAS_SCAN_WORKERS = int(os.getenv("RLENS_ATLAS_SCAN_WORKERS", "4"))
+# FS picker: directory listings are reused while the directory mtime is unchanged, at most this long
+FS_LIST_CACHE_SEC = float(os.getenv("RLENS_FS_LIST_CACHE_SEC", "5"))
 
 # Security: Root Jail for File System Browsing
 # Set to system root to allow full access, but preventing traversal above it (which is impossible anyway).
@@ -143,15 +164,42 @@ class ServiceState:
     merges_dir: Path = None
     job_store: JobStore = None
     runner: JobRunner = None
+    artifact_cache: ArtifactCache = None
     log_provider: LogProvider = None
+    watcher: Optional[LiveIndex] = None
+    atlas_jobs: Optional[AtlasJobManager] = None
 
 state = ServiceState()
 
-def init_service(hub_path: Path, token: Optional[str] = None, host: str = "127.0.0.1", merges_dir: Optional[Path] = None):
+def init_service(hub_path: Path, token: Optional[str] = None, host: str = "127.0.0.1", merges_dir: Optional[Path] = None,
+                 job_isolation: Optional[str] = None, watch: Optional[str] = None):
     state.hub = hub_path
     state.merges_dir = merges_dir
     state.job_store = JobStore(hub_path)
-    state.runner = JobRunner(state.job_store)
+    state.artifact_cache = ArtifactCache(state.job_store, max_bytes=CACHE_MAX_BYTES)
+
+    # Live index (re-init in tests must not leak watcher threads)
+    if state.watcher:
+        state.watcher.stop()
+        state.watcher = None
+    watch_mode = watch or WATCH_MODE
+    if watch_mode != "off":
+        exclude = [get_merges_dir(hub_path)] + ([merges_dir] if merges_dir else [])
+        state.watcher = LiveIndex(hub_path, backend=watch_mode, poll_interval=WATCH_POLL_SEC,
+                                  exclude=[p.resolve() for p in exclude]).start()
+
+    # Atlas scans: re-init cancels scans of the previous instance
+    if state.atlas_jobs:
+        state.atlas_jobs.shutdown()
+    state.atlas_jobs = AtlasJobManager()
+
+    state.runner = JobRunner(
+        state.job_store,
+        isolation=job_isolation or JOB_ISOLATION,
+        limits=WorkerLimits.from_env(),
+        cache=state.artifact_cache,
+        index=state.watcher,
+    )
     state.log_provider = FileLogProvider(state.job_store)
 
     # Configure Security
@@ -197,7 +245,62 @@ def init_service(hub_path: Path, token: Optional[str] = None, host: str = "127.0
             allow_headers=["Authorization", "Content-Type", "x-rlens-token"],
         )
 
-def _list_dir(candidate: Path) -> Dict[str, Any]:
+class _DirListing:
+    """One scandir pass of a directory: names + d_type, sorted; stats and tokens filled per page."""
+
+    __slots__ = ("mtime_ns", "read_at", "names", "is_dir", "stats", "tokens")
+
+    def __init__(self, mtime_ns: int, names: List[str], is_dir: List[bool]):
+        self.mtime_ns = mtime_ns
+        self.read_at = time.monotonic()
+        self.names = names
+        self.is_dir = is_dir
+        self.stats: Dict[int, Optional[os.stat_result]] = {}
+        self.tokens: Dict[int, str] = {}
+
+
+_fs_listings: Dict[str, _DirListing] = {}
+_fs_listings_lock = threading.Lock()
+_FS_LISTINGS_MAX = 256
+# Listings carry issued tokens; keep them well inside the token TTL (1200s)
+_FS_LIST_MAX_AGE_SEC = 600
+
+
+def _read_listing(resolved: Path) -> _DirListing:
+    key = str(resolved)
+    mtime_ns = os.stat(key).st_mtime_ns
+    with _fs_listings_lock:
+        cached = _fs_listings.get(key)
+    if cached and cached.mtime_ns == mtime_ns and time.monotonic() - cached.read_at < min(FS_LIST_CACHE_SEC, _FS_LIST_MAX_AGE_SEC):
+        return cached
+
+    rows = []
+    with os.scandir(key) as it:
+        for entry in it:
+            try:
+                # d_type answers this without a stat (symlinks are followed, as before)
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            rows.append((entry.name.lower(), entry.name, is_dir))
+    rows.sort()
+    listing = _DirListing(mtime_ns, [r[1] for r in rows], [r[2] for r in rows])
+    with _fs_listings_lock:
+        if len(_fs_listings) >= _FS_LISTINGS_MAX:
+            _fs_listings.clear()
+        _fs_listings[key] = listing
+    return listing
+
+
+def _list_dir(candidate: Path, offset: int = 0, limit: Optional[int] = None, tokens: bool = True) -> Dict[str, Any]:
+    """
+    Directory listing for the picker.
+
+    Names and types come from one cached scandir pass; size/mtime are stat'ed
+    and subdirectory tokens issued (in one batch) only for the returned page.
+    With tokens=False entries carry no token; clients navigate with
+    `?token=<this dir>&child=<name>` instead.
+    """
     # Defense-in-depth: always re-validate before touching the filesystem.
     sec = get_security_config()
     resolved = sec.validate_path(candidate)
@@ -207,23 +310,58 @@ def _list_dir(candidate: Path) -> Dict[str, Any]:
     if not resolved.is_dir():
         raise HTTPException(status_code=400, detail="Not a directory")
 
-    dirs: List[str] = []
-    files: List[str] = []
-    entries: List[Dict[str, Any]] = []
-
     try:
-        for child in sorted(resolved.iterdir(), key=lambda x: x.name.lower()):
-            if child.is_dir():
-                dirs.append(child.name)
-                entries.append({"name": child.name, "type": "dir", "token": issue_fs_token(child.resolve())})
-            else:
-                files.append(child.name)
-                entries.append({"name": child.name, "type": "file"})
+        listing = _read_listing(resolved)
     except OSError as e:
         logger.error(f"Error listing {resolved}: {e}")
         raise HTTPException(status_code=500, detail="Error listing directory")
 
-    return {"abs": str(resolved), "dirs": dirs, "files": files, "entries": entries}
+    total = len(listing.names)
+    offset = max(0, offset)
+    stop = total if limit is None else min(total, offset + max(0, limit))
+    page = range(offset, stop)
+
+    # Tokens for the page's directories, batch-issued and kept with the listing
+    if tokens:
+        missing = [i for i in page if listing.is_dir[i] and i not in listing.tokens]
+        if missing:
+            targets = []
+            for i in missing:
+                try:
+                    targets.append((i, (resolved / listing.names[i]).resolve()))
+                except (OSError, RuntimeError):
+                    continue
+            for (i, _), tok in zip(targets, issue_fs_tokens([t for _, t in targets])):
+                listing.tokens[i] = tok
+
+    dirs: List[str] = []
+    files: List[str] = []
+    entries: List[Dict[str, Any]] = []
+    for i in page:
+        name = listing.names[i]
+        if i not in listing.stats:
+            try:
+                listing.stats[i] = os.stat(os.path.join(str(resolved), name))
+            except OSError:
+                listing.stats[i] = None
+        st = listing.stats[i]
+        entry: Dict[str, Any] = {"name": name, "type": "dir" if listing.is_dir[i] else "file"}
+        if st is not None:
+            entry["mtime"] = int(st.st_mtime)
+            if not listing.is_dir[i]:
+                entry["size"] = st.st_size
+        if listing.is_dir[i]:
+            dirs.append(name)
+            if tokens and i in listing.tokens:
+                entry["token"] = listing.tokens[i]
+        else:
+            files.append(name)
+        entries.append(entry)
+
+    return {
+        "abs": str(resolved), "dirs": dirs, "files": files, "entries": entries,
+        "total": total, "offset": offset, "next_offset": stop if stop < total else None,
+    }
 
 @app.get("/api/fs/roots", response_model=FSRootsResponse, dependencies=[Depends(verify_token)])
 def api_fs_roots():
@@ -245,16 +383,22 @@ def api_fs_roots():
 
 @app.get("/api/fs", dependencies=[Depends(verify_token)])
 @app.get("/api/fs/list", dependencies=[Depends(verify_token)])
-def api_fs_list(token: Optional[str] = None, root: Optional[str] = None, rel: Optional[str] = None):
+def api_fs_list(token: Optional[str] = None, root: Optional[str] = None, rel: Optional[str] = None,
+                child: Optional[str] = None, offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1, le=10000),
+                tokens: bool = True):
     """
     FS listing endpoint.
-    Canonical: ?token=<opaque>
+    Canonical: ?token=<opaque>  (optionally &child=<name> for a direct subdirectory)
     Transitional: ?root=<root_id>&rel=   (base only; subpaths require tokens)
+    Paging: offset/limit; `next_offset` is null on the last page.
     """
     hub = state.hub
     merges_dir = getattr(state, "merges_dir", None)
-    trusted = resolve_fs_path(hub=hub, merges_dir=merges_dir, root_id=root, rel_path=rel, token=token)
-    payload = _list_dir(trusted.path)
+    trusted = resolve_fs_path(hub=hub, merges_dir=merges_dir, root_id=root, rel_path=rel, token=token, child=child)
+    payload = _list_dir(trusted.path, offset=offset, limit=limit, tokens=tokens)
+    if child is not None:
+        # Token of the directory actually listed, so the client can keep navigating
+        payload["self_token"] = issue_fs_token(trusted.path)
     # Add parent token for upward navigation if possible
     try:
         # Only offer parent if parent itself is allowed (avoid broken Up + reduce taint)
@@ -383,7 +527,9 @@ def health():
         "hub": str(state.hub),
         "merges_dir": str(state.merges_dir) if state.merges_dir else None,
         "auth_enabled": bool(get_security_config().token),
-        "running_jobs": len(state.runner.futures) if state.runner else 0
+        "running_jobs": len(state.runner.futures) if state.runner else 0,
+        "job_isolation": state.runner.isolation if state.runner else None,
+        "watch": state.watcher.backend if state.watcher else None
     }
 
 @app.get("/api/repos", dependencies=[Depends(verify_token)])
@@ -393,8 +539,6 @@ def list_repos(hub: Optional[str] = None):
     if hub:
         target_hub = validate_hub_path(hub)
 
-    # Use runner's helper or core helper
-    from .runner import _find_repos
     return _find_repos(target_hub)
 
 @app.post("/api/prescan", response_model=PrescanResponse, dependencies=[Depends(verify_token)])
@@ -413,7 +557,8 @@ def api_prescan(request: PrescanRequest):
         result = prescan_repo(
             repo_root=repo_root,
             max_depth=request.max_depth,
-            ignore_globs=request.ignore_globs
+            ignore_globs=request.ignore_globs,
+            index=state.watcher
         )
         # Convert to response
         return PrescanResponse(
@@ -428,6 +573,36 @@ def api_prescan(request: PrescanRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/prescan/level", response_model=PrescanLevelResponse, dependencies=[Depends(verify_token)])
+def api_prescan_level(request: PrescanLevelRequest):
+    """
+    One level of the prescan tree with recursive counts/bytes per directory.
+    Clients expand directories on demand; there is no node limit.
+    """
+    if not state.hub:
+        raise HTTPException(status_code=400, detail="Hub not configured")
+
+    repo_name = validate_repo_name(request.repo)
+    repo_root = state.hub / repo_name
+    if not repo_root.exists() or not repo_root.is_dir():
+        raise HTTPException(status_code=404, detail=f"Repo {repo_name} not found")
+
+    try:
+        result = prescan_level(
+            repo_root=repo_root,
+            rel_dir=request.path,
+            max_depth=request.max_depth,
+            ignore_globs=request.ignore_globs,
+            index=state.watcher
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Prescan level failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return PrescanLevelResponse(**result)
+
+
 @app.post("/api/jobs", response_model=Job, dependencies=[Depends(verify_token)])
 def create_job(request: JobRequest):
     # Validate Hub in request
@@ -458,33 +633,281 @@ def create_job(request: JobRequest):
     resolved_hub_str = str(req_hub)
     content_hash = calculate_job_hash(request, resolved_hub_str, SPEC_VERSION)
 
+    # Content-aware key: parameters + current state of the input repos.
+    # The runner re-keys the job right before it scans.
+    fingerprint = input_fingerprint(request, req_hub, state_dir=state.job_store.storage_dir / "fingerprints")
+    cache_key = calculate_cache_key(content_hash, fingerprint)
+
     # Lazy GC
     state.job_store.cleanup_jobs(max_jobs=GC_MAX_JOBS, max_age_hours=GC_MAX_AGE_HOURS)
 
-    existing = state.job_store.find_job_by_hash(content_hash)
-    if existing and not request.force_new:
-        # Check if we should reuse
-        if existing.status in ("queued", "running", "canceling"):
+    if not request.force_new:
+        existing = state.job_store.find_job_by_hash(content_hash)
+        # Reuse in-flight jobs only if they work on the same input state
+        if existing and existing.status in ("queued", "running", "canceling") and existing.cache_key == cache_key:
              logger.info(f"Reusing existing active job {existing.id}")
              return existing
 
-        # Policy: Reuse succeeded jobs (server-side default: yes)
-        if existing.status == "succeeded":
+        # Policy: Reuse succeeded jobs for identical parameters AND identical hub state
+        cached = state.artifact_cache.get(cache_key)
+        if cached:
+             logger.info(f"Artifact cache hit: reusing succeeded job {cached.id}")
+             return cached
+
+        if existing and existing.status == "succeeded" and existing.cache_key == cache_key:
              logger.info(f"Reusing existing succeeded job {existing.id}")
+             state.artifact_cache.put(cache_key, existing)
              return existing
 
     job = Job.create(request, content_hash=content_hash)
     job.hub_resolved = resolved_hub_str
+    job.input_fingerprint = fingerprint
+    job.cache_key = cache_key
     state.job_store.add_job(job)
     state.runner.submit_job(job.id)
     return job
 
-@app.get("/api/jobs", response_model=List[Job], dependencies=[Depends(verify_token)])
-def get_jobs(status: Optional[str] = None, limit: int = 20):
-    jobs = state.job_store.get_all_jobs()
-    if status:
-        jobs = [j for j in jobs if j.status == status]
-    return jobs[:limit]
+@app.post("/api/merge/stream", dependencies=[Depends(verify_token)], response_model=None)
+async def stream_merge(request: Request, body: JobRequest, tee: bool = False):
+    """
+    Runs a single-file "gesamt" merge straight into a chunked text/markdown response.
+
+    - Blocks are produced only as fast as the client reads them (backpressure).
+    - Client disconnect stops the merge; a tee file is then discarded.
+    - tee=true also writes the report as a regular job artifact (X-Job-Id header).
+    """
+    req_hub = validate_hub_path(body.hub) if body.hub else state.hub
+    if body.mode != "gesamt":
+        raise HTTPException(status_code=400, detail="Streaming supports mode 'gesamt' only")
+    if body.repos:
+        body.repos = [validate_repo_name(r) for r in body.repos]
+    if not body.merges_dir and state.merges_dir:
+        body.merges_dir = str(state.merges_dir)
+
+    cancel = threading.Event()
+    job: Optional[Job] = None
+    if tee:
+        job = Job.create(body, content_hash=calculate_job_hash(body, str(req_hub), SPEC_VERSION))
+        job.hub_resolved = str(req_hub)
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc).isoformat()
+        state.job_store.add_job(job)
+
+    def log(msg: str):
+        if job:
+            ts = datetime.now(timezone.utc).strftime("%H:%M:%SZ")
+            state.job_store.append_log_line(job.id, f"[{ts}] {msg}")
+
+    def warn(msg: str):
+        if job:
+            job.warnings.append(msg)
+
+    def finish(status: str, error: Optional[str] = None):
+        if job:
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.now(timezone.utc).isoformat()
+            state.job_store.update_job(job)
+
+    def is_canceled() -> bool:
+        if cancel.is_set():
+            return True
+        current = state.job_store.get_job(job.id) if job else None
+        return bool(current and current.status == "canceling")
+
+    try:
+        repo_names, summaries = await run_in_threadpool(
+            scan_request, body, req_hub, log, warn, is_canceled, state.watcher)
+        merges_dir = resolve_output_dir(body, req_hub, log)
+        extras = _parse_extras_csv(body.extras)
+        out_path, blocks = stream_report_v2(
+            merges_dir,
+            summaries,
+            body.level,
+            parse_human_size(body.max_bytes or "0"),
+            body.plan_only,
+            body.code_only,
+            path_filter=body.path_filter,
+            ext_filter=_normalize_ext_list(",".join(body.extensions)) if body.extensions else None,
+            extras=extras,
+            meta_density=body.meta_density,
+        )
+    except JobCanceled as e:
+        finish("canceled", str(e))
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        finish("failed", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        # Never leave the tee job "running" (OSError, KeyError, ... during setup)
+        logger.exception("Streaming merge setup failed")
+        finish("failed", str(e))
+        raise
+
+    def produce():
+        tmp_path = out_path.with_name(out_path.name + ".part")
+        tee_f = tmp_path.open("w", encoding="utf-8") if job else None
+        completed = False
+        try:
+            buf: List[str] = []
+            size = 0
+            first = True
+            for block in blocks:
+                if tee_f:
+                    tee_f.write(block)
+                buf.append(block)
+                size += len(block)
+                if first or size >= STREAM_CHUNK_BYTES:
+                    if is_canceled():
+                        return
+                    yield "".join(buf)
+                    buf, size, first = [], 0, False
+            if buf:
+                yield "".join(buf)
+            completed = True
+        except Exception as e:
+            logger.exception("Streaming merge failed")
+            finish("failed", str(e))
+            raise
+        finally:
+            if tee_f:
+                tee_f.close()
+                if completed:
+                    tmp_path.replace(out_path)
+                    _register_stream_artifact(job, req_hub, repo_names, merges_dir, out_path.name)
+                    log("Streamed report completed.")
+                    finish("succeeded")
+                else:
+                    try:
+                        tmp_path.unlink()
+                    except OSError:
+                        pass
+                    if job.status == "running":
+                        finish("canceled", "Client disconnected")
+
+    async def body_iter():
+        it = produce()
+        try:
+            while True:
+                chunk = await run_in_threadpool(next, it, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            cancel.set()
+            try:
+                it.close()
+            except ValueError:
+                # Generator still running in the worker thread; it observes `cancel`
+                pass
+
+    headers = {"X-Report-Filename": out_path.name, "X-Accel-Buffering": "no", "Cache-Control": "no-store"}
+    if job:
+        headers["X-Job-Id"] = job.id
+    return StreamingResponse(body_iter(), media_type="text/markdown; charset=utf-8", headers=headers)
+
+def _register_stream_artifact(job: Job, hub: Path, repo_names: List[str], merges_dir: Path, filename: str):
+    paths = {"md": filename}
+    hashes, encoded = finalize_outputs(merges_dir, paths)
+    art = Artifact(
+        id=str(uuid.uuid4()),
+        job_id=job.id,
+        hub=str(hub),
+        repos=repo_names,
+        created_at=datetime.now(timezone.utc).isoformat(),
+        paths=paths,
+        params=job.request,
+        merges_dir=str(merges_dir.resolve()),
+        hashes=hashes,
+        encoded=encoded,
+    )
+    state.job_store.add_artifact(art)
+    job.artifact_ids.append(art.id)
+
+@app.get("/api/cache/stats", dependencies=[Depends(verify_token)])
+def api_cache_stats():
+    if not state.artifact_cache:
+        raise HTTPException(status_code=400, detail="Service not initialized")
+    return state.artifact_cache.stats()
+
+@app.get("/api/watch/status", dependencies=[Depends(verify_token)])
+def api_watch_status():
+    if not state.watcher:
+        return {"enabled": False}
+    return {"enabled": True, **state.watcher.status(), "dirty_subtrees": state.watcher.dirty_subtrees()[:100]}
+
+def _normalize_ts(value: Optional[str], name: str) -> Optional[str]:
+    """ISO timestamp query param -> UTC isoformat comparable with created_at strings."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} timestamp: {value}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+def _project(data: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Keeps only the given (dotted) fields, e.g. ["id", "params.level"]."""
+    out: Dict[str, Any] = {}
+    for field in fields:
+        src, dst = data, out
+        parts = field.split(".")
+        for i, part in enumerate(parts):
+            if not isinstance(src, dict) or part not in src:
+                break
+            if i == len(parts) - 1:
+                dst[part] = src[part]
+            else:
+                src = src[part]
+                dst = dst.setdefault(part, {})
+    return out
+
+def _paged_list(request: Request, kind: str, query_fn, fields: Optional[str]) -> Response:
+    """
+    Shared list response: ETag from the store revision + query string (304 on match,
+    before any query work), next page cursor in X-Next-Cursor, optional projection.
+    """
+    raw = f"{state.job_store.etag(kind)}?{request.url.query}"
+    etag = 'W/"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        items, next_cursor = query_fn()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    body = []
+    for item in items:
+        data = item.model_dump()
+        body.append(_project(data, field_list) if field_list else data)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return JSONResponse(content=body, headers=headers)
+
+@app.get("/api/jobs", dependencies=[Depends(verify_token)])
+def get_jobs(request: Request, status: Optional[str] = None, repo: Optional[str] = None,
+             level: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+             cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=1000),
+             fields: Optional[str] = None):
+    since_ts, until_ts = _normalize_ts(since, "since"), _normalize_ts(until, "until")
+
+    def _match(j: Job) -> bool:
+        if status and j.status != status:
+            return False
+        if repo and repo not in (j.request.repos or []):
+            return False
+        if level and j.request.level != level:
+            return False
+        return True
+
+    return _paged_list(request, "jobs",
+                       lambda: state.job_store.query_jobs(_match, cursor, limit, since_ts, until_ts),
+                       fields)
 
 @app.get("/api/jobs/{job_id}", response_model=Job, dependencies=[Depends(verify_token)])
 def get_job(job_id: str):
@@ -566,46 +989,34 @@ async def stream_logs(request: Request, job_id: str, last_id: Optional[int] = Qu
 
     return StreamingResponse(log_generator(), media_type="text/event-stream")
 
-@app.get("/api/artifacts", response_model=List[Artifact], dependencies=[Depends(verify_token)])
-def list_artifacts(repo: Optional[str] = None):
-    arts = state.job_store.get_all_artifacts()
-    if repo:
-        arts = [a for a in arts if repo in a.repos]
-    return arts
+@app.get("/api/artifacts", dependencies=[Depends(verify_token)])
+def list_artifacts(request: Request, repo: Optional[str] = None, level: Optional[str] = None,
+                   mode: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                   cursor: Optional[str] = None, limit: Optional[int] = Query(None, ge=1, le=10000),
+                   fields: Optional[str] = None):
+    # No limit = full list (legacy behaviour); paged clients pass limit + cursor
+    since_ts, until_ts = _normalize_ts(since, "since"), _normalize_ts(until, "until")
+
+    def _match(a: Artifact) -> bool:
+        if repo and repo not in a.repos:
+            return False
+        if level and a.params.level != level:
+            return False
+        if mode and a.params.mode != mode:
+            return False
+        return True
+
+    return _paged_list(request, "artifacts",
+                       lambda: state.job_store.query_artifacts(_match, cursor, limit, since_ts, until_ts),
+                       fields)
 
 @app.get("/api/artifacts/latest", dependencies=[Depends(verify_token)])
 def get_latest_artifact(repo: str, level: str = "max", mode: str = "gesamt"):
-    # "Heimgewebe-Hebel" - Return the single latest matching artifact
-    arts = state.job_store.get_all_artifacts()
-    matches = []
-
-    for a in arts:
-        # Filter by params
-        if a.params.level != level:
-            continue
-        if a.params.mode != mode:
-            continue
-
-        # Filter by repo
-        # If artifact covers specific repos, 'repo' must be in that list.
-        # If artifact covers all (empty list/None), it counts as a match for any repo query?
-        # Or does 'latest?repo=X' imply "Snapshot of X"?
-        # Usually "Snapshot of X" means X is in the list.
-        if a.repos:
-            if repo in a.repos:
-                matches.append(a)
-        else:
-            # Artifact is for ALL repos.
-            # Does this count as "latest artifact for repo X"?
-            # Yes, if X is in the hub. We assume it is.
-            matches.append(a)
-
-    if not matches:
+    # "Heimgewebe-Hebel" - Return the single latest matching artifact.
+    # Artifacts for all repos (empty repo list) count as a match for any repo.
+    latest = state.job_store.latest_artifact(repo, level, mode)
+    if not latest:
         raise HTTPException(status_code=404, detail="No matching artifact found")
-
-    # Sort by created_at desc (lexicographical ISO string sort works)
-    # The JobStore already returns sorted list (desc), but to be safe/explicit:
-    latest = max(matches, key=lambda x: x.created_at)
     return latest
 
 @app.get("/api/artifacts/{id}", dependencies=[Depends(verify_token)])
@@ -616,7 +1027,7 @@ def get_artifact(id: str):
     return art
 
 @app.get("/api/artifacts/{id}/download", dependencies=[Depends(verify_token)])
-def download_artifact(id: str, key: str = "md"):
+def download_artifact(id: str, key: str = "md", request: Request = None):
     art = state.job_store.get_artifact(id)
     if not art:
         raise HTTPException(status_code=404, detail="Artifact not found")
@@ -625,9 +1036,11 @@ def download_artifact(id: str, key: str = "md"):
     if not filename:
         # Try finding part
         if key == "md" and "canonical_md" in art.paths:
-            filename = art.paths["canonical_md"]
+            key = "canonical_md"
+            filename = art.paths[key]
         elif key == "json" and "index_json" in art.paths:
-             filename = art.paths["index_json"]
+             key = "index_json"
+             filename = art.paths[key]
         else:
              raise HTTPException(status_code=404, detail=f"File key '{key}' not found in artifact")
 
@@ -704,12 +1117,18 @@ def download_artifact(id: str, key: str = "md"):
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File on disk missing")
 
-    return FileResponse(file_path, filename=filename)
+    # Pre-compressed siblings: same directory, plain names only
+    encoded = {}
+    for enc, sibling in art.encoded.get(key, {}).items():
+        if sibling and os.path.basename(sibling) == sibling and sibling.startswith(filename):
+            encoded[enc] = file_path.parent / sibling
+
+    return serve_file(request, file_path, filename, digest=art.hashes.get(key), encoded=encoded)
 
 # Atlas API
 
 @app.post("/api/atlas", response_model=AtlasArtifact, dependencies=[Depends(verify_token)])
-async def create_atlas(request: AtlasRequest, background_tasks: BackgroundTasks):
+async def create_atlas(request: AtlasRequest):
     # Determine root to scan
     hub = state.hub
     if not hub:
@@ -775,93 +1194,92 @@ async def create_atlas(request: AtlasRequest, background_tasks: BackgroundTasks)
     except HTTPException as e:
          raise e
 
-    # Generate ID
-    scan_id = f"atlas-{int(time.time())}"
-
     # Define output paths
     merges_dir = state.merges_dir or get_merges_dir(hub)
     if not merges_dir.exists():
         merges_dir.mkdir(parents=True, exist_ok=True)
 
-    json_filename = f"{scan_id}.json"
-    md_filename = f"{scan_id}.md"
-    inventory_filename = f"{scan_id}.inventory.jsonl" # Default name
+    effective = AtlasEffective(
+        max_depth=effective_max_depth,
+        max_entries=effective_max_entries,
+        exclude_globs=effective_excludes
+    )
 
-    # Helper to run scan and save
-    def run_scan_and_save():
-        try:
-            # Inventory First: inventory_file is always passed now.
-            inventory_path = merges_dir / inventory_filename
-
-            # Use inventory_strict if configured?
-            # We don't have this in AtlasRequest yet (schema change).
-            # But the user said: "Inventur-Default: ... (z.B. nur .git und offensichtliche Virtualenvs), damit der Nutzer wirklich 'alles beim Namen' bekommt."
-            # and "Erlaube optional einen Modus 'inventur_strict=true'".
-            # We should pass inventory_file.
-            # And strict mode? If user didn't ask for specific excludes, maybe we should default to strict?
-            # Or expose it.
-            # Current instruction: "Default-Output is complete file list".
-            # The AtlasScanner default excludes are NOT strict (they include node_modules etc).
-            # To match the "Inventur" goal, we should probably set inventory_strict=True unless specified otherwise?
-            # But wait, inventory_strict=True means LESS excludes.
-            # So if we want "complete file list", we want strict mode.
-            # Let's check existing logic:
-            # inventory_strict=True -> only .git, .venv
-            # inventory_strict=False -> .git, node_modules, cache, etc.
-
-            # The requirement is "Primär-Output ist ein vollständiger Index".
-            # "node_modules" usually is noise.
-            # But "alles beim Namen" implies listing it.
-            # Let's enable strict mode if no explicit excludes are given?
-            # Or just pass inventory_file and let AtlasScanner defaults rule (which are SAFE/Clean).
-            # The prompt said: "Phase 0 Ziel: Inventur... Keine Top N...".
-            # It also said: "Default-Excludes dürfen existieren... Wichtig: Erlaube optional einen Modus 'inventur_strict=true'".
-            # So Strict is OPTIONAL.
-
-            # We will generate inventory file ALWAYS.
-
-            scanner = AtlasScanner(
-                root=scan_root,
-                max_depth=effective_max_depth,
-                max_entries=effective_max_entries,
-                exclude_globs=effective_excludes,
-                inventory_strict=False # Default safe. Can be exposed later.
-            )
-            result = scanner.scan(inventory_file=inventory_path)
+    # The inventory (atlas-<id>.inventory.jsonl) is always written; see AtlasScanner
+    # for the default excludes (inventory_strict=False keeps node_modules etc. out).
+    scanner = AtlasScanner(
+        root=scan_root,
+        max_depth=effective_max_depth,
+        max_entries=effective_max_entries,
+        exclude_globs=effective_excludes,
+        inventory_strict=False, # Default safe. Can be exposed later.
+        index=state.watcher,
+        workers=ATLAS_SCAN_WORKERS
+    )
 
-            # Save JSON Stats
-            with open(merges_dir / json_filename, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2)
+    # Identical in-flight scans (same root + effective params) are shared
+    scan, deduplicated = state.atlas_jobs.submit(
+        scan_key(scan_root, effective), scan_root, effective, merges_dir, scanner, render_atlas_md
+    )
 
-            # Render and Save MD
-            md_content = render_atlas_md(result)
-            with open(merges_dir / md_filename, "w", encoding="utf-8") as f:
-                f.write(md_content)
+    return AtlasArtifact(
+        id=scan.id,
+        created_at=scan.created_at,
+        hub=str(hub),
+        root_scanned=scan.root_scanned,
+        paths=scan.paths,
+        stats=scan.stats, # Empty until the scan finished (see /api/atlas/{id}/status)
+        effective=scan.effective,
+        status=scan.status,
+        deduplicated=deduplicated,
+    )
 
-            logger.info(f"Atlas scan completed: {scan_id}")
+def _get_atlas_scan(id: str) -> AtlasScanStatus:
+    scan = state.atlas_jobs.get(id) if state.atlas_jobs else None
+    if not scan:
+        raise HTTPException(status_code=404, detail="Atlas scan not found")
+    return scan
+
+@app.get("/api/atlas/{id}/status", response_model=AtlasScanStatus, dependencies=[Depends(verify_token)])
+def get_atlas_status(id: str):
+    return _get_atlas_scan(id)
+
+@app.post("/api/atlas/{id}/cancel", dependencies=[Depends(verify_token)])
+def cancel_atlas(id: str):
+    _get_atlas_scan(id)
+    scan = state.atlas_jobs.cancel(id)
+    return {"status": scan.status}
+
+@app.get("/api/atlas/{id}/events", dependencies=[Depends(verify_token)], response_model=None)
+async def stream_atlas_events(request: Request, id: str):
+    """SSE: `progress` events (status + counters) on change, then `end` with the final status."""
+    _get_atlas_scan(id)
+
+    async def event_generator():
+        last_version = -1
+        while True:
+            try:
+                if await request.is_disconnected():
+                    break
+            except Exception:
+                pass
 
-        except Exception as e:
-            logger.exception(f"Atlas scan failed: {e}")
-            # Could save an error file?
+            version = state.atlas_jobs.version(id)
+            scan = state.atlas_jobs.get(id)
+            if scan is None:
+                break
+            if version != last_version:
+                last_version = version
+                payload = {"id": scan.id, "status": scan.status, "progress": scan.progress.model_dump()}
+                yield f"event: progress\ndata: {json.dumps(payload)}\n\n"
 
-    background_tasks.add_task(run_scan_and_save)
+            if scan.status in ("succeeded", "failed", "canceled"):
+                yield f"event: end\ndata: {json.dumps(scan.model_dump())}\n\n"
+                break
 
-    # Update response object to include inventory path
-    paths = {"json": json_filename, "md": md_filename, "inventory": inventory_filename}
+            await asyncio.sleep(SSE_POLL_SEC)
 
-    return AtlasArtifact(
-        id=scan_id,
-        created_at=datetime.now(timezone.utc).isoformat(),
-        hub=str(hub),
-        root_scanned=str(scan_root),
-        paths=paths,
-        stats={}, # Empty initially
-        effective=AtlasEffective(
-            max_depth=effective_max_depth,
-            max_entries=effective_max_entries,
-            exclude_globs=effective_excludes
-        )
-    )
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 @app.post("/api/sync/metarepo", dependencies=[Depends(verify_token)])
 def api_sync_metarepo(payload: Dict[str, Any]):
@@ -942,6 +1360,9 @@ def get_latest_atlas():
          # Actually check if it exists to avoid 404 links
          if inv_file.exists():
              paths["inventory"] = inv_file.name
+    inv_bin = latest_file.with_suffix(".inventory.bin")
+    if inv_bin.exists():
+        paths["inventory_bin"] = inv_bin.name
 
     return AtlasArtifact(
         id=scan_id,
@@ -952,30 +1373,14 @@ def get_latest_atlas():
         stats=stats
     )
 
-@app.get("/api/atlas/{id}/download", dependencies=[Depends(verify_token)])
-def download_atlas(id: str, key: str = "md"):
-    # Hard allowlist: atlas ids are generated as "atlas-<unix_ts>"
-    if not re.fullmatch(r"atlas-\d+", (id or "").strip()):
-        raise HTTPException(status_code=400, detail="Invalid atlas id format")
-
-    if key not in ("json", "md", "inventory"):
-        raise HTTPException(status_code=400, detail="Invalid key. Use 'json', 'md', or 'inventory'.")
-
-    if not state.hub:
-        raise HTTPException(status_code=400, detail="Hub not configured")
-
-    merges_dir = (state.merges_dir or get_merges_dir(state.hub)).resolve()
-    if not merges_dir.exists():
-        raise HTTPException(status_code=404, detail="Merges directory not found")
-
-    # IMPORTANT: do NOT build a path from user input.
-    # Enumerate allowed files and then select by id.
+def _find_atlas_file(merges_dir: Path, id: str, ext: str) -> Optional[Path]:
+    """
+    Resolved `<id><ext>` inside merges_dir, or None.
+    IMPORTANT: do NOT build a path from user input.
+    Enumerate allowed files and then select by id.
+    """
     candidates = {}
 
-    # Map key to extension
-    ext_map = {"json": ".json", "md": ".md", "inventory": ".inventory.jsonl"}
-    ext = ext_map[key]
-
     # Glob pattern needs to match suffix carefully
     # atlas-*.json covers .inventory.jsonl? No.
     # Globbing: atlas-*{ext}
@@ -1001,15 +1406,75 @@ def download_atlas(id: str, key: str = "md"):
 
     file_path = candidates.get(id)
     if not file_path:
-        raise HTTPException(status_code=404, detail="File not found")
+        return None
 
     # Final belt-and-suspenders containment check
     try:
         file_path.relative_to(merges_dir)
     except ValueError:
         raise HTTPException(status_code=403, detail="Access denied")
+    return file_path
+
+@app.get("/api/atlas/{id}/download", dependencies=[Depends(verify_token)])
+def download_atlas(id: str, key: str = "md", request: Request = None):
+    # Hard allowlist: atlas ids are generated as "atlas-<unix_ts>"
+    if not re.fullmatch(r"atlas-\d+", (id or "").strip()):
+        raise HTTPException(status_code=400, detail="Invalid atlas id format")
+
+    if key not in ("json", "md", "inventory", "inventory_bin"):
+        raise HTTPException(status_code=400, detail="Invalid key. Use 'json', 'md', 'inventory' or 'inventory_bin'.")
+
+    if not state.hub:
+        raise HTTPException(status_code=400, detail="Hub not configured")
 
-    return FileResponse(file_path, filename=file_path.name)
+    merges_dir = (state.merges_dir or get_merges_dir(state.hub)).resolve()
+    if not merges_dir.exists():
+        raise HTTPException(status_code=404, detail="Merges directory not found")
+
+    # Map key to extension
+    ext_map = {"json": ".json", "md": ".md", "inventory": ".inventory.jsonl", "inventory_bin": ".inventory.bin"}
+    file_path = _find_atlas_file(merges_dir, id, ext_map[key])
+    if not file_path:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    encoded = {}
+    for enc, suffix in ENCODING_SUFFIXES.items():
+        sibling = file_path.with_name(file_path.name + suffix)
+        if sibling.is_file():
+            encoded[enc] = sibling
+
+    return serve_file(request, file_path, file_path.name, encoded=encoded)
+
+@app.post("/api/atlas/diff", response_model=AtlasDiffResponse, dependencies=[Depends(verify_token)])
+def diff_atlas(request: AtlasDiffRequest):
+    """Streams the two scans' inventories (JSONL, else binary) through adapters/atlas_diff."""
+    for scan_id in (request.old_id, request.new_id):
+        if not re.fullmatch(r"atlas-\d+", (scan_id or "").strip()):
+            raise HTTPException(status_code=400, detail="Invalid atlas id format")
+
+    if not state.hub:
+        raise HTTPException(status_code=400, detail="Hub not configured")
+
+    merges_dir = (state.merges_dir or get_merges_dir(state.hub)).resolve()
+    if not merges_dir.exists():
+        raise HTTPException(status_code=404, detail="Merges directory not found")
+
+    inventories = []
+    for scan_id in (request.old_id, request.new_id):
+        inv = _find_atlas_file(merges_dir, scan_id, ".inventory.jsonl") or _find_atlas_file(merges_dir, scan_id, ".inventory.bin")
+        if not inv:
+            raise HTTPException(status_code=404, detail=f"Inventory not found for {scan_id}")
+        inventories.append(inv)
+
+    try:
+        diff = diff_inventories(inventories[0], inventories[1], top=request.top)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Do not expose server paths
+    diff["old"], diff["new"] = inventories[0].name, inventories[1].name
+    diff["externally_sorted"] = [Path(p).name for p in diff["externally_sorted"]]
+
+    return AtlasDiffResponse(old_id=request.old_id, new_id=request.new_id, stats=diff, markdown=render_diff_md(diff))
 
 @app.post("/api/export/webmaschine", dependencies=[Depends(verify_token)])
 def export_webmaschine():
@@ -0,0 +1,224 @@
+"""
+Atlas scans as tracked background jobs.
+
+Scans run on a small bounded pool (RLENS_ATLAS_WORKERS, default 1) instead of
+the request's BackgroundTasks. An identical scan (same root and effective
+parameters) that is still queued or running is returned instead of starting a
+second walk. Progress is kept per scan and can be polled or streamed; outputs
+are written to temporary files and renamed into place only on success.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .delivery import finalize_outputs
+from .models import AtlasEffective, AtlasProgress, AtlasScanStatus
+
+try:
+    from ..adapters.atlas import AtlasScanCanceled
+except ImportError:
+    from merger.lenskit.adapters.atlas import AtlasScanCanceled
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ("queued", "running", "canceling")
+# Finished scans kept in memory for status queries
+MAX_FINISHED = 50
+
+
+def scan_key(root: Path, effective: AtlasEffective, inventory_strict: bool = False) -> str:
+    """Dedup key: the scan root plus every parameter that changes the output."""
+    payload = {
+        "root": str(root),
+        "max_depth": effective.max_depth,
+        "max_entries": effective.max_entries,
+        "exclude_globs": sorted(effective.exclude_globs),
+        "inventory_strict": inventory_strict,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class AtlasJobManager:
+    """Schedules, deduplicates, tracks and cancels Atlas scans."""
+
+    def __init__(self, max_workers: Optional[int] = None, inventory_bin: Optional[bool] = None):
+        workers = max_workers or int(os.getenv("RLENS_ATLAS_WORKERS", "1"))
+        # Also write the compact binary inventory (adapters/atlas_inventory)
+        self.inventory_bin = (os.getenv("RLENS_ATLAS_INVENTORY_BIN", "0") == "1") if inventory_bin is None else inventory_bin
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers),
+                                                              thread_name_prefix="rlens-atlas")
+        self._lock = threading.Lock()
+        self._scans: Dict[str, AtlasScanStatus] = {}
+        self._inflight: Dict[str, str] = {}  # dedup key -> scan id
+        self._keys: Dict[str, str] = {}  # scan id -> dedup key
+        self._cancel: Dict[str, threading.Event] = {}
+        # Bumped on every status/progress change (SSE change detection)
+        self._versions: Dict[str, int] = {}
+
+    def _new_id(self, merges_dir: Path) -> str:
+        # "atlas-<unix_ts>" is the download id format; bump on collisions within a second
+        ts = int(time.time())
+        while f"atlas-{ts}" in self._scans or (merges_dir / f"atlas-{ts}.json").exists():
+            ts += 1
+        return f"atlas-{ts}"
+
+    def submit(self, key: str, root: Path, effective: AtlasEffective, merges_dir: Path,
+               scanner: Any, render: Callable[[Dict[str, Any]], str]) -> Tuple[AtlasScanStatus, bool]:
+        """
+        Queues `scanner.scan(...)` (Markdown via `render`) unless an identical
+        scan is in flight. Returns (status snapshot, deduplicated).
+        """
+        with self._lock:
+            existing = self._inflight.get(key)
+            if existing and self._scans[existing].status in ACTIVE_STATES:
+                return self._scans[existing].model_copy(deep=True), True
+
+            scan_id = self._new_id(merges_dir)
+            status = AtlasScanStatus(
+                id=scan_id,
+                status="queued",
+                created_at=datetime.now(timezone.utc).isoformat(),
+                root_scanned=str(root),
+                paths={"json": f"{scan_id}.json", "md": f"{scan_id}.md", "inventory": f"{scan_id}.inventory.jsonl"},
+                effective=effective,
+            )
+            if self.inventory_bin:
+                status.paths["inventory_bin"] = f"{scan_id}.inventory.bin"
+            self._scans[scan_id] = status
+            self._inflight[key] = scan_id
+            self._keys[scan_id] = key
+            self._cancel[scan_id] = threading.Event()
+            self._versions[scan_id] = 0
+            snapshot = status.model_copy(deep=True)
+
+        self.executor.submit(self._run, scan_id, merges_dir, scanner, render)
+        return snapshot, False
+
+    def get(self, scan_id: str) -> Optional[AtlasScanStatus]:
+        with self._lock:
+            status = self._scans.get(scan_id)
+            return status.model_copy(deep=True) if status else None
+
+    def version(self, scan_id: str) -> int:
+        with self._lock:
+            return self._versions.get(scan_id, -1)
+
+    def cancel(self, scan_id: str) -> Optional[AtlasScanStatus]:
+        with self._lock:
+            status = self._scans.get(scan_id)
+            if status is None:
+                return None
+            if status.status in ("queued", "running"):
+                status.status = "canceling"
+                self._cancel[scan_id].set()
+                self._versions[scan_id] += 1
+            return status.model_copy(deep=True)
+
+    def shutdown(self) -> None:
+        """Cancels everything in flight (service re-init); does not wait."""
+        with self._lock:
+            for event in self._cancel.values():
+                event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _update(self, scan_id: str, **fields: Any) -> None:
+        with self._lock:
+            status = self._scans[scan_id]
+            for k, v in fields.items():
+                setattr(status, k, v)
+            self._versions[scan_id] += 1
+
+    def _finish(self, scan_id: str, state: str, **fields: Any) -> None:
+        with self._lock:
+            status = self._scans[scan_id]
+            status.status = state
+            status.finished_at = datetime.now(timezone.utc).isoformat()
+            for k, v in fields.items():
+                setattr(status, k, v)
+            self._versions[scan_id] += 1
+            key = self._keys.get(scan_id)
+            if key and self._inflight.get(key) == scan_id:
+                del self._inflight[key]
+
+            finished = [s for s in self._scans.values() if s.status not in ACTIVE_STATES]
+            for old in sorted(finished, key=lambda s: s.created_at)[:-MAX_FINISHED]:
+                for table in (self._scans, self._keys, self._cancel, self._versions):
+                    table.pop(old.id, None)
+
+    def _run(self, scan_id: str, merges_dir: Path, scanner: Any, render: Callable[[Dict[str, Any]], str]) -> None:
+        cancel = self._cancel[scan_id]
+        status = self.get(scan_id)
+        if cancel.is_set():
+            self._finish(scan_id, "canceled")
+            return
+        self._update(scan_id, status="running", started_at=datetime.now(timezone.utc).isoformat())
+
+        paths = status.paths
+        final = {k: merges_dir / v for k, v in paths.items()}
+        part_inventory = final["inventory"].with_name(final["inventory"].name + ".part")
+        part_bin = final["inventory_bin"].with_name(final["inventory_bin"].name + ".part") if "inventory_bin" in final else None
+
+        def progress(p: Dict[str, Any]) -> None:
+            self._update(scan_id, progress=AtlasProgress(**p))
+
+        try:
+            extra = {"inventory_bin_file": part_bin} if part_bin else {}
+            result = scanner.scan(inventory_file=part_inventory, progress=progress, is_canceled=cancel.is_set, **extra)
+            if cancel.is_set():
+                raise AtlasScanCanceled("Atlas scan canceled")
+
+            if part_inventory.exists():
+                os.replace(part_inventory, final["inventory"])
+            if part_bin and part_bin.exists():
+                os.replace(part_bin, final["inventory_bin"])
+            stats = result.get("stats", {}) if isinstance(result, dict) else {}
+            if "inventory_file" in stats:
+                stats["inventory_file"] = str(final["inventory"].resolve())
+            if "inventory_bin_file" in stats:
+                stats["inventory_bin_file"] = str(final["inventory_bin"].resolve())
+
+            _write_atomic(final["json"], json.dumps(result, indent=2))
+            _write_atomic(final["md"], render(result))
+            finalize_outputs(merges_dir, {"md": paths["md"]})
+
+            logger.info(f"Atlas scan completed: {scan_id}")
+            self._finish(scan_id, "succeeded", stats=stats)
+        except AtlasScanCanceled:
+            logger.info(f"Atlas scan canceled: {scan_id}")
+            self._finish(scan_id, "canceled")
+        except Exception as e:
+            logger.exception(f"Atlas scan failed: {e}")
+            self._finish(scan_id, "failed", error=str(e))
+        finally:
+            for leftover in (part_inventory, part_bin, final["json"].with_name(final["json"].name + ".tmp"),
+                             final["md"].with_name(final["md"].name + ".tmp")):
+                if leftover is None:
+                    continue
+                try:
+                    leftover.unlink()
+                except OSError:
+                    pass
+
+    def wait(self, scan_id: str, timeout: float, poll: float = 0.02) -> Optional[AtlasScanStatus]:
+        """Blocks until the scan left the active states or `timeout` passed (tests, CLI)."""
+        deadline = time.monotonic() + timeout
+        status = self.get(scan_id)
+        while status is not None and status.status in ACTIVE_STATES and time.monotonic() < deadline:
+            time.sleep(poll)
+            status = self.get(scan_id)
+        return status
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .jobstore import JobStore
+from .models import Job
+
+try:
+    from ..core.merge import get_merges_dir
+    from ..core.fingerprint import RepoFingerprint, build_repo_fingerprint
+except ImportError:
+    from merger.lenskit.core.merge import get_merges_dir
+    from merger.lenskit.core.fingerprint import RepoFingerprint, build_repo_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def repo_stat_signature(repo_root: Path, exclude: Iterable[Path] = (), state_file: Optional[Path] = None) -> str:
+    """
+    Cheap change detector for one repo: Merkle root over (name, size, mtime_ns)
+    of everything scan_repo would see. No file content is read.
+
+    With `state_file`, the previous fingerprint is loaded from and the new one
+    saved to that path; changed subtrees are logged for diagnostics.
+    """
+    previous = RepoFingerprint.load(state_file) if state_file else None
+    fp = build_repo_fingerprint(repo_root, previous=previous, exclude=exclude)
+    if state_file:
+        if previous is not None and previous.root_hash != fp.root_hash:
+            logger.info("Input change in %s: %s", repo_root.name, fp.changed_subtrees(previous)[:20])
+        try:
+            fp.save(state_file)
+        except OSError as e:
+            logger.debug("Could not persist fingerprint %s: %s", state_file, e)
+    return fp.root_hash
+
+
+def hub_fingerprint(hub: Path, repo_names: List[str], exclude: Iterable[Path] = (),
+                    state_dir: Optional[Path] = None) -> str:
+    """
+    Combines per-repo Merkle roots into one fingerprint of the job inputs.
+    Missing repos contribute a fixed marker so that (dis)appearing repos change the key.
+    """
+    exclude = list(exclude)
+    h = hashlib.sha256()
+    for name in sorted(repo_names):
+        repo_root = hub / name
+        if repo_root.is_dir():
+            state_file = (state_dir / f"{name}.json") if state_dir else None
+            sig = repo_stat_signature(repo_root, exclude, state_file=state_file)
+        else:
+            sig = "missing"
+        h.update(f"{name}:{sig}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def calculate_cache_key(content_hash: str, fingerprint: str) -> str:
+    """Cache key = request parameters (content_hash) + hub input state (fingerprint)."""
+    return hashlib.sha256(f"{content_hash}:{fingerprint}".encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """
+    Maps cache keys (parameters + hub fingerprint) to succeeded jobs.
+
+    - Hits are validated against the JobStore and the files on disk.
+    - Entries are evicted LRU once their artifacts exceed max_bytes (0 = unlimited);
+      eviction removes the job and its files through JobStore.remove_job.
+    - Index and counters persist in the service storage dir (cache.json).
+      Entry changes are written at once; counters and last_access from lookups
+      are written at most every `save_interval` seconds (or with the next put).
+    """
+
+    def __init__(self, job_store: JobStore, max_bytes: int = 0, save_interval: float = 30.0):
+        self.job_store = job_store
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self.index_file = job_store.storage_dir / "cache.json"
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._saved_at = time.monotonic()
+        self._load()
+
+    def _load(self):
+        if not self.index_file.exists():
+            return
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+            self._entries = dict(data.get("entries", {}))
+            for k in self._counters:
+                self._counters[k] = int(data.get("counters", {}).get(k, 0))
+        except Exception as e:
+            print(f"Error loading artifact cache index: {e}")
+
+    def _save(self):
+        # Must be called under lock
+        tmp_file = self.index_file.with_suffix(".tmp")
+        data = {"entries": self._entries, "counters": self._counters}
+        tmp_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp_file.replace(self.index_file)
+        self._saved_at = time.monotonic()
+
+    def _save_lazily(self):
+        # Must be called under lock; lookup bookkeeping only
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self._save()
+
+    def _artifact_files(self, job: Job) -> Optional[List[Path]]:
+        """Returns artifact file paths of a job, or None if any is missing on disk."""
+        files: List[Path] = []
+        for art_id in job.artifact_ids:
+            art = self.job_store.get_artifact(art_id)
+            if not art:
+                return None
+            if art.merges_dir:
+                base = Path(art.merges_dir)
+            elif art.params.merges_dir:
+                base = Path(art.params.merges_dir)
+            else:
+                base = get_merges_dir(Path(art.hub))
+            for fname in art.paths.values():
+                p = base / fname
+                if not p.is_file():
+                    return None
+                files.append(p)
+        return files if job.artifact_ids else None
+
+    def get(self, key: str) -> Optional[Job]:
+        with self._lock:
+            entry = self._entries.get(key)
+            job = self.job_store.get_job(entry["job_id"]) if entry else None
+            if job and job.status == "succeeded" and self._artifact_files(job) is not None:
+                entry["last_access"] = time.time()
+                self._counters["hits"] += 1
+                self._save_lazily()
+                return job
+
+            self._counters["misses"] += 1
+            if entry:
+                # Stale entry (GC'd job or deleted files)
+                del self._entries[key]
+                self._save()
+            else:
+                self._save_lazily()
+            return None
+
+    def put(self, key: str, job: Job) -> None:
+        with self._lock:
+            files = self._artifact_files(job)
+            if files is None:
+                return
+            size = 0
+            for p in files:
+                try:
+                    size += p.stat().st_size
+                except OSError:
+                    pass
+            now = time.time()
+            self._entries[key] = {"job_id": job.id, "bytes": size, "created": now, "last_access": now}
+            self._evict_locked(keep=key)
+            self._save()
+
+    def _evict_locked(self, keep: Optional[str] = None) -> None:
+        if self.max_bytes <= 0:
+            return
+        total = sum(e["bytes"] for e in self._entries.values())
+        # Least recently used first
+        for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.job_store.remove_job(entry["job_id"])
+            del self._entries[key]
+            total -= entry["bytes"]
+            self._counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._counters["hits"]
+            misses = self._counters["misses"]
+            lookups = hits + misses
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(e["bytes"] for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": hits,
+                "misses": misses,
+                "evictions": self._counters["evictions"],
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,238 @@
+"""
+Artifact delivery: content-hash ETags, byte ranges and pre-compressed siblings.
+
+Writers call `finalize_outputs` once per written file (hash + optional
+`.gz`/`.zst` siblings, RLENS_PRECOMPRESS). The download endpoints answer with
+`serve_file`, which handles If-None-Match (304), Range/If-Range (206/416) and
+Accept-Encoding, and hands the body to the server's zero-copy extension when
+the ASGI server offers one.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import zstandard  # optional
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Encoding name (HTTP token) -> sibling suffix, in server preference order
+ENCODING_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+CHUNK_SIZE = 1024 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def configured_encodings() -> List[str]:
+    """Encodings to pre-compress at write time (RLENS_PRECOMPRESS, e.g. "gzip,zstd")."""
+    out = []
+    for token in os.getenv("RLENS_PRECOMPRESS", "").split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        if token not in ENCODING_SUFFIXES:
+            logger.warning("Ignoring unknown RLENS_PRECOMPRESS encoding: %s", token)
+            continue
+        if token == "zstd" and zstandard is None:
+            logger.warning("RLENS_PRECOMPRESS=zstd requires the 'zstandard' package; skipping")
+            continue
+        out.append(token)
+    return out
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def precompress(path: Path, encoding: str) -> Path:
+    """Writes the compressed sibling atomically (tmp + replace) and returns its path."""
+    target = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+    tmp = target.with_name(target.name + ".tmp")
+    with path.open("rb") as src, tmp.open("wb") as raw:
+        if encoding == "gzip":
+            # mtime=0: identical input -> identical bytes (stable ETags)
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        else:
+            zstandard.ZstdCompressor(level=10).copy_stream(src, raw)
+    tmp.replace(target)
+    return target
+
+
+def finalize_outputs(base: Path, filenames: Dict[str, str],
+                     encodings: Optional[List[str]] = None) -> Tuple[Dict[str, str], Dict[str, Dict[str, str]]]:
+    """
+    Hashes every written output and creates compressed siblings for Markdown files.
+
+    Returns (hashes {key: sha256}, encoded {key: {encoding: sibling filename}}).
+    """
+    encodings = configured_encodings() if encodings is None else encodings
+    hashes: Dict[str, str] = {}
+    encoded: Dict[str, Dict[str, str]] = {}
+    for key, fname in filenames.items():
+        p = base / fname
+        try:
+            hashes[key] = sha256_file(p)
+            if p.suffix == ".md":
+                for enc in encodings:
+                    encoded.setdefault(key, {})[enc] = precompress(p, enc).name
+        except OSError as e:
+            logger.warning("Could not finalize output %s: %s", p, e)
+    return hashes, encoded
+
+
+# Lazily computed hashes for files without a recorded one (Atlas, legacy artifacts)
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+
+def content_hash(path: Path) -> str:
+    st = path.stat()
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _hash_lock:
+        cached = _hash_cache.get(key)
+    if cached:
+        return cached
+    digest = sha256_file(path)
+    with _hash_lock:
+        if len(_hash_cache) > 1024:
+            _hash_cache.clear()
+        _hash_cache[key] = digest
+    return digest
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        m = re.search(r"q=([0-9.]+)", params)
+        if m:
+            try:
+                q = float(m.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Single byte range -> inclusive (start, end), or None if unsatisfiable."""
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else size - 1
+    else:
+        # Suffix range: last N bytes
+        start = max(0, size - int(m.group(2)))
+        end = size - 1
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+class RangeFileResponse(Response):
+    """Sends bytes [start, end] of a file; uses the ASGI zero-copy extension when offered."""
+
+    def __init__(self, path: Path, start: int, end: int, status_code: int, headers: Dict[str, str]):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.headers["content-length"] = str(max(0, end - start + 1))
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        length = self.end - self.start + 1
+        if scope.get("method") == "HEAD" or length <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        with open(self.path, "rb") as f:
+            if "http.response.zerocopy" in scope.get("extensions", {}):
+                await send({"type": "http.response.zerocopy", "file": f,
+                            "offset": self.start, "count": length, "more_body": False})
+                return
+            f.seek(self.start)
+            remaining = length
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank underneath us; terminate the body
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def serve_file(request: Optional[Request], path: Path, filename: str, digest: Optional[str] = None,
+               encoded: Optional[Dict[str, Path]] = None, media_type: Optional[str] = None) -> Response:
+    """
+    Conditional/range-aware download of `path`.
+
+    - ETag = content hash (+ encoding suffix for compressed representations)
+    - Accept-Encoding picks an existing pre-compressed sibling (zstd > gzip)
+    - If-None-Match -> 304; Range (single) -> 206, honouring If-Range; bad range -> 416
+    """
+    digest = digest or content_hash(path)
+    req_headers = request.headers if request is not None else {}
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    if media_type is None:
+        media_type = {".md": "text/markdown; charset=utf-8", ".json": "application/json",
+                      ".jsonl": "application/x-ndjson"}.get(path.suffix, "application/octet-stream")
+    headers["Content-Type"] = media_type
+
+    body_path, etag = path, f'"{digest}"'
+    accepted = _accepted_encodings(req_headers.get("accept-encoding", ""))
+    for enc, suffix in ENCODING_SUFFIXES.items():
+        sibling = (encoded or {}).get(enc)
+        if sibling is not None and accepted.get(enc, 0) > 0 and sibling.is_file():
+            body_path, etag = sibling, f'"{digest}{suffix.replace(".", "-")}"'
+            headers["Content-Encoding"] = enc
+            break
+    headers["ETag"] = etag
+
+    inm = req_headers.get("if-none-match")
+    if inm and (inm.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in inm.split(",")]):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Type"})
+
+    size = body_path.stat().st_size
+    range_header = req_headers.get("range")
+    if_range = req_headers.get("if-range")
+    # Multi-range or foreign units: ignored, full body (RFC 9110 allows this)
+    if range_header and _RANGE_RE.match(range_header.strip()) and (not if_range or if_range.strip() == etag):
+        rng = _parse_range(range_header, size)
+        if rng is None:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}", "ETag": etag})
+        start, end = rng
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return RangeFileResponse(body_path, start, end, 206, headers)
+
+    return RangeFileResponse(body_path, 0, size - 1, 200, headers)
@@ -1,11 +1,34 @@
+import base64
+import bisect
 import json
 import threading
+import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import os
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict, Tuple, TypeVar
 from .models import Job, Artifact
 
+# (created_at, id): sort key of the time-ordered indexes, also the cursor payload
+OrderKey = Tuple[str, str]
+T = TypeVar("T")
+
+
+def encode_cursor(key: OrderKey) -> str:
+    return base64.urlsafe_b64encode(f"{key[0]}|{key[1]}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> OrderKey:
+    """Raises ValueError on malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    created_at, sep, obj_id = raw.partition("|")
+    if not sep or not created_at or not obj_id:
+        raise ValueError("Invalid cursor")
+    return created_at, obj_id
+
 try:
     from ..core.merge import MERGES_DIR_NAME, get_merges_dir
 except ImportError:
@@ -25,6 +48,16 @@ class JobStore:
         self._jobs_cache: Dict[str, Job] = {}
         self._artifacts_cache: Dict[str, Artifact] = {}
 
+        # Time-ordered indexes (ascending by (created_at, id)) for paging without full sorts
+        self._job_order: List[OrderKey] = []
+        self._artifact_order: List[OrderKey] = []
+        # (level, mode, repo or "*") -> artifact order keys, for O(log n) "latest" lookups
+        self._latest_index: Dict[Tuple[str, str, str], List[OrderKey]] = {}
+
+        # Change counters for ETags; instance_id keeps them unique across restarts
+        self.instance_id = uuid.uuid4().hex[:12]
+        self.revisions = {"jobs": 0, "artifacts": 0}
+
         self._load()
 
     def _load(self):
@@ -35,6 +68,7 @@ class JobStore:
                     for j in data:
                         job = Job(**j)
                         self._jobs_cache[job.id] = job
+                        self._job_order.append((job.created_at, job.id))
                 except Exception as e:
                     print(f"Error loading jobs: {e}")
 
@@ -47,6 +81,33 @@ class JobStore:
                 except Exception as e:
                     print(f"Error loading artifacts: {e}")
 
+            self._job_order.sort()
+            for art in self._artifacts_cache.values():
+                self._index_artifact(art)
+
+    # --- Indexes (all expect lock) ---
+
+    @staticmethod
+    def _latest_keys(art: Artifact) -> List[Tuple[str, str, str]]:
+        level, mode = art.params.level, art.params.mode
+        return [(level, mode, r) for r in art.repos] if art.repos else [(level, mode, "*")]
+
+    def _index_artifact(self, art: Artifact):
+        key = (art.created_at, art.id)
+        bisect.insort(self._artifact_order, key)
+        for lk in self._latest_keys(art):
+            bisect.insort(self._latest_index.setdefault(lk, []), key)
+
+    def _unindex_artifact(self, art: Artifact):
+        key = (art.created_at, art.id)
+        _remove_sorted(self._artifact_order, key)
+        for lk in self._latest_keys(art):
+            bucket = self._latest_index.get(lk)
+            if bucket is not None:
+                _remove_sorted(bucket, key)
+                if not bucket:
+                    del self._latest_index[lk]
+
     def _save_jobs(self):
         # Must be called under lock
         tmp_file = self.jobs_file.with_suffix(".tmp")
@@ -61,14 +122,25 @@ class JobStore:
         tmp_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
         tmp_file.rename(self.artifacts_file)
 
+    def _put_job(self, job: Job):
+        # Must be called under lock
+        old = self._jobs_cache.get(job.id)
+        if old is None:
+            bisect.insort(self._job_order, (job.created_at, job.id))
+        elif old.created_at != job.created_at:
+            _remove_sorted(self._job_order, (old.created_at, old.id))
+            bisect.insort(self._job_order, (job.created_at, job.id))
+        self._jobs_cache[job.id] = job
+        self.revisions["jobs"] += 1
+
     def add_job(self, job: Job):
         with self._lock:
-            self._jobs_cache[job.id] = job
+            self._put_job(job)
             self._save_jobs()
 
     def update_job(self, job: Job):
         with self._lock:
-            self._jobs_cache[job.id] = job
+            self._put_job(job)
             self._save_jobs()
 
     def append_log_line(self, job_id: str, line: str):
@@ -76,6 +148,8 @@ class JobStore:
             p = self.logs_dir / f"{job_id}.log"
             with p.open("a", encoding="utf-8", errors="replace") as f:
                 f.write(line + "\n")
+            # Listed jobs carry an in-memory log tail (Job.logs)
+            self.revisions["jobs"] += 1
 
     def read_log_lines(self, job_id: str) -> List[str]:
         with self._lock:
@@ -137,10 +211,15 @@ class JobStore:
                     if merges_dir.exists():
                         for fname in art.paths.values():
                             _safe_unlink(merges_dir, fname)
+                        for siblings in art.encoded.values():
+                            for fname in siblings.values():
+                                _safe_unlink(merges_dir, fname)
                 except Exception:
                     pass
 
+                self._unindex_artifact(art)
                 del self._artifacts_cache[art_id]
+                self.revisions["artifacts"] += 1
 
         # Remove logs
         log_p = self.logs_dir / f"{job_id}.log"
@@ -152,7 +231,9 @@ class JobStore:
 
         # Remove job
         if job_id in self._jobs_cache:
+            _remove_sorted(self._job_order, (job.created_at, job.id))
             del self._jobs_cache[job_id]
+            self.revisions["jobs"] += 1
 
     def get_job(self, job_id: str) -> Optional[Job]:
         with self._lock:
@@ -227,7 +308,12 @@ class JobStore:
 
     def add_artifact(self, artifact: Artifact):
         with self._lock:
+            old = self._artifacts_cache.get(artifact.id)
+            if old is not None:
+                self._unindex_artifact(old)
             self._artifacts_cache[artifact.id] = artifact
+            self._index_artifact(artifact)
+            self.revisions["artifacts"] += 1
             self._save_artifacts()
 
     def get_artifact(self, artifact_id: str) -> Optional[Artifact]:
@@ -237,3 +323,67 @@ class JobStore:
     def get_all_artifacts(self) -> List[Artifact]:
         with self._lock:
             return sorted(self._artifacts_cache.values(), key=lambda x: x.created_at, reverse=True)
+
+    # --- Paged queries ---
+
+    def etag(self, kind: str) -> str:
+        """Revision tag of the jobs/artifacts collection (changes on every mutation)."""
+        with self._lock:
+            return f"{self.instance_id}-{self.revisions[kind]}"
+
+    def query_jobs(self, predicate: Optional[Callable[[Job], bool]] = None, cursor: Optional[str] = None,
+                   limit: int = 20, since: Optional[str] = None,
+                   until: Optional[str] = None) -> Tuple[List[Job], Optional[str]]:
+        """Newest-first page of jobs; returns (items, next_cursor)."""
+        with self._lock:
+            return _page(self._job_order, self._jobs_cache, predicate, cursor, limit, since, until)
+
+    def query_artifacts(self, predicate: Optional[Callable[[Artifact], bool]] = None, cursor: Optional[str] = None,
+                        limit: Optional[int] = None, since: Optional[str] = None,
+                        until: Optional[str] = None) -> Tuple[List[Artifact], Optional[str]]:
+        """Newest-first page of artifacts; returns (items, next_cursor)."""
+        with self._lock:
+            return _page(self._artifact_order, self._artifacts_cache, predicate, cursor, limit, since, until)
+
+    def latest_artifact(self, repo: str, level: str, mode: str) -> Optional[Artifact]:
+        """Newest artifact for (level, mode) covering `repo`; all-repo artifacts match any repo."""
+        with self._lock:
+            candidates = [b[-1] for b in (self._latest_index.get((level, mode, repo)),
+                                          self._latest_index.get((level, mode, "*"))) if b]
+            if not candidates:
+                return None
+            return self._artifacts_cache.get(max(candidates)[1])
+
+
+def _remove_sorted(order: List[OrderKey], key: OrderKey) -> None:
+    i = bisect.bisect_left(order, key)
+    if i < len(order) and order[i] == key:
+        del order[i]
+
+
+def _page(order: List[OrderKey], lookup: Dict[str, T], predicate: Optional[Callable[[T], bool]],
+          cursor: Optional[str], limit: Optional[int], since: Optional[str],
+          until: Optional[str]) -> Tuple[List[T], Optional[str]]:
+    """
+    Walks `order` newest-first, starting strictly below the cursor, inside
+    [since, until] (created_at ISO strings). Cost is O(log n + visited).
+    """
+    hi = len(order)
+    if cursor:
+        hi = bisect.bisect_left(order, decode_cursor(cursor))
+    if until:
+        hi = min(hi, bisect.bisect_right(order, (until, "\uffff")))
+    lo = bisect.bisect_left(order, (since, "")) if since else 0
+
+    items: List[T] = []
+    i = hi - 1
+    while i >= lo:
+        obj = lookup[order[i][1]]
+        if predicate is None or predicate(obj):
+            items.append(obj)
+            if limit is not None and len(items) >= limit:
+                break
+        i -= 1
+
+    next_cursor = encode_cursor(order[i]) if limit is not None and len(items) >= limit and i > lo else None
+    return items, next_cursor
@@ -113,6 +113,38 @@ class AtlasArtifact(BaseModel):
     paths: Dict[str, str] # {"json": "...", "md": "..."}
     stats: Dict[str, Any] # Summary stats
     effective: Optional[AtlasEffective] = None # Effective parameters (max_depth, etc)
+    status: Optional[str] = None # Scan job status (see AtlasScanStatus); None for listings from disk
+    deduplicated: bool = False # True if an identical in-flight scan was returned
+
+class AtlasDiffRequest(BaseModel):
+    old_id: str # "atlas-<unix_ts>"
+    new_id: str
+    top: int = Field(20, ge=0, le=500) # Rows in the hotspot tables
+
+class AtlasDiffResponse(BaseModel):
+    old_id: str
+    new_id: str
+    stats: Dict[str, Any] # See adapters/atlas_diff.diff_inventories
+    markdown: str
+
+class AtlasProgress(BaseModel):
+    files: int = 0
+    dirs: int = 0
+    bytes: int = 0
+    current_dir: Optional[str] = None
+
+class AtlasScanStatus(BaseModel):
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed", "canceling", "canceled"]
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    root_scanned: str
+    paths: Dict[str, str]
+    effective: AtlasEffective
+    progress: AtlasProgress = Field(default_factory=AtlasProgress)
+    stats: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[str] = None
 
 class Artifact(BaseModel):
     id: str
@@ -123,6 +155,8 @@ class Artifact(BaseModel):
     paths: Dict[str, str]  # e.g. {"md": "...", "json": "...", "part2": "..."}
     params: JobRequest # Effective parameters used for generation (normalized)
     merges_dir: Optional[str] = None # Effective absolute path to output directory
+    hashes: Dict[str, str] = Field(default_factory=dict)  # key -> sha256 of the file (download ETag)
+    encoded: Dict[str, Dict[str, str]] = Field(default_factory=dict)  # key -> {"gzip": "x.md.gz", "zstd": ...}
 
 class Job(BaseModel):
     id: str
@@ -135,6 +169,10 @@ class Job(BaseModel):
     request: JobRequest
     hub_resolved: Optional[str] = None
     content_hash: Optional[str] = None
+    # Stat fingerprint of the job's input repos at submission time (see service/cache.py)
+    input_fingerprint: Optional[str] = None
+    # content_hash + input_fingerprint; identical keys produce identical artifacts
+    cache_key: Optional[str] = None
     logs: List[str] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list)
     artifact_ids: List[str] = Field(default_factory=list)
@@ -181,6 +219,32 @@ class PrescanResponse(BaseModel):
     file_count: int
     total_bytes: int
 
+class PrescanLevelRequest(BaseModel):
+    repo: str # Repo name to scan
+    path: str = "." # Directory to expand, relative to the repo root
+    max_depth: int = 10
+    ignore_globs: Optional[List[str]] = None
+
+class PrescanLevelEntry(BaseModel):
+    path: str
+    type: Literal["file", "dir"]
+    size: Optional[int] = None # files
+    file_count: Optional[int] = None # dirs: recursive
+    dir_count: Optional[int] = None
+    total_bytes: Optional[int] = None
+    has_children: Optional[bool] = None
+
+class PrescanLevelResponse(BaseModel):
+    root: str
+    path: str
+    entries: List[PrescanLevelEntry]
+    file_count: int # recursive, below `path`
+    dir_count: int
+    total_bytes: int
+    signature: str # whole repo
+    repo_file_count: int
+    repo_total_bytes: int
+
 class FSRoot(BaseModel):
     id: str
     path: str
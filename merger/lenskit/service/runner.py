@@ -1,12 +1,24 @@
 import concurrent.futures
+import multiprocessing
+import os
+import signal
 import sys
+import time
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from .models import Artifact
+try:
+    import resource  # POSIX only; limits are skipped where unavailable
+except ImportError:  # pragma: no cover
+    resource = None
+
+from .models import Artifact, JobRequest
 from .jobstore import JobStore
+from .cache import ArtifactCache, calculate_cache_key, hub_fingerprint
+from .delivery import finalize_outputs
 from ..adapters.security import validate_source_dir, get_security_config, SecurityViolationError
 
 # Import core logic.
@@ -25,6 +37,16 @@ from ..core.merge import (
     parse_human_size,
 )
 
+# Execution isolation:
+#   "thread"  - jobs run on the runner's thread pool inside the service process (default)
+#   "process" - each job runs in its own worker subprocess with resource limits
+ISOLATION_MODES = ("thread", "process")
+
+# Supervisor poll interval for worker pipes / cancel checks (seconds)
+WORKER_POLL_SEC = 0.2
+# Grace period between a cooperative cancel request and terminating the worker
+WORKER_CANCEL_GRACE_SEC = 5.0
+
 def _find_repos(hub: Path) -> List[str]:
     from ..adapters.security import validate_source_dir
     hub = validate_source_dir(hub)
@@ -43,6 +65,18 @@ def _find_repos(hub: Path) -> List[str]:
         repos.append(child.name)
     return repos
 
+def input_fingerprint(req: JobRequest, hub: Path, state_dir: Optional[Path] = None) -> str:
+    """
+    Hub input state of a job (see cache.hub_fingerprint). Output dirs are
+    excluded so a job's own artifacts never change its key.
+    """
+    repo_names = req.repos or _find_repos(hub)
+    exclude = [get_merges_dir(hub)]
+    if req.merges_dir:
+        md = Path(req.merges_dir)
+        exclude.append(md if md.is_absolute() else hub / md)
+    return hub_fingerprint(hub, repo_names, exclude=exclude, state_dir=state_dir)
+
 def _diagnostic_norm_repo_key(s: str) -> str:
     """
     Robust normalization for diagnostic logging only.
@@ -78,9 +112,324 @@ def _parse_extras_csv(extras_csv: str) -> ExtrasConfig:
             setattr(config, item, True)
     return config
 
+
+@dataclass
+class WorkerLimits:
+    """
+    Resource limits applied inside process-isolated job workers.
+    0 means "no limit". Ignored on platforms without the `resource` module.
+    """
+    max_memory_bytes: int = 0  # RLIMIT_AS (virtual address space)
+    max_cpu_seconds: int = 0   # RLIMIT_CPU (worker is killed with SIGXCPU)
+
+    @classmethod
+    def from_env(cls) -> "WorkerLimits":
+        try:
+            cpu = int(os.getenv("RLENS_WORKER_MAX_CPU_SEC", "0") or 0)
+        except ValueError:
+            cpu = 0
+        return cls(
+            max_memory_bytes=parse_human_size(os.getenv("RLENS_WORKER_MAX_MEMORY", "0")),
+            max_cpu_seconds=cpu,
+        )
+
+    def apply(self) -> None:
+        if resource is None:
+            return
+        if self.max_memory_bytes > 0:
+            resource.setrlimit(resource.RLIMIT_AS, (self.max_memory_bytes, self.max_memory_bytes))
+        if self.max_cpu_seconds > 0:
+            # Soft limit sends SIGXCPU, hard limit (+5s) guarantees SIGKILL
+            resource.setrlimit(resource.RLIMIT_CPU, (self.max_cpu_seconds, self.max_cpu_seconds + 5))
+
+class JobCanceled(Exception):
+    """Raised from execute_job when a cancel request was observed."""
+    pass
+
+def scan_request(
+    req: JobRequest,
+    hub: Path,
+    log: Callable[[str], None],
+    warn: Callable[[str], None],
+    is_canceled: Callable[[], bool],
+    index: Optional[Any] = None,
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Resolves and scans the repos of a job request (steps 1-2 of execute_job).
+
+    Returns (repo_names, scan summaries). Raises JobCanceled between repos.
+    """
+    log(f"Using hub: {hub}")
+
+    # 1. Determine Repos
+    if req.repos:
+        repo_names = req.repos
+        log(f"Selected specific repos: {repo_names}")
+    else:
+        repo_names = _find_repos(hub)
+        log(f"Auto-detected all repos: {repo_names}")
+
+    if not repo_names:
+        raise ValueError("No repositories found or selected.")
+
+    sources = []
+    for name in repo_names:
+        p = hub / name
+        if p.exists() and p.is_dir():
+            validate_source_dir(p)
+            sources.append(p)
+        else:
+            log(f"Warning: Repo {name} not found at {p}")
+
+    if not sources:
+        raise ValueError("No valid repository sources found.")
+
+    # 2. Scan Repos
+    max_bytes = parse_human_size(req.max_bytes or "0")
+    ext_list = _normalize_ext_list(",".join(req.extensions)) if req.extensions else None
+    path_filter = req.path_filter
+    include_paths = req.include_paths
+
+    summaries = []
+    total_sources = len(sources)
+    for i, src in enumerate(sources, 1):
+        # Detect external cancel between repos
+        if is_canceled():
+            raise JobCanceled("Job canceled by user during scan.")
+
+        # Defense in depth: validate each src before scanning
+        validate_source_dir(src)
+
+        # Determine include_paths for this specific repo
+        # Priority: include_paths_by_repo (if key exists) > include_paths (global)
+        current_include_paths = include_paths
+        if req.include_paths_by_repo is not None:
+            if src.name in req.include_paths_by_repo:
+                current_include_paths = req.include_paths_by_repo[src.name]
+            else:
+                # Key missing
+                # Check strict mode flag
+                if req.strict_include_paths_by_repo:
+                    # Strict Mode: Hard Fail
+
+                    # Diagnostic: check if normalization would have helped (before failing)
+                    norm_key = _diagnostic_norm_repo_key(src.name)
+                    available_norm = [_diagnostic_norm_repo_key(k) for k in req.include_paths_by_repo.keys()]
+                    if norm_key in available_norm:
+                        log(f"INFO key would match after normalization (diagnostic only)")
+
+                    err_msg = f"Strict Mode Violation: include_paths_by_repo is active but missing key for repo '{src.name}'. Available: {list(req.include_paths_by_repo.keys())}"
+                    log(f"ERROR {err_msg}")
+                    raise ValueError(err_msg)
+                else:
+                    # Soft Mode: Warn and Fallback to global include_paths (Backward Compatibility)
+                    # Only warn if fallback results in FULL SCAN (None) or if explicit request mismatches
+                    is_explicit_repo = req.repos and src.name in req.repos
+
+                    if is_explicit_repo or current_include_paths is None:
+                        fallback_status = "FULL SCAN" if current_include_paths is None else f"global paths ({len(current_include_paths)} items)"
+                        msg = f"WARN include_paths_by_repo has no entry for requested repo '{src.name}'. Fallback: {fallback_status}. (Enable strict_include_paths_by_repo for hard fail)"
+                        log(msg)
+                        warn(msg)
+
+            # Check for empty list in current_include_paths (which means 'scan nothing' or accident)
+            if current_include_paths is not None and len(current_include_paths) == 0:
+                msg = f"WARN Repo '{src.name}' has empty include paths ([]). This will scan NOTHING (except critical files). If you meant ALL, use null."
+                log(msg)
+                warn(msg)
+
+        log(f"Scanning {i}/{total_sources}: {src.name} ...")
+        # Note: scan_repo can be slow.
+        # Optimization: Skip MD5 for plan_only jobs to reduce scan cost.
+        # plan_only is currently the proxy for "no hashes needed" (content/manifest skipped).
+        should_hash = not req.plan_only
+        summary = scan_repo(src, ext_list, path_filter, max_bytes, include_paths=current_include_paths, calculate_md5=should_hash, index=index)
+        summaries.append(summary)
+
+
+    return list(repo_names), summaries
+
+
+def resolve_output_dir(req: JobRequest, hub: Path, log: Callable[[str], None]) -> Path:
+    """Effective merges dir of a request (validated); updates req.merges_dir to the canonical path."""
+    if req.merges_dir:
+        p = Path(req.merges_dir)
+        if not p.is_absolute():
+            # Resolve relative paths against HUB to ensure visibility in container environments
+            merges_dir = (hub / p).resolve()
+            log(f"Resolved relative merges_dir '{p}' to '{merges_dir}'")
+        else:
+            merges_dir = p.resolve()
+
+        merges_dir.mkdir(parents=True, exist_ok=True)
+        # Ensure security/validation for custom merges_dir if needed
+        try:
+            # Use the validated, canonical path
+            merges_dir = get_security_config().validate_path(merges_dir)
+            # Update request object so Artifact reflects reality (absolute canonical path)
+            req.merges_dir = str(merges_dir.resolve())
+        except SecurityViolationError as e:
+            log(f"Security Warning: merges_dir '{merges_dir}' validation failed: {e}")
+            raise ValueError(f"SECURITY: merges_dir not allowed: {e}")
+    else:
+        merges_dir = get_merges_dir(hub)
+
+    return merges_dir
+
+
+def execute_job(
+    req: JobRequest,
+    hub: Path,
+    log: Callable[[str], None],
+    warn: Callable[[str], None],
+    is_canceled: Callable[[], bool],
+    index: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Scans the requested repos and writes the reports.
+
+    Pure with respect to the JobStore: progress goes through `log`/`warn`,
+    cancellation is polled via `is_canceled`. This lets the same code run
+    in the service thread pool and inside an isolated worker process.
+
+    Returns a picklable result dict:
+      {"repo_names": [...], "paths": {key: filename}, "hashes": {key: sha256},
+       "encoded": {key: {encoding: filename}}, "merges_dir": str, "request_merges_dir": str|None}
+    """
+    repo_names, summaries = scan_request(req, hub, log, warn, is_canceled, index=index)
+    max_bytes = parse_human_size(req.max_bytes or "0")
+    ext_list = _normalize_ext_list(",".join(req.extensions)) if req.extensions else None
+    path_filter = req.path_filter
+
+    # 3. Write Reports
+    log("Generating reports...")
+    merges_dir = resolve_output_dir(req, hub, log)
+
+    # Log the effective output directory
+    log(f"Writing reports to: {merges_dir.resolve()}")
+
+    # Re-check cancel status before write (expensive operation)
+    if is_canceled():
+        raise JobCanceled("Job canceled by user before write.")
+
+    split_size = parse_human_size(req.split_size or "25MB")
+    extras = _parse_extras_csv(req.extras)
+    if req.json_sidecar:
+        extras.json_sidecar = True
+
+    artifacts_obj = write_reports_v2(
+        merges_dir,
+        hub,
+        summaries,
+        req.level,
+        req.mode,
+        max_bytes,
+        req.plan_only,
+        req.code_only,
+        split_size,
+        debug=False,
+        path_filter=path_filter,
+        ext_filter=ext_list,
+        extras=extras,
+        meta_density=req.meta_density,
+    )
+
+    # 4. Collect outputs
+    out_paths = artifacts_obj.get_all_paths()
+    display_limit = 10
+    truncated_paths = [str(p) for p in out_paths[:display_limit]]
+    more_count = len(out_paths) - display_limit
+    msg = f"Generated {len(out_paths)} files: {truncated_paths}"
+    if more_count > 0:
+        msg += f" (+{more_count} more)"
+    log(msg)
+
+    # Map outputs to Artifact record
+    path_map = {}
+    if artifacts_obj.index_json:
+        path_map["json"] = artifacts_obj.index_json.name
+
+    if artifacts_obj.canonical_md:
+        path_map["md"] = artifacts_obj.canonical_md.name
+
+    for i, p in enumerate(artifacts_obj.md_parts):
+        path_map[f"md_part_{i+1}"] = p.name
+
+    # Content hashes (download ETags) and optional .gz/.zst siblings, while files are hot
+    hashes, encoded = finalize_outputs(merges_dir, path_map)
+    if encoded:
+        log(f"Pre-compressed {sum(len(v) for v in encoded.values())} file(s): {sorted({e for v in encoded.values() for e in v})}")
+
+    return {
+        "repo_names": list(repo_names),
+        "paths": path_map,
+        "hashes": hashes,
+        "encoded": encoded,
+        "merges_dir": str(merges_dir.resolve()),
+        "request_merges_dir": req.merges_dir,
+    }
+
+def _worker_main(conn, request_data: Dict[str, Any], hub: str, allowlist_roots: List[str],
+                 limits: WorkerLimits, cancel_event) -> None:
+    """
+    Entry point of an isolated job worker process.
+
+    Protocol (child -> parent, one tuple per message):
+      ("log", str) | ("warning", str) | ("result", dict) | ("canceled", str) | ("error", str)
+    """
+    try:
+        limits.apply()
+
+        # The security singleton is per process: mirror the service allowlist.
+        sec = get_security_config()
+        for root in allowlist_roots:
+            sec.add_allowlist_root(Path(root))
+
+        req = JobRequest(**request_data)
+        result = execute_job(
+            req,
+            Path(hub),
+            log=lambda msg: conn.send(("log", msg)),
+            warn=lambda msg: conn.send(("warning", msg)),
+            is_canceled=cancel_event.is_set,
+        )
+        conn.send(("result", result))
+    except JobCanceled as e:
+        conn.send(("canceled", str(e)))
+    except BaseException as e:
+        try:
+            conn.send(("error", str(e) or type(e).__name__))
+        except Exception:
+            pass
+    finally:
+        conn.close()
+
+def _describe_exitcode(code: Optional[int]) -> str:
+    if code is None:
+        return "unknown exit status"
+    if code < 0:
+        try:
+            return f"killed by signal {signal.Signals(-code).name}"
+        except ValueError:
+            return f"killed by signal {-code}"
+    return f"exit code {code}"
+
 class JobRunner:
-    def __init__(self, job_store: JobStore, max_workers: int = 1):
+    def __init__(self, job_store: JobStore, max_workers: int = 1, isolation: str = "thread",
+                 limits: Optional[WorkerLimits] = None, start_method: Optional[str] = None,
+                 cache: Optional[ArtifactCache] = None, index: Optional[Any] = None):
+        if isolation not in ISOLATION_MODES:
+            raise ValueError(f"Invalid isolation mode '{isolation}'. Use one of {ISOLATION_MODES}.")
         self.job_store = job_store
+        self.cache = cache
+        # Live directory index (watch mode); only usable in-process, workers walk the disk
+        self.index = index
+        self.isolation = isolation
+        self.limits = limits or WorkerLimits()
+        # "spawn" avoids forking a multi-threaded server process (held locks, event loop state)
+        self.start_method = start_method or os.getenv("RLENS_WORKER_START_METHOD", "spawn")
+        # Process target; overridable for tests
+        self.worker_target = _worker_main
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
         self.futures = {}
 
@@ -92,6 +441,10 @@ class JobRunner:
         future = self.executor.submit(self._run_job, job_id)
         self.futures[job_id] = future
 
+    def _is_cancel_requested(self, job_id: str) -> bool:
+        current_job = self.job_store.get_job(job_id)
+        return bool(current_job and current_job.status in ("canceled", "canceling"))
+
     def _run_job(self, job_id: str):
         job = self.job_store.get_job(job_id)
         if not job:
@@ -111,212 +464,53 @@ class JobRunner:
         def log(msg: str):
             ts = datetime.now(timezone.utc).strftime("%H:%M:%SZ")
             line = f"[{ts}] {msg}"
-            self.job_store.append_log_line(job.id, line)
             # Keep a small in-memory tail for API convenience (optional)
             job.logs.append(line)
             if len(job.logs) > 200:
                 job.logs = job.logs[-200:]
-            # Save job state less aggressively: only on status changes or every N lines
-            # For simplicity, we update job here to keep 'logs' tail sync, but strictly we could skip it.
-            # self.job_store.update_job(job)
-            # To avoid excessive writes, we DON'T call update_job for every log line anymore.
-            pass
+            # Appending bumps the jobs revision (listing ETag) after the tail changed.
+            # To avoid excessive writes, we DON'T call update_job for every log line.
+            self.job_store.append_log_line(job.id, line)
+
+        def warn(msg: str):
+            job.warnings.append(msg)
+            self.job_store.update_job(job)
 
         try:
             req = job.request
 
-            # 1. Use resolved Hub from job
+            # Use resolved Hub from job
             if not job.hub_resolved:
                 raise ValueError("Internal: hub_resolved missing on job")
             hub = Path(job.hub_resolved)
-            log(f"Using hub: {hub}")
 
-            # 2. Determine Repos
-            if req.repos:
-                repo_names = req.repos
-                log(f"Selected specific repos: {repo_names}")
-            else:
-                repo_names = _find_repos(hub)
-                log(f"Auto-detected all repos: {repo_names}")
-
-            if not repo_names:
-                raise ValueError("No repositories found or selected.")
-
-            sources = []
-            for name in repo_names:
-                p = hub / name
-                if p.exists() and p.is_dir():
-                    validate_source_dir(p)
-                    sources.append(p)
-                else:
-                    log(f"Warning: Repo {name} not found at {p}")
-
-            if not sources:
-                raise ValueError("No valid repository sources found.")
-
-            # 3. Scan Repos
-            max_bytes = parse_human_size(req.max_bytes or "0")
-            ext_list = _normalize_ext_list(",".join(req.extensions)) if req.extensions else None
-            path_filter = req.path_filter
-            include_paths = req.include_paths
-
-            summaries = []
-            total_sources = len(sources)
-            warnings_dirty = False
-            for i, src in enumerate(sources, 1):
-                # Refresh job status from store to detect external cancel
-                current_job = self.job_store.get_job(job_id)
-                if current_job and current_job.status in ("canceled", "canceling"):
-                    log("Job canceled by user during scan.")
-                    current_job.status = "canceled"
-                    current_job.finished_at = datetime.now(timezone.utc).isoformat()
-                    self.job_store.update_job(current_job)
-                    return
-
-                # Defense in depth: validate each src before scanning
-                validate_source_dir(src)
-
-                # Determine include_paths for this specific repo
-                # Priority: include_paths_by_repo (if key exists) > include_paths (global)
-                current_include_paths = include_paths
-                if req.include_paths_by_repo is not None:
-                    if src.name in req.include_paths_by_repo:
-                        current_include_paths = req.include_paths_by_repo[src.name]
-                    else:
-                        # Key missing
-                        # Check strict mode flag
-                        if req.strict_include_paths_by_repo:
-                            # Strict Mode: Hard Fail
-
-                            # Diagnostic: check if normalization would have helped (before failing)
-                            norm_key = _diagnostic_norm_repo_key(src.name)
-                            available_norm = [_diagnostic_norm_repo_key(k) for k in req.include_paths_by_repo.keys()]
-                            if norm_key in available_norm:
-                                log(f"INFO key would match after normalization (diagnostic only)")
-
-                            err_msg = f"Strict Mode Violation: include_paths_by_repo is active but missing key for repo '{src.name}'. Available: {list(req.include_paths_by_repo.keys())}"
-                            log(f"ERROR {err_msg}")
-                            raise ValueError(err_msg)
-                        else:
-                            # Soft Mode: Warn and Fallback to global include_paths (Backward Compatibility)
-                            # Only warn if fallback results in FULL SCAN (None) or if explicit request mismatches
-                            is_explicit_repo = req.repos and src.name in req.repos
-
-                            if is_explicit_repo or current_include_paths is None:
-                                fallback_status = "FULL SCAN" if current_include_paths is None else f"global paths ({len(current_include_paths)} items)"
-                                msg = f"WARN include_paths_by_repo has no entry for requested repo '{src.name}'. Fallback: {fallback_status}. (Enable strict_include_paths_by_repo for hard fail)"
-                                log(msg)
-                                job.warnings.append(msg)
-                                warnings_dirty = True
-
-                    # Check for empty list in current_include_paths (which means 'scan nothing' or accident)
-                    if current_include_paths is not None and len(current_include_paths) == 0:
-                        msg = f"WARN Repo '{src.name}' has empty include paths ([]). This will scan NOTHING (except critical files). If you meant ALL, use null."
-                        log(msg)
-                        job.warnings.append(msg)
-                        warnings_dirty = True
-
-                log(f"Scanning {i}/{total_sources}: {src.name} ...")
-                # Note: scan_repo can be slow.
-                # Optimization: Skip MD5 for plan_only jobs to reduce scan cost.
-                # plan_only is currently the proxy for "no hashes needed" (content/manifest skipped).
-                should_hash = not req.plan_only
-                summary = scan_repo(src, ext_list, path_filter, max_bytes, include_paths=current_include_paths, calculate_md5=should_hash)
-                summaries.append(summary)
-
-            if warnings_dirty:
-                self.job_store.update_job(job)
-
-            # 4. Write Reports
-            log("Generating reports...")
-            if req.merges_dir:
-                p = Path(req.merges_dir)
-                if not p.is_absolute():
-                    # Resolve relative paths against HUB to ensure visibility in container environments
-                    merges_dir = (hub / p).resolve()
-                    log(f"Resolved relative merges_dir '{p}' to '{merges_dir}'")
-                else:
-                    merges_dir = p.resolve()
-
-                merges_dir.mkdir(parents=True, exist_ok=True)
-                # Ensure security/validation for custom merges_dir if needed
-                try:
-                    # Use the validated, canonical path
-                    merges_dir = get_security_config().validate_path(merges_dir)
-                    # Update request object so Artifact reflects reality (absolute canonical path)
-                    req.merges_dir = str(merges_dir.resolve())
-                except SecurityViolationError as e:
-                    log(f"Security Warning: merges_dir '{merges_dir}' validation failed: {e}")
-                    raise ValueError(f"SECURITY: merges_dir not allowed: {e}")
-            else:
-                merges_dir = get_merges_dir(hub)
-
-            # Log the effective output directory
-            log(f"Writing reports to: {merges_dir.resolve()}")
-
-            # Re-check cancel status before write (expensive operation)
-            job = self.job_store.get_job(job_id)
-            if job.status in ("canceled", "canceling"):
-                log("Job canceled by user before write.")
-                job.status = "canceled"
-                job.finished_at = datetime.now(timezone.utc).isoformat()
-                self.job_store.update_job(job)
-                return
-
-            split_size = parse_human_size(req.split_size or "25MB")
-            extras = _parse_extras_csv(req.extras)
-            if req.json_sidecar:
-                extras.json_sidecar = True
-
-            artifacts_obj = write_reports_v2(
-                merges_dir,
-                hub,
-                summaries,
-                req.level,
-                req.mode,
-                max_bytes,
-                req.plan_only,
-                req.code_only,
-                split_size,
-                debug=False,
-                path_filter=path_filter,
-                ext_filter=ext_list,
-                extras=extras,
-                meta_density=req.meta_density,
-            )
-
-            # 5. Register Artifacts
-            out_paths = artifacts_obj.get_all_paths()
-            display_limit = 10
-            truncated_paths = [str(p) for p in out_paths[:display_limit]]
-            more_count = len(out_paths) - display_limit
-            msg = f"Generated {len(out_paths)} files: {truncated_paths}"
-            if more_count > 0:
-                msg += f" (+{more_count} more)"
-            log(msg)
-
-            # Map outputs to Artifact record
-            path_map = {}
-            if artifacts_obj.index_json:
-                path_map["json"] = artifacts_obj.index_json.name
-
-            if artifacts_obj.canonical_md:
-                path_map["md"] = artifacts_obj.canonical_md.name
+            # The key computed at submit time may be stale by now (queued job):
+            # key the artifact by the input state right before the scan.
+            if job.cache_key and job.content_hash:
+                job.input_fingerprint = input_fingerprint(
+                    req, hub, state_dir=self.job_store.storage_dir / "fingerprints")
+                job.cache_key = calculate_cache_key(job.content_hash, job.input_fingerprint)
 
-            for i, p in enumerate(artifacts_obj.md_parts):
-                path_map[f"md_part_{i+1}"] = p.name
+            if self.isolation == "process":
+                result = self._execute_in_worker(job, hub, log, warn)
+            else:
+                result = execute_job(req, hub, log, warn, lambda: self._is_cancel_requested(job_id), index=self.index)
 
+            # Register Artifact
+            req.merges_dir = result["request_merges_dir"]
             artifact_id = str(uuid.uuid4())
 
             art = Artifact(
                 id=artifact_id,
                 job_id=job_id,
                 hub=str(hub),
-                repos=repo_names,
+                repos=result["repo_names"],
                 created_at=datetime.now(timezone.utc).isoformat(),
-                paths=path_map,
+                paths=result["paths"],
                 params=req,
-                merges_dir=str(merges_dir.resolve())
+                merges_dir=result["merges_dir"],
+                hashes=result.get("hashes", {}),
+                encoded=result.get("encoded", {}),
             )
 
             self.job_store.add_artifact(art)
@@ -327,6 +521,16 @@ class JobRunner:
             log("Job completed successfully.")
             self.job_store.update_job(job)
 
+            if self.cache and job.cache_key:
+                self.cache.put(job.cache_key, job)
+
+        except JobCanceled as e:
+            log(str(e))
+            current_job = self.job_store.get_job(job_id) or job
+            current_job.status = "canceled"
+            current_job.finished_at = datetime.now(timezone.utc).isoformat()
+            self.job_store.update_job(current_job)
+
         except Exception as e:
             job.status = "failed"
             job.error = str(e)
@@ -335,3 +539,67 @@ class JobRunner:
             import traceback
             traceback.print_exc() # Print to server console too
             self.job_store.update_job(job)
+
+    def _execute_in_worker(self, job, hub: Path, log: Callable[[str], None],
+                           warn: Callable[[str], None]) -> Dict[str, Any]:
+        """
+        Runs execute_job in a dedicated subprocess and relays its messages.
+        A dying worker (OOM, RLIMIT_CPU, segfault) only fails this job.
+        """
+        ctx = multiprocessing.get_context(self.start_method)
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        cancel_event = ctx.Event()
+        allowlist = [str(r) for r in get_security_config().allowlist_roots]
+
+        proc = ctx.Process(
+            target=self.worker_target,
+            args=(child_conn, job.request.model_dump(), str(hub), allowlist, self.limits, cancel_event),
+            name=f"rlens-job-{job.id[:8]}",
+            daemon=True,
+        )
+        proc.start()
+        # Parent keeps only the read end; EOF then signals worker exit.
+        child_conn.close()
+        log(f"Started worker process pid={proc.pid}")
+
+        outcome = None
+        cancel_deadline = None
+        try:
+            while outcome is None:
+                if parent_conn.poll(WORKER_POLL_SEC):
+                    try:
+                        kind, payload = parent_conn.recv()
+                    except (EOFError, OSError):
+                        break
+                    if kind == "log":
+                        log(payload)
+                    elif kind == "warning":
+                        warn(payload)
+                    else:
+                        outcome = (kind, payload)
+                elif not proc.is_alive():
+                    break
+
+                if outcome is None and self._is_cancel_requested(job.id):
+                    if cancel_deadline is None:
+                        cancel_event.set()
+                        cancel_deadline = time.monotonic() + WORKER_CANCEL_GRACE_SEC
+                    elif time.monotonic() > cancel_deadline and proc.is_alive():
+                        proc.terminate()
+                        outcome = ("canceled", "Job canceled by user (worker terminated).")
+        finally:
+            parent_conn.close()
+            proc.join(timeout=WORKER_CANCEL_GRACE_SEC)
+            if proc.is_alive():
+                proc.kill()
+                proc.join()
+
+        if outcome is None:
+            raise RuntimeError(f"Worker process died ({_describe_exitcode(proc.exitcode)})")
+
+        kind, payload = outcome
+        if kind == "result":
+            return payload
+        if kind == "canceled":
+            raise JobCanceled(payload)
+        raise RuntimeError(payload)
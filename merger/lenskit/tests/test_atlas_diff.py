@@ -0,0 +1,109 @@
+import json
+import os
+import random
+
+from merger.lenskit.adapters.atlas import AtlasScanner
+from merger.lenskit.adapters.atlas_diff import diff_inventories, main, render_diff_md
+
+
+def _tree(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (root / "src" / "main.py").write_text("print(1)\n")
+    (root / "src-old").mkdir()
+    (root / "src-old" / "gone.py").write_text("old\n")
+    (root / "README.md").write_text("# Demo\n")
+
+
+def _change(root):
+    (root / "src-old" / "gone.py").unlink()
+    (root / "src" / "pkg" / "mod.py").write_text("x = 1\n" * 100)
+    (root / "src" / "pkg" / "sub").mkdir()
+    (root / "src" / "pkg" / "sub" / "big.bin").write_bytes(b"\0" * 5000)
+    (root / "a.txt").write_text("new\n")
+
+
+def test_diff_counts_and_directory_rollups(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    old = tmp_path / "old.jsonl"
+    AtlasScanner(root).scan(inventory_file=old)
+    _change(root)
+    new = tmp_path / "new.bin"
+    AtlasScanner(root, workers=3).scan(inventory_bin_file=new)
+
+    dirs_file = tmp_path / "dirs.jsonl"
+    changes_file = tmp_path / "changes.jsonl"
+    diff = diff_inventories(old, new, changes_file=changes_file, dirs_file=dirs_file)
+
+    assert (diff["added"], diff["removed"], diff["changed"], diff["unchanged"]) == (2, 1, 1, 2)
+    assert diff["externally_sorted"] == []
+    assert diff["bytes_delta"] == diff["bytes_new"] - diff["bytes_old"] == 5000 + 4 + 594 - 4
+
+    changes = {c["path"]: c for c in map(json.loads, changes_file.read_text().splitlines())}
+    assert changes["src-old/gone.py"]["op"] == "removed"
+    assert changes["src/pkg/mod.py"]["delta"] == 594
+
+    dirs = {d["path"]: d for d in map(json.loads, dirs_file.read_text().splitlines())}
+    assert dirs["src/pkg"]["delta"] == 5594
+    assert dirs["src"]["delta"] == 5594
+    assert dirs["src-old"]["delta"] == -4
+    assert dirs["."]["delta"] == diff["bytes_delta"]
+
+    assert [h["path"] for h in diff["hotspots"][:3]] == ["src", "src/pkg", "src/pkg/sub"]
+    assert diff["top_files"][0]["path"] == "src/pkg/sub/big.bin"
+    md = render_diff_md(diff)
+    assert "## 📈 Growth Hotspots (Folders)" in md and "`src/pkg/sub`" in md
+
+
+def test_unsorted_inventory_is_sorted_externally(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    inv = tmp_path / "inv.jsonl"
+    AtlasScanner(root).scan(inventory_file=inv)
+    lines = inv.read_text(encoding="utf-8").splitlines()
+    random.Random(1).shuffle(lines)
+    shuffled = tmp_path / "shuffled.jsonl"
+    shuffled.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    diff = diff_inventories(shuffled, inv, sort_chunk_records=2)
+    assert diff["externally_sorted"] == [str(shuffled)]
+    assert diff["unchanged"] == len(lines)
+    assert diff["added"] == diff["removed"] == diff["changed"] == 0
+
+
+def test_cli_writes_markdown(tmp_path, capsys):
+    root = tmp_path / "root"
+    _tree(root)
+    old = tmp_path / "old.jsonl"
+    AtlasScanner(root).scan(inventory_file=old)
+    _change(root)
+    new = tmp_path / "new.jsonl"
+    AtlasScanner(root).scan(inventory_file=new)
+
+    assert main([str(old), str(new), "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["added"] == 2
+    md = tmp_path / "diff.md"
+    assert main([str(old), str(new), "--md", str(md)]) == 0
+    assert md.read_text(encoding="utf-8").startswith("# 🗺️ Atlas Diff")
+
+
+def test_diff_endpoint(service_client):
+    ctx = service_client
+    root = ctx.hub_path / "repo-test"
+    AtlasScanner(root).scan(inventory_file=ctx.merges_dir / "atlas-100.inventory.jsonl")
+    (root / "added.txt").write_text("hello\n")
+    AtlasScanner(root).scan(inventory_file=ctx.merges_dir / "atlas-200.inventory.jsonl")
+
+    resp = ctx.client.post("/api/atlas/diff", json={"old_id": "atlas-100", "new_id": "atlas-200"}, headers=ctx.headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["stats"]["added"] == 1
+    assert body["stats"]["old"] == "atlas-100.inventory.jsonl"
+    assert "added.txt" in body["markdown"]
+    assert not os.path.isabs(body["stats"]["new"])
+
+    bad = ctx.client.post("/api/atlas/diff", json={"old_id": "../x", "new_id": "atlas-200"}, headers=ctx.headers)
+    assert bad.status_code == 400
+    missing = ctx.client.post("/api/atlas/diff", json={"old_id": "atlas-1", "new_id": "atlas-200"}, headers=ctx.headers)
+    assert missing.status_code == 404
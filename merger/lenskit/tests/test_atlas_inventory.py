@@ -133,3 +133,25 @@ def test_atlas_dirs_inventory_excludes_files(tmp_path):
 
     mixed_dir = next(i for i in items if i["rel_path"] == "mixed")
     assert mixed_dir["n_files"] == 1
+
+def test_atlas_dirs_inventory_recursive_totals(tmp_path):
+    root = tmp_path / "root"
+    (root / "a" / "sub").mkdir(parents=True)
+    (root / "a" / "x.txt").write_text("12345")
+    (root / "a" / "sub" / "y.txt").write_text("123")
+    (root / "a-b").mkdir()
+    (root / "a-b" / "z.txt").write_text("1")
+    (root / "top.txt").write_text("12")
+
+    dirs_file = tmp_path / "dirs.jsonl"
+    result = AtlasScanner(root).scan(dirs_inventory_file=dirs_file)
+    items = [json.loads(line) for line in dirs_file.read_text(encoding="utf-8").splitlines()]
+
+    # Post-order: a directory is written once its subtree is complete
+    assert [i["rel_path"] for i in items] == ["a/sub", "a", "a-b", "."]
+    totals = {i["rel_path"]: (i["recursive_bytes"], i["recursive_files"]) for i in items}
+    assert totals == {"a/sub": (3, 1), "a": (8, 2), "a-b": (1, 1), ".": (11, 4)}
+
+    top = result["stats"]["top_dirs"]
+    assert top[0] == {"path": ".", "bytes": 11}
+    assert [d["path"] for d in top] == [".", "a", "a/sub", "a-b"]
@@ -0,0 +1,78 @@
+import json
+
+from merger.lenskit.adapters.atlas import AtlasScanner
+from merger.lenskit.adapters.atlas_inventory import (
+    InventoryBin,
+    bin_to_jsonl,
+    iter_inventory,
+    iso_to_us,
+    jsonl_to_bin,
+    main,
+)
+
+
+def _make_tree(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (root / "src" / "main.py").write_text("print(1)\n")
+    (root / "data.bin").write_bytes(b"\x00\x01\x02")
+    (root / "Ünïcode.md").write_text("# ü\n")
+    (root / "link.py").symlink_to(root / "src" / "main.py")
+
+
+def _scan(root, tmp_path, workers):
+    inv = tmp_path / f"inv{workers}.jsonl"
+    binf = tmp_path / f"inv{workers}.bin"
+    AtlasScanner(root, workers=workers).scan(inventory_file=inv, inventory_bin_file=binf)
+    return inv, binf
+
+
+def test_scanner_bin_matches_jsonl(tmp_path):
+    root = tmp_path / "root"
+    _make_tree(root)
+    for workers in (1, 3):
+        inv, binf = _scan(root, tmp_path, workers)
+        items = [json.loads(line) for line in inv.read_text(encoding="utf-8").splitlines()]
+        recs = list(InventoryBin.load(binf))
+
+        assert [r.rel_path for r in recs] == [i["rel_path"] for i in items]
+        for rec, item in zip(recs, items):
+            assert (rec.name, rec.ext, rec.size_bytes, rec.is_text, rec.is_symlink) == \
+                (item["name"], item["ext"], item["size_bytes"], item["is_text"], item["is_symlink"])
+            # JSONL renders st_mtime (float), the binary format st_mtime_ns
+            assert abs(rec.mtime_us - iso_to_us(item["mtime"])) <= 1
+
+        link = next(r for r in recs if r.rel_path == "link.py")
+        assert link.is_symlink and link.is_text
+        assert next(r for r in recs if r.name == "data.bin").is_text is False
+
+
+def test_jsonl_roundtrip_is_byte_identical(tmp_path):
+    root = tmp_path / "root"
+    _make_tree(root)
+    inv, _ = _scan(root, tmp_path, 1)
+
+    binf = tmp_path / "conv.bin"
+    back = tmp_path / "back.jsonl"
+    assert jsonl_to_bin(inv, binf) == len(inv.read_text(encoding="utf-8").splitlines())
+    bin_to_jsonl(binf, back)
+    assert back.read_bytes() == inv.read_bytes()
+    assert binf.stat().st_size < inv.stat().st_size
+
+    # iter_inventory reads both formats alike
+    assert list(iter_inventory(binf)) == list(iter_inventory(inv))
+
+
+def test_column_subset_and_cli(tmp_path, capsys):
+    root = tmp_path / "root"
+    _make_tree(root)
+    inv, binf = _scan(root, tmp_path, 1)
+
+    sizes = InventoryBin.load(binf, columns=["size"])
+    assert sum(sizes.columns["size"]) == sum(json.loads(line)["size_bytes"] for line in inv.read_text().splitlines())
+    assert "mtime" not in sizes.columns
+
+    out = tmp_path / "cli.jsonl"
+    assert main(["to-jsonl", str(binf), str(out)]) == 0
+    assert "records" in capsys.readouterr().out
+    assert len(out.read_text().splitlines()) == len(inv.read_text().splitlines())
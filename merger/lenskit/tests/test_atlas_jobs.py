@@ -0,0 +1,95 @@
+import json
+import threading
+
+from merger.lenskit.adapters.atlas import AtlasScanCanceled
+from merger.lenskit.adapters.filesystem import issue_fs_token
+from merger.lenskit.service.atlas_jobs import AtlasJobManager, scan_key
+from merger.lenskit.service.models import AtlasEffective
+
+
+class _BlockingScanner:
+    """Reports progress, then waits until released or canceled."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+
+    def scan(self, inventory_file=None, progress=None, is_canceled=None):
+        self.calls += 1
+        inventory_file.write_text('{"rel_path": "a"}\n')
+        progress({"files": 1, "dirs": 1, "bytes": 10, "current_dir": "."})
+        self.started.set()
+        while not self.release.wait(0.01):
+            if is_canceled():
+                raise AtlasScanCanceled("canceled")
+        return {"root": "/x", "stats": {"total_files": 1, "inventory_file": str(inventory_file)}}
+
+
+def _effective():
+    return AtlasEffective(max_depth=2, max_entries=10, exclude_globs=[])
+
+
+def test_identical_inflight_scans_are_deduplicated(tmp_path):
+    mgr = AtlasJobManager(max_workers=1)
+    scanner = _BlockingScanner()
+    key = scan_key(tmp_path, _effective())
+
+    first, dedup1 = mgr.submit(key, tmp_path, _effective(), tmp_path, scanner, lambda r: "# md\n")
+    second, dedup2 = mgr.submit(key, tmp_path, _effective(), tmp_path, scanner, lambda r: "# md\n")
+    assert (dedup1, dedup2) == (False, True)
+    assert second.id == first.id
+
+    assert scanner.started.wait(5)
+    assert mgr.get(first.id).progress.files == 1
+    scanner.release.set()
+    done = mgr.wait(first.id, timeout=5)
+    assert done.status == "succeeded"
+    assert scanner.calls == 1
+
+    # Outputs renamed into place; no temporaries left
+    assert (tmp_path / done.paths["inventory"]).read_text() == '{"rel_path": "a"}\n'
+    assert json.loads((tmp_path / done.paths["json"]).read_text())["stats"]["inventory_file"].endswith(".inventory.jsonl")
+    assert not list(tmp_path.glob("*.part")) and not list(tmp_path.glob("*.tmp"))
+
+    # Finished scans no longer dedup
+    third, dedup3 = mgr.submit(key, tmp_path, _effective(), tmp_path, _BlockingScanner(), lambda r: "")
+    assert not dedup3 and third.id != first.id
+    mgr.cancel(third.id)
+    mgr.wait(third.id, timeout=5)
+    mgr.shutdown()
+
+
+def test_cancel_leaves_no_outputs(tmp_path):
+    mgr = AtlasJobManager(max_workers=1)
+    scanner = _BlockingScanner()
+    scan, _ = mgr.submit("k", tmp_path, _effective(), tmp_path, scanner, lambda r: "")
+    assert scanner.started.wait(5)
+
+    assert mgr.cancel(scan.id).status == "canceling"
+    assert mgr.wait(scan.id, timeout=5).status == "canceled"
+    assert list(tmp_path.iterdir()) == []
+    mgr.shutdown()
+
+
+def test_atlas_endpoint_status_and_events(service_client):
+    ctx = service_client
+    token = issue_fs_token((ctx.hub_path / "repo-test").resolve())
+    resp = ctx.client.post("/api/atlas", json={"root_token": token, "max_depth": 2}, headers=ctx.headers)
+    assert resp.status_code == 200
+    art = resp.json()
+    assert art["status"] in ("queued", "running", "succeeded")
+
+    from merger.lenskit.service.app import state
+    assert state.atlas_jobs.wait(art["id"], timeout=10).status == "succeeded"
+
+    status = ctx.client.get(f"/api/atlas/{art['id']}/status", headers=ctx.headers).json()
+    assert status["status"] == "succeeded"
+    assert status["stats"]["total_files"] == 1
+    assert (ctx.merges_dir / status["paths"]["md"]).exists()
+
+    events = ctx.client.get(f"/api/atlas/{art['id']}/events", headers=ctx.headers).text
+    assert "event: progress" in events and "event: end" in events
+
+    assert ctx.client.get("/api/atlas/atlas-1/status", headers=ctx.headers).status_code == 404
+    assert ctx.client.post(f"/api/atlas/{art['id']}/cancel", headers=ctx.headers).json()["status"] == "succeeded"
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from merger.lenskit.adapters.atlas import AtlasScanner, AtlasScanCanceled
+
+
+def _make_tree(root: Path) -> None:
+    for top in ("alpha", "beta", "gamma"):
+        for sub in ("one", "two"):
+            d = root / top / sub
+            d.mkdir(parents=True)
+            for i in range(3):
+                (d / f"f{i}.txt").write_text("x" * (i + 1))
+        (root / top / "top.md").write_text("# t\n")
+    (root / "beta" / ".git").mkdir()
+    (root / "beta" / ".git" / "HEAD").write_text("ref\n")
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "node_modules" / "dep" / "i.js").write_text("1")
+    (root / "deep" / "a" / "b" / "c").mkdir(parents=True)
+    (root / "deep" / "a" / "b" / "c" / "leaf.txt").write_text("leaf")
+    (root / "root.txt").write_text("root")
+
+
+def _scan(root, tmp_path, tag, **kw):
+    inv = tmp_path / f"{tag}.inv.jsonl"
+    dirs = tmp_path / f"{tag}.dirs.jsonl"
+    result = AtlasScanner(root, **kw).scan(inventory_file=inv, dirs_inventory_file=dirs)
+    return result["stats"], inv.read_text().splitlines(), dirs.read_text().splitlines()
+
+
+@pytest.mark.parametrize("workers", [2, 8])
+def test_parallel_matches_serial(tmp_path, workers):
+    root = tmp_path / "root"
+    _make_tree(root)
+
+    s_stats, s_inv, s_dirs = _scan(root, tmp_path, "serial", max_depth=2)
+    p_stats, p_inv, p_dirs = _scan(root, tmp_path, f"par{workers}", max_depth=2, workers=workers)
+
+    for key in ("total_files", "total_dirs", "total_bytes", "extensions"):
+        assert p_stats[key] == s_stats[key], key
+    assert sorted(p_stats["repo_nodes"]) == sorted(s_stats["repo_nodes"]) == ["beta"]
+    # Both walks are sorted; ties in top_dirs keep walk order
+    assert p_stats["top_dirs"] == s_stats["top_dirs"]
+    assert p_stats["truncated"]["reason"] == s_stats["truncated"]["reason"] == "max_depth"
+    assert p_inv == s_inv
+    assert p_dirs == s_dirs
+
+    # Deterministic: sorted pre-order, identical across runs
+    paths = [json.loads(line)["rel_path"] for line in p_inv]
+    assert paths[0] == "root.txt"
+    assert paths.index("alpha/top.md") < paths.index("alpha/one/f0.txt") < paths.index("beta/top.md")
+    assert _scan(root, tmp_path, "again", max_depth=2, workers=workers)[1] == p_inv
+
+
+def test_parallel_shared_entry_budget(tmp_path):
+    root = tmp_path / "root"
+    _make_tree(root)
+    stats, inv, _ = _scan(root, tmp_path, "budget", max_entries=7, workers=4)
+    assert len(inv) == stats["total_files"] <= 7
+    assert stats["truncated"]["hit"] is True
+    assert stats["truncated"]["reason"] == "max_entries"
+    assert stats["truncated"]["files_seen"] == 7
+
+
+def test_parallel_cancel(tmp_path):
+    root = tmp_path / "root"
+    _make_tree(root)
+    with pytest.raises(AtlasScanCanceled):
+        AtlasScanner(root, workers=4).scan(is_canceled=lambda: True)
@@ -0,0 +1,67 @@
+import json
+
+from merger.lenskit.core import extractor
+
+
+def _diff(tmp_path):
+    old = tmp_path / "old"
+    new = tmp_path / "new"
+    for root in (old, new):
+        (root / "src").mkdir(parents=True)
+    (old / "src" / "app.py").write_text("x = 1\n")
+    (new / "src" / "app.py").write_text("x = 22\n")
+    (old / "gone.md").write_text("# gone\n")
+    (new / "docs.md").write_text("# docs\n")
+    (old / "same.txt").write_text("same\n")
+    (new / "same.txt").write_text("same\n")
+    merges = tmp_path / "merges"
+    merges.mkdir()
+    return extractor.diff_trees(old, new, "demo", merges), new, merges
+
+
+def test_sidecar_carries_full_file_rows(tmp_path):
+    diff_path, _, _ = _diff(tmp_path)
+    sidecar = extractor.load_delta_sidecar(diff_path)
+    rows = {r["path"]: r for r in extractor.delta_rows_from_meta(sidecar)}
+
+    assert sorted(rows) == ["docs.md", "gone.md", "src/app.py"]
+    app = rows["src/app.py"]
+    assert (app["status"], app["size_old"], app["size_new"], app["delta"]) == ("changed", 6, 7, 1)
+    assert app["md5_changed"] is True and app["md5_old"] and app["md5_new"]
+    assert rows["gone.md"]["delta"] == -7 and rows["docs.md"]["category"]
+
+    # Same rows as the legacy Markdown table
+    legacy = extractor.parse_import_diff_table(diff_path.read_text(encoding="utf-8"))
+    keys = ("path", "status", "category", "size_old", "size_new", "delta", "md5_changed")
+    assert [{k: r[k] for k in keys} for r in legacy] == [
+        {k: r[k] for k in keys} for r in extractor.delta_rows_from_meta(sidecar)]
+
+
+def test_delta_consumers_read_the_sidecar(tmp_path, monkeypatch):
+    diff_path, new, merges = _diff(tmp_path)
+
+    def no_parsing(text):
+        raise AssertionError("Markdown table parsed")
+
+    monkeypatch.setitem(vars(extractor), "parse_import_diff_table", no_parsing)
+    meta = extractor.extract_delta_meta_from_diff_file(diff_path)
+    assert meta["summary"] == {"files_added": 1, "files_removed": 1, "files_changed": 1}
+    assert "files" not in meta  # schema shape, no row payload in merge JSON
+
+    report = extractor.create_delta_merge_from_diff(diff_path, new, merges)
+    text = report.read_text(encoding="utf-8")
+    assert "- Changed files: **1**" in text and "x = 22" in text
+
+
+def test_diffs_without_rows_fall_back_to_the_table(tmp_path):
+    diff_path, new, merges = _diff(tmp_path)
+    sidecar = extractor.delta_sidecar_path(diff_path)
+    legacy = json.loads(sidecar.read_text(encoding="utf-8"))
+    for key in ("delta_version", "file_columns", "files"):
+        del legacy[key]
+    sidecar.write_text(json.dumps(legacy), encoding="utf-8")
+
+    assert extractor.load_delta_sidecar(diff_path) is None
+    assert extractor.extract_delta_meta_from_diff_file(diff_path)["summary"]["files_changed"] == 1
+    report = extractor.create_delta_merge_from_diff(diff_path, new, merges)
+    assert "- Added files: **1**" in report.read_text(encoding="utf-8")
@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+import time
+import zipfile
+
+from merger.lenskit.core import extractor
+
+
+def _write_zip(path, files):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+
+
+def _count_calls(monkeypatch, namespace, fn_name):
+    original = namespace[fn_name]
+    calls = []
+
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setitem(namespace, fn_name, counting)
+    return calls
+
+
+def test_import_scans_each_tree_once_and_reuses_md5_cache(tmp_path, monkeypatch):
+    hub = tmp_path / "hub"
+    merges = tmp_path / "merges"
+    merges.mkdir()
+    repo = hub / "demo"
+    repo.mkdir(parents=True)
+    (repo / "a.py").write_text("a = 1\n")
+    (repo / "b.md").write_text("# b\n")
+
+    # extractor imports merge through its own sys.path entry; patch the module it actually uses
+    merge_globals = extractor.get_repo_snapshot.__globals__
+    hashed = _count_calls(monkeypatch, merge_globals, "compute_md5")
+    snapshots = _count_calls(monkeypatch, vars(extractor), "get_repo_snapshot")
+
+    _write_zip(hub / "demo.zip", {"a.py": "a = 2\n", "b.md": "# b\n", "c.txt": "new\n"})
+    diff_path = extractor.import_zip(hub / "demo.zip", hub, merges)
+
+    assert len(snapshots) == 2  # old + new tree, shared by bundle and diff
+    assert len(hashed) == 5  # nothing cached yet: 2 old + 3 new files
+    assert (hub / extractor.SNAPSHOT_CACHE_DIR / "demo.json").is_file()
+    assert "Dateien mit geändertem Inhalt: **1**" in diff_path.read_text(encoding="utf-8")
+    bundles = list((hub / extractor.PR_SCHAU_DIR / "demo").glob("*/delta.json"))
+    assert json.loads(bundles[0].read_text(encoding="utf-8"))["summary"] == {"added": 1, "changed": 1, "removed": 0}
+
+    snapshots.clear()
+    hashed.clear()
+    _write_zip(hub / "demo.zip", {"a.py": "a = 2\n", "b.md": "# b2\n", "c.txt": "new\n"})
+    diff_path = extractor.import_zip(hub / "demo.zip", hub, merges, zip_delta=False)
+
+    assert len(snapshots) == 2
+    # The old tree (previous import) comes from the cache; only the new tree is hashed
+    assert sorted(p.name for p in hashed) == ["a.py", "b.md", "c.txt"]
+    assert all("__extract_tmp_demo" in p.parts for p in hashed)
+    assert "Dateien mit geändertem Inhalt: **1**" in diff_path.read_text(encoding="utf-8")
+
+
+def _tree_files(root):
+    return {p.relative_to(root).as_posix(): p.read_text() for p in root.rglob("*") if p.is_file()}
+
+
+def test_zip_delta_extracts_only_changed_entries(tmp_path, monkeypatch):
+    hub = tmp_path / "hub"
+    merges = tmp_path / "merges"
+    merges.mkdir()
+    hub.mkdir()
+    first = {"a.py": "a = 1\n", "b.md": "# b\n", "old/gone.txt": "bye\n", "keep/k.txt": "k\n"}
+    _write_zip(hub / "demo.zip", first)
+    extractor.import_zip(hub / "demo.zip", hub, merges)
+    repo = hub / "demo"
+    assert (hub / extractor.SNAPSHOT_CACHE_DIR / "demo.crc.json").is_file()
+    kept = (repo / "b.md").stat()
+
+    hashed = _count_calls(monkeypatch, extractor.get_repo_snapshot.__globals__, "compute_md5")
+    second = {"a.py": "a = 2\n", "b.md": "# b\n", "keep/k.txt": "k\n", "new/c.txt": "new\n"}
+    _write_zip(hub / "demo.zip", second)
+    diff_path = extractor.import_zip(hub / "demo.zip", hub, merges)
+
+    assert _tree_files(repo) == second
+    assert not (repo / "old").exists()  # emptied directory is pruned
+    assert not (hub / "__extract_tmp_demo").exists()
+    # Unchanged entry was neither rewritten nor hashed
+    assert (repo / "b.md").stat().st_ino == kept.st_ino
+    assert (repo / "b.md").stat().st_mtime_ns == kept.st_mtime_ns
+    assert sorted(p.name for p in hashed) == ["a.py", "a.py", "c.txt", "gone.txt"]
+
+    text = diff_path.read_text(encoding="utf-8")
+    assert "Dateien mit geändertem Inhalt: **1**" in text
+    assert "Dateien nur im alten Repo: **1**" in text
+    bundles = sorted((hub / extractor.PR_SCHAU_DIR / "demo").glob("*/delta.json"))
+    assert json.loads(bundles[-1].read_text(encoding="utf-8"))["summary"] == {"added": 1, "changed": 1, "removed": 1}
+
+
+def test_zip_delta_notices_local_edits(tmp_path):
+    hub = tmp_path / "hub"
+    merges = tmp_path / "merges"
+    merges.mkdir()
+    hub.mkdir()
+    files = {"a.py": "a = 1\n", "b.md": "# b\n"}
+    _write_zip(hub / "demo.zip", files)
+    extractor.import_zip(hub / "demo.zip", hub, merges)
+
+    # Edited and added by hand since the last import: the ZIP state wins
+    (hub / "demo" / "a.py").write_text("a = 99\n")
+    (hub / "demo" / "stray.txt").write_text("x\n")
+    _write_zip(hub / "demo.zip", files)
+    diff_path = extractor.import_zip(hub / "demo.zip", hub, merges)
+
+    assert _tree_files(hub / "demo") == files
+    assert "Dateien mit geändertem Inhalt: **1**" in diff_path.read_text(encoding="utf-8")
+
+
+def test_run_extractor_imports_in_parallel_and_records_each_zip(tmp_path):
+    hub = tmp_path / "hub"
+    hub.mkdir()
+    for name in ("one", "two", "three"):
+        _write_zip(hub / f"{name}.zip", {"README.md": f"# {name}\n"})
+    (hub / "broken.zip").write_bytes(b"not a zip")
+
+    events = []
+    code, msg = extractor.run_extractor(hub_override=hub, workers=4, progress=events.append)
+
+    assert code == 2
+    assert "failures: 1" in msg and "broken.zip" in msg
+    assert sorted(e["done"] for e in events) == [1, 2, 3, 4]
+    assert {e["zip"] for e in events if not e["ok"]} == {"broken.zip"}
+    for name in ("one", "two", "three"):
+        assert (hub / name / "README.md").read_text() == f"# {name}\n"
+
+    state = json.loads((extractor.get_merges_dir(hub) / ".extractor_state.json").read_text(encoding="utf-8"))
+    outcomes = {e["zip"]: e for e in state["ledger"].values()}
+    assert {k: e["status"] for k, e in outcomes.items()} == {
+        "one.zip": "ok", "two.zip": "ok", "three.zip": "ok", "broken.zip": "failed"}
+    assert outcomes["one.zip"]["artifacts"] == {}  # fresh import: nothing to diff against
+    # Imported ZIPs are cleaned up, the failed one stays for a retry
+    assert sorted(p.name for p in hub.glob("*.zip")) == ["broken.zip"]
+
+
+def test_failed_zip_is_retried_on_the_next_run(tmp_path, monkeypatch):
+    hub = tmp_path / "hub"
+    hub.mkdir()
+    _write_zip(hub / "demo.zip", {"a.py": "a = 1\n"})
+    real_import = extractor.import_zip
+
+    def flaky(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setitem(vars(extractor), "import_zip", flaky)
+    code, msg = extractor.run_extractor(hub_override=hub)
+    assert code == 2 and "demo.zip" in msg
+    assert (hub / "demo.zip").exists()
+
+    monkeypatch.setitem(vars(extractor), "import_zip", real_import)
+    code, msg = extractor.run_extractor(hub_override=hub)
+    assert code == 0 and "failures: 0" in msg
+    assert (hub / "demo" / "a.py").read_text() == "a = 1\n"
+    assert not (hub / "demo.zip").exists()
+    state = json.loads((extractor.get_merges_dir(hub) / ".extractor_state.json").read_text(encoding="utf-8"))
+    assert [e["status"] for e in state["ledger"].values()] == ["ok"]
+
+
+def test_ledger_reprocesses_only_new_or_changed_zips(tmp_path, monkeypatch):
+    hub = tmp_path / "hub"
+    hub.mkdir()
+    _write_zip(hub / "demo.zip", {"a.py": "a = 1\n"})
+    assert extractor.run_extractor(hub_override=hub)[0] == 0
+
+    imported = _count_calls(monkeypatch, vars(extractor), "import_zip_wrapper")
+    read = _count_calls(monkeypatch, vars(extractor), "zip_content_fingerprint")
+
+    # Same content dropped again and re-touched: fingerprint read once, import skipped
+    _write_zip(hub / "demo.zip", {"a.py": "a = 1\n"})
+    os.utime(hub / "demo.zip", (1, 1))
+    code, msg = extractor.run_extractor(hub_override=hub)
+    assert code == 0 and "skipped" in msg
+    assert (len(read), len(imported)) == (1, 0)
+
+    # Nothing changed since: stat cache hit, the ZIP is not opened at all
+    read.clear()
+    assert "skipped" in extractor.run_extractor(hub_override=hub)[1]
+    assert read == []
+
+    # New content under the same name is imported
+    _write_zip(hub / "demo.zip", {"a.py": "a = 2\n"})
+    os.utime(hub / "demo.zip", (1, 1))
+    code, msg = extractor.run_extractor(hub_override=hub)
+    assert code == 0 and "imports processed: 1" in msg
+    assert [p.name for p in imported] == ["demo.zip"]
+    assert (hub / "demo" / "a.py").read_text() == "a = 2\n"
+    state = json.loads((extractor.get_merges_dir(hub) / ".extractor_state.json").read_text(encoding="utf-8"))
+    latest = max(state["ledger"].values(), key=lambda e: e["imported_at"])
+    assert sorted(latest["artifacts"]) == ["delta_json", "delta_merge", "diff", "pr_schau"]
+    assert all((hub / ref).exists() for ref in latest["artifacts"].values())
+
+
+def test_zip_content_fingerprint_ignores_mtime(tmp_path):
+    a, b, c = tmp_path / "a.zip", tmp_path / "b.zip", tmp_path / "c.zip"
+    _write_zip(a, {"x.txt": "1", "y.txt": "2"})
+    a.rename(b)
+    os.utime(b, (5, 5))
+    _write_zip(a, {"x.txt": "1", "y.txt": "2"})
+    _write_zip(c, {"x.txt": "1", "y.txt": "3"})
+    assert extractor.zip_content_fingerprint(a) == extractor.zip_content_fingerprint(b)
+    assert extractor.zip_content_fingerprint(a) != extractor.zip_content_fingerprint(c)
+    (tmp_path / "junk.zip").write_bytes(b"nope")
+    assert extractor.zip_content_fingerprint(tmp_path / "junk.zip").startswith("4-raw")
+
+
+def test_import_zips_serialises_same_repo(tmp_path, monkeypatch):
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+    # The first "a" import and "b" only pass this together, i.e. concurrently
+    rendezvous = threading.Barrier(2, timeout=5)
+
+    def fake_import(zip_path, hub, merges_dir, artifacts):
+        repo = zip_path.stem.casefold()
+        with lock:
+            active[repo] = active.get(repo, 0) + 1
+            peak[repo] = max(peak.get(repo, 0), active[repo])
+            first = peak.get(repo + "-seen") is None
+            peak[repo + "-seen"] = True
+        if first:
+            rendezvous.wait()
+        time.sleep(0.05)
+        with lock:
+            active[repo] -= 1
+        return None
+
+    monkeypatch.setitem(vars(extractor), "_import_zip_and_delta_merge", fake_import)
+    zips = [tmp_path / "a.zip", tmp_path / "A.zip", tmp_path / "b.zip"]
+    results = extractor.import_zips(zips, tmp_path, tmp_path, workers=3)
+
+    assert [r.error for r in results] == [None, None, None]
+    assert peak["a"] == 1  # "a.zip" and "A.zip" target the same repo
+
+
+def test_ledger_reimports_a_reverted_zip(tmp_path):
+    hub = tmp_path / "hub"
+    hub.mkdir()
+    x = {"a.py": "a = 1\n"}
+    y = {"a.py": "a = 2\n"}
+    for content in (x, y, x):
+        _write_zip(hub / "demo.zip", content)
+        code, msg = extractor.run_extractor(hub_override=hub)
+        assert code == 0 and "skipped" not in msg
+        assert (hub / "demo" / "a.py").read_text() == content["a.py"]
+        assert not (hub / "demo.zip").exists()
+
+    # Same content as the last import is still skipped
+    _write_zip(hub / "demo.zip", x)
+    assert "skipped" in extractor.run_extractor(hub_override=hub)[1]
@@ -159,3 +159,78 @@ def test_generate_review_bundle_splitting(schema):
 
 if __name__ == "__main__":
     pytest.main([__file__])
+
+def test_review_parts_are_streamed_with_exact_accounting(tmp_path):
+    """Split parts carry the SHA-256 and byte counts of exactly what was written."""
+    old_repo = tmp_path / "old_repo"
+    new_repo = tmp_path / "new_repo"
+    old_repo.mkdir()
+    new_repo.mkdir()
+    for i in range(12):
+        (new_repo / f"mod{i:02d}.py").write_text(f"value = {i}\r\n" * 4000, newline="")
+
+    bundle_dir = generate_review_bundle(old_repo, new_repo, "big-repo", tmp_path / "hub")
+    bundle = json.loads((bundle_dir / "bundle.json").read_text(encoding="utf-8"))
+    comp = bundle["completeness"]
+    parts = [bundle_dir / name for name in comp["parts"]]
+
+    assert len(parts) > 1 and parts[1].name == "review_part2.md"
+    assert all(p.stat().st_size <= 200 * 1024 for p in parts)
+    assert comp["emitted_bytes"] == sum(p.stat().st_size for p in parts)
+    # Each continuation part adds its "# PR-Review (Part N)" line; its newline replaces the one at the split
+    overhead = sum(len(p.read_text(encoding="utf-8").split("\n", 1)[0]) for p in parts[1:])
+    assert comp["expected_bytes"] == comp["emitted_bytes"] - overhead
+    shas = {a["basename"]: a["sha256"] for a in bundle["artifacts"] if "sha256" in a}
+    assert all(shas[p.name] == _compute_sha256(p) for p in parts)
+    assert b"\r" not in b"".join(p.read_bytes() for p in parts)
+
+
+def test_unified_diff_mode_shrinks_review_of_small_edits(tmp_path):
+    old_repo = tmp_path / "old_repo"
+    new_repo = tmp_path / "new_repo"
+    old_repo.mkdir()
+    new_repo.mkdir()
+    lines = [f"def f{i}(): return {i}" for i in range(20000)]  # ~500 KB, over the inline limit
+    (old_repo / "big.py").write_text("\n".join(lines) + "\n")
+    lines[10] = "def f10(): return -1"
+    (new_repo / "big.py").write_text("\n".join(lines) + "\n")
+    (old_repo / "rewritten.txt").write_text("a\nb\n")
+    (new_repo / "rewritten.txt").write_text("c\nd\n")
+
+    bundle_dir = generate_review_bundle(old_repo, new_repo, "r", tmp_path / "hub", unified_diff=True)
+    review = (bundle_dir / "review.md").read_text(encoding="utf-8")
+    assert "-def f10(): return 10\n+def f10(): return -1" in review
+    assert "Omitted" not in review
+    # Diff would not be smaller than the file: full content instead
+    assert "```txt\nc\nd\n" in review
+
+    bundle = json.loads((bundle_dir / "bundle.json").read_text(encoding="utf-8"))
+    assert bundle["completeness"]["unified_diff"] == {
+        "files": 1, "fallback_full": 1, "lines_added": 1, "lines_removed": 1}
+    assert bundle["completeness"]["emitted_bytes"] < 5000
+    delta = {f["path"]: f for f in json.loads((bundle_dir / "delta.json").read_text(encoding="utf-8"))["files"]}
+    assert (delta["big.py"]["lines_added"], delta["big.py"]["lines_removed"]) == (1, 1)
+    assert "lines_added" not in delta["rewritten.txt"]
+
+
+def test_unified_diff_mode_shows_line_ending_only_changes(tmp_path):
+    old_repo = tmp_path / "old_repo"
+    new_repo = tmp_path / "new_repo"
+    old_repo.mkdir()
+    new_repo.mkdir()
+    (old_repo / "eol.txt").write_text("one\ntwo")
+    (new_repo / "eol.txt").write_text("one\ntwo\n")
+    (old_repo / "crlf.txt").write_bytes(b"alpha\r\nbeta\r\n")
+    (new_repo / "crlf.txt").write_bytes(b"alpha\nbeta\n")
+
+    bundle_dir = generate_review_bundle(old_repo, new_repo, "r", tmp_path / "hub", unified_diff=True)
+    review = (bundle_dir / "review.md").read_text(encoding="utf-8")
+    assert "(+0 / -0 lines)" not in review
+    assert "```txt\none\ntwo\n" in review
+    assert "```txt\nalpha\nbeta\n" in review
+
+    bundle = json.loads((bundle_dir / "bundle.json").read_text(encoding="utf-8"))
+    assert bundle["completeness"]["unified_diff"] == {
+        "files": 0, "fallback_full": 2, "lines_added": 0, "lines_removed": 0}
+    delta = json.loads((bundle_dir / "delta.json").read_text(encoding="utf-8"))
+    assert all("lines_added" not in f for f in delta["files"])
@@ -0,0 +1,107 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from merger.lenskit.core.fingerprint import RepoFingerprint, build_repo_fingerprint, main
+from merger.lenskit.core.merge import scan_repo
+
+
+def _make_repo(root: Path) -> Path:
+    repo = root / "repo"
+    (repo / "src" / "pkg").mkdir(parents=True)
+    (repo / "docs").mkdir()
+    (repo / "node_modules" / "x").mkdir(parents=True)
+    (repo / "README.md").write_text("# Repo\n")
+    (repo / "src" / "main.py").write_text("print(1)\n")
+    (repo / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (repo / "docs" / "intro.md").write_text("intro\n")
+    (repo / "node_modules" / "x" / "index.js").write_text("ignored\n")
+    return repo
+
+
+def test_fingerprint_is_stable_and_skips_skip_dirs(tmp_path):
+    repo = _make_repo(tmp_path)
+    fp1 = build_repo_fingerprint(repo)
+    fp2 = build_repo_fingerprint(repo)
+    assert fp1.root_hash == fp2.root_hash
+    assert "node_modules" not in fp1.dirs
+    assert "src/pkg" in fp1.dirs
+
+
+def test_changed_subtrees_only_reports_changed_dirs(tmp_path):
+    repo = _make_repo(tmp_path)
+    old = build_repo_fingerprint(repo)
+
+    (repo / "src" / "pkg" / "mod.py").write_text("x = 22\n")
+    (repo / "docs" / "new").mkdir()
+    new = build_repo_fingerprint(repo)
+
+    assert new.root_hash != old.root_hash
+    assert new.dirs["src"].hash != old.dirs["src"].hash
+    # Sibling subtree untouched
+    changed = new.changed_subtrees(old)
+    assert changed == ["docs", "docs/new", "src/pkg"]
+    assert new.changed_subtrees(new) == []
+    assert new.changed_subtrees(None) == ["."]
+
+
+def test_persistence_roundtrip_and_content_hash_carry_over(tmp_path):
+    repo = _make_repo(tmp_path)
+    fp = build_repo_fingerprint(repo)
+    before = {rel: n.hash for rel, n in fp.dirs.items()}
+    fp.set_content_hash("src/main.py", "abc123")
+    # Content hashes are a side table, not Merkle input
+    assert {rel: n.hash for rel, n in fp.dirs.items()} == before
+    assert fp.changed_subtrees(build_repo_fingerprint(repo)) == []
+
+    state = tmp_path / "state" / "repo.json"
+    fp.save(state)
+    loaded = RepoFingerprint.load(state)
+    assert loaded.root_hash == fp.root_hash
+
+    # Rebuild against the persisted tree: unchanged file keeps its content hash
+    rebuilt = build_repo_fingerprint(repo, previous=loaded)
+    st = (repo / "src" / "main.py").stat()
+    assert rebuilt.lookup_content_hash("src/main.py", st.st_size, st.st_mtime_ns) == "abc123"
+    assert rebuilt.root_hash == fp.root_hash
+
+    # Modified file drops it
+    (repo / "src" / "main.py").write_text("print(2)  # changed\n")
+    rebuilt2 = build_repo_fingerprint(repo, previous=loaded)
+    st = (repo / "src" / "main.py").stat()
+    assert rebuilt2.lookup_content_hash("src/main.py", st.st_size, st.st_mtime_ns) is None
+
+
+def test_load_rejects_garbage(tmp_path):
+    p = tmp_path / "broken.json"
+    p.write_text("{not json")
+    assert RepoFingerprint.load(p) is None
+    assert RepoFingerprint.load(tmp_path / "missing.json") is None
+
+
+def test_scan_repo_reuses_fingerprint_hashes(tmp_path):
+    repo = _make_repo(tmp_path)
+    fp = build_repo_fingerprint(repo)
+    root_hash = fp.root_hash
+
+    first = scan_repo(repo, fingerprint=fp)
+    assert fp.root_hash == root_hash  # hashing files does not change the cache key
+    md5_by_path = {fi.rel_path.as_posix(): fi.md5 for fi in first["files"]}
+    st = (repo / "README.md").stat()
+    assert fp.lookup_content_hash("README.md", st.st_size, st.st_mtime_ns) == md5_by_path["README.md"]
+
+    with patch("merger.lenskit.core.merge.compute_md5") as mock_md5:
+        second = scan_repo(repo, fingerprint=build_repo_fingerprint(repo, previous=fp))
+        assert mock_md5.call_count == 0
+    assert {fi.rel_path.as_posix(): fi.md5 for fi in second["files"]} == md5_by_path
+
+
+def test_cli_reports_changes(tmp_path, capsys):
+    repo = _make_repo(tmp_path)
+    state = tmp_path / "fp.json"
+    assert main([str(repo), "--save", str(state)]) == 0
+    capsys.readouterr()
+
+    (repo / "docs" / "intro.md").write_text("changed intro\n")
+    assert main([str(repo), "--since", str(state)]) == 0
+    out = capsys.readouterr().out
+    assert '"docs"' in out
@@ -0,0 +1,70 @@
+import os
+
+from merger.lenskit.adapters.filesystem import issue_fs_token, issue_fs_tokens, resolve_fs_token
+
+
+def _root_token(ctx):
+    return issue_fs_token(ctx.hub_path.resolve())
+
+
+def test_batch_tokens_resolve(service_client):
+    ctx = service_client
+    paths = [ctx.hub_path.resolve(), (ctx.hub_path / "repo-test").resolve()]
+    toks = issue_fs_tokens(paths)
+    assert [resolve_fs_token(t) for t in toks] == paths
+
+
+def test_listing_paginates_with_size_and_mtime(service_client):
+    ctx = service_client
+    big = ctx.hub_path / "big"
+    big.mkdir()
+    for i in range(25):
+        (big / f"f{i:02d}.txt").write_text("x" * i)
+    (big / "Sub").mkdir()
+
+    tok = issue_fs_token(big.resolve())
+    names, offset = [], 0
+    while offset is not None:
+        resp = ctx.client.get("/api/fs/list", params={"token": tok, "offset": offset, "limit": 10}, headers=ctx.headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 26
+        assert len(data["entries"]) <= 10
+        names += [e["name"] for e in data["entries"]]
+        offset = data["next_offset"]
+    assert names == sorted(names, key=str.lower)
+    assert len(names) == 26
+
+    first = ctx.client.get("/api/fs/list", params={"token": tok, "limit": 3}, headers=ctx.headers).json()
+    f02 = next(e for e in first["entries"] if e["name"] == "f02.txt")
+    assert f02["size"] == 2 and "mtime" in f02
+
+    sub = ctx.client.get("/api/fs/list", params={"token": tok, "offset": 25}, headers=ctx.headers).json()
+    assert sub["entries"][0]["type"] == "dir" and "token" in sub["entries"][0]
+
+
+def test_listing_cache_follows_directory_changes(service_client):
+    ctx = service_client
+    tok = _root_token(ctx)
+    before = ctx.client.get("/api/fs/list", params={"token": tok}, headers=ctx.headers).json()
+    (ctx.hub_path / "new-dir").mkdir()
+    st = os.stat(ctx.hub_path)
+    os.utime(ctx.hub_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    after = ctx.client.get("/api/fs/list", params={"token": tok}, headers=ctx.headers).json()
+    assert "new-dir" in after["dirs"] and "new-dir" not in before["dirs"]
+
+
+def test_lazy_child_navigation(service_client):
+    ctx = service_client
+    tok = _root_token(ctx)
+    listing = ctx.client.get("/api/fs/list", params={"token": tok, "tokens": "false"}, headers=ctx.headers).json()
+    assert all("token" not in e for e in listing["entries"])
+
+    resp = ctx.client.get("/api/fs/list", params={"token": tok, "child": "repo-test"}, headers=ctx.headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["files"] == ["README.md"]
+    assert resolve_fs_token(data["self_token"]) == (ctx.hub_path / "repo-test").resolve()
+
+    for bad in ("..", "a/b", ""):
+        assert ctx.client.get("/api/fs/list", params={"token": tok, "child": bad}, headers=ctx.headers).status_code == 400
@@ -0,0 +1,56 @@
+import random
+
+from merger.lenskit.core.line_diff import edit_script, unified_diff
+
+
+def _apply(old, diff_text):
+    """Applies unified diff hunks to `old` (list of lines)."""
+    out, pos = [], 0
+    for line in diff_text.split("\n") if diff_text else []:
+        if line.startswith("@@"):
+            start, length = (int(x) for x in line.split()[1][1:].split(","))
+            begin = start - 1 if length else start
+            out.extend(old[pos:begin])
+            pos = begin
+        elif line[0] == "+":
+            out.append(line[1:])
+        else:
+            assert old[pos] == line[1:]
+            pos += 1
+            if line[0] == " ":
+                out.append(line[1:])
+    return out + old[pos:]
+
+
+def test_diffs_roundtrip_and_are_minimal():
+    rnd = random.Random(5)
+    for _ in range(500):
+        a = [rnd.choice("abcd") for _ in range(rnd.randint(0, 20))]
+        b = [rnd.choice("abcd") for _ in range(rnd.randint(0, 20))]
+        ops = edit_script(a, b)
+        assert [a[i] for op, i, _ in ops if op != "+"] == a
+        assert [b[j] if op == "+" else a[i] for op, i, j in ops if op != "-"] == b
+
+        text_a = "".join(x + "\n" for x in a)
+        text_b = "".join(x + "\n" for x in b)
+        diff = unified_diff(text_a, text_b)
+        assert _apply(a, diff.text) == b
+        assert diff.added - diff.removed == len(b) - len(a)
+
+
+def test_small_edit_to_large_file_yields_small_hunk():
+    old = [f"line {i}" for i in range(100_000)]
+    new = list(old)
+    new[50_000] = "changed"
+    diff = unified_diff("\n".join(old), "\n".join(new))
+    assert (diff.added, diff.removed) == (1, 1)
+    assert diff.text.splitlines()[0] == "@@ -49998,7 +49998,7 @@"
+    assert len(diff.text.splitlines()) == 9
+
+
+def test_guards_return_none():
+    a = "\n".join(f"a{i}" for i in range(300))
+    b = "\n".join(f"b{i}" for i in range(300))
+    assert unified_diff(a, b, max_edits=100) is None
+    assert unified_diff(a, b, time_budget=-1) is None
+    assert unified_diff(a, b).removed == 300
@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+
+from merger.lenskit.cli import pr_schau_catalog
+from merger.lenskit.core import pr_schau_bundle
+from merger.lenskit.core.extractor import generate_review_bundle
+from merger.lenskit.core.merge import PR_SCHAU_DIR
+
+
+def _repos(tmp_path):
+    old = tmp_path / "old"
+    new = tmp_path / "new"
+    for root in (old, new):
+        root.mkdir()
+    (old / "a.txt").write_text("A\n")
+    (new / "a.txt").write_text("B\n")
+    (new / "b.md").write_text("# b\n")
+    return old, new
+
+
+def _age(path, ns):
+    for p in [path, *path.rglob("*")]:
+        os.utime(p, ns=(ns, ns))
+
+
+def test_generate_review_bundle_records_the_bundle(tmp_path):
+    old, new = _repos(tmp_path)
+    hub = tmp_path / "hub"
+    bundle_dir = generate_review_bundle(old, new, "demo", hub)
+    root = hub / PR_SCHAU_DIR
+
+    [entry] = pr_schau_bundle.load_catalog(root)
+    assert entry["dir"] == f"demo/{bundle_dir.name}"
+    assert entry["summary"] == {"added": 1, "changed": 1, "removed": 0}
+    assert entry["parts"] == ["review.md"] and entry["verified"] == "full"
+    assert entry["size"] == (bundle_dir / "review.md").stat().st_size
+    assert not pr_schau_bundle.catalog_is_stale(root)
+
+
+def test_listing_reads_the_catalogue_and_rebuild_fixes_drift(tmp_path, monkeypatch):
+    old, new = _repos(tmp_path)
+    hub = tmp_path / "hub"
+    root = hub / PR_SCHAU_DIR
+    first = generate_review_bundle(old, new, "demo", hub)
+    second = first.parent / "2020-01-01T000000Z"
+    shutil.copytree(first, second)
+    (root / "other").mkdir()
+    shutil.copytree(first, root / "other" / "2020-01-02T000000Z")
+    _age(root, 10**18)
+    pr_schau_bundle.rebuild_catalog(root)
+    os.utime(pr_schau_bundle.catalog_path(root), ns=(10**18 + 10, 10**18 + 10))
+
+    loaded = []
+    monkeypatch.setattr(pr_schau_bundle, "load_pr_schau_bundle",
+                        lambda d, **kw: loaded.append(d) or (None, d))
+    assert len(pr_schau_bundle.list_pr_schau_bundles(root)) == 3
+    assert loaded == []  # served from the catalogue
+
+    # Drift: a bundle removed, another edited by hand
+    shutil.rmtree(root / "other")
+    review = second / "review.md"
+    review.write_text(review.read_text(encoding="utf-8") + "x", encoding="utf-8")
+    (second / "bundle.json").write_text((second / "bundle.json").read_text(encoding="utf-8") + " ")
+    assert pr_schau_bundle.catalog_is_stale(root)
+    monkeypatch.undo()
+
+    entries = {e["dir"]: e for e in pr_schau_bundle.list_pr_schau_bundles(root)}
+    assert sorted(entries) == ["demo/2020-01-01T000000Z", f"demo/{first.name}"]
+    assert entries["demo/2020-01-01T000000Z"]["verified"] == "failed"
+    assert "SHA256 mismatch" in entries["demo/2020-01-01T000000Z"]["error"]
+    assert entries[f"demo/{first.name}"]["verified"] == "full"
+
+
+def test_cli_rebuilds_and_reports_failures(tmp_path, capsys):
+    old, new = _repos(tmp_path)
+    hub = tmp_path / "hub"
+    bundle_dir = generate_review_bundle(old, new, "demo", hub)
+    pr_schau_bundle.catalog_path(hub / PR_SCHAU_DIR).unlink()
+    capsys.readouterr()
+
+    assert pr_schau_catalog.main([str(hub), "--rebuild", "--json"]) == 0
+    [line] = capsys.readouterr().out.splitlines()
+    assert json.loads(line)["verified"] == "full"
+
+    (bundle_dir / "review.md").write_text("tampered", encoding="utf-8")
+    assert pr_schau_catalog.main([str(hub), "--rebuild", "--full"]) == 2
+    assert "1 bundles, 1 failed" in capsys.readouterr().out
+    assert pr_schau_catalog.main([str(tmp_path / "nope")]) == 1
+
+
+def test_rebuild_verifies_changed_bundles_in_one_batch(tmp_path, monkeypatch):
+    old, new = _repos(tmp_path)
+    hub = tmp_path / "hub"
+    root = hub / PR_SCHAU_DIR
+    first = generate_review_bundle(old, new, "demo", hub)
+    for ts in ("2020-01-01T000000Z", "2020-01-02T000000Z"):
+        shutil.copytree(first, first.parent / ts)
+    (first.parent / "2020-01-02T000000Z" / "bundle.json").unlink()
+
+    batches = []
+    verify = pr_schau_bundle.verify_pr_schau_bundles
+    monkeypatch.setattr(pr_schau_bundle, "verify_pr_schau_bundles",
+                        lambda dirs, **kw: batches.append([d.name for d in dirs]) or verify(dirs, **kw))
+    entries = {e["ts"]: e for e in pr_schau_bundle.rebuild_catalog(root, full=True, max_workers=2)}
+
+    assert batches == [["2020-01-01T000000Z", first.name]]
+    assert entries["2020-01-01T000000Z"]["verified"] == "full"
+    assert entries["2020-01-02T000000Z"]["verified"] == "missing"
@@ -1,10 +1,12 @@
 import json
+import os
 import tempfile
 from pathlib import Path
 
 import pytest
 
 from merger.lenskit.core.extractor import generate_review_bundle
+from merger.lenskit.core import pr_schau_bundle
 from merger.lenskit.core.pr_schau_bundle import load_pr_schau_bundle, PRSchauBundleError
 
 
@@ -95,3 +97,45 @@ def test_loader_rejects_missing_parts():
 
         with pytest.raises(PRSchauBundleError):
             load_pr_schau_bundle(d, verify_level="basic")
+
+
+def _bundle(tmp, repo):
+    (tmp / "old").mkdir()
+    (tmp / "old" / "a.txt").write_text("A", encoding="utf-8")
+    (tmp / "new").mkdir()
+    (tmp / "new" / "a.txt").write_text("B", encoding="utf-8")
+    return generate_review_bundle(tmp / "old", tmp / "new", repo, tmp / "hub")
+
+
+def test_full_verification_caches_unchanged_parts(tmp_path, monkeypatch):
+    bundle_dir = _bundle(tmp_path, "repo3")
+    review = bundle_dir / "review.md"
+    os.utime(review, ns=(10**18, 10**18))  # outside the racy window
+    pr_schau_bundle.clear_scan_cache()
+
+    scanned = []
+    original = pr_schau_bundle._scan_file
+    monkeypatch.setattr(pr_schau_bundle, "_scan_file", lambda p: scanned.append(p) or original(p))
+    load_pr_schau_bundle(bundle_dir, verify_level="full")
+    assert [(bundle_dir, None)] == pr_schau_bundle.verify_pr_schau_bundles([bundle_dir])
+    assert scanned == [review]
+    scan = pr_schau_bundle.scan_part(review)
+    assert set(pr_schau_bundle.ZONE_MARKERS) <= scan.markers
+    assert scan.size == review.stat().st_size
+
+    # Same-size edit with a new mtime is re-hashed and rejected
+    text = review.read_text(encoding="utf-8")
+    review.write_text(text.replace("B", "C", 1), encoding="utf-8")
+    os.utime(review, ns=(10**18 + 1, 10**18 + 1))
+    [(_, error)] = pr_schau_bundle.verify_pr_schau_bundles([bundle_dir])
+    assert "SHA256 mismatch" in error
+    assert len(scanned) == 2
+
+
+def test_scan_finds_markers_across_chunk_boundaries(tmp_path, monkeypatch):
+    monkeypatch.setattr(pr_schau_bundle, "_SCAN_CHUNK", 8)
+    p = tmp_path / "part.md"
+    p.write_bytes(b"x" * 5 + b"Content truncated at 10 bytes\n")
+    scan = pr_schau_bundle.scan_part(p)
+    assert "Content truncated at" in scan.markers
+    assert scan.size == 35
@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from merger.lenskit.core import merge
+from merger.lenskit.core.merge import prescan_level, prescan_repo, prescan_signature
+
+
+def _make_repo(root: Path) -> Path:
+    repo = root / "repo"
+    (repo / "src" / "pkg").mkdir(parents=True)
+    (repo / "src-extra").mkdir()
+    (repo / "node_modules" / "dep").mkdir(parents=True)
+    (repo / "README.md").write_text("# Repo\n")
+    (repo / "src.txt").write_text("abc")
+    (repo / "src" / "main.py").write_text("print(1)\n")
+    (repo / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (repo / "src" / "pkg" / "big.log").write_text("l" * 100)
+    (repo / "src-extra" / "a").write_text("a")
+    (repo / "node_modules" / "dep" / "index.js").write_text("module.exports = 1\n")
+    (repo / ".env").write_text("SECRET=1\n")
+    return repo
+
+
+def test_signature_matches_full_prescan(tmp_path):
+    repo = _make_repo(tmp_path)
+    for globs in (None, ["*.log"], ["src/pkg"]):
+        full = prescan_repo(repo, ignore_globs=globs)
+        sig = prescan_signature(repo, ignore_globs=globs)
+        assert sig["signature"] == full["signature"]
+        assert (sig["file_count"], sig["total_bytes"]) == (full["file_count"], full["total_bytes"])
+
+    # Depth cut-off is honoured the same way
+    assert prescan_signature(repo, max_depth=1)["signature"] == prescan_repo(repo, max_depth=1)["signature"]
+
+
+def test_level_aggregates(tmp_path):
+    repo = _make_repo(tmp_path)
+    top = prescan_level(repo)
+    by_path = {e["path"]: e for e in top["entries"]}
+
+    assert "node_modules" not in by_path and ".env" not in by_path
+    assert by_path["src"]["type"] == "dir"
+    assert (by_path["src"]["file_count"], by_path["src"]["dir_count"]) == (3, 1)
+    assert by_path["src"]["total_bytes"] == len("print(1)\n") + len("x = 1\n") + 100
+    assert by_path["src.txt"] == {"path": "src.txt", "type": "file", "size": 3}
+    assert top["file_count"] == top["repo_file_count"] == 6
+
+    pkg = prescan_level(repo, "src/pkg", ignore_globs=["*.log"])
+    assert [e["path"] for e in pkg["entries"]] == ["src/pkg/mod.py"]
+    assert pkg["total_bytes"] == len("x = 1\n")
+
+    with pytest.raises(ValueError):
+        prescan_level(repo, "../etc")
+    with pytest.raises(ValueError):
+        prescan_level(repo, "node_modules")
+
+
+def test_snapshot_reused_until_tree_changes(tmp_path):
+    repo = _make_repo(tmp_path)
+    first = merge._prescan_snapshot(repo.resolve(), 10, None, None)
+    assert merge._prescan_snapshot(repo.resolve(), 10, None, None) is first
+
+    (repo / "src" / "pkg" / "new.py").write_text("y = 2\n")
+    # Force the directory fingerprint to differ even on coarse-mtime filesystems
+    st = os.stat(repo / "src" / "pkg")
+    os.utime(repo / "src" / "pkg", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    changed = merge._prescan_snapshot(repo.resolve(), 10, None, None)
+    assert changed is not first
+    assert changed.file_count == first.file_count + 1
+    assert changed.signature == prescan_repo(repo)["signature"]
+
+
+class _RacyIndex:
+    """Live-index stand-in whose generation moves while the walk is running."""
+
+    def __init__(self):
+        self.generation = 1
+
+    def scandir(self, path):
+        self.generation += 1
+        return os.scandir(path)
+
+
+def test_snapshot_keeps_generation_from_before_the_walk(tmp_path):
+    repo = _make_repo(tmp_path)
+    index = _RacyIndex()
+    first = merge._prescan_snapshot(repo.resolve(), 10, None, index)
+    assert first.generation == 1
+    # Events during the walk bumped the generation: the snapshot is not reused
+    assert merge._prescan_snapshot(repo.resolve(), 10, None, index) is not first
+
+
+def test_prescan_caches_are_bounded():
+    cache = merge._BoundedCache(max_entries=3, max_weight=10, ttl=60)
+    for i in range(5):
+        cache.put(i, i)
+    assert len(cache) == 3 and cache.get(0) is None and cache.get(4) == 4
+    cache.get(2)
+    cache.put("heavy", "x", weight=8)  # over the weight budget: least recently used go first
+    assert cache.get(3) is None and cache.get(2) == 2 and cache.get("heavy") == "x"
+
+    expired = merge._BoundedCache(max_entries=3, max_weight=10, ttl=0)
+    expired.put("k", 1)
+    assert expired.get("k") is None and len(expired) == 0
+
+
+def test_level_endpoint(service_client):
+    ctx = service_client
+    resp = ctx.client.post("/api/prescan/level", json={"repo": "repo-test"}, headers=ctx.headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [e["path"] for e in data["entries"]] == ["README.md"]
+    full = ctx.client.post("/api/prescan", json={"repo": "repo-test"}, headers=ctx.headers).json()
+    assert data["signature"] == full["signature"]
+
+    resp = ctx.client.post("/api/prescan/level", json={"repo": "repo-test", "path": "missing"}, headers=ctx.headers)
+    assert resp.status_code == 404
+
+
+def test_prescan_repo_tree_and_reference_signature(tmp_path):
+    import hashlib
+
+    repo = _make_repo(tmp_path)
+    result = prescan_repo(repo, ignore_globs=["*.log"])
+
+    lines = sorted(f"{p}:{s}" for p, s in [
+        ("README.md", 7), ("src.txt", 3), ("src/main.py", 9), ("src/pkg/mod.py", 6), ("src-extra/a", 1),
+    ])
+    assert result["signature"] == hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    tree = result["tree"]
+    assert [c["path"] for c in tree["children"]] == ["README.md", "src", "src-extra", "src.txt"]
+    src = tree["children"][1]
+    assert [c["path"] for c in src["children"]] == ["src/main.py", "src/pkg"]
+    assert src["children"][1]["children"] == [{"path": "src/pkg/mod.py", "type": "file", "size": 6}]
+
+    with pytest.raises(RuntimeError):
+        prescan_repo(repo, max_nodes=3)
+    assert prescan_repo(repo, max_nodes=None)["file_count"] == 6
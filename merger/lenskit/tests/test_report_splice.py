@@ -0,0 +1,72 @@
+import datetime
+
+from merger.lenskit.core import clock, merge
+from merger.lenskit.core.merge import scan_repo, write_incremental_report, write_reports_v2
+from merger.lenskit.core.report_splice import block_index_path
+
+
+def _at(day):
+    return clock.frozen(datetime.datetime(2025, 1, day, 3, 4, 5, tzinfo=datetime.timezone.utc))
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "README.md").write_text("# Demo\n")
+    for i in range(5):
+        (repo / "src" / f"m{i}.py").write_text(f"x = {i}\n" + "# ü\n" * i)
+    return repo
+
+
+def _reads(monkeypatch):
+    calls = []
+    original = merge.read_smart_content
+
+    def counting(fi, *args, **kwargs):
+        calls.append(fi.rel_path.as_posix())
+        return original(fi, *args, **kwargs)
+
+    monkeypatch.setattr(merge, "read_smart_content", counting)
+    return calls
+
+
+def test_incremental_report_splices_unchanged_blocks(tmp_path, monkeypatch):
+    repo = _repo(tmp_path)
+    out = tmp_path / "out"
+    out.mkdir()
+    first_stats = {}
+    with _at(1):
+        first = write_incremental_report(out, tmp_path, [scan_repo(repo)], splice_stats=first_stats)
+    assert first_stats == {"reused": 0, "rendered": 6}
+    assert block_index_path(first.canonical_md) in first.other
+
+    (repo / "src" / "m1.py").write_text("x = 'changed'\n")
+    (repo / "src" / "new.py").write_text("y = 1\n")
+    reads = _reads(monkeypatch)
+    stats = {}
+    with _at(2):
+        second = write_incremental_report(out, tmp_path, [scan_repo(repo)], splice_stats=stats)
+    assert stats == {"reused": 5, "rendered": 2}
+    assert sorted(reads) == ["src/m1.py", "src/new.py"]
+
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    with _at(2):
+        fresh = write_reports_v2(scratch, tmp_path, [scan_repo(repo)], "max", "gesamt", 0, False)
+    assert second.canonical_md.read_bytes() == fresh.canonical_md.read_bytes()
+
+
+def test_edited_prior_report_is_not_spliced(tmp_path):
+    repo = _repo(tmp_path)
+    out = tmp_path / "out"
+    out.mkdir()
+    with _at(1):
+        first = write_incremental_report(out, tmp_path, [scan_repo(repo)])
+    report = first.canonical_md
+    report.write_text(report.read_text(encoding="utf-8").replace("x = 3", "x = 9"), encoding="utf-8")
+
+    stats = {}
+    with _at(2):
+        second = write_incremental_report(out, tmp_path, [scan_repo(repo)], splice_stats=stats)
+    assert stats == {"reused": 0, "rendered": 6}
+    assert "x = 3" in second.canonical_md.read_text(encoding="utf-8")
@@ -0,0 +1,94 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from merger.lenskit.service.runner import JobRunner, WorkerLimits, _describe_exitcode
+from merger.lenskit.service.jobstore import JobStore
+from merger.lenskit.service.models import JobRequest, Job
+from merger.lenskit.adapters import security
+from merger.lenskit.adapters.security import SecurityConfig
+
+
+def _crashing_worker(conn, *args):
+    # Simulates a worker dying hard (e.g. OOM kill) without reporting a result.
+    conn.send(("log", "about to crash"))
+    os._exit(3)
+
+
+@pytest.fixture
+def temp_hub():
+    with tempfile.TemporaryDirectory() as tmp:
+        hub = Path(tmp).resolve()
+        (hub / "repoA").mkdir()
+        (hub / "repoA" / "README.md").write_text("# Repo A\n\nHello.\n")
+        (hub / "repoA" / "main.py").write_text("print('hi')\n")
+
+        new_config = SecurityConfig()
+        new_config.add_allowlist_root(hub)
+        with patch.object(security, "_security_config", new_config):
+            yield hub
+
+
+def _make_job(store: JobStore, hub: Path) -> Job:
+    req = JobRequest(hub=str(hub), repos=["repoA"], level="dev")
+    job = Job.create(req)
+    job.hub_resolved = str(hub)
+    store.add_job(job)
+    return job
+
+
+def test_process_isolation_runs_job_and_relays_logs(temp_hub):
+    store = JobStore(temp_hub)
+    runner = JobRunner(store, isolation="process")
+    job = _make_job(store, temp_hub)
+
+    runner._run_job(job.id)
+
+    updated = store.get_job(job.id)
+    assert updated.status == "succeeded", updated.error
+    assert len(updated.artifact_ids) == 1
+
+    art = store.get_artifact(updated.artifact_ids[0])
+    assert art.repos == ["repoA"]
+    assert (Path(art.merges_dir) / art.paths["md"]).exists()
+
+    logs = store.read_log_lines(job.id)
+    assert any("Started worker process" in line for line in logs)
+    assert any("Scanning 1/1: repoA" in line for line in logs)
+
+
+def test_crashed_worker_marks_job_failed(temp_hub):
+    store = JobStore(temp_hub)
+    runner = JobRunner(store, isolation="process")
+    runner.worker_target = _crashing_worker
+    job = _make_job(store, temp_hub)
+
+    runner._run_job(job.id)
+
+    updated = store.get_job(job.id)
+    assert updated.status == "failed"
+    assert "exit code 3" in updated.error
+    logs = store.read_log_lines(job.id)
+    assert any("about to crash" in line for line in logs)
+
+
+def test_invalid_isolation_mode_rejected(temp_hub):
+    store = JobStore(temp_hub)
+    with pytest.raises(ValueError):
+        JobRunner(store, isolation="fiber")
+
+
+def test_worker_limits_from_env(monkeypatch):
+    monkeypatch.setenv("RLENS_WORKER_MAX_MEMORY", "2G")
+    monkeypatch.setenv("RLENS_WORKER_MAX_CPU_SEC", "600")
+    limits = WorkerLimits.from_env()
+    assert limits.max_memory_bytes == 2 * 1024**3
+    assert limits.max_cpu_seconds == 600
+
+
+def test_describe_exitcode():
+    assert _describe_exitcode(-9) == "killed by signal SIGKILL"
+    assert _describe_exitcode(1) == "exit code 1"
@@ -0,0 +1,176 @@
+import os
+import time
+import uuid
+
+from merger.lenskit.service.cache import ArtifactCache, calculate_cache_key, repo_stat_signature, hub_fingerprint
+from merger.lenskit.service.models import Job, Artifact, JobRequest
+from merger.lenskit.service.runner import input_fingerprint
+
+
+def _wait_for(ctx, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = ctx.store.get_job(job_id)
+        if job and job.status in ("succeeded", "failed", "canceled"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_unchanged_hub_hits_cache(service_client):
+    ctx = service_client
+    payload = {"repos": ["repo-test"], "level": "dev"}
+
+    job1 = ctx.client.post("/api/jobs", json=payload, headers=ctx.headers).json()
+    assert _wait_for(ctx, job1["id"]).status == "succeeded"
+
+    job2 = ctx.client.post("/api/jobs", json=payload, headers=ctx.headers).json()
+    assert job2["id"] == job1["id"]
+
+    stats = ctx.client.get("/api/cache/stats", headers=ctx.headers).json()
+    assert stats["hits"] >= 1
+    assert stats["entries"] == 1
+    assert stats["bytes"] > 0
+
+
+def test_changed_repo_is_never_reused(service_client):
+    ctx = service_client
+    payload = {"repos": ["repo-test"], "level": "dev"}
+
+    job1 = ctx.client.post("/api/jobs", json=payload, headers=ctx.headers).json()
+    assert _wait_for(ctx, job1["id"]).status == "succeeded"
+
+    (ctx.hub_path / "repo-test" / "new.py").write_text("x = 1\n")
+
+    job2 = ctx.client.post("/api/jobs", json=payload, headers=ctx.headers).json()
+    assert job2["id"] != job1["id"]
+    assert job2["input_fingerprint"] != job1["input_fingerprint"]
+    _wait_for(ctx, job2["id"])
+
+
+def test_repo_stat_signature_detects_edits(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    f = repo / "src" / "a.py"
+    f.write_text("a")
+    (repo / "node_modules").mkdir()
+    (repo / "node_modules" / "dep.js").write_text("ignored")
+
+    sig1 = repo_stat_signature(repo)
+    assert repo_stat_signature(repo) == sig1
+
+    # SKIP_DIRS content does not influence the signature
+    (repo / "node_modules" / "dep.js").write_text("still ignored")
+    assert repo_stat_signature(repo) == sig1
+
+    f.write_text("ab")
+    assert repo_stat_signature(repo) != sig1
+
+
+def test_hub_fingerprint_marks_missing_repos(tmp_path):
+    (tmp_path / "a").mkdir()
+    fp1 = hub_fingerprint(tmp_path, ["a", "b"])
+    (tmp_path / "b").mkdir()
+    assert hub_fingerprint(tmp_path, ["a", "b"]) != fp1
+
+
+def _add_succeeded_job(store, merges_dir, size):
+    fname = f"report-{uuid.uuid4().hex}.md"
+    (merges_dir / fname).write_text("x" * size)
+    req = JobRequest()
+    job = Job.create(req)
+    job.status = "succeeded"
+    art = Artifact(
+        id=str(uuid.uuid4()),
+        job_id=job.id,
+        hub=str(store.hub_path),
+        repos=[],
+        created_at=job.created_at,
+        paths={"md": fname},
+        params=req,
+        merges_dir=str(merges_dir),
+    )
+    store.add_artifact(art)
+    job.artifact_ids.append(art.id)
+    store.add_job(job)
+    return job, merges_dir / fname
+
+
+def test_lru_eviction_by_disk_usage(service_client):
+    ctx = service_client
+    cache = ArtifactCache(ctx.store, max_bytes=250)
+
+    job_a, file_a = _add_succeeded_job(ctx.store, ctx.merges_dir, 100)
+    job_b, file_b = _add_succeeded_job(ctx.store, ctx.merges_dir, 100)
+    cache.put("key-a", job_a)
+    cache.put("key-b", job_b)
+
+    # Touch A so that B becomes least recently used
+    assert cache.get("key-a").id == job_a.id
+
+    job_c, file_c = _add_succeeded_job(ctx.store, ctx.merges_dir, 100)
+    cache.put("key-c", job_c)
+
+    assert cache.get("key-b") is None
+    assert not file_b.exists()
+    assert ctx.store.get_job(job_b.id) is None
+    assert file_a.exists() and file_c.exists()
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+    # Index survives a restart
+    reloaded = ArtifactCache(ctx.store, max_bytes=250)
+    assert reloaded.get("key-c").id == job_c.id
+
+
+def test_cache_entry_with_deleted_files_is_a_miss(service_client):
+    ctx = service_client
+    cache = ArtifactCache(ctx.store)
+    job, f = _add_succeeded_job(ctx.store, ctx.merges_dir, 10)
+    cache.put("k", job)
+    os.remove(f)
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lookups_do_not_rewrite_the_index_every_time(service_client):
+    ctx = service_client
+    cache = ArtifactCache(ctx.store, save_interval=3600)
+    job, _ = _add_succeeded_job(ctx.store, ctx.merges_dir, 10)
+    cache.put("k", job)
+    mtime = cache.index_file.stat().st_mtime_ns
+
+    for _ in range(5):
+        assert cache.get("k").id == job.id
+        assert cache.get("other") is None
+    assert cache.index_file.stat().st_mtime_ns == mtime
+
+    # The next put persists the pending counters
+    job2, _ = _add_succeeded_job(ctx.store, ctx.merges_dir, 10)
+    cache.put("k2", job2)
+    counters = ArtifactCache(ctx.store).stats()
+    assert (counters["hits"], counters["misses"]) == (5, 5)
+
+
+def test_runner_rekeys_a_job_by_the_input_state_at_scan_time(service_client):
+    ctx = service_client
+    req = JobRequest(repos=["repo-test"], level="dev", merges_dir=str(ctx.merges_dir))
+    job = Job.create(req, content_hash="params")
+    job.hub_resolved = str(ctx.hub_path)
+    job.input_fingerprint = "submitted"
+    job.cache_key = calculate_cache_key("params", "submitted")
+    ctx.store.add_job(job)
+
+    # The repo changes while the job is queued
+    (ctx.hub_path / "repo-test" / "late.py").write_text("x = 1\n")
+    ctx.runner._run_job(job.id)
+
+    done = ctx.store.get_job(job.id)
+    assert done.status == "succeeded"
+    fingerprint = input_fingerprint(req, ctx.hub_path)
+    assert done.input_fingerprint == fingerprint
+    assert done.cache_key == calculate_cache_key("params", fingerprint)
+    assert ctx.runner.cache.get(done.cache_key).id == job.id
+    assert ctx.runner.cache.get(calculate_cache_key("params", "submitted")) is None
@@ -0,0 +1,123 @@
+import gzip
+import uuid
+
+import anyio
+
+from merger.lenskit.service.delivery import RangeFileResponse, finalize_outputs, sha256_file
+from merger.lenskit.service.models import Artifact, Job, JobRequest
+
+
+CONTENT = ("# Report\n" + "line of markdown\n" * 500).encode("utf-8")
+
+
+def _add_artifact(ctx, encodings=("gzip",)):
+    fname = f"report-{uuid.uuid4().hex}.md"
+    (ctx.merges_dir / fname).write_bytes(CONTENT)
+    hashes, encoded = finalize_outputs(ctx.merges_dir, {"md": fname}, encodings=list(encodings))
+    art = Artifact(
+        id=str(uuid.uuid4()),
+        job_id="job-x",
+        hub=str(ctx.hub_path),
+        repos=[],
+        created_at="2025-01-01T00:00:00+00:00",
+        paths={"md": fname},
+        params=JobRequest(),
+        merges_dir=str(ctx.merges_dir),
+        hashes=hashes,
+        encoded=encoded,
+    )
+    ctx.store.add_artifact(art)
+    return art
+
+
+def test_finalize_outputs_hashes_and_precompresses(tmp_path):
+    (tmp_path / "a.md").write_bytes(CONTENT)
+    (tmp_path / "a.json").write_text("{}")
+    hashes, encoded = finalize_outputs(tmp_path, {"md": "a.md", "json": "a.json"}, encodings=["gzip"])
+    assert hashes["md"] == sha256_file(tmp_path / "a.md")
+    assert "json" in hashes and "json" not in encoded
+    assert gzip.decompress((tmp_path / encoded["md"]["gzip"]).read_bytes()) == CONTENT
+
+
+def test_download_etag_and_conditional(service_client):
+    ctx = service_client
+    art = _add_artifact(ctx)
+    url = f"/api/artifacts/{art.id}/download?key=md"
+
+    resp = ctx.client.get(url, headers={**ctx.headers, "Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert resp.content == CONTENT
+    assert resp.headers["ETag"] == f'"{art.hashes["md"]}"'
+    assert resp.headers["Accept-Ranges"] == "bytes"
+
+    again = ctx.client.get(url, headers={**ctx.headers, "Accept-Encoding": "identity",
+                                         "If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_download_byte_ranges(service_client):
+    ctx = service_client
+    art = _add_artifact(ctx)
+    url = f"/api/artifacts/{art.id}/download?key=md"
+    base = {**ctx.headers, "Accept-Encoding": "identity"}
+
+    resp = ctx.client.get(url, headers={**base, "Range": "bytes=10-19"})
+    assert resp.status_code == 206
+    assert resp.content == CONTENT[10:20]
+    assert resp.headers["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    # Resume from offset / suffix range
+    assert ctx.client.get(url, headers={**base, "Range": "bytes=100-"}).content == CONTENT[100:]
+    assert ctx.client.get(url, headers={**base, "Range": "bytes=-5"}).content == CONTENT[-5:]
+
+    # Stale If-Range -> full body
+    stale = ctx.client.get(url, headers={**base, "Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200 and stale.content == CONTENT
+
+    bad = ctx.client.get(url, headers={**base, "Range": f"bytes={len(CONTENT) + 10}-"})
+    assert bad.status_code == 416
+    assert bad.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_download_serves_precompressed_sibling(service_client):
+    ctx = service_client
+    art = _add_artifact(ctx)
+    url = f"/api/artifacts/{art.id}/download?key=md"
+
+    # httpx transparently decodes gzip; check encoding header and decoded body
+    resp = ctx.client.get(url, headers={**ctx.headers, "Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["ETag"] != f'"{art.hashes["md"]}"'
+    assert int(resp.headers["Content-Length"]) < len(CONTENT)
+    assert resp.content == CONTENT
+
+    # Removing the job removes the sibling too
+    sibling = ctx.merges_dir / art.encoded["md"]["gzip"]
+    job = Job.create(JobRequest())
+    job.id = art.job_id
+    job.artifact_ids.append(art.id)
+    ctx.store.add_job(job)
+    assert sibling.exists()
+    ctx.store.remove_job(job.id)
+    assert not sibling.exists()
+
+
+def test_range_response_hands_a_file_object_to_zerocopy(tmp_path):
+    path = tmp_path / "report.md"
+    path.write_bytes(CONTENT)
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopy":
+            f = message["file"]
+            f.seek(message["offset"])
+            message = {**message, "data": f.read(message["count"])}
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "extensions": {"http.response.zerocopy": {}}}
+    response = RangeFileResponse(path, 10, 19, 206, {})
+    anyio.run(response, scope, None, send)
+
+    assert [m["type"] for m in sent] == ["http.response.start", "http.response.zerocopy"]
+    assert sent[1]["data"] == CONTENT[10:20]
@@ -0,0 +1,120 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from merger.lenskit.service.models import Job, Artifact, JobRequest
+
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _add(store, i, repos, level="dev", mode="gesamt", status="succeeded"):
+    req = JobRequest(repos=repos, level=level, mode=mode)
+    job = Job.create(req)
+    job.created_at = (BASE + timedelta(minutes=i)).isoformat()
+    job.status = status
+    art = Artifact(
+        id=str(uuid.uuid4()),
+        job_id=job.id,
+        hub=str(store.hub_path),
+        repos=repos,
+        created_at=job.created_at,
+        paths={"md": f"report-{i}.md"},
+        params=req,
+    )
+    store.add_artifact(art)
+    job.artifact_ids.append(art.id)
+    store.add_job(job)
+    return job, art
+
+
+def test_jobs_cursor_pagination_and_filters(service_client):
+    ctx = service_client
+    for i in range(7):
+        _add(ctx.store, i, ["a"] if i % 2 else ["b"], status="failed" if i == 3 else "succeeded")
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        resp = ctx.client.get("/api/jobs", params=params, headers=ctx.headers)
+        assert resp.status_code == 200
+        seen += [j["created_at"] for j in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+
+    resp = ctx.client.get("/api/jobs", params={"repo": "a", "status": "succeeded"}, headers=ctx.headers)
+    assert [j["request"]["repos"] for j in resp.json()] == [["a"], ["a"]]
+
+    since = (BASE + timedelta(minutes=2)).isoformat()
+    until = (BASE + timedelta(minutes=4)).isoformat()
+    resp = ctx.client.get("/api/jobs", params={"since": since, "until": until}, headers=ctx.headers)
+    assert len(resp.json()) == 3
+
+    assert ctx.client.get("/api/jobs", params={"cursor": "!!"}, headers=ctx.headers).status_code == 400
+
+
+def test_artifact_projection_and_etag(service_client):
+    ctx = service_client
+    _add(ctx.store, 0, ["a"])
+
+    resp = ctx.client.get("/api/artifacts", params={"fields": "id,params.level"}, headers=ctx.headers)
+    assert resp.status_code == 200
+    item = resp.json()[0]
+    assert set(item) == {"id", "params"}
+    assert item["params"] == {"level": "dev"}
+
+    etag = resp.headers["ETag"]
+    again = ctx.client.get("/api/artifacts", params={"fields": "id,params.level"},
+                           headers={**ctx.headers, "If-None-Match": etag})
+    assert again.status_code == 304
+
+    # Different query -> different tag; mutation -> new tag
+    other = ctx.client.get("/api/artifacts", headers={**ctx.headers, "If-None-Match": etag})
+    assert other.status_code == 200
+    _add(ctx.store, 1, ["a"])
+    changed = ctx.client.get("/api/artifacts", params={"fields": "id,params.level"},
+                             headers={**ctx.headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()) == 2
+
+
+def test_latest_artifact_index(service_client):
+    ctx = service_client
+    _add(ctx.store, 0, ["a"], level="max")
+    _, all_repos = _add(ctx.store, 1, [], level="max")
+    _, newest_a = _add(ctx.store, 2, ["a"], level="max")
+    _add(ctx.store, 3, ["a"], level="dev")
+
+    latest = ctx.client.get("/api/artifacts/latest", params={"repo": "a"}, headers=ctx.headers).json()
+    assert latest["id"] == newest_a.id
+
+    # All-repo artifacts match any repo
+    latest_b = ctx.client.get("/api/artifacts/latest", params={"repo": "b"}, headers=ctx.headers).json()
+    assert latest_b["id"] == all_repos.id
+
+    # Removing the newest job drops its artifact from the index
+    ctx.store.remove_job(newest_a.job_id)
+    latest = ctx.client.get("/api/artifacts/latest", params={"repo": "a"}, headers=ctx.headers).json()
+    assert latest["id"] == all_repos.id
+
+    resp = ctx.client.get("/api/artifacts/latest", params={"repo": "a", "mode": "pro-repo"}, headers=ctx.headers)
+    assert resp.status_code == 404
+
+
+def test_job_log_lines_change_the_listing_etag(service_client):
+    ctx = service_client
+    job, _ = _add(ctx.store, 0, ["a"], status="running")
+    resp = ctx.client.get("/api/jobs", headers=ctx.headers)
+    etag = resp.headers["ETag"]
+
+    job.logs.append("[00:00:00Z] scanning")
+    ctx.store.append_log_line(job.id, job.logs[-1])
+
+    resp = ctx.client.get("/api/jobs", headers={**ctx.headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()[0]["logs"] == ["[00:00:00Z] scanning"]
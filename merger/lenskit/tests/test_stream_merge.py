@@ -0,0 +1,83 @@
+import datetime
+import time
+
+from merger.lenskit.core import clock
+from merger.lenskit.core.merge import scan_repo, stream_report_v2, write_reports_v2
+
+
+def test_stream_report_matches_single_file_write(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "README.md").write_text("# Demo\n")
+    (repo / "src" / "main.py").write_text("print('hi')\n")
+    out = tmp_path / "out"
+    out.mkdir()
+
+    summary = scan_repo(repo)
+    with clock.frozen(datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)):
+        arts = write_reports_v2(out, tmp_path, [summary], "max", "gesamt", 0, False)
+        out_path, blocks = stream_report_v2(out, [summary], "max", 0, False)
+        streamed = "".join(blocks)
+
+    assert out_path == arts.canonical_md
+    assert streamed == arts.canonical_md.read_text(encoding="utf-8")
+    assert "# repoLens Report (Part 1/1)" in streamed
+
+
+def test_stream_endpoint_tees_artifact(service_client):
+    ctx = service_client
+    payload = {"repos": ["repo-test"], "level": "max"}
+
+    resp = ctx.client.post("/api/merge/stream?tee=true", json=payload, headers=ctx.headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/markdown")
+    body = resp.text
+    assert "# repoLens Report (Part 1/1)" in body
+    assert "Test Content" in body
+
+    job_id = resp.headers["X-Job-Id"]
+    deadline = time.time() + 5
+    job = ctx.store.get_job(job_id)
+    while job.status == "running" and time.time() < deadline:
+        time.sleep(0.02)
+        job = ctx.store.get_job(job_id)
+    assert job.status == "succeeded"
+
+    art = ctx.store.get_artifact(job.artifact_ids[0])
+    assert art.paths["md"] == resp.headers["X-Report-Filename"]
+    written = (ctx.merges_dir / art.paths["md"]).read_text(encoding="utf-8")
+    assert written == body
+    assert not list(ctx.merges_dir.glob("*.part"))
+
+
+def test_stream_endpoint_without_tee_writes_nothing(service_client):
+    ctx = service_client
+    before = set(ctx.merges_dir.glob("*.md"))
+    resp = ctx.client.post("/api/merge/stream", json={"repos": ["repo-test"]}, headers=ctx.headers)
+    assert resp.status_code == 200
+    assert "X-Job-Id" not in resp.headers
+    assert set(ctx.merges_dir.glob("*.md")) == before
+
+
+def test_stream_endpoint_rejects_pro_repo(service_client):
+    ctx = service_client
+    resp = ctx.client.post("/api/merge/stream", json={"repos": ["repo-test"], "mode": "pro-repo"}, headers=ctx.headers)
+    assert resp.status_code == 400
+
+
+def test_stream_setup_error_fails_the_tee_job(service_client, monkeypatch):
+    from merger.lenskit.service import app as app_module
+
+    ctx = service_client
+
+    def broken(*args, **kwargs):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(app_module, "resolve_output_dir", broken)
+    before = {j.id for j in ctx.store.get_all_jobs()}
+    try:
+        ctx.client.post("/api/merge/stream?tee=true", json={"repos": ["repo-test"]}, headers=ctx.headers)
+    except OSError:
+        pass  # TestClient re-raises server errors
+    [job] = [j for j in ctx.store.get_all_jobs() if j.id not in before]
+    assert job.status == "failed" and "disk gone" in job.error
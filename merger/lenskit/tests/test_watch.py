@@ -0,0 +1,186 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from merger.lenskit.adapters.atlas import AtlasScanner
+from merger.lenskit.adapters.watch import LiveIndex, IN_DELETE_SELF, IN_Q_OVERFLOW
+from merger.lenskit.core.merge import prescan_repo, scan_repo
+
+
+def _make_hub(root: Path) -> Path:
+    hub = root / "hub"
+    repo = hub / "repo"
+    (repo / "src" / "pkg").mkdir(parents=True)
+    (repo / "node_modules" / "dep").mkdir(parents=True)
+    (repo / "README.md").write_text("# Repo\n")
+    (repo / "src" / "main.py").write_text("print(1)\n")
+    (repo / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (repo / "node_modules" / "dep" / "index.js").write_text("module.exports = 1\n")
+    return hub
+
+
+def _walk_set(walk, top):
+    return {(os.path.relpath(d, top), tuple(sorted(dn)), tuple(sorted(fn))) for d, dn, fn in walk(top)}
+
+
+@pytest.fixture(params=["inotify", "poll"])
+def index(request, tmp_path):
+    hub = _make_hub(tmp_path)
+    try:
+        idx = LiveIndex(hub, backend=request.param, poll_interval=3600).start()
+    except OSError:
+        pytest.skip("inotify not available")
+    yield idx
+    idx.stop()
+
+
+def _settle(index):
+    # Polling backend: run one poll pass deterministically instead of waiting
+    if index.backend == "poll":
+        index.poll_once()
+
+
+def test_walk_matches_os_walk(index):
+    top = os.path.join(index.root, "repo")
+    assert _walk_set(index.walk, top) == _walk_set(os.walk, top)
+    # SKIP_DIRS are not indexed but still served (from disk)
+    assert index.status()["fallback_dirs"] >= 1
+
+
+def test_changes_mark_dirty_and_are_picked_up(index):
+    repo = Path(index.root) / "repo"
+    (repo / "src" / "new.py").write_text("y = 2\n")
+    (repo / "docs").mkdir()
+    (repo / "docs" / "intro.md").write_text("intro\n")
+    (repo / "src" / "pkg" / "mod.py").write_text("x = 12345\n")
+    _settle(index)
+
+    dirty = index.dirty_subtrees()
+    assert "repo/src" in dirty
+    assert "repo/src/pkg" in dirty
+
+    assert _walk_set(index.walk, str(repo)) == _walk_set(os.walk, str(repo))
+    entry = index.lookup(repo / "src" / "pkg" / "mod.py")
+    assert entry.stat().st_size == len("x = 12345\n")
+    # Everything below the walked repo is clean again (the hub root may still be dirty under polling)
+    assert [d for d in index.dirty_subtrees() if d.startswith("repo")] == []
+
+
+def test_consumers_served_from_index_match_disk(index):
+    repo = Path(index.root) / "repo"
+    (repo / "src" / "extra.txt").write_text("hello\n")
+    _settle(index)
+
+    plain = scan_repo(repo, calculate_md5=False)
+    live = scan_repo(repo, calculate_md5=False, index=index)
+    assert [f.rel_path for f in live["files"]] == [f.rel_path for f in plain["files"]]
+    assert live["total_bytes"] == plain["total_bytes"]
+
+    assert prescan_repo(repo, index=index)["signature"] == prescan_repo(repo)["signature"]
+
+    a = AtlasScanner(Path(index.root)).scan()
+    b = AtlasScanner(Path(index.root), index=index).scan()
+    assert (a["stats"]["total_files"], a["stats"]["total_bytes"]) == (b["stats"]["total_files"], b["stats"]["total_bytes"])
+    assert index.status()["served_dirs"] > 0
+
+
+def test_removed_directory_is_dropped(index):
+    repo = Path(index.root) / "repo"
+    (repo / "src" / "pkg" / "mod.py").unlink()
+    (repo / "src" / "pkg").rmdir()
+    _settle(index)
+
+    assert _walk_set(index.walk, str(repo)) == _walk_set(os.walk, str(repo))
+    assert str(repo / "src" / "pkg") not in index._dirs
+
+
+def _scanned(repo, index=None):
+    return sorted(f.rel_path.as_posix() for f in scan_repo(repo, calculate_md5=False, index=index)["files"])
+
+
+def test_recreated_directory_is_reindexed(index):
+    repo = Path(index.root) / "repo"
+    shutil.rmtree(repo / "src")
+    (repo / "src").mkdir()
+    (repo / "src" / "new.py").write_text("y = 1\n")
+    _settle(index)
+    assert _scanned(repo, index) == _scanned(repo)
+
+    # The recreated directory is watched again
+    (repo / "src" / "new2.py").write_text("y = 2\n")
+    _settle(index)
+    assert _scanned(repo, index) == _scanned(repo)
+    assert "src/new2.py" in _scanned(repo, index)
+
+
+def test_directory_replaced_by_rename_is_reindexed(index):
+    hub = Path(index.root)
+    repo = hub / "repo"
+    staged = hub / ".staged"
+    staged.mkdir()
+    (staged / "b.py").write_text("b = 1\n")
+    shutil.rmtree(repo)
+    staged.rename(repo)
+    _settle(index)
+    assert _scanned(repo, index) == ["b.py"]
+
+    (repo / "c.py").write_text("c = 1\n")
+    _settle(index)
+    assert _scanned(repo, index) == _scanned(repo) == ["b.py", "c.py"]
+
+
+def test_lost_watch_is_reindexed_from_the_parent(tmp_path):
+    hub = _make_hub(tmp_path)
+    try:
+        idx = LiveIndex(hub, backend="inotify", poll_interval=3600).start()
+    except OSError:
+        pytest.skip("inotify not available")
+    try:
+        src = os.path.join(idx.root, "repo", "src")
+        with idx._lock:
+            # Same name and inode as before (e.g. a reused inode after rmtree + mkdir)
+            idx._process_events([(idx._dir_to_wd[src], IN_DELETE_SELF, "")])
+        assert src not in idx._dirs
+        idx.scandir(os.path.dirname(src))
+        assert src in idx._dirs and src in idx._dir_to_wd
+    finally:
+        idx.stop()
+
+
+def test_overflow_triggers_rebuild(index):
+    rebuilds = index.status()["rebuilds"]
+    with index._lock:
+        index._process_events([(-1, IN_Q_OVERFLOW, "")])
+    assert not index.status()["valid"]
+
+    repo = Path(index.root) / "repo"
+    assert _walk_set(index.walk, str(repo)) == _walk_set(os.walk, str(repo))
+    status = index.status()
+    assert status["valid"]
+    assert status["rebuilds"] == rebuilds + 1
+    assert status["overflows"] == 1
+
+
+def test_inotify_events_arrive_without_query(tmp_path):
+    hub = _make_hub(tmp_path)
+    try:
+        idx = LiveIndex(hub, backend="inotify").start()
+    except OSError:
+        pytest.skip("inotify not available")
+    try:
+        (hub / "repo" / "src" / "late.py").write_text("z = 3\n")
+        deadline = time.time() + 5
+        while time.time() < deadline and idx.status()["events"] == 0:
+            time.sleep(0.05)
+        assert idx.status()["events"] > 0
+        assert idx.lookup(hub / "repo" / "src" / "late.py") is not None
+    finally:
+        idx.stop()
+
+
+def test_invalid_backend_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        LiveIndex(tmp_path, backend="fanotify")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Benchmark `prescan_repo` on a synthetic tree.
+
+Builds a tree with ~200k entries (files + directories) in a temp directory,
+times the current `prescan_repo` against the previous recursive
+implementation (kept below as `legacy_prescan` for reference) and checks that
+both produce the same signature.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from merger.lenskit.core.merge import SKIP_DIRS, SKIP_FILES, prescan_repo  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200_000, help="approximate number of entries")
+    parser.add_argument("--fanout", type=int, default=20, help="files per directory")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per implementation")
+    parser.add_argument("--glob", action="append", default=["*.tmp", "build/*", "*/cache/*", "*.min.js"],
+                        help="ignore glob (repeatable)")
+    parser.add_argument("--root", type=Path, help="reuse/create the tree here instead of a temp dir")
+    return parser.parse_args()
+
+
+def build_tree(root: Path, entries: int, fanout: int) -> int:
+    """Creates directories of `fanout` small files, two levels deep, until `entries` is reached."""
+    created = 0
+    top = 0
+    while created < entries:
+        top_dir = root / f"pkg{top:04d}"
+        top_dir.mkdir(parents=True, exist_ok=True)
+        created += 1
+        for sub in range(fanout):
+            if created >= entries:
+                break
+            sub_dir = top_dir / f"mod{sub:03d}"
+            sub_dir.mkdir(exist_ok=True)
+            created += 1
+            for i in range(fanout):
+                if created >= entries:
+                    break
+                ext = ".tmp" if i % 17 == 0 else ".py"
+                (sub_dir / f"file{i:03d}{ext}").write_bytes(b"x" * (i + 1))
+                created += 1
+        top += 1
+    return created
+
+
+def legacy_prescan(repo_root: Path, max_depth: int = 10, ignore_globs: Optional[List[str]] = None) -> Dict[str, Any]:
+    """The recursive pathlib/fnmatch implementation prescan_repo replaced (without its node limit)."""
+    repo_root = repo_root.resolve()
+    total_files = 0
+    total_bytes = 0
+
+    def _is_ignored(name: str, relpath: str) -> bool:
+        if name in SKIP_DIRS or name in SKIP_FILES:
+            return True
+        if name.startswith(".env") and name not in (".env.example", ".env.template", ".env.sample"):
+            return True
+        for g in ignore_globs or []:
+            if fnmatch.fnmatch(name, g) or fnmatch.fnmatch(relpath, g):
+                return True
+        return False
+
+    def _walk(path: Path, depth: int) -> Dict[str, Any]:
+        nonlocal total_files, total_bytes
+        rel_dir = path.relative_to(repo_root).as_posix() if path != repo_root else "."
+        node: Dict[str, Any] = {"path": rel_dir, "type": "dir", "children": []}
+        if depth > max_depth:
+            return node
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return node
+        for entry in entries:
+            child_rel = entry.name if rel_dir == "." else f"{rel_dir}/{entry.name}"
+            if _is_ignored(entry.name, child_rel) or entry.is_symlink():
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            full = path / entry.name
+            if entry.is_dir(follow_symlinks=False):
+                node["children"].append(_walk(full, depth + 1))
+            else:
+                total_files += 1
+                total_bytes += st.st_size
+                node["children"].append({"path": full.relative_to(repo_root).as_posix(), "type": "file", "size": st.st_size})
+        return node
+
+    tree = _walk(repo_root, 0)
+    sig_items: List[str] = []
+
+    def _collect(node: Dict[str, Any]) -> None:
+        if node["type"] == "file":
+            sig_items.append(f"{node['path']}:{node.get('size', 0)}")
+        for c in node.get("children") or []:
+            _collect(c)
+
+    _collect(tree)
+    sig_items.sort()
+    signature = hashlib.sha256("\n".join(sig_items).encode("utf-8")).hexdigest()
+    return {"tree": tree, "signature": signature, "file_count": total_files, "total_bytes": total_bytes}
+
+
+def best_of(fn, repeat: int) -> tuple:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run(root: Path, args: argparse.Namespace) -> int:
+    if not any(root.iterdir()):
+        t0 = time.perf_counter()
+        n = build_tree(root, args.entries, args.fanout)
+        print(f"built {n} entries in {time.perf_counter() - t0:.1f}s")
+
+    # Warm the page cache once so both implementations see the same conditions
+    prescan_repo(root, ignore_globs=args.glob, max_nodes=None)
+
+    legacy_t, legacy = best_of(lambda: legacy_prescan(root, ignore_globs=args.glob), args.repeat)
+    new_t, new = best_of(lambda: prescan_repo(root, ignore_globs=args.glob, max_nodes=None), args.repeat)
+
+    print(f"files={new['file_count']} bytes={new['total_bytes']} globs={len(args.glob)}")
+    print(f"legacy      {legacy_t * 1000:9.1f} ms")
+    print(f"prescan_repo {new_t * 1000:8.1f} ms  ({legacy_t / new_t:.2f}x)")
+
+    if legacy["signature"] != new["signature"] or legacy["file_count"] != new["file_count"]:
+        print("ERROR: signature/file_count mismatch", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    if args.root:
+        args.root.mkdir(parents=True, exist_ok=True)
+        return run(args.root, args)
+    with tempfile.TemporaryDirectory(prefix="bench-prescan-") as tmp:
+        return run(Path(tmp), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())